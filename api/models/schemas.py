@@ -82,6 +82,61 @@ class ProductCreate(ProductBase):
 class OdooProductUpdate(ProductBase):
     pass
 
+# Resultado de cada producto en el alta/actualización masiva
+class ProductBulkResult(BaseModel):
+    index: int  # Posición en la lista enviada
+    default_code: Optional[str] = None
+    status: str  # created | updated | error
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class ProductBulkResponse(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: List[ProductBulkResult]
+
+# Informe de márgenes del catálogo (margen = % de beneficio sobre el coste)
+class MarginGroupStats(BaseModel):
+    id: Optional[int] = None
+    name: str
+    products: int
+    alerts: int
+    mean: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    p10: Optional[float] = None
+    p25: Optional[float] = None
+    p50: Optional[float] = None
+    p75: Optional[float] = None
+    p90: Optional[float] = None
+
+class MarginAlertProduct(BaseModel):
+    id: int
+    default_code: Optional[str] = None
+    name: str
+    list_price: float
+    standard_price: float
+    margin_pct: Optional[float] = None
+    category: Optional[str] = None
+    supplier: Optional[str] = None
+
+class MarginFlagsWritten(BaseModel):
+    flagged: int
+    cleared: int
+    errors: List[str] = []
+
+class MarginReport(BaseModel):
+    threshold: float
+    products: int
+    without_cost: int
+    alerts: int
+    summary: Dict[str, Optional[float]]
+    by_category: List[MarginGroupStats]
+    by_supplier: List[MarginGroupStats]
+    worst: List[MarginAlertProduct]
+    written: Optional[MarginFlagsWritten] = None
+
 # --- Fin de Modelos de Producto Refactorizados ---
 
 class InventoryItem(BaseModel):
@@ -308,6 +363,12 @@ class DashboardStats(BaseModel):
     recent_customers: Optional[List[Customer]] = []  # Clientes recientes
     recent_providers: Optional[List[Provider]] = []  # Proveedores recientes
 
+# Instantánea precalculada del dashboard: las estadísticas más su antigüedad
+class DashboardSnapshot(DashboardStats):
+    generated_at: Optional[datetime] = None  # Hora a la que se calcularon
+    stale_after: Optional[datetime] = None  # A partir de esta hora se consideran antiguas
+    stale: bool = False  # True si ya ha pasado stale_after (hay un recálculo pedido)
+
 # Modelo de categoría de producto - Basado en product.category de Odoo
 class ProductCategory(BaseModel):
     id: int
@@ -344,7 +405,10 @@ class PaginationParams(BaseModel):
     
 class PaginatedResponse(BaseModel, Generic[T]):
     data: List[T]
-    total: int
+    # En paginación por cursor total y pages son None salvo que se pida el recuento
+    total: Optional[int]
     page: int
     limit: int
-    pages: int
+    pages: Optional[int]
+    # Cursor opaco para pedir la página siguiente (None en la última o sin paginación por cursor)
+    next_cursor: Optional[str] = None
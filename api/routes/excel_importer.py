@@ -27,6 +27,35 @@ if not os.path.exists(TEMP_DIR):
 
 CHUNK_SIZE = 25  # Procesar en lotes de 50 productos
 
+def load_products_into_odoo(productos: list, proveedor_nombre: str):
+    """Crea o actualiza en Odoo los productos interpretados por la IA.
+    Proveedor y categorías se resuelven en serie (una vez por lote) y las
+    altas/actualizaciones se lanzan en paralelo sobre el pool de conexiones.
+    Devuelve la tupla (creados, fallidos).
+    """
+    created, failed = [], []
+    odoo_product_service = OdooProductService()
+
+    preparados = []
+    lookup_cache = {}
+    for idx, producto in enumerate(productos):
+        try:
+            odoo_dict = odoo_product_service.front_to_odoo_product_dict(producto, proveedor_nombre, lookup_cache)
+            preparados.append((idx, odoo_dict))
+        except Exception as e:
+            logger.error(f"Error procesando producto en Odoo: {producto.get('nombre')}, error: {e}")
+            failed.append({"idx": idx, "name": producto.get('nombre'), "error": str(e)})
+
+    resultados = odoo_product_service.upsert_products_concurrently([d for _, d in preparados])
+    for (idx, odoo_dict), resultado in zip(preparados, resultados):
+        if resultado["result"]:
+            created.append({"idx": idx, "name": odoo_dict.get("name"), "odoo_id": resultado["result"]})
+        else:
+            failed.append({"idx": idx, "name": odoo_dict.get("name"), "error": resultado["error"] or "No se pudo crear o actualizar en Odoo."})
+
+    failed.sort(key=lambda f: f["idx"])
+    return created, failed
+
 @router.post("/", response_model=dict)
 async def process_and_load_excel(
     file: UploadFile = File(...),
@@ -139,21 +168,8 @@ async def process_and_load_excel(
 
         # --- FASE 3: CARGA EN ODOO --- #
         logger.info("Fase 3: Iniciando carga de productos en Odoo.")
-        created, failed = [], []
-        odoo_product_service = OdooProductService()
-
-        for idx, producto in enumerate(all_processed_products):
-            try:
-                odoo_dict = odoo_product_service.front_to_odoo_product_dict(producto, proveedor_nombre)
-                created_product_id = odoo_product_service.create_or_update_product(odoo_dict)
-                if created_product_id:
-                    created.append({"idx": idx, "name": odoo_dict.get("name"), "odoo_id": created_product_id})
-                else:
-                    failed.append({"idx": idx, "name": odoo_dict.get("name"), "error": "No se pudo crear o actualizar en Odoo."})
-            except Exception as e:
-                logger.error(f"Error procesando producto en Odoo: {producto.get('nombre')}, error: {e}")
-                failed.append({"idx": idx, "name": producto.get('nombre'), "error": str(e)})
-
+        # Las llamadas XML-RPC son bloqueantes: se ejecutan fuera del event loop
+        created, failed = await asyncio.to_thread(load_products_into_odoo, all_processed_products, proveedor_nombre)
         logger.info(f"Fase 3: Carga en Odoo completada.")
         total_time = time.time() - start_time
 
@@ -160,18 +160,22 @@ async def process_invoice_free(
                 supplier_vat = odoo_partner_dict.get('vat')
                 
                 if supplier_name:
-                    # Buscar proveedor por NIF/VAT primero
+                    # Buscar proveedor por NIF/VAT primero y si no por nombre (aproximado: viene del OCR)
+                    match = await odoo_provider_service.match_supplier_async(
+                        name=supplier_name, vat=supplier_vat, fuzzy=True
+                    )
                     supplier_id = None
-                    if supplier_vat:
-                        vat_ids = odoo_provider_service._execute_kw('res.partner', 'search', [[['vat', '=', supplier_vat]]], {'limit': 1})
-                        if vat_ids:
-                            supplier_id = vat_ids[0]
-
-                    # Si no se encontró por VAT, buscar por nombre
-                    if not supplier_id and supplier_name:
-                        providers = odoo_provider_service.get_providers(search_term=supplier_name, limit=1)
-                        if providers:
-                            supplier_id = providers[0].id
+                    if match and match['match'] == 'fuzzy':
+                        # Solo parecido: no se modifica ese proveedor ni se le imputa la factura;
+                        # se crea el proveedor leído y se deja la coincidencia para revisar
+                        logger.warning(f"Proveedor '{supplier_name}' parecido a '{match['name']}' (ID {match['id']}); se crea aparte para revisión")
+                        response_data['supplier_review'] = {
+                            'possible_match_id': match['id'],
+                            'possible_match_name': match['name'],
+                            'similarity': match['score'],
+                        }
+                    elif match:
+                        supplier_id = match['id']
 
                     if supplier_id:
                         # Actualizar datos usando el diccionario normalizado
@@ -183,10 +187,10 @@ async def process_invoice_free(
                                 del update_vals[field]
                                 
                         if update_vals:
-                            odoo_provider_service.update_provider(supplier_id, update_vals)
+                            await odoo_provider_service.update_provider_async(supplier_id, update_vals)
                     else:
                         # Crear nuevo proveedor con el diccionario normalizado
-                        new_provider = odoo_provider_service.create_provider(odoo_partner_dict)
+                        new_provider = await odoo_provider_service.create_supplier_async(odoo_partner_dict)
                         supplier_id = new_provider.id
                     
                     # Preparar datos de la factura para Odoo
@@ -227,7 +231,7 @@ async def process_invoice_free(
                     due_date_iso = parse_date(invoice_data.due_date) if hasattr(invoice_data, 'due_date') and invoice_data.due_date else None
                     
                     # Campos obligatorios para Odoo 18
-                    invoice_result = odoo_invoice_service.create_supplier_invoice(
+                    invoice_result = await odoo_invoice_service.create_supplier_invoice_async(
                         partner_id=supplier_id,
                         invoice_number=invoice_data.invoice_number,
                         invoice_date=invoice_date_iso,
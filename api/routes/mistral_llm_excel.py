@@ -7,6 +7,7 @@ import tempfile
 import os
 import logging
 import time
+import asyncio
 from ..utils.config import config
 from ..models.schemas import User
 from ..services.auth_service import get_current_active_user
@@ -23,6 +24,79 @@ router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
+def cargar_productos_en_odoo(productos_validos: list, proveedor_nombre: str):
+    """Crea o actualiza en Odoo los productos validados.
+    Proveedor y categorías se resuelven en serie; las altas/actualizaciones se
+    ejecutan en paralelo con concurrencia acotada. Devuelve (creados, fallidos).
+    """
+    creados = []
+    fallidos = []
+    odoo_product_service = OdooProductService()
+    preparados = []
+    lookup_cache = {}
+
+    for idx, producto in enumerate(productos_validos):
+        try:
+            # Log para depuración
+            logger.info(f"Procesando producto {idx}: {producto.get('nombre', 'Sin nombre')}")
+            
+            # Construir el diccionario de valores para Odoo usando la utilidad centralizada
+            product_vals = odoo_product_service.front_to_odoo_product_dict(producto, proveedor_nombre, lookup_cache)
+            
+            # Log para depuración
+            logger.info(f"Valores preparados para Odoo: {product_vals}")
+
+            # Asegurar campos mínimos obligatorios
+            if 'name' not in product_vals or not product_vals['name']:
+                product_vals['name'] = producto.get('nombre', 'Producto sin nombre')
+            if 'default_code' not in product_vals or not product_vals['default_code']:
+                product_vals['default_code'] = producto.get('codigo', f"SIN_CODIGO_{idx}")
+
+            # Valores numéricos seguros
+            try:
+                product_vals['list_price'] = float(producto.get('precio_venta', 0.0) or 0.0)
+            except (ValueError, TypeError):
+                product_vals['list_price'] = 0.0
+                
+            try:
+                product_vals['standard_price'] = float(producto.get('precio_coste', 0.0) or 0.0)
+            except (ValueError, TypeError):
+                product_vals['standard_price'] = 0.0
+
+            preparados.append((idx, producto, product_vals, product_vals.get('default_code', 'Sin código')))
+        except Exception as e:
+            logger.error(f"Error al crear producto {producto.get('nombre', 'Sin nombre')}: {e}", exc_info=True)
+            fallidos.append({
+                'idx': idx,
+                'name': producto.get('nombre', 'Sin nombre'),
+                'error': str(e),
+                'default_code': producto.get('codigo', f"SIN_CODIGO_{idx}")
+            })
+
+    # Crear o actualizar productos en Odoo (en paralelo)
+    resultados = odoo_product_service.upsert_products_concurrently([p[2] for p in preparados])
+    for (idx, producto, product_vals, default_code), resultado in zip(preparados, resultados):
+        product_id = resultado["result"]
+        if product_id:
+            logger.info(f"Producto creado/actualizado con éxito: ID {product_id}")
+            creados.append({
+                'idx': idx,
+                'name': producto.get('nombre', product_vals.get('name', 'Sin nombre')),
+                'id': product_id,
+                'default_code': default_code
+            })
+        else:
+            logger.error(f"No se pudo crear/actualizar el producto '{producto.get('nombre')}' en Odoo")
+            fallidos.append({
+                'idx': idx,
+                'name': producto.get('nombre', product_vals.get('name', 'Sin nombre')),
+                'error': resultado["error"] or 'No se pudo crear en Odoo',
+                'default_code': default_code
+            })
+
+    fallidos.sort(key=lambda f: f['idx'])
+    return creados, fallidos
+
 # Utilidad para convertir Excel a texto plano (todas las hojas)
 def excel_to_full_text(file_path: str, start_row: int = 0, chunk_size: int = 50, only_first_sheet: bool = True) -> str:
     xls = pd.ExcelFile(file_path)
@@ -212,65 +286,7 @@ async def process_excel_file(
 
         logger.info(f"[PERF] Iniciando creación de productos en Odoo...")
         t_before_odoo = time.time()
-        creados = []
-        fallidos = []
-        odoo_product_service = OdooProductService()
-        
-        for idx, producto in enumerate(productos_validos):
-            try:
-                # Log para depuración
-                logger.info(f"Procesando producto {idx}: {producto.get('nombre', 'Sin nombre')}")
-                
-                # Construir el diccionario de valores para Odoo usando la utilidad centralizada
-                product_vals = odoo_product_service.front_to_odoo_product_dict(producto, proveedor_nombre)
-                
-                # Log para depuración
-                logger.info(f"Valores preparados para Odoo: {product_vals}")
-
-                # Asegurar campos mínimos obligatorios
-                if 'name' not in product_vals or not product_vals['name']:
-                    product_vals['name'] = producto.get('nombre', 'Producto sin nombre')
-                if 'default_code' not in product_vals or not product_vals['default_code']:
-                    product_vals['default_code'] = producto.get('codigo', f"SIN_CODIGO_{idx}")
-
-                # Valores numéricos seguros
-                try:
-                    product_vals['list_price'] = float(producto.get('precio_venta', 0.0) or 0.0)
-                except (ValueError, TypeError):
-                    product_vals['list_price'] = 0.0
-                    
-                try:
-                    product_vals['standard_price'] = float(producto.get('precio_coste', 0.0) or 0.0)
-                except (ValueError, TypeError):
-                    product_vals['standard_price'] = 0.0
-                
-                # Crear o actualizar producto en Odoo
-                product_id = odoo_product_service.create_or_update_product(product_vals)
-                
-                if product_id:
-                    logger.info(f"Producto creado/actualizado con éxito: ID {product_id}")
-                    creados.append({
-                        'idx': idx,
-                        'name': producto.get('nombre', product_vals.get('name', 'Sin nombre')),
-                        'id': product_id,
-                        'default_code': product_vals.get('default_code', 'Sin código')
-                    })
-                else:
-                    logger.error(f"No se pudo crear/actualizar el producto '{producto.get('nombre')}' en Odoo")
-                    fallidos.append({
-                        'idx': idx,
-                        'name': producto.get('nombre', product_vals.get('name', 'Sin nombre')),
-                        'error': 'No se pudo crear en Odoo',
-                        'default_code': product_vals.get('default_code', 'Sin código')
-                    })
-            except Exception as e:
-                logger.error(f"Error al crear producto {producto.get('nombre', 'Sin nombre')}: {e}", exc_info=True)
-                fallidos.append({
-                    'idx': idx,
-                    'name': producto.get('nombre', 'Sin nombre'),
-                    'error': str(e),
-                    'default_code': producto.get('codigo', f"SIN_CODIGO_{idx}")
-                })
+        creados, fallidos = await asyncio.to_thread(cargar_productos_en_odoo, productos_validos, proveedor_nombre)
         t_after_odoo = time.time()
         logger.info(f"[PERF] Creación de productos en Odoo completada en {t_after_odoo - t_before_odoo:.2f} segundos.")
         logger.info(f"[MISTRAL LLM EXCEL] Productos creados: {len(creados)}, fallidos: {len(fallidos)}")
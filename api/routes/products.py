@@ -1,9 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List, Optional, Dict
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Iterator, List, Optional, Dict
+import csv
+import io
+import itertools
+import json
 
-from ..models.schemas import Product, User, PaginatedResponse, ProductCreate, OdooProductUpdate
+from ..models.schemas import Product, User, PaginatedResponse, ProductCreate, OdooProductUpdate, ProductBulkResponse, MarginReport
 from ..services.auth_service import get_current_active_user
 from ..services.odoo_product_service import OdooProductService
+from ..utils.conditional import is_not_modified, not_modified_response, validator_headers
+from ..utils.config import config
+from ..utils.sparse_fields import parse_fields
 
 router = APIRouter(prefix="/api/v1", tags=["products"])
 
@@ -15,8 +25,20 @@ def get_product_service():
     service.initialize_custom_fields()
     return service
 
+
+def _paginated(requested: Optional[List[str]], response: Response, headers: Dict[str, str], **page):
+    """Respuesta paginada; con ``fields=`` se serializa tal cual (solo las claves pedidas)
+    en lugar de pasar por el modelo Product, que completaría el resto con sus valores por defecto"""
+    result = PaginatedResponse(**page)
+    if requested is None:
+        response.headers.update(headers)
+        return result
+    return JSONResponse(content=jsonable_encoder(result), headers=headers)
+
 @router.get("/products", response_model=PaginatedResponse[Product])
 async def get_products(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=1000), # Límite aumentado para pruebas
     sort_by: Optional[str] = Query('id', description="Campo por el que ordenar"),
@@ -24,26 +46,150 @@ async def get_products(
     search: Optional[str] = Query(None, description="Término de búsqueda en nombre y código"),
     category: Optional[str] = Query(None, description="Filtrar por nombre de categoría"),
     include_inactive: bool = Query(False, description="Incluir productos inactivos (archivados)"),
+    cursor: Optional[str] = Query(None, description="Cursor next_cursor de la respuesta anterior (paginación por cursor)"),
+    after_id: Optional[int] = Query(None, ge=0, description="Paginación por cursor ordenando por id: productos con id posterior (0 = primera página)"),
+    with_count: bool = Query(False, description="En paginación por cursor, calcular también el total"),
+    fields: Optional[str] = Query(None, description="Claves de cada producto separadas por comas (p. ej. id,name,price); por defecto todas"),
     current_user: User = Depends(get_current_active_user),
     product_service: OdooProductService = Depends(get_product_service)
 ):
-    """Obtiene lista paginada de productos REALES de Odoo"""
+    """Obtiene lista paginada de productos REALES de Odoo.
+    Con ``cursor`` o ``after_id`` se usa paginación por cursor: coste constante en
+    páginas profundas y sin recuento salvo ``with_count=true``.
+    Con ``fields`` solo se leen de Odoo y se devuelven las claves pedidas.
+    Lleva ETag / Last-Modified (registros y write_date máximo del filtro, y de stock.quant
+    si la respuesta incluye el stock): con un
+    ``If-None-Match`` que coincide se responde 304 sin leer la página.
+    """
     import logging
     logger = logging.getLogger("api.routes.products")
     logger.info(f"Llamada a /products page={page} size={size} search={search} category={category}")
-    products, total = product_service.get_paginated_products(
+    try:
+        requested = parse_fields(fields, OdooProductService.LIST_FIELD_SOURCES)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {}
+    version = await product_service.get_products_version_async(
+        search, category, include_inactive, sort_by=sort_by, keyset=cursor is not None or after_id is not None,
+        with_stock=requested is None or 'stock' in requested
+    )
+    if version is not None:
+        headers = validator_headers(request, *version)
+        if is_not_modified(request, headers["ETag"]):
+            return not_modified_response(headers)
+    if cursor is not None or after_id is not None:
+        try:
+            products, next_cursor, total = await product_service.get_products_after_async(
+                cursor=cursor,
+                after_id=after_id,
+                limit=size,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                search=search,
+                category=category,
+                include_inactive=include_inactive,
+                with_count=with_count,
+                fields=requested
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        pages = (total + size - 1) // size if total is not None else None
+        return _paginated(requested, response, headers, data=products, total=total, page=page, limit=size, pages=pages, next_cursor=next_cursor)
+    products, total = await product_service.get_paginated_products_async(
         page=page, 
         limit=size, 
         sort_by=sort_by, 
         sort_order=sort_order,
         search=search,
         category=category,
-        include_inactive=include_inactive
+        include_inactive=include_inactive,
+        fields=requested
     )
     logger.info(f"Respuesta de get_paginated_products: {len(products)} productos, total={total}")
     pages = (total + size - 1) // size if size else 1
     logger.info(f"Paginas calculadas: {pages}")
-    return PaginatedResponse(data=products, total=total, page=page, limit=size, pages=pages)
+    return _paginated(requested, response, headers, data=products, total=total, page=page, limit=size, pages=pages)
+
+# Columnas de la exportación CSV (mismo orden que get_all_products)
+EXPORT_COLUMNS = ['id', 'name', 'default_code', 'list_price', 'standard_price', 'categ_id', 'category', 'active', 'type', 'barcode']
+
+
+def _csv_value(column: str, value):
+    # Odoo devuelve False en los campos vacíos; solo 'active' es booleano de verdad
+    if value is None or (value is False and column != 'active'):
+        return ''
+    return value
+
+
+def _ndjson_lines(chunks: Iterator[List[Dict]]) -> Iterator[str]:
+    for chunk in chunks:
+        yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in chunk)
+
+
+def _csv_lines(chunks: Iterator[List[Dict]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for chunk in chunks:
+        for row in chunk:
+            writer.writerow([_csv_value(col, row.get(col)) for col in EXPORT_COLUMNS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+# Declarada antes de /products/{product_id} para que "export" no se interprete como un ID
+@router.get("/products/export")
+async def export_products(
+    format: str = Query('ndjson', pattern='^(ndjson|csv)$', description="ndjson o csv"),
+    include_inactive: bool = Query(False, description="Incluir productos inactivos (archivados)"),
+    chunk_size: int = Query(config.ODOO_EXPORT_CHUNK_SIZE, ge=100, le=5000, description="Productos por bloque leído de Odoo"),
+    current_user: User = Depends(get_current_active_user),
+    product_service: OdooProductService = Depends(get_product_service)
+):
+    """Exporta el catálogo completo en streaming (NDJSON o CSV).
+    Los productos se leen de Odoo por bloques ordenados por ID y se envían al
+    cliente según llegan, sin cargar todo el catálogo en memoria.
+    """
+    chunks = product_service.iter_product_chunks(chunk_size=chunk_size, include_inactive=include_inactive)
+    # El primer bloque se lee antes de responder: si Odoo no está disponible, 503 en lugar de un fichero vacío
+    first = await run_in_threadpool(next, chunks, None)
+    all_chunks = itertools.chain([first] if first is not None else [], chunks)
+    if format == 'csv':
+        body, media_type = _csv_lines(all_chunks), "text/csv; charset=utf-8"
+    else:
+        body, media_type = _ndjson_lines(all_chunks), "application/x-ndjson"
+    filename = f"productos.{format}"
+    return StreamingResponse(body, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    })
+
+
+@router.get("/products/margins", response_model=MarginReport)
+async def get_margin_report(
+    threshold: Optional[float] = Query(None, description="Margen mínimo (% sobre el coste); por defecto MARGIN_ALERT_THRESHOLD"),
+    include_inactive: bool = Query(False, description="Incluir productos inactivos (archivados)"),
+    top: int = Query(20, ge=0, le=500, description="Productos con peor margen que se devuelven"),
+    current_user: User = Depends(get_current_active_user),
+    product_service: OdooProductService = Depends(get_product_service)
+):
+    """Informe de márgenes de todo el catálogo: resumen, percentiles por categoría y
+    proveedor y productos con alerta (margen por debajo del umbral)"""
+    return await product_service.get_margin_report_async(threshold, include_inactive, top=top)
+
+
+@router.post("/products/margins/alerts", response_model=MarginReport)
+async def write_margin_alerts(
+    threshold: Optional[float] = Query(None, description="Margen mínimo (% sobre el coste); por defecto MARGIN_ALERT_THRESHOLD"),
+    include_inactive: bool = Query(False, description="Incluir productos inactivos (archivados)"),
+    top: int = Query(20, ge=0, le=500, description="Productos con peor margen que se devuelven"),
+    current_user: User = Depends(get_current_active_user),
+    product_service: OdooProductService = Depends(get_product_service)
+):
+    """Calcula el informe de márgenes y escribe x_alerta_margen en Odoo
+    (solo los productos cuyo indicador cambia, en writes agrupados)"""
+    return await product_service.get_margin_report_async(threshold, include_inactive, write_flags=True, top=top)
+
 
 @router.get("/products/{product_id}", response_model=Product)
 async def get_product(
@@ -52,7 +198,7 @@ async def get_product(
     product_service: OdooProductService = Depends(get_product_service)
 ):
     """Obtiene un producto específico por ID"""
-    product = product_service.get_product_by_id(product_id)
+    product = await product_service.get_product_by_id_async(product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Producto no encontrado")
     return product
@@ -65,9 +211,28 @@ async def create_product(
 ):
     """Crea un nuevo producto en Odoo (real)"""
     # El servicio ya maneja la lógica de creación y las excepciones
-    created_product_dict = product_service.create_product(product_data)
+    created_product_dict = await product_service.create_product_async(product_data)
     return created_product_dict
 
+@router.post("/products/bulk", response_model=ProductBulkResponse)
+async def bulk_upsert_products(
+    products: List[ProductCreate],
+    current_user: User = Depends(get_current_active_user),
+    product_service: OdooProductService = Depends(get_product_service)
+):
+    """Crea o actualiza (por default_code) muchos productos de una vez, p. ej. una tarifa.
+    Devuelve el resultado de cada producto en el orden recibido."""
+    if not products:
+        raise HTTPException(status_code=400, detail="La lista de productos está vacía")
+    results = await product_service.bulk_upsert_products_async(products)
+    statuses = [r['status'] for r in results]
+    return ProductBulkResponse(
+        created=statuses.count('created'),
+        updated=statuses.count('updated'),
+        failed=statuses.count('error'),
+        results=results,
+    )
+
 @router.put("/products/{product_id}", response_model=Product)
 async def update_product(
     product_id: int,
@@ -81,7 +246,7 @@ async def update_product(
     if not update_dict:
         raise HTTPException(status_code=400, detail="No se proporcionaron datos para actualizar")
 
-    updated_product = product_service.update_product(product_id, update_dict)
+    updated_product = await product_service.update_product_async(product_id, update_dict)
     if not updated_product:
         # El servicio ya loguea el error, aquí solo informamos al cliente
         raise HTTPException(status_code=404, detail=f"No se pudo actualizar el producto {product_id}. Puede que no exista o haya un error en Odoo.")
@@ -94,7 +259,7 @@ async def delete_product(
     product_service: OdooProductService = Depends(get_product_service)
 ):
     """Archiva (desactiva) un producto en Odoo (real)"""
-    success = product_service.archive_product(product_id)
+    success = await product_service.archive_product_async(product_id)
     if not success:
         raise HTTPException(status_code=404, detail=f"No se pudo archivar el producto {product_id}. Puede que no exista o ya esté archivado.")
     # No se devuelve contenido en un 204
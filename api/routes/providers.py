@@ -1,31 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from ..models.schemas import Provider, ProviderCreate, ProviderUpdate, User, PaginatedResponse
 from typing import List
 
+from ..services.odoo_provider_service import OdooProviderService
+from ..utils.conditional import is_not_modified, not_modified_response, validator_headers
+from ..utils.sparse_fields import parse_fields
+
 from ..services.auth_service import get_current_active_user
 from ..services.odoo_service import odoo_service
+from ..services.odoo_resilience import OdooUnavailableError
 
 router = APIRouter(prefix="/api/v1", tags=["providers"])
 
 @router.get("/providers", response_model=PaginatedResponse[Provider])
 async def get_providers(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
     search: str | None = Query(None),
+    fields: str | None = Query(None, description="Claves de cada proveedor separadas por comas (p. ej. id,name,vat); por defecto todas"),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Obtiene lista paginada de proveedores"""
+    """Obtiene lista paginada de proveedores (con ETag: 304 si no ha cambiado nada)"""
+    try:
+        requested = parse_fields(fields, OdooProviderService.PROVIDER_FIELD_SOURCES)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     try:
         import logging
         logger = logging.getLogger("api.routes.providers")
         logger.info(f"Llamada a /providers page={page} size={size} search={search}")
         logger.info(f"Llamada a /providers page={page} size={size}")
-        providers, total = odoo_service.get_paginated_providers(page=page, limit=size, search_term=search)
+        headers = {}
+        version = await odoo_service.get_providers_version_async(search)
+        if version is not None:
+            headers = validator_headers(request, *version)
+            if is_not_modified(request, headers["ETag"]):
+                return not_modified_response(headers)
+        providers, total = await odoo_service.get_paginated_providers_async(page=page, limit=size, search_term=search, fields=requested)
         logger.info(f"Respuesta de get_paginated_providers: {len(providers)} proveedores, total={total}")
         # Calcular páginas
         pages = (total + size - 1) // size if size else 1
         logger.info(f"Paginas calculadas: {pages}")
-        return PaginatedResponse(data=providers, total=total, page=page, limit=size, pages=pages)
+        result = PaginatedResponse(data=providers, total=total, page=page, limit=size, pages=pages)
+        if requested is not None:
+            # Solo las claves pedidas: sin pasar por el modelo Provider
+            return JSONResponse(content=jsonable_encoder(result), headers=headers)
+        response.headers.update(headers)
+        return result
+    except OdooUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -35,7 +62,9 @@ async def get_all_providers(
 ):
     """Obtiene todos los proveedores sin paginación"""
     try:
-        return odoo_service.get_providers()
+        return await odoo_service.get_providers_async()
+    except OdooUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -46,10 +75,12 @@ async def get_provider(
 ):
     """Obtiene un proveedor específico por ID"""
     try:
-        provider = odoo_service.get_provider_by_id(provider_id)
+        provider = await odoo_service.get_provider_by_id_async(provider_id)
         if provider is None:
             raise HTTPException(status_code=404, detail="Provider not found")
         return provider
+    except OdooUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -61,15 +92,17 @@ async def create_provider(
     """Crea un nuevo proveedor REAL en Odoo 18 (campos español/inglés, robusto)"""
     import logging
     try:
-        created_provider_id = odoo_service.create_provider(provider.dict())
+        created_provider_id = await odoo_service.create_provider_async(provider.dict())
         if not created_provider_id:
             raise HTTPException(status_code=400, detail="Failed to create provider in Odoo")
         
-        new_provider = odoo_service.get_provider_by_id(created_provider_id)
+        new_provider = await odoo_service.get_provider_by_id_async(created_provider_id)
         if not new_provider:
              raise HTTPException(status_code=404, detail="Could not retrieve newly created provider.")
 
         return new_provider
+    except OdooUnavailableError:
+        raise
     except Exception as e:
         logging.error(f"Error al crear proveedor: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -83,15 +116,17 @@ async def update_provider(
     """Actualiza un proveedor existente en Odoo (real, flexible y robusto)"""
     import logging
     try:
-        success = odoo_service.update_provider(provider_id, provider.dict(exclude_unset=True))
+        success = await odoo_service.update_provider_async(provider_id, provider.dict(exclude_unset=True))
         if not success:
             raise HTTPException(status_code=400, detail="Failed to update provider in Odoo")
         
-        updated_provider = odoo_service.get_provider_by_id(provider_id)
+        updated_provider = await odoo_service.get_provider_by_id_async(provider_id)
         if not updated_provider:
             raise HTTPException(status_code=404, detail="Could not retrieve updated provider.")
 
         return updated_provider
+    except OdooUnavailableError:
+        raise
     except Exception as e:
         logging.error(f"Error al actualizar proveedor {provider_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,194 @@
+"""Instantánea precalculada del dashboard.
+
+Las estadísticas del dashboard (cifras, categorías principales, ventas recientes
+y stock bajo) se calculan en un hilo cada ``DASHBOARD_REFRESH_INTERVAL``
+segundos y se guardan en memoria (y en disco si se indica
+``DASHBOARD_SNAPSHOT_PATH``, para no empezar en vacío tras un reinicio). Las
+peticiones reciben la última instantánea al momento, con la hora a la que se
+calculó y ``stale_after``: a partir de esa hora la instantánea se sirve igual
+pero marcada como antigua y se pide un recálculo en segundo plano.
+
+Los recálculos se agrupan: si llegan varias peticiones mientras uno está en
+curso, todas esperan a ese mismo cálculo en lugar de lanzar otro contra Odoo.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from ..models.schemas import DashboardSnapshot, DashboardStats
+from ..utils.config import config
+
+logger = logging.getLogger("dashboard_snapshot")
+
+
+class DashboardSnapshotStore:
+    """Última instantánea del dashboard de un Odoo (url, db) y su hilo de recálculo"""
+
+    def __init__(self, service, stale_after: float, path: Optional[str] = None):
+        self.service = service
+        self.stale_after = stale_after
+        self.path = path or None
+        self._lock = threading.Lock()
+        self._stats: Optional[DashboardStats] = None
+        self._generated_at: Optional[float] = None
+        # Recálculo en curso: las peticiones que llegan mientras tanto esperan a este
+        self._inflight: Optional[Future] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._load()
+
+    # --- disco ---
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            self._stats = DashboardStats.model_validate(data['stats'])
+            self._generated_at = float(data['generated_at'])
+            logger.info(f"Instantánea del dashboard cargada de {self.path}")
+        except Exception as e:
+            logger.warning(f"No se pudo cargar la instantánea del dashboard de {self.path}: {e}")
+
+    def _save(self, stats: DashboardStats, generated_at: float) -> None:
+        if not self.path:
+            return
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'generated_at': generated_at, 'stats': stats.model_dump(mode='json')}, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"No se pudo guardar la instantánea del dashboard en {self.path}: {e}")
+
+    # --- recálculo ---
+
+    def refresh(self) -> Tuple[DashboardStats, float]:
+        """Recalcula la instantánea y la devuelve con su hora. Si ya hay un recálculo
+        en curso se espera a ese en lugar de lanzar otro. Los errores se propagan
+        a todos los que esperan y la instantánea anterior se conserva."""
+        with self._lock:
+            future = self._inflight
+            owner = future is None
+            if owner:
+                future = self._inflight = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            started = time.time()
+            stats = self.service.get_dashboard_stats()
+            with self._lock:
+                self._stats, self._generated_at = stats, started
+            self._save(stats, started)
+            logger.info(f"Instantánea del dashboard recalculada en {time.time() - started:.2f}s")
+            future.set_result((stats, started))
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight = None
+        return stats, started
+
+    def request_refresh(self) -> None:
+        """Pide un recálculo al hilo en segundo plano (o lanza uno suelto si no hay hilo)"""
+        if self._thread and self._thread.is_alive():
+            self._wake.set()
+            return
+        with self._lock:
+            if self._inflight is not None:
+                return
+        threading.Thread(target=self._refresh_quietly, name="dashboard-snapshot-refresh", daemon=True).start()
+
+    def _refresh_quietly(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(f"Error recalculando la instantánea del dashboard: {e}")
+
+    # --- lectura ---
+
+    def is_stale(self) -> bool:
+        with self._lock:
+            generated_at = self._generated_at
+        return generated_at is None or time.time() - generated_at > self.stale_after
+
+    def get(self) -> DashboardSnapshot:
+        """Última instantánea sin esperar a Odoo. Solo se calcula en la petición si
+        aún no hay ninguna; si ha caducado se sirve y se pide un recálculo."""
+        with self._lock:
+            stats, generated_at = self._stats, self._generated_at
+        if stats is None:
+            stats, generated_at = self.refresh()
+        elif self.is_stale():
+            self.request_refresh()
+        return self._envelope(stats, generated_at)
+
+    def get_fresh(self) -> DashboardSnapshot:
+        """Recalcula ahora (agrupado con los recálculos en curso) y devuelve el resultado"""
+        return self._envelope(*self.refresh())
+
+    def _envelope(self, stats: DashboardStats, generated_at: float) -> DashboardSnapshot:
+        stale_after = generated_at + self.stale_after
+        return DashboardSnapshot(
+            **stats.model_dump(),
+            generated_at=datetime.fromtimestamp(generated_at),
+            stale_after=datetime.fromtimestamp(stale_after),
+            stale=time.time() > stale_after,
+        )
+
+    # --- hilo de recálculo ---
+
+    def start(self, interval: float) -> None:
+        """Arranca el hilo que recalcula cada ``interval`` segundos (o antes, si se pide)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                self._refresh_quietly()
+                self._wake.wait(interval)
+                self._wake.clear()
+
+        self._thread = threading.Thread(target=run, name="dashboard-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+_snapshots: Dict[Tuple[str, str], DashboardSnapshotStore] = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_dashboard_snapshot(service) -> DashboardSnapshotStore:
+    """Instantánea del Odoo (url, db) del servicio de dashboard"""
+    key = (service._url, service._db)
+    with _snapshots_lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is None:
+            snapshot = DashboardSnapshotStore(service, config.DASHBOARD_STALE_AFTER, config.DASHBOARD_SNAPSHOT_PATH)
+            _snapshots[key] = snapshot
+        return snapshot
+
+
+def close_dashboard_snapshots() -> None:
+    """Detiene los hilos y olvida las instantáneas (al apagar la aplicación o en tests)"""
+    with _snapshots_lock:
+        snapshots = list(_snapshots.values())
+        _snapshots.clear()
+    for snapshot in snapshots:
+        snapshot.stop()
@@ -36,23 +36,24 @@ class InvoiceImportService:
         from .odoo_product_service import odoo_product_service  # lazy import to avoid cycles
         product_ids = []
         order_lines_odoo = []
+        products_vals = []
         for l in core.lines:
-            product_vals = {
+            products_vals.append({
                 "name": l.description[:60],
                 "default_code": l.code,
                 "type": "consu",
                 "uom_id": 1,
                 "uom_po_id": 1,
-                "name": l.description[:60],
-                "default_code": l.code,
                 "list_price": l.price_unit,
                 "standard_price": l.price_unit,
-                "type": "consu",
                 "purchase_ok": True,
                 "sale_ok": False,
                 #"categ_id": None,
-            }
-            prod_id = odoo_product_service.create_or_update_product(product_vals)
+            })
+        # Las líneas son independientes: se dan de alta en paralelo y se recogen en orden
+        upserts = odoo_product_service.upsert_products_concurrently(products_vals)
+        for l, upsert in zip(core.lines, upserts):
+            prod_id = upsert["result"]
             if prod_id:
                 product_ids.append(prod_id)
                 order_lines_odoo.append((0, 0, {
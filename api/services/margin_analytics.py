@@ -0,0 +1,210 @@
+"""Análisis de márgenes de todo el catálogo con pandas/NumPy.
+
+El catálogo se lee por bloques (paginación por clave, como la exportación):
+por cada bloque un ``search_read`` de product.template y otro de
+product.supplierinfo para el proveedor principal. Los precios se cargan en un
+DataFrame y el margen, las alertas y los percentiles por categoría y por
+proveedor se calculan de forma vectorizada, sin recorrer producto a producto.
+
+El margen es el mismo que muestra el listado (``x_margen_calculado``): beneficio
+sobre el coste, ``(list_price - standard_price) / standard_price * 100``. Los
+productos sin coste no tienen margen ni alerta.
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..utils.config import config
+
+logger = logging.getLogger("margin_analytics")
+
+_TEMPLATE_FIELDS = ['id', 'name', 'default_code', 'list_price', 'standard_price', 'categ_id']
+_PERCENTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+_ALERT_FIELD = 'x_alerta_margen'
+NO_CATEGORY = 'Sin categoría'
+NO_SUPPLIER = 'Sin proveedor'
+
+
+def _many2one(value):
+    """(id, nombre) de un many2one de search_read"""
+    if isinstance(value, (list, tuple)) and value:
+        return value[0], (value[1] if len(value) > 1 else None)
+    return (value or None), None
+
+
+def load_margin_frame(service, include_inactive: bool = False, chunk_size: Optional[int] = None) -> pd.DataFrame:
+    """DataFrame con id, referencia, nombre, precios, categoría y proveedor principal
+    de todo el catálogo (y ``x_alerta_margen`` si el campo existe). Los errores de
+    Odoo se propagan: un informe sobre un catálogo incompleto sería engañoso."""
+    chunk_size = chunk_size or config.ODOO_EXPORT_CHUNK_SIZE
+    fields = list(_TEMPLATE_FIELDS)
+    has_flag = _ALERT_FIELD in service.get_model_fields('product.template')
+    if has_flag:
+        fields.append(_ALERT_FIELD)
+    domain = [] if include_inactive else [('active', '=', True)]
+    context = {'active_test': False} if include_inactive else {}
+
+    columns: Dict[str, List[Any]] = {name: [] for name in
+                                     ('id', 'default_code', 'name', 'list_price', 'standard_price',
+                                      'category_id', 'category', 'supplier_id', 'supplier')}
+    if has_flag:
+        columns[_ALERT_FIELD] = []
+    last_id = 0
+    while True:
+        products = service._call_kw(
+            'product.template', 'search_read',
+            [domain + [('id', '>', last_id)]],
+            {'fields': fields, 'order': 'id asc', 'limit': chunk_size, 'context': context}
+        )
+        if not products:
+            break
+        last_id = products[-1]['id']
+        # Proveedor principal (primero en el orden del modelo) de todo el bloque
+        sellers = service._call_kw(
+            'product.supplierinfo', 'search_read',
+            [[('product_tmpl_id', 'in', [p['id'] for p in products])]],
+            {'fields': ['product_tmpl_id', 'partner_id']}
+        ) or []
+        first_seller: Dict[int, Any] = {}
+        for seller in sellers:
+            first_seller.setdefault(_many2one(seller.get('product_tmpl_id'))[0], seller.get('partner_id'))
+        for product in products:
+            category_id, category = _many2one(product.get('categ_id'))
+            supplier_id, supplier = _many2one(first_seller.get(product['id']))
+            columns['id'].append(product['id'])
+            columns['default_code'].append(product.get('default_code') or None)
+            columns['name'].append(product.get('name') or '')
+            columns['list_price'].append(product.get('list_price') or 0.0)
+            columns['standard_price'].append(product.get('standard_price') or 0.0)
+            columns['category_id'].append(category_id)
+            columns['category'].append(category or NO_CATEGORY)
+            columns['supplier_id'].append(supplier_id)
+            columns['supplier'].append(supplier or NO_SUPPLIER)
+            if has_flag:
+                columns[_ALERT_FIELD].append(bool(product.get(_ALERT_FIELD)))
+        if len(products) < chunk_size:
+            break
+
+    frame = pd.DataFrame(columns)
+    frame['list_price'] = frame['list_price'].astype(float)
+    frame['standard_price'] = frame['standard_price'].astype(float)
+    logger.info(f"Catálogo cargado para el análisis de márgenes: {len(frame)} productos")
+    return frame
+
+
+def compute_margins(frame: pd.DataFrame, threshold: float) -> pd.DataFrame:
+    """Añade ``margin_pct`` (NaN sin coste) y ``alert`` (margen por debajo de ``threshold``)"""
+    price = frame['list_price'].to_numpy(dtype=float)
+    cost = frame['standard_price'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        margin = np.where(cost > 0, (price - cost) / cost * 100.0, np.nan)
+    # Sin redondear: percentiles y medias se redondean solo al presentarlos
+    frame['margin_pct'] = margin
+    # NaN < umbral es False: sin coste no hay alerta
+    frame['alert'] = margin < threshold
+    return frame
+
+
+def _round(value) -> Optional[float]:
+    return None if value is None or pd.isna(value) else round(float(value), 2)
+
+
+def margin_percentiles(frame: pd.DataFrame, by: str, id_column: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Estadísticas del margen por grupo (``category`` o ``supplier``), peor mediana primero"""
+    valid = frame[frame['margin_pct'].notna()]
+    if valid.empty:
+        return []
+    grouped = valid.groupby(by, sort=False)
+    margins = grouped['margin_pct']
+    stats = pd.DataFrame({
+        'products': margins.size(),
+        'alerts': grouped['alert'].sum(),
+        'mean': margins.mean(),
+        'min': margins.min(),
+        'max': margins.max(),
+    })
+    quantiles = margins.quantile(list(_PERCENTILES)).unstack()
+    for q in _PERCENTILES:
+        stats[f'p{int(q * 100)}'] = quantiles[q]
+    if id_column:
+        stats['id'] = grouped[id_column].first()
+    stats = stats.sort_values(['p50', 'products'], ascending=[True, False])
+
+    rows = []
+    for name, row in stats.iterrows():
+        item = {'name': name, 'products': int(row['products']), 'alerts': int(row['alerts'])}
+        if id_column:
+            item['id'] = None if pd.isna(row['id']) else int(row['id'])
+        for key in ['mean', 'min', 'max'] + [f'p{int(q * 100)}' for q in _PERCENTILES]:
+            item[key] = _round(row[key])
+        rows.append(item)
+    return rows
+
+
+def write_alert_flags(service, frame: pd.DataFrame, chunk_size: Optional[int] = None) -> Dict[str, Any]:
+    """Escribe ``x_alerta_margen`` en Odoo: un ``write`` por bloque de IDs con el mismo
+    valor y solo para los productos cuyo indicador cambia."""
+    service.initialize_custom_fields()
+    if _ALERT_FIELD not in service.get_model_fields('product.template'):
+        return {'flagged': 0, 'cleared': 0, 'errors': [f"El campo {_ALERT_FIELD} no existe en product.template"]}
+
+    chunk_size = chunk_size or config.ODOO_EXPORT_CHUNK_SIZE
+    alert = frame['alert'].to_numpy(dtype=bool)
+    current = frame[_ALERT_FIELD].to_numpy(dtype=bool) if _ALERT_FIELD in frame else np.zeros(len(frame), dtype=bool)
+    ids = frame['id'].to_numpy()
+    # Si el campo se acaba de crear no se ha leído: todos los productos lo tienen a False
+    to_flag = ids[alert & ~current].tolist()
+    to_clear = ids[~alert & current].tolist()
+
+    calls, sizes = [], []
+    for flag, targets in ((True, to_flag), (False, to_clear)):
+        for start in range(0, len(targets), chunk_size):
+            chunk = targets[start:start + chunk_size]
+            calls.append(('product.template', 'write', [chunk, {_ALERT_FIELD: flag}]))
+            sizes.append((flag, len(chunk)))
+    written = {True: 0, False: 0}
+    errors = []
+    for (flag, size), result in zip(sizes, service.execute_batch(calls)):
+        if result['error']:
+            errors.append(result['error'])
+        else:
+            written[flag] += size
+    logger.info(f"Alertas de margen escritas: {written[True]} marcadas, {written[False]} desmarcadas")
+    return {'flagged': written[True], 'cleared': written[False], 'errors': errors}
+
+
+def margin_report(service, threshold: Optional[float] = None, include_inactive: bool = False,
+                  write_flags: bool = False, top: int = 20) -> Dict[str, Any]:
+    """Informe completo: resumen, percentiles por categoría y proveedor, los ``top``
+    productos con peor margen entre los que tienen alerta y, con ``write_flags``,
+    el resultado de escribir las alertas en Odoo."""
+    threshold = config.MARGIN_ALERT_THRESHOLD if threshold is None else threshold
+    frame = compute_margins(load_margin_frame(service, include_inactive), threshold)
+    margins = frame['margin_pct'].dropna()
+
+    summary = {'mean': _round(margins.mean()) if len(margins) else None}
+    for q in _PERCENTILES:
+        summary[f'p{int(q * 100)}'] = _round(margins.quantile(q)) if len(margins) else None
+
+    worst = frame[frame['alert']].nsmallest(top, 'margin_pct')
+    report = {
+        'threshold': threshold,
+        'products': int(len(frame)),
+        'without_cost': int(frame['margin_pct'].isna().sum()),
+        'alerts': int(frame['alert'].sum()),
+        'summary': summary,
+        'by_category': margin_percentiles(frame, 'category', 'category_id'),
+        'by_supplier': margin_percentiles(frame, 'supplier', 'supplier_id'),
+        'worst': [
+            {
+                'id': int(row.id), 'default_code': row.default_code, 'name': row.name,
+                'list_price': float(row.list_price), 'standard_price': float(row.standard_price),
+                'margin_pct': _round(row.margin_pct), 'category': row.category, 'supplier': row.supplier,
+            }
+            for row in worst.itertuples(index=False)
+        ],
+        'written': write_alert_flags(service, frame) if write_flags else None,
+    }
+    return report
@@ -0,0 +1,142 @@
+"""Cliente asíncrono para Odoo.
+
+Habla el mismo protocolo que ``OdooBaseService`` (XML-RPC o JSON-RPC según
+``ODOO_TRANSPORT``; ``common.authenticate`` y ``object.execute_kw``) pero envía las peticiones con ``httpx.AsyncClient``,
+de forma que las rutas ``async def`` de FastAPI pueden esperar la respuesta de
+Odoo sin bloquear el event loop de uvicorn.
+"""
+import asyncio
+import logging
+import weakref
+import xmlrpc.client
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from ..utils.config import config
+from .odoo_auth_cache import check_uid, get_cached_uid, invalidate_uid, is_access_denied, store_uid
+from .odoo_transport import decode_jsonrpc_response, encode_jsonrpc_request, get_transport_name
+
+logger = logging.getLogger("odoo_async_client")
+
+
+class AsyncOdooClient:
+    """Cliente Odoo awaitable con la misma semántica que ``execute_kw``"""
+
+    def __init__(self, url: str, db: str, username: str, password: str, timeout: Optional[float] = None):
+        self.url = url.rstrip("/")
+        self.db = db
+        self.username = username
+        self.password = password
+        self.timeout = timeout if timeout is not None else config.ODOO_TIMEOUT
+        # Un httpx.AsyncClient (y su lock de autenticación) por event loop: no pueden
+        # compartirse entre loops. Débil para no retener loops ya cerrados.
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, asyncio.Lock]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _loop_state(self) -> Tuple[httpx.AsyncClient, asyncio.Lock]:
+        """Devuelve (cliente HTTP, lock de autenticación) del event loop actual"""
+        loop = asyncio.get_running_loop()
+        state = self._clients.get(loop)
+        if state is None or state[0].is_closed:
+            # Mismos límites que el pool síncrono (ODOO_POOL_SIZE / ODOO_POOL_IDLE_TIMEOUT)
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=config.ODOO_POOL_SIZE,
+                    max_keepalive_connections=config.ODOO_POOL_SIZE,
+                    keepalive_expiry=config.ODOO_POOL_IDLE_TIMEOUT,
+                ),
+            )
+            state = self._clients[loop] = (client, asyncio.Lock())
+        return state
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Devuelve el cliente HTTP del event loop actual"""
+        return self._loop_state()[0]
+
+    async def _call(self, service: str, method: str, *params: Any) -> Any:
+        """Envía la llamada con el transporte configurado (``ODOO_TRANSPORT``)"""
+        client = self._get_http_client()
+        if get_transport_name() == "jsonrpc":
+            response = await client.post(
+                f"{self.url}/jsonrpc",
+                content=encode_jsonrpc_request(service, method, params),
+                headers={"Content-Type": "application/json"},
+            )
+            response.raise_for_status()
+            return decode_jsonrpc_response(response.content)
+        payload = xmlrpc.client.dumps(params, method, allow_none=True)
+        response = await client.post(
+            f"{self.url}/xmlrpc/2/{service}",
+            content=payload.encode("utf-8"),
+            headers={"Content-Type": "text/xml"},
+        )
+        response.raise_for_status()
+        # loads lanza xmlrpc.client.Fault si Odoo devuelve un error
+        result, _ = xmlrpc.client.loads(response.content)
+        return result[0]
+
+    async def authenticate(self) -> int:
+        """Devuelve el UID de la caché del proceso o autentica contra Odoo.
+        Lanza PermissionError si Odoo rechaza el login (como la versión síncrona)."""
+        uid = get_cached_uid(self.url, self.db, self.username)
+        if uid:
+            return uid
+        _, auth_lock = self._loop_state()
+        async with auth_lock:
+            uid = get_cached_uid(self.url, self.db, self.username)
+            if not uid:
+                uid = await self._call("common", "authenticate", self.db, self.username, self.password, {})
+                store_uid(self.url, self.db, self.username, uid)
+                check_uid(self.username, uid)
+                logger.info(f"Autenticación asíncrona exitosa con UID: {uid}")
+        return uid
+
+    async def execute_kw(self, model: str, method: str, args: list, kwargs: Optional[dict] = None) -> Any:
+        """Equivalente awaitable de ``object.execute_kw``.
+        Si Odoo rechaza el UID en caché se reautentica y se reintenta una vez.
+        """
+        uid = await self.authenticate()
+        try:
+            return await self._call(
+                "object", "execute_kw",
+                self.db, uid, self.password, model, method, args, kwargs or {}
+            )
+        except xmlrpc.client.Fault as fault:
+            if not is_access_denied(fault):
+                raise
+            invalidate_uid(self.url, self.db, self.username, uid)
+            uid = await self.authenticate()
+            return await self._call(
+                "object", "execute_kw",
+                self.db, uid, self.password, model, method, args, kwargs or {}
+            )
+
+    async def aclose(self) -> None:
+        """Cierra el cliente HTTP del event loop actual (los de otros loops no se pueden
+        cerrar desde aquí: se cierran al apagar su propio loop con ``aclose``)"""
+        state = self._clients.pop(asyncio.get_running_loop(), None)
+        if state is not None and not state[0].is_closed:
+            await state[0].aclose()
+
+
+# Un cliente por (url, db, usuario) para todo el proceso
+_clients: Dict[Tuple[str, str, str], AsyncOdooClient] = {}
+
+
+def get_async_odoo_client(url: str, db: str, username: str, password: str) -> AsyncOdooClient:
+    """Devuelve el cliente asíncrono compartido para esas credenciales"""
+    key = (url, db, username)
+    client = _clients.get(key)
+    if client is None or client.password != password:
+        client = AsyncOdooClient(url, db, username, password)
+        _clients[key] = client
+    return client
+
+
+async def close_async_odoo_clients() -> None:
+    """Cierra los clientes HTTP abiertos en el event loop actual (al apagar la aplicación)"""
+    for client in list(_clients.values()):
+        await client.aclose()
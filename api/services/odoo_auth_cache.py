@@ -0,0 +1,94 @@
+"""Caché de autenticación de Odoo compartida por todo el proceso.
+
+El UID devuelto por ``common.authenticate`` se guarda por (url, db, usuario) y
+lo reutilizan todas las instancias de servicio (síncronas y asíncronas). Solo
+se vuelve a autenticar cuando Odoo rechaza las credenciales (``AccessDenied``).
+Un login rechazado (``authenticate`` devuelve False) lanza ``PermissionError`` en
+los dos caminos y no se guarda.
+"""
+import logging
+import threading
+import xmlrpc.client
+from typing import Dict, Optional, Tuple
+
+from .odoo_transport import get_service_proxy
+
+logger = logging.getLogger("odoo_auth_cache")
+
+AuthKey = Tuple[str, str, str]
+
+_uids: Dict[AuthKey, int] = {}
+_key_locks: Dict[AuthKey, threading.Lock] = {}
+_lock = threading.Lock()
+_stats = {"authentications": 0, "reauthentications": 0}
+
+
+def _key_lock(key: AuthKey) -> threading.Lock:
+    with _lock:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+def get_cached_uid(url: str, db: str, username: str) -> Optional[int]:
+    """Devuelve el UID en caché o None si aún no se ha autenticado"""
+    return _uids.get((url, db, username))
+
+
+def store_uid(url: str, db: str, username: str, uid: int) -> None:
+    """Guarda el UID de una autenticación recién hecha y la contabiliza.
+    Un UID vacío (login rechazado) no se guarda: ver ``check_uid``."""
+    with _lock:
+        _stats["authentications"] += 1
+        if uid:
+            _uids[(url, db, username)] = uid
+
+
+def check_uid(username: str, uid) -> int:
+    """Devuelve ``uid`` o lanza PermissionError si Odoo ha rechazado el login (False)"""
+    if not uid:
+        logger.error(f"Odoo rechazó las credenciales del usuario {username}")
+        raise PermissionError(f"Autenticación rechazada por Odoo para el usuario {username}")
+    return uid
+
+
+def invalidate_uid(url: str, db: str, username: str, uid: Optional[int] = None) -> None:
+    """Descarta el UID en caché.
+    Si se indica ``uid`` solo se descarta si sigue siendo el mismo, para que
+    varios hilos que reciben AccessDenied a la vez no reautentiquen todos.
+    """
+    key = (url, db, username)
+    with _lock:
+        if key in _uids and (uid is None or _uids[key] == uid):
+            del _uids[key]
+            _stats["reauthentications"] += 1
+            logger.info(f"UID de Odoo invalidado para {username}@{db}")
+
+
+def authenticate(url: str, db: str, username: str, password: str) -> int:
+    """Devuelve el UID en caché o autentica contra Odoo (una sola vez por clave).
+    Lanza PermissionError si Odoo rechaza el login."""
+    uid = get_cached_uid(url, db, username)
+    if uid:
+        return uid
+    with _key_lock((url, db, username)):
+        uid = get_cached_uid(url, db, username)
+        if uid:
+            return uid
+        uid = get_service_proxy(url, "common").authenticate(db, username, password, {})
+        store_uid(url, db, username, uid)
+        check_uid(username, uid)
+        logger.info(f"Autenticación exitosa con UID: {uid}")
+        return uid
+
+
+def is_access_denied(error: Exception) -> bool:
+    """Indica si el error es un rechazo de credenciales (y no un error de permisos sobre registros)"""
+    if not isinstance(error, xmlrpc.client.Fault):
+        return False
+    fault = str(error.faultString)
+    return error.faultCode == 3 or "AccessDenied" in fault or "Access Denied" in fault
+
+
+def get_auth_stats() -> dict:
+    """Contadores de autenticación del proceso"""
+    with _lock:
+        return {**_stats, "cached_sessions": len(_uids)}
@@ -1,9 +1,39 @@
 import xmlrpc.client
+import asyncio
 import gc
 import os
 import logging
-from typing import Any, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from ..utils.config import config
+from ..utils.ttl_cache import TTLCache
+from .odoo_async_client import AsyncOdooClient, get_async_odoo_client
+from .odoo_auth_cache import authenticate, invalidate_uid, is_access_denied
+from .odoo_catalog_mirror import notify_write
+from .odoo_supplier_directory import notify_partner_write
+from .odoo_category_cache import get_category_tree
+from .odoo_name_loader import Many2oneLoader, _current_loader, current_loader, many2one_id
+from .odoo_resilience import (
+    OdooUnavailableError, backoff_delay, get_circuit_breaker, is_retryable, is_transient_error
+)
+from .odoo_transport import get_service_proxy
+
+# Metadatos de modelos (fields_get) compartidos por todo el proceso, por (url, db, modelo)
+_model_fields_cache = TTLCache(ttl=config.ODOO_METADATA_TTL)
+# Métodos que modifican registros (la réplica local del catálogo deja de valer)
+_WRITE_METHODS = {'create', 'write', 'unlink'}
+# Versión del servidor (common.version) por URL
+_server_version_cache = TTLCache(ttl=config.ODOO_METADATA_TTL)
+
+
+def _list_version(groups: Optional[List[dict]]) -> Optional[Tuple[int, Optional[str]]]:
+    if not groups:
+        return None
+    row = groups[0]
+    return row.get('__count', 0), row.get('write_date') or None
+
 
 class OdooBaseService:
     """Servicio base para interactuar con Odoo via XML-RPC"""
@@ -21,21 +51,23 @@ class OdooBaseService:
     def _get_connection(self) -> None:
         """
         Establece la conexión con Odoo usando las credenciales de entorno.
+        El UID se reutiliza de la caché del proceso; solo se autentica la primera vez.
+        Con los mismos reintentos y circuit breaker que las llamadas a Odoo.
         """
+        self._with_resilience("authenticate", self._connect)
+
+    def _connect(self) -> None:
+        """Un intento de conexión/autenticación (sin reintentos)"""
         try:
-            logging.info(f"Intentando conectar a Odoo en: {self._url}, DB: {self._db}")
-            
             # Validar que la URL no contenga caracteres de control no válidos
             if any(ord(char) < 32 for char in self._url):
                 logging.warning(f"URL de Odoo contiene caracteres no válidos, limpiando URL")
                 self._url = "".join(char for char in self._url if ord(char) >= 32)
 
-            self._common = xmlrpc.client.ServerProxy(f"{self._url}/xmlrpc/2/common")
-            logging.info("Conexión común establecida con Odoo.")
-            self._uid = self._common.authenticate(self._db, self._username, self._password, {})
-            logging.info(f"Autenticación exitosa con UID: {self._uid}")
-            self._models = xmlrpc.client.ServerProxy(f"{self._url}/xmlrpc/2/object")
-            logging.info("Conexión completa con Odoo.")
+            # Proxies compartidos (XML-RPC o JSON-RPC según ODOO_TRANSPORT) sobre el pool keep-alive
+            self._common = get_service_proxy(self._url, "common")
+            self._uid = authenticate(self._url, self._db, self._username, self._password)
+            self._models = get_service_proxy(self._url, "object")
         except Exception as e:
             logging.error(f"Error al conectar con Odoo: {e}", exc_info=True)
             self._common = None
@@ -44,56 +76,233 @@ class OdooBaseService:
             raise
     
     def _cleanup_connection(self):
-        """Limpia las conexiones y libera memoria"""
-        if self._common:
-            del self._common
-            self._common = None
-        if self._models:
-            del self._models
-            self._models = None
+        """Suelta las referencias a los proxies (las conexiones siguen en el pool compartido)"""
+        self._common = None
+        self._models = None
         gc.collect()
     
+    def _call_kw_once(self, model: str, method: str, sanitized_args: list, kwargs: dict) -> Any:
+        """Un intento de execute_kw; si Odoo rechaza el UID en caché, reautentica y repite."""
+        if self._models is None:
+            self._connect()
+        try:
+            return self._models.execute_kw(
+                self._db, self._uid, self._password, model, method, sanitized_args, kwargs
+            )
+        except xmlrpc.client.Fault as fault:
+            if not is_access_denied(fault):
+                raise
+            # Sesión caducada o credenciales cambiadas: reautenticar y reintentar una vez
+            logging.warning(f"Odoo rechazó el UID {self._uid}; reautenticando")
+            invalidate_uid(self._url, self._db, self._username, self._uid)
+            self._connect()
+            return self._models.execute_kw(
+                self._db, self._uid, self._password, model, method, sanitized_args, kwargs
+            )
+
+    def _with_resilience(self, method: str, func: Callable[[], Any], label: Optional[str] = None) -> Any:
+        """Ejecuta ``func`` con reintentos ante errores transitorios (las escrituras
+        solo si la petición no llegó a salir) y circuit breaker por URL de Odoo.
+        Si Odoo sigue sin responder o el breaker está abierto lanza OdooUnavailableError.
+        """
+        label = label or method
+        breaker = get_circuit_breaker(self._url)
+        breaker.before_call()
+        attempt = 0
+        while True:
+            try:
+                result = func()
+            except Exception as e:
+                if not is_transient_error(e):
+                    # Odoo respondió (p. ej. un Fault de validación): el servidor está vivo
+                    breaker.record_success()
+                    raise
+                if attempt < config.ODOO_RETRY_ATTEMPTS and is_retryable(e, method):
+                    delay = backoff_delay(attempt)
+                    attempt += 1
+                    logging.warning(f"Error transitorio en {label} ({e}); reintento {attempt} en {delay:.2f}s")
+                    time.sleep(delay)
+                    continue
+                breaker.record_failure()
+                raise OdooUnavailableError(f"Odoo no disponible en {label}: {e}") from e
+            breaker.record_success()
+            return result
+
+    def _call_kw(self, model: str, method: str, args: list, kwargs: dict = None) -> Any:
+        """Ejecuta una llamada a Odoo y propaga los errores (con reintentos y circuit breaker)"""
+        # Sanitizar valores None en args para evitar errores de XML-RPC
+        sanitized_args = self._sanitize_values(args)
+        kwargs = kwargs or {}
+        result = self._with_resilience(
+            method,
+            lambda: self._call_kw_once(model, method, sanitized_args, kwargs),
+            f"{model}.{method}",
+        )
+        if method in _WRITE_METHODS:
+            notify_write(self, model)
+            notify_partner_write(self, model)
+        return result
+
     def _execute_kw(self, model: str, method: str, args: list, kwargs: dict = None) -> Any:
         """Ejecuta una llamada a Odoo mediante XML-RPC.
         Garantiza que la conexión esté establecida y reutiliza la existente
-        para evitar reconexiones innecesarias.
+        para evitar reconexiones innecesarias. Devuelve None si la llamada falla,
+        salvo cuando Odoo no está disponible (OdooUnavailableError se propaga).
         """
-        # Asegurar conexión
-        if self._models is None:
-            self._get_connection()
-        # Si continúa sin modelos, abortar
-        if self._models is None:
-            logging.error("No se pudo establecer la conexión con Odoo; _models es None")
-            return None
         try:
-            if kwargs is None:
-                kwargs = {}
-                
-            # Sanitizar valores None en args para evitar errores de XML-RPC
-            sanitized_args = self._sanitize_values(args)
-            
-            # Configurar el servidor XML-RPC para permitir valores None
-            if not hasattr(self._models, '_ServerProxy__allow_none') or not self._models._ServerProxy__allow_none:
-                # Crear un nuevo ServerProxy con allow_none=True si es necesario
-                self._models = xmlrpc.client.ServerProxy(
-                    f"{self._url}/xmlrpc/2/object",
-                    allow_none=True
-                )
-                logging.info("Reconectado a Odoo con allow_none=True")
-                
-            return self._models.execute_kw(
-                self._db,
-                self._uid,
-                self._password,
-                model,
-                method,
-                sanitized_args,
-                kwargs
-            )
+            return self._call_kw(model, method, args, kwargs)
+        except OdooUnavailableError:
+            raise
         except Exception as e:
             logging.error(f"Error ejecutando {method} en {model}: {e}", exc_info=True)
             return None
-    
+
+    def map_concurrent(self, func: Callable, items: Iterable, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Aplica ``func`` a cada elemento en paralelo sobre el pool de conexiones.
+        Devuelve, en el mismo orden que ``items``, un diccionario por elemento con
+        ``result`` y ``error`` (None si no hubo error); un fallo no detiene al resto.
+        """
+        items = list(items)
+        if not items:
+            return []
+        # Conectar (y autenticar) una sola vez antes de repartir el trabajo
+        if self._models is None:
+            try:
+                self._get_connection()
+            except Exception:
+                pass  # cada llamada devolverá su propio error
+
+        def _run(item):
+            try:
+                return {"result": func(item), "error": None}
+            except Exception as e:
+                logging.error(f"Error en llamada por lotes a Odoo: {e}")
+                return {"result": None, "error": str(e)}
+
+        workers = min(max_workers or config.ODOO_BATCH_CONCURRENCY, len(items))
+        if workers <= 1:
+            return [_run(item) for item in items]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="odoo-batch") as executor:
+            return list(executor.map(_run, items))
+
+    def execute_batch(self, calls: Iterable[Sequence], max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Ejecuta muchas llamadas independientes ``(model, method, args[, kwargs])``
+        con concurrencia acotada. Devuelve los resultados en orden con su error por llamada.
+        """
+        return self.map_concurrent(lambda call: self._call_kw(*call), calls, max_workers)
+
+    async def execute_batch_async(self, calls: Iterable[Sequence], max_concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Versión awaitable de execute_batch sobre el cliente asíncrono"""
+        semaphore = asyncio.Semaphore(max_concurrency or config.ODOO_BATCH_CONCURRENCY)
+
+        async def _run(call):
+            model, method, args, *rest = call
+            async with semaphore:
+                try:
+                    result = await self._call_kw_async(model, method, args, rest[0] if rest else None)
+                    return {"result": result, "error": None}
+                except Exception as e:
+                    logging.error(f"Error ejecutando {method} en {model} (lote async): {e}")
+                    return {"result": None, "error": str(e)}
+
+        return await asyncio.gather(*(_run(call) for call in calls))
+
+    def _get_async_client(self) -> AsyncOdooClient:
+        """Devuelve el cliente asíncrono compartido para las credenciales de esta instancia"""
+        return get_async_odoo_client(self._url, self._db, self._username, self._password)
+
+    async def _call_kw_async(self, model: str, method: str, args: list, kwargs: dict = None) -> Any:
+        """Versión awaitable de _call_kw (mismos reintentos y circuit breaker)"""
+        sanitized_args = self._sanitize_values(args)
+        kwargs = kwargs or {}
+        client = self._get_async_client()
+        breaker = get_circuit_breaker(self._url)
+        breaker.before_call()
+        attempt = 0
+        while True:
+            try:
+                result = await client.execute_kw(model, method, sanitized_args, kwargs)
+            except Exception as e:
+                if not is_transient_error(e):
+                    breaker.record_success()
+                    raise
+                if attempt < config.ODOO_RETRY_ATTEMPTS and is_retryable(e, method):
+                    delay = backoff_delay(attempt)
+                    attempt += 1
+                    logging.warning(f"Error transitorio en {model}.{method} ({e}); reintento {attempt} en {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                breaker.record_failure()
+                raise OdooUnavailableError(f"Odoo no disponible en {model}.{method}: {e}") from e
+            breaker.record_success()
+            if method in _WRITE_METHODS:
+                notify_write(self, model)
+                notify_partner_write(self, model)
+            return result
+
+    async def _execute_kw_async(self, model: str, method: str, args: list, kwargs: dict = None) -> Any:
+        """Versión awaitable de _execute_kw: no bloquea el event loop.
+        Mantiene la misma semántica: sanitiza los argumentos y devuelve None si falla
+        (OdooUnavailableError se propaga).
+        """
+        try:
+            return await self._call_kw_async(model, method, args, kwargs)
+        except OdooUnavailableError:
+            raise
+        except Exception as e:
+            logging.error(f"Error ejecutando {method} en {model} (async): {e}", exc_info=True)
+            return None
+
+    async def _run_async(self, func: Callable, *args, **kwargs) -> Any:
+        """Ejecuta un método síncrono del servicio en el threadpool.
+        Se usa para las operaciones de varios pasos que aún no tienen versión nativa;
+        el transporte XML-RPC es thread-safe gracias al pool de conexiones.
+        """
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    def get_model_fields(self, model_name: str) -> Dict[str, dict]:
+        """Devuelve los campos del modelo (``fields_get``) desde la caché del proceso.
+        Solo consulta a Odoo la primera vez o cuando caduca/se invalida la entrada.
+        Devuelve un diccionario vacío si Odoo no responde (y no lo guarda).
+        """
+        return _model_fields_cache.get_or_set(
+            (self._url, self._db, model_name),
+            lambda: self._execute_kw(
+                model_name, 'fields_get', [], {'attributes': ['type', 'string', 'relation']}
+            ),
+        ) or {}
+
+    def get_server_major_version(self) -> Optional[int]:
+        """Versión mayor de Odoo (17, 18...) desde la caché del proceso; None si no se conoce"""
+        def fetch():
+            try:
+                info = self._with_resilience("version", lambda: get_service_proxy(self._url, "common").version())
+                return int((info.get('server_version_info') or [0])[0]) or None
+            except OdooUnavailableError:
+                raise
+            except Exception as e:
+                logging.warning(f"No se pudo obtener la versión de Odoo: {e}")
+                return None
+        return _server_version_cache.get_or_set(self._url, fetch)
+
+    def get_list_version(self, model: str, domain: list) -> Optional[Tuple[int, Optional[str]]]:
+        """Validador barato de un listado: ``(registros, write_date máximo)`` del dominio
+        con un único read_group. None si no se puede calcular."""
+        groups = self._execute_kw(model, 'read_group', [domain, ['write_date:max'], []], {'lazy': False})
+        return _list_version(groups)
+
+    async def get_list_version_async(self, model: str, domain: list) -> Optional[Tuple[int, Optional[str]]]:
+        """Versión awaitable de get_list_version"""
+        groups = await self._execute_kw_async(model, 'read_group', [domain, ['write_date:max'], []], {'lazy': False})
+        return _list_version(groups)
+
+    def invalidate_model_fields(self, model_name: Optional[str] = None) -> None:
+        """Invalida los metadatos en caché de un modelo (o de todos)"""
+        if model_name is None:
+            _model_fields_cache.invalidate()
+        else:
+            _model_fields_cache.invalidate((self._url, self._db, model_name))
+
     def _sanitize_values(self, value):
         """Sanitiza valores para XML-RPC, reemplazando None por valores vacíos apropiados"""
         if value is None:
@@ -107,11 +316,35 @@ class OdooBaseService:
             return False
         return value
             
+    @contextmanager
+    def many2one_loader(self) -> Iterator[Many2oneLoader]:
+        """Abre el loader many2one de la petición (o reutiliza el ya abierto).
+        Dentro del bloque, los nombres de registros relacionados se leen en bloque
+        con un único ``read`` por modelo.
+        """
+        loader = current_loader()
+        if loader is not None:
+            yield loader
+            return
+        loader = Many2oneLoader(self)
+        token = _current_loader.set(loader)
+        try:
+            yield loader
+        finally:
+            _current_loader.reset(token)
+
     def _get_category_name(self, categ_id) -> str:
         """Obtiene el nombre de una categoría"""
         if not categ_id:
             return "Sin categoría"
         
+        # Primero el árbol de categorías en caché; si no está (recién creada), lectura
+        name = get_category_tree(self).name(self, many2one_id(categ_id))
+        if name:
+            return name
+        loader = current_loader()
+        if loader is not None:
+            return loader.get('product.category', categ_id, default="Sin categoría")
         try:
             category = self._execute_kw(
                 'product.category',
@@ -0,0 +1,587 @@
+"""Réplica local (SQLite) del catálogo de Odoo para las lecturas de los listados.
+
+Se replican product.template, product.supplierinfo, product.category y los
+proveedores de res.partner. Cada sincronización pide a Odoo solo los registros
+con ``write_date`` posterior a la marca de la anterior (``search_read`` por
+bloques) y detecta los borrados comparando los IDs (un ``search`` por modelo).
+Un hilo en segundo plano sincroniza cada ``ODOO_MIRROR_SYNC_INTERVAL`` segundos.
+
+Los servicios de productos y proveedores leen de la réplica mientras la última
+sincronización tenga menos de ``ODOO_MIRROR_MAX_STALENESS`` segundos; si no
+(o si la API acaba de escribir en uno de esos modelos) se consulta Odoo en vivo.
+Cada registro se guarda tal y como lo devuelve ``search_read`` (JSON) junto con
+las columnas por las que se filtra y ordena.
+
+El stock a mano (``qty_available``) va con cada producto. Los movimientos de stock
+no cambian el ``write_date`` de product.template, así que cada sincronización
+sigue los ``stock.quant`` modificados desde su propia marca de agua y vuelve a
+leer ``qty_available`` de sus plantillas.
+
+La réplica mantiene además un índice de texto completo (FTS5) sobre nombre,
+referencia, código de barras y códigos de proveedor de cada producto, sin
+acentos y con búsqueda por prefijo ("frigo" encuentra "Frigorífico"). Las búsquedas
+usan el índice mientras la última sincronización tenga menos de
+``ODOO_MIRROR_SEARCH_MAX_AGE`` segundos; si no, se busca en Odoo.
+"""
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.config import config
+
+logger = logging.getLogger("odoo_catalog_mirror")
+
+# Modelos replicados: tabla, campos leídos, columnas indexables y dominio
+MIRROR_MODELS: Dict[str, Dict[str, Any]] = {
+    'product.template': {
+        'table': 'product_template',
+        'fields': ['name', 'default_code', 'barcode', 'active', 'is_published', 'list_price', 'standard_price',
+                   'categ_id', 'seller_ids', 'x_margen_calculado', 'x_alerta_margen', 'qty_available'],
+        'columns': {'name': 'TEXT', 'default_code': 'TEXT', 'barcode': 'TEXT', 'active': 'INTEGER',
+                    'list_price': 'REAL', 'standard_price': 'REAL', 'categ_id': 'INTEGER'},
+        'domain': [],
+        # Columna con el producto cuyo registro del índice de búsqueda cambia
+        'search_owner': 'id',
+    },
+    'product.supplierinfo': {
+        'table': 'product_supplierinfo',
+        'fields': ['partner_id', 'product_tmpl_id', 'price', 'delay', 'min_qty', 'product_name',
+                   'product_code', 'sequence'],
+        'columns': {'product_tmpl_id': 'INTEGER', 'partner_id': 'INTEGER', 'sequence': 'INTEGER',
+                    'min_qty': 'REAL', 'price': 'REAL', 'product_code': 'TEXT'},
+        'domain': [],
+        'search_owner': 'product_tmpl_id',
+    },
+    'product.category': {
+        'table': 'product_category',
+        'fields': ['name', 'complete_name', 'parent_id'],
+        'columns': {'name': 'TEXT', 'complete_name': 'TEXT', 'parent_id': 'INTEGER'},
+        'domain': [],
+    },
+    'res.partner': {
+        'table': 'res_partner',
+        'fields': ['name', 'email', 'phone', 'mobile', 'website', 'street', 'street2', 'city', 'state_id',
+                   'zip', 'country_id', 'vat', 'supplier_rank', 'customer_rank', 'is_company',
+                   'category_id', 'comment', 'active'],
+        'columns': {'name': 'TEXT', 'is_company': 'INTEGER', 'supplier_rank': 'INTEGER', 'active': 'INTEGER'},
+        'domain': [('supplier_rank', '>', 0)],
+    },
+}
+
+# Columnas por las que se puede ordenar el listado de productos desde la réplica
+PRODUCT_SORT_COLUMNS = ('id', 'name', 'default_code', 'list_price', 'standard_price')
+
+# Versión del esquema: si cambia, la réplica se vacía y se vuelve a sincronizar entera
+_SCHEMA_VERSION = '3'
+
+# Peso en bm25 de cada columna del índice (name, default_code, barcode, supplier_codes):
+# una coincidencia en una referencia pesa más que en el nombre
+_SEARCH_WEIGHTS = "1.0, 4.0, 4.0, 2.0"
+
+# Margen de la marca de agua: una transacción larga de Odoo puede confirmar
+# registros con un write_date algo anterior al de la última sincronización
+_WATERMARK_OVERLAP = timedelta(seconds=60)
+
+
+def _ilike(value: Optional[str], term: Optional[str]) -> bool:
+    """``ilike`` de Odoo (contiene, sin distinguir mayúsculas, también en no ASCII)"""
+    return value is not None and term is not None and term.casefold() in value.casefold()
+
+
+def search_match_expression(term: str) -> Optional[str]:
+    """Consulta FTS5 para lo que escribe el usuario: cada palabra es una frase con prefijo
+    ("REF-0001" → ``"REF 0001" *``) y todas deben aparecer. None si no queda ningún término."""
+    phrases = []
+    for word in term.split():
+        tokens = re.findall(r'[^\W_]+', word)
+        if tokens:
+            phrases.append('"' + ' '.join(tokens) + '" *')
+    return ' AND '.join(phrases) or None
+
+
+def _column_value(value: Any) -> Any:
+    """Valor de columna: ID de un many2one, None para False, enteros para booleanos"""
+    if isinstance(value, (list, tuple)):
+        return value[0] if value else None
+    if value is False:
+        return None
+    if value is True:
+        return 1
+    return value
+
+
+def _order_sql(column: str, descending: bool) -> str:
+    # Como en PostgreSQL: NULL al final en ascendente y al principio en descendente
+    direction = 'DESC' if descending else 'ASC'
+    return f"({column} IS NULL) {direction}, {column} {direction}"
+
+
+class CatalogMirror:
+    """Réplica SQLite del catálogo de un Odoo (url, db)"""
+
+    def __init__(self, path: str, source: Tuple[str, str], max_staleness: float,
+                 max_search_age: Optional[float] = None):
+        self.path = path
+        self.source = source
+        self.max_staleness = max_staleness
+        self.max_search_age = max_staleness if max_search_age is None else max_search_age
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.create_function('ilike', 2, _ilike, deterministic=True)
+        # Escrituras de la API en modelos replicados: la réplica no vale hasta la próxima sincronización
+        self._dirty_generation = 0
+        self._synced_generation = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.fts = False
+        self._create_schema()
+
+    # --- esquema ---
+
+    def _create_schema(self) -> None:
+        with self._lock, self._conn:
+            if self.path != ':memory:':
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS mirror_state (key TEXT PRIMARY KEY, value TEXT)")
+            source = self._state('source')
+            if source is not None and (source != json.dumps(self.source) or self._state('schema') != _SCHEMA_VERSION):
+                # Otro Odoo (url, db) u otro esquema: la réplica anterior no sirve
+                logger.warning(f"La réplica {self.path} es de otro Odoo o de otra versión; se vacía")
+                for spec in MIRROR_MODELS.values():
+                    self._conn.execute(f"DROP TABLE IF EXISTS {spec['table']}")
+                self._conn.execute("DROP TABLE IF EXISTS product_search")
+                self._conn.execute("DELETE FROM mirror_state")
+            self._set_state('source', json.dumps(self.source))
+            self._set_state('schema', _SCHEMA_VERSION)
+            for spec in MIRROR_MODELS.values():
+                columns = "".join(f", {name} {kind}" for name, kind in spec['columns'].items())
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {spec['table']} "
+                    f"(id INTEGER PRIMARY KEY, write_date TEXT, data TEXT NOT NULL{columns})"
+                )
+                for name in spec['columns']:
+                    self._conn.execute(f"CREATE INDEX IF NOT EXISTS {spec['table']}_{name} ON {spec['table']} ({name})")
+            try:
+                # rowid = ID del producto; remove_diacritics pliega los acentos también en la consulta
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS product_search USING fts5("
+                    "name, default_code, barcode, supplier_codes, "
+                    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+                )
+                self.fts = True
+            except sqlite3.OperationalError as e:
+                logger.warning(f"SQLite sin FTS5 ({e}): la búsqueda de productos seguirá usando ilike")
+
+    def _state(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM mirror_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO mirror_state (key, value) VALUES (?, ?)", (key, value))
+
+    # --- sincronización ---
+
+    def sync(self, service) -> Dict[str, int]:
+        """Trae de Odoo los cambios desde la última marca de agua y borra lo que ya no existe.
+        Devuelve los registros leídos por modelo. Los errores de Odoo se propagan.
+        """
+        with self._sync_lock:
+            generation = self._dirty_generation
+            started = time.time()
+            fetched, touched = {}, set()
+            for model in MIRROR_MODELS:
+                fetched[model] = self._sync_model(service, model, touched)
+            restocked = self._sync_stock(service)
+            self._refresh_search(touched)
+            with self._lock, self._conn:
+                self._set_state('synced_at', str(started))
+            self._synced_generation = generation
+            logger.info(f"Réplica sincronizada en {time.time() - started:.2f}s: {fetched}, stock de {restocked} productos")
+            return fetched
+
+    def _sync_model(self, service, model: str, touched: set) -> int:
+        spec = MIRROR_MODELS[model]
+        available = service.get_model_fields(model)
+        fields = [name for name in spec['fields'] if not available or name in available] + ['write_date']
+        with self._lock:
+            watermark = self._state(f'watermark:{model}')
+        domain = list(spec['domain'])
+        if watermark:
+            since = datetime.strptime(watermark, "%Y-%m-%d %H:%M:%S") - _WATERMARK_OVERLAP
+            domain.append(('write_date', '>=', since.strftime("%Y-%m-%d %H:%M:%S")))
+        context = {'active_test': False}
+        chunk_size = config.ODOO_EXPORT_CHUNK_SIZE
+
+        fetched, last_id, newest = 0, 0, watermark
+        while True:
+            records = service._call_kw(model, 'search_read', [domain + [('id', '>', last_id)]], {
+                'fields': fields, 'order': 'id asc', 'limit': chunk_size, 'context': context,
+            }) or []
+            if records:
+                self._upsert(spec, records, touched)
+                fetched += len(records)
+                last_id = records[-1]['id']
+                newest = max([newest or ''] + [r.get('write_date') or '' for r in records]) or None
+            if len(records) < chunk_size:
+                break
+
+        # Borrados (y registros que dejan de cumplir el dominio): no se ven por write_date
+        ids = service._call_kw(model, 'search', [list(spec['domain'])], {'context': context}) or []
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS mirror_ids (id INTEGER PRIMARY KEY)")
+            self._conn.execute("DELETE FROM mirror_ids")
+            self._conn.executemany("INSERT INTO mirror_ids (id) VALUES (?)", ((i,) for i in ids))
+            if spec.get('search_owner'):
+                touched.update(row[0] for row in self._conn.execute(
+                    f"SELECT {spec['search_owner']} FROM {spec['table']} WHERE id NOT IN (SELECT id FROM mirror_ids)"))
+            self._conn.execute(f"DELETE FROM {spec['table']} WHERE id NOT IN (SELECT id FROM mirror_ids)")
+            if newest:
+                self._set_state(f'watermark:{model}', str(newest)[:19])
+        return fetched
+
+    def _sync_stock(self, service) -> int:
+        """Actualiza ``qty_available`` de los productos con stock.quant modificados desde la
+        marca de agua del stock. Devuelve las plantillas releídas (0 sin módulo de inventario)."""
+        if 'qty_available' not in service.get_model_fields('product.template'):
+            return 0
+        groups = service._call_kw('stock.quant', 'read_group', [[], ['write_date:max'], []], {'lazy': False}) or [{}]
+        count, newest = groups[0].get('__count', 0), groups[0].get('write_date') or None
+        version = f"{count}|{newest or ''}"
+        with self._lock:
+            previous, watermark = self._state('stock_version'), self._state('watermark:stock.quant')
+        if version == previous:
+            return 0
+
+        template_ids = []
+        # Sin versión anterior los productos se acaban de leer enteros (con qty_available)
+        if previous is not None:
+            domain = []
+            if watermark:
+                since = datetime.strptime(watermark, "%Y-%m-%d %H:%M:%S") - _WATERMARK_OVERLAP
+                domain.append(('write_date', '>=', since.strftime("%Y-%m-%d %H:%M:%S")))
+            quants = service._call_kw('stock.quant', 'search_read', [domain], {'fields': ['product_id']}) or []
+            variant_ids = sorted({_column_value(q.get('product_id')) for q in quants} - {None})
+            if variant_ids:
+                variants = service._call_kw('product.product', 'read', [variant_ids], {
+                    'fields': ['product_tmpl_id'], 'context': {'active_test': False},
+                }) or []
+                template_ids = sorted({_column_value(v.get('product_tmpl_id')) for v in variants} - {None})
+
+        chunk_size = config.ODOO_EXPORT_CHUNK_SIZE
+        for start in range(0, len(template_ids), chunk_size):
+            records = service._call_kw('product.template', 'read', [template_ids[start:start + chunk_size]], {
+                'fields': ['qty_available'], 'context': {'active_test': False},
+            }) or []
+            with self._lock, self._conn:
+                for record in records:
+                    row = self._conn.execute("SELECT data FROM product_template WHERE id = ?", (record['id'],)).fetchone()
+                    if row is None:
+                        continue
+                    data = json.loads(row[0])
+                    data['qty_available'] = record.get('qty_available') or 0.0
+                    self._conn.execute("UPDATE product_template SET data = ? WHERE id = ?",
+                                       (json.dumps(data, ensure_ascii=False), record['id']))
+        with self._lock, self._conn:
+            self._set_state('stock_version', version)
+            if newest:
+                self._set_state('watermark:stock.quant', str(newest)[:19])
+        return len(template_ids)
+
+    def _upsert(self, spec: Dict[str, Any], records: List[dict], touched: Optional[set] = None) -> None:
+        columns = list(spec['columns'])
+        placeholders = ", ".join("?" for _ in range(len(columns) + 3))
+        sql = (f"INSERT OR REPLACE INTO {spec['table']} (id, write_date, data{''.join(', ' + c for c in columns)}) "
+               f"VALUES ({placeholders})")
+        rows = []
+        for record in records:
+            data = {k: v for k, v in record.items() if k != 'write_date'}
+            rows.append([record['id'], record.get('write_date') or None, json.dumps(data, ensure_ascii=False)]
+                        + [_column_value(record.get(c)) for c in columns])
+        with self._lock, self._conn:
+            owner = spec.get('search_owner')
+            if owner and touched is not None:
+                # El producto anterior de un registro que cambia de producto también se reindexa
+                marks = ", ".join("?" for _ in rows)
+                touched.update(row[0] for row in self._conn.execute(
+                    f"SELECT {owner} FROM {spec['table']} WHERE id IN ({marks})", [r[0] for r in rows]))
+                touched.update(_column_value(record.get(owner, record['id'])) for record in records)
+            self._conn.executemany(sql, rows)
+
+    def _refresh_search(self, product_ids: set) -> None:
+        """Rehace las entradas del índice de búsqueda de esos productos"""
+        product_ids = [i for i in product_ids if i]
+        if not self.fts or not product_ids:
+            return
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS mirror_search_ids (id INTEGER PRIMARY KEY)")
+            self._conn.execute("DELETE FROM mirror_search_ids")
+            self._conn.executemany("INSERT OR IGNORE INTO mirror_search_ids (id) VALUES (?)", ((i,) for i in product_ids))
+            self._conn.execute("DELETE FROM product_search WHERE rowid IN (SELECT id FROM mirror_search_ids)")
+            self._conn.execute(
+                "INSERT INTO product_search (rowid, name, default_code, barcode, supplier_codes) "
+                "SELECT p.id, p.name, p.default_code, p.barcode, "
+                "(SELECT group_concat(s.product_code, ' ') FROM product_supplierinfo s WHERE s.product_tmpl_id = p.id) "
+                "FROM product_template p WHERE p.id IN (SELECT id FROM mirror_search_ids)"
+            )
+
+    # --- frescura ---
+
+    def synced_at(self) -> Optional[float]:
+        with self._lock:
+            value = self._state('synced_at')
+        return float(value) if value else None
+
+    def is_fresh(self) -> bool:
+        """True si la réplica se puede servir: sincronizada hace menos de ``max_staleness``
+        y sin escrituras de la API posteriores a esa sincronización"""
+        synced_at = self.synced_at()
+        return (synced_at is not None and time.time() - synced_at <= self.max_staleness
+                and self._synced_generation == self._dirty_generation)
+
+    def is_searchable(self) -> bool:
+        """True si el índice de texto se puede usar para buscar: sincronizado hace menos
+        de ``max_search_age``. Las escrituras de la API no lo invalidan (solo da los IDs y
+        la sincronización que despiertan llega en segundos)."""
+        synced_at = self.synced_at()
+        return self.fts and synced_at is not None and time.time() - synced_at <= self.max_search_age
+
+    def mark_stale(self) -> None:
+        """La API ha escrito en un modelo replicado: se lee de Odoo hasta la próxima sincronización"""
+        self._dirty_generation += 1
+        self._wake.set()
+
+    # --- hilo de sincronización ---
+
+    def start(self, service, interval: float) -> None:
+        """Arranca el hilo que sincroniza cada ``interval`` segundos (o antes, tras una escritura)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.sync(service)
+                except Exception as e:
+                    logger.warning(f"Error sincronizando la réplica del catálogo: {e}")
+                self._wake.wait(interval)
+                self._wake.clear()
+
+        self._thread = threading.Thread(target=run, name="odoo-catalog-mirror", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # --- consultas ---
+
+    def query_products(self, search: Optional[str] = None, category: Optional[str] = None,
+                       include_inactive: bool = False, sort_by: str = 'id', sort_order: str = 'asc',
+                       offset: int = 0, limit: int = 10):
+        """Página de productos como ``(registros, total, proveedores)``, en el formato de
+        search_read y con el primer proveedor de cada producto. None si ``sort_by`` no
+        se puede ordenar desde la réplica."""
+        if sort_by not in PRODUCT_SORT_COLUMNS:
+            return None
+        with self._lock:
+            rows, total = self._product_page("p.data, c.id AS categ_id, c.complete_name", search, category,
+                                             include_inactive, sort_by, sort_order, offset, limit)
+            records = []
+            for row in rows:
+                record = json.loads(row['data'])
+                if row['categ_id'] is not None:
+                    record['categ_id'] = [row['categ_id'], row['complete_name']]
+                records.append(record)
+            sellers = self._first_sellers([r['id'] for r in records])
+        return records, total, sellers
+
+    def search_product_ids(self, search: str, category: Optional[str] = None, include_inactive: bool = False,
+                           sort_by: str = 'id', sort_order: str = 'asc', offset: int = 0, limit: int = 10):
+        """Búsqueda con el índice de texto: ``(ids de la página, total)`` ordenados por relevancia
+        (o por ``sort_by`` si no es el orden por defecto). None si no se puede resolver aquí."""
+        if not self.fts or sort_by not in PRODUCT_SORT_COLUMNS or not search_match_expression(search or ''):
+            return None
+        with self._lock:
+            rows, total = self._product_page("p.id", search, category, include_inactive, sort_by, sort_order, offset, limit)
+        return [row[0] for row in rows], total
+
+    def matching_product_ids(self, search: str, category: Optional[str] = None,
+                             include_inactive: bool = False) -> Optional[List[int]]:
+        """Todos los IDs que da la búsqueda con el índice (sin paginar), para el validador
+        del listado. None si la búsqueda no se resuelve con el índice."""
+        if not self.fts or not search_match_expression(search or ''):
+            return None
+        joins, where_sql, params, _ = self._product_filter(search, category, include_inactive)
+        with self._lock:
+            rows = self._conn.execute(f"SELECT p.id {joins} {where_sql}", params).fetchall()
+        return [row[0] for row in rows]
+
+    def _product_page(self, select: str, search, category, include_inactive, sort_by, sort_order, offset, limit):
+        descending = sort_order.lower() == 'desc'
+        joins, where_sql, params, ranked = self._product_filter(search, category, include_inactive)
+        if ranked and sort_by == 'id' and not descending:
+            # Con búsqueda, el orden por defecto es el de relevancia (bm25; menor es mejor)
+            order_sql = f"bm25(product_search, {_SEARCH_WEIGHTS}), p.id"
+        elif sort_by == 'id':
+            order_sql = f"p.id {'DESC' if descending else 'ASC'}"
+        else:
+            order_sql = f"{_order_sql('p.' + sort_by, descending)}, p.id ASC"
+        total = self._conn.execute(f"SELECT COUNT(*) {joins} {where_sql}", params).fetchone()[0]
+        rows = self._conn.execute(
+            f"SELECT {select} {joins} {where_sql} ORDER BY {order_sql} LIMIT ? OFFSET ?", params + [limit, offset]
+        ).fetchall()
+        return rows, total
+
+    def _product_filter(self, search: Optional[str], category: Optional[str], include_inactive: bool):
+        """FROM, WHERE y parámetros del listado; la búsqueda usa el índice FTS5 si existe.
+        Mismo filtro que el dominio del listado en Odoo: categoría por nombre (ilike) y, si
+        ninguna categoría coincide, sin filtro de categoría."""
+        joins = "FROM product_template p LEFT JOIN product_category c ON c.id = p.categ_id"
+        where, params, ranked = [], [], False
+        if not include_inactive:
+            where.append("p.active = 1")
+        if search:
+            match = search_match_expression(search) if self.fts else None
+            if match:
+                joins += " JOIN product_search ON product_search.rowid = p.id"
+                where.append("product_search MATCH ?")
+                params.append(match)
+                ranked = True
+            else:
+                where.append("(ilike(p.name, ?) OR ilike(p.default_code, ?))")
+                params += [search, search]
+        if category:
+            where.append("(ilike(c.name, ?) OR NOT EXISTS (SELECT 1 FROM product_category WHERE ilike(name, ?)))")
+            params += [category, category]
+        return joins, (f"WHERE {' AND '.join(where)}" if where else ""), params, ranked
+
+    @staticmethod
+    def _provider_where(search_term: Optional[str]):
+        where, params = "WHERE is_company = 1 AND supplier_rank > 0 AND active = 1", []
+        if search_term:
+            where += " AND ilike(name, ?)"
+            params.append(search_term)
+        return where, params
+
+    def products_version(self, search: Optional[str] = None, category: Optional[str] = None,
+                         include_inactive: bool = False, with_stock: bool = False):
+        """(registros, write_date máximo) del listado filtrado, como get_list_version en Odoo.
+        Con ``with_stock`` se añade la versión del stock replicado, como en
+        OdooProductService.get_products_version (None si aún no se ha replicado)."""
+        joins, where_sql, params, _ = self._product_filter(search, category, include_inactive)
+        with self._lock:
+            row = self._conn.execute(f"SELECT COUNT(*), MAX(p.write_date) {joins} {where_sql}", params).fetchone()
+            stock_version = self._state('stock_version') if with_stock else None
+        if not with_stock:
+            return row[0], row[1]
+        if stock_version is None:
+            return None
+        stock_write = stock_version.split('|', 1)[1] or None
+        return row[0], max(filter(None, [row[1], stock_write]), default=None), stock_version
+
+    def providers_version(self, search_term: Optional[str] = None) -> Tuple[int, Optional[str]]:
+        """(registros, write_date máximo) del listado de proveedores"""
+        where, params = self._provider_where(search_term)
+        with self._lock:
+            row = self._conn.execute(f"SELECT COUNT(*), MAX(write_date) FROM res_partner {where}", params).fetchone()
+        return row[0], row[1]
+
+    def _first_sellers(self, product_ids: List[int]) -> Dict[int, dict]:
+        """Primer proveedor (orden del modelo) de cada producto, con el nombre actual del partner"""
+        if not product_ids:
+            return {}
+        marks = ", ".join("?" for _ in product_ids)
+        rows = self._conn.execute(
+            f"SELECT s.product_tmpl_id, s.data, r.name AS partner_name FROM product_supplierinfo s "
+            f"LEFT JOIN res_partner r ON r.id = s.partner_id WHERE s.product_tmpl_id IN ({marks}) "
+            f"ORDER BY s.product_tmpl_id, s.sequence, s.min_qty DESC, s.price, s.id",
+            product_ids,
+        ).fetchall()
+        sellers = {}
+        for row in rows:
+            if row['product_tmpl_id'] in sellers:
+                continue
+            seller = json.loads(row['data'])
+            if row['partner_name'] is not None and seller.get('partner_id'):
+                seller['partner_id'] = [seller['partner_id'][0], row['partner_name']]
+            sellers[row['product_tmpl_id']] = seller
+        return sellers
+
+    def query_providers(self, search_term: Optional[str] = None, offset: int = 0, limit: int = 10):
+        """Proveedores (empresas con supplier_rank) como ``(registros, total)`` en el formato de
+        search_read, en el orden por defecto de res.partner"""
+        where, params = self._provider_where(search_term)
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM res_partner {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT data FROM res_partner {where} ORDER BY {_order_sql('name', False)}, id LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return [json.loads(row['data']) for row in rows], total
+
+    def close(self) -> None:
+        self.stop()
+        with self._lock:
+            self._conn.close()
+
+
+_mirrors: Dict[Tuple[str, str], CatalogMirror] = {}
+_mirrors_lock = threading.Lock()
+
+
+def get_catalog_mirror(service, create: bool = True) -> Optional[CatalogMirror]:
+    """Réplica del Odoo (url, db) del servicio, o None si está desactivada"""
+    if not config.ODOO_MIRROR_ENABLED:
+        return None
+    key = (service._url, service._db)
+    with _mirrors_lock:
+        mirror = _mirrors.get(key)
+        if mirror is None and create:
+            mirror = CatalogMirror(config.ODOO_MIRROR_PATH, key, config.ODOO_MIRROR_MAX_STALENESS,
+                                   config.ODOO_MIRROR_SEARCH_MAX_AGE)
+            _mirrors[key] = mirror
+        return mirror
+
+
+def fresh_catalog_mirror(service) -> Optional[CatalogMirror]:
+    """Réplica del servicio si está activada y dentro del límite de antigüedad"""
+    mirror = get_catalog_mirror(service)
+    return mirror if mirror is not None and mirror.is_fresh() else None
+
+
+def searchable_catalog_mirror(service) -> Optional[CatalogMirror]:
+    """Réplica con índice de búsqueda utilizable: puede superar el límite de antigüedad de
+    los listados (solo aporta los IDs; los datos se leen después de Odoo), pero no
+    ``ODOO_MIRROR_SEARCH_MAX_AGE``; pasado ese límite se busca en Odoo"""
+    mirror = get_catalog_mirror(service)
+    return mirror if mirror is not None and mirror.is_searchable() else None
+
+
+def notify_write(service, model: str) -> None:
+    """Avisa a la réplica (si existe) de que la API ha modificado ``model`` en Odoo"""
+    if model not in MIRROR_MODELS or not config.ODOO_MIRROR_ENABLED:
+        return
+    mirror = get_catalog_mirror(service, create=False)
+    if mirror is not None:
+        mirror.mark_stale()
+
+
+def close_catalog_mirrors() -> None:
+    """Detiene los hilos y cierra las réplicas abiertas (al apagar la aplicación o en tests)"""
+    with _mirrors_lock:
+        mirrors = list(_mirrors.values())
+        _mirrors.clear()
+    for mirror in mirrors:
+        mirror.close()
@@ -0,0 +1,187 @@
+"""Caché en proceso del árbol de ``product.category``.
+
+Se carga el árbol completo (id, nombre, padre y ruta completa) con un único
+``search_read`` y se refresca cada ``ODOO_CATEGORY_CACHE_TTL`` segundos. Las
+búsquedas por nombre, por ruta ("All / Electrodomésticos / Frío") o por hijo de
+un padre se resuelven como consultas a diccionarios; las categorías que crea
+la API se añaden al árbol en el momento, sin recargarlo.
+"""
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ..utils.config import config
+
+logger = logging.getLogger("odoo_category_cache")
+
+_FIELDS = ['id', 'name', 'parent_id', 'complete_name']
+
+
+def _norm(text: str) -> str:
+    return " ".join(str(text).split()).casefold()
+
+
+class CategoryTreeCache:
+    """Árbol de categorías de un Odoo (url, db)"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._loaded_at: Optional[float] = None
+        self._by_id: Dict[int, dict] = {}
+        self._by_name: Dict[str, List[int]] = {}
+        self._by_path: Dict[str, int] = {}
+        self._children: Dict[Tuple[Optional[int], str], int] = {}
+
+    # --- carga ---
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def _ensure_loaded(self, service) -> bool:
+        """Carga o refresca el árbol si ha caducado. Devuelve False si no hay árbol disponible."""
+        if self._is_fresh():
+            return True
+        with self._lock:
+            if self._is_fresh():
+                return True
+            records = service._execute_kw('product.category', 'search_read', [[]], {'fields': _FIELDS})
+            if records is None:
+                logger.warning("No se pudo cargar el árbol de categorías; se usará el último disponible")
+                return self._loaded_at is not None
+            self._rebuild(records)
+            self._loaded_at = time.monotonic()
+            logger.info(f"Árbol de categorías cargado: {len(self._by_id)} categorías")
+            return True
+
+    def _rebuild(self, records: List[dict]) -> None:
+        self._by_id = {}
+        self._by_name = {}
+        self._by_path = {}
+        self._children = {}
+        for record in records:
+            parent = record.get('parent_id')
+            self._by_id[record['id']] = {
+                'id': record['id'],
+                'name': record.get('name') or '',
+                'parent_id': parent[0] if isinstance(parent, (list, tuple)) and parent else (parent or None),
+                'path': record.get('complete_name') or '',
+            }
+        for category in self._by_id.values():
+            if not category['path']:
+                category['path'] = self._compute_path(category['id'])
+        # Mismo orden que search(limit=1) en Odoo: product.category se ordena por complete_name
+        for category in sorted(self._by_id.values(), key=lambda c: (c['path'], c['id'])):
+            self._index(category)
+
+    def _compute_path(self, category_id: int) -> str:
+        names, seen = [], set()
+        current = self._by_id.get(category_id)
+        while current and current['id'] not in seen:
+            seen.add(current['id'])
+            names.append(current['name'])
+            current = self._by_id.get(current['parent_id'])
+        return " / ".join(reversed(names))
+
+    def _index(self, category: dict) -> None:
+        self._by_name.setdefault(category['name'], []).append(category['id'])
+        self._by_path.setdefault(_norm(category['path']), category['id'])
+        self._children.setdefault((category['parent_id'], category['name']), category['id'])
+
+    def add(self, category_id: int, name: str, parent_id: Optional[int] = None) -> None:
+        """Añade al árbol una categoría recién creada (sin recargarlo)"""
+        with self._lock:
+            category = {'id': category_id, 'name': name, 'parent_id': parent_id, 'path': ''}
+            self._by_id[category_id] = category
+            category['path'] = self._compute_path(category_id)
+            self._index(category)
+
+    def invalidate(self) -> None:
+        """Fuerza la recarga en la próxima consulta"""
+        with self._lock:
+            self._loaded_at = None
+
+    # --- consultas ---
+
+    def get(self, service, category_id: int) -> Optional[dict]:
+        """Categoría por ID (``id``, ``name``, ``parent_id``, ``path``)"""
+        self._ensure_loaded(service)
+        return self._by_id.get(category_id)
+
+    def name(self, service, category_id: int) -> Optional[str]:
+        category = self.get(service, category_id)
+        return category['name'] if category else None
+
+    def cached_name(self, category_id: int) -> Optional[str]:
+        """Nombre si el árbol ya está cargado (nunca llama a Odoo; para rutas async)"""
+        category = self._by_id.get(category_id)
+        return category['name'] if category else None
+
+    def find_by_name(self, service, name: str) -> Optional[int]:
+        """ID de la primera categoría con ese nombre exacto (como ``('name', '=', name)``)"""
+        self._ensure_loaded(service)
+        ids = self._by_name.get(name)
+        return ids[0] if ids else None
+
+    def find_child(self, service, parent_id: Optional[int], name: str) -> Optional[int]:
+        """ID de la categoría ``name`` cuyo padre es ``parent_id``"""
+        self._ensure_loaded(service)
+        return self._children.get((parent_id, name))
+
+    def find_by_path(self, service, path: str) -> Optional[int]:
+        """ID por ruta completa, p. ej. "All / Electrodomésticos / Frío" (sin distinguir mayúsculas)"""
+        self._ensure_loaded(service)
+        return self._by_path.get(_norm(path))
+
+    def search(self, service, term: str) -> List[int]:
+        """IDs cuyo nombre contiene ``term`` sin distinguir mayúsculas (como ``ilike``)"""
+        self._ensure_loaded(service)
+        needle = term.casefold()
+        return [cid for cid, category in self._by_id.items() if needle in category['name'].casefold()]
+
+    def get_or_create(self, service, name: str, parent_id: Optional[int] = None, any_parent: bool = True) -> Optional[int]:
+        """Busca la categoría por nombre (en cualquier padre o solo bajo ``parent_id``)
+        y si no existe la crea bajo ``parent_id``. El lock evita que dos hilos del
+        mismo proceso creen la misma categoría a la vez.
+        """
+        with self._lock:
+            if not self._ensure_loaded(service):
+                return self._get_or_create_rpc(service, name, parent_id, any_parent)
+            category_id = self.find_by_name(service, name) if any_parent else self.find_child(service, parent_id, name)
+            if category_id:
+                return category_id
+            vals = {'name': name}
+            if parent_id:
+                vals['parent_id'] = parent_id
+            category_id = service._execute_kw('product.category', 'create', [vals])
+            if category_id:
+                self.add(category_id, name, parent_id)
+                logger.info(f"Categoría creada: {name} (ID: {category_id})")
+            return category_id
+
+    def _get_or_create_rpc(self, service, name, parent_id, any_parent) -> Optional[int]:
+        """Camino sin caché (árbol no disponible): búsqueda y alta directamente en Odoo"""
+        domain = [('name', '=', name)] if any_parent else [('name', '=', name), ('parent_id', '=', parent_id)]
+        ids = service._execute_kw('product.category', 'search', [domain], {'limit': 1})
+        if ids:
+            return ids[0]
+        vals = {'name': name}
+        if parent_id:
+            vals['parent_id'] = parent_id
+        return service._execute_kw('product.category', 'create', [vals])
+
+
+_trees: Dict[Tuple[str, str], CategoryTreeCache] = {}
+_trees_lock = threading.Lock()
+
+
+def get_category_tree(service) -> CategoryTreeCache:
+    """Árbol de categorías compartido para el Odoo (url, db) del servicio"""
+    key = (service._url, service._db)
+    with _trees_lock:
+        tree = _trees.get(key)
+        if tree is None:
+            tree = CategoryTreeCache(config.ODOO_CATEGORY_CACHE_TTL)
+            _trees[key] = tree
+        return tree
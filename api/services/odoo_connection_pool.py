@@ -0,0 +1,185 @@
+"""Pool de conexiones HTTP persistentes hacia Odoo.
+
+Todas las instancias de ``OdooBaseService`` comparten, por URL de Odoo, un pool
+acotado de conexiones keep-alive. El transporte XML-RPC toma una conexión del
+pool para cada llamada y la devuelve al terminar, por lo que es seguro usarlo
+desde varios hilos a la vez (threadpool de FastAPI, importadores, etc.).
+"""
+import http.client
+import logging
+import threading
+import time
+import xmlrpc.client
+from typing import Dict, List, Tuple
+from urllib.parse import urlparse
+
+from ..utils.config import config
+
+logger = logging.getLogger("odoo_connection_pool")
+
+# Errores que indican que el servidor cerró una conexión keep-alive reutilizada
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+class OdooConnectionPool:
+    """Pool acotado y thread-safe de conexiones HTTP(S) persistentes"""
+
+    def __init__(self, url: str, size: int, idle_timeout: float, timeout: float):
+        parsed = urlparse(url)
+        self.scheme = parsed.scheme or "http"
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port
+        self.size = max(1, size)
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._idle: List[Tuple[http.client.HTTPConnection, float]] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._in_use = 0
+        self.created = 0
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        conn_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        self.created += 1
+        return conn_class(self.host, self.port, timeout=self.timeout)
+
+    def acquire(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """Obtiene una conexión del pool. Devuelve (conexión, reutilizada)."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No hay conexiones libres hacia Odoo ({self.size} en uso)")
+        try:
+            with self._lock:
+                self._in_use += 1
+                now = time.monotonic()
+                while self._idle:
+                    conn, last_used = self._idle.pop()
+                    if now - last_used <= self.idle_timeout:
+                        return conn, True
+                    # Conexión ociosa demasiado tiempo: Odoo/proxy probablemente la cerró
+                    conn.close()
+                conn = self._new_connection()
+            return conn, False
+        except Exception:
+            self._release_slot()
+            raise
+
+    def release(self, conn: http.client.HTTPConnection, reusable: bool = True) -> None:
+        """Devuelve la conexión al pool (o la cierra si no es reutilizable)"""
+        try:
+            if reusable:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+            else:
+                conn.close()
+        finally:
+            self._release_slot()
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            self._in_use -= 1
+        self._slots.release()
+
+    def post(self, handler: str, body: bytes, headers: Dict[str, str]) -> bytes:
+        """Envía un POST por una conexión del pool y devuelve el cuerpo de la respuesta.
+        Reintenta una vez si la conexión reutilizada estaba cerrada por el servidor.
+        """
+        for attempt in (0, 1):
+            conn, reused = self.acquire()
+            reusable = False
+            try:
+                conn.request("POST", handler, body, headers)
+                response = conn.getresponse()
+                data = response.read()
+                reusable = not response.will_close
+                if response.status != 200:
+                    raise xmlrpc.client.ProtocolError(
+                        f"{self.host}{handler}", response.status, response.reason, dict(response.getheaders())
+                    )
+                return data
+            except _STALE_CONNECTION_ERRORS:
+                if attempt == 0 and reused:
+                    logger.debug("Conexión keep-alive cerrada por Odoo; reintentando con una nueva")
+                    continue
+                raise
+            finally:
+                self.release(conn, reusable)
+
+    def close_all(self) -> None:
+        """Cierra las conexiones ociosas"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            conn.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "created": self.created,
+            }
+
+
+class PooledTransport(xmlrpc.client.Transport):
+    """Transporte XML-RPC que toma las conexiones de un OdooConnectionPool"""
+
+    def __init__(self, pool: OdooConnectionPool):
+        super().__init__()
+        self._pool = pool
+
+    def request(self, host, handler, request_body, verbose=False):
+        body = self._pool.post(handler, request_body, {
+            "Content-Type": "text/xml",
+            "User-Agent": self.user_agent,
+        })
+        parser, unmarshaller = self.getparser()
+        parser.feed(body)
+        parser.close()
+        return unmarshaller.close()
+
+
+_pools: Dict[str, OdooConnectionPool] = {}
+_proxies: Dict[Tuple[str, str], xmlrpc.client.ServerProxy] = {}
+_registry_lock = threading.Lock()
+
+
+def get_connection_pool(url: str) -> OdooConnectionPool:
+    """Devuelve el pool compartido para la URL de Odoo indicada"""
+    with _registry_lock:
+        pool = _pools.get(url)
+        if pool is None:
+            pool = OdooConnectionPool(
+                url,
+                size=config.ODOO_POOL_SIZE,
+                idle_timeout=config.ODOO_POOL_IDLE_TIMEOUT,
+                timeout=config.ODOO_TIMEOUT,
+            )
+            _pools[url] = pool
+        return pool
+
+
+def get_server_proxy(url: str, service: str) -> xmlrpc.client.ServerProxy:
+    """Devuelve el ServerProxy compartido de ``/xmlrpc/2/<service>`` sobre el pool"""
+    key = (url, service)
+    proxy = _proxies.get(key)
+    if proxy is None:
+        pool = get_connection_pool(url)
+        proxy = xmlrpc.client.ServerProxy(
+            f"{url}/xmlrpc/2/{service}",
+            transport=PooledTransport(pool),
+            allow_none=True,
+        )
+        with _registry_lock:
+            proxy = _proxies.setdefault(key, proxy)
+    return proxy
+
+
+def get_pool_stats() -> Dict[str, dict]:
+    """Estadísticas de todos los pools del proceso"""
+    return {url: pool.stats() for url, pool in list(_pools.items())}
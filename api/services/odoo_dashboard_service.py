@@ -0,0 +1,187 @@
+"""Estadísticas del dashboard calculadas por Odoo.
+
+En lugar de traer productos, ventas y clientes y contarlos en Python, cada
+cifra sale de un agregado (``read_group`` / ``search_count``) o de una lectura
+pequeña con ``limit``. Las consultas son independientes y se lanzan juntas con
+``execute_batch``: el coste del dashboard no depende del tamaño del catálogo.
+"""
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from .odoo_base_service import OdooBaseService
+from .odoo_resilience import OdooUnavailableError
+from ..models.schemas import DashboardStats, Product, Sale
+
+logger = logging.getLogger("odoo_dashboard_service")
+
+# Por debajo de estas unidades un producto tiene stock bajo
+LOW_STOCK_THRESHOLD = 5
+# Pedidos de venta confirmados
+CONFIRMED_SALE_STATES = ['sale', 'done']
+CONFIRMED_PURCHASE_STATES = ['purchase', 'done']
+
+
+def _month_starts(today: date):
+    """Inicio del mes actual y del anterior como fecha-hora de Odoo"""
+    this_month = today.replace(day=1)
+    last_month = (this_month - timedelta(days=1)).replace(day=1)
+    return this_month.strftime('%Y-%m-%d 00:00:00'), last_month.strftime('%Y-%m-%d 00:00:00')
+
+
+def _many2one(value):
+    if isinstance(value, (list, tuple)) and value:
+        return value[0], (value[1] if len(value) > 1 else None)
+    return (value or None), None
+
+
+class OdooDashboardService(OdooBaseService):
+    """Estadísticas agregadas del dashboard (read_group / search_count)"""
+
+    def _dashboard_queries(self, today: date) -> Dict[str, tuple]:
+        this_month, last_month = _month_starts(today)
+        confirmed = [('state', 'in', CONFIRMED_SALE_STATES)]
+        active = [('active', '=', True)]
+        low_stock = active + [('qty_available', '<', LOW_STOCK_THRESHOLD)]
+        return {
+            'products_by_active': ('product.template', 'read_group',
+                                   [[('active', 'in', [True, False])], [], ['active']], {'lazy': False}),
+            'products_by_category': ('product.template', 'read_group', [active, [], ['categ_id']], {'lazy': False}),
+            'categories': ('product.category', 'search_count', [[]]),
+            'out_of_stock': ('product.template', 'search_count', [active + [('qty_available', '<=', 0)]]),
+            'low_stock': ('product.template', 'search_count', [low_stock]),
+            'low_stock_products': ('product.template', 'search_read', [low_stock], {
+                'fields': ['name', 'default_code', 'list_price', 'standard_price', 'categ_id', 'qty_available'],
+                'order': 'name', 'limit': 10,
+            }),
+            'sales': ('sale.order', 'read_group', [confirmed, ['amount_total:sum'], []], {'lazy': False}),
+            'sales_this_month': ('sale.order', 'read_group',
+                                 [confirmed + [('date_order', '>=', this_month)], ['amount_total:sum'], []], {'lazy': False}),
+            'sales_last_month': ('sale.order', 'read_group',
+                                 [confirmed + [('date_order', '>=', last_month), ('date_order', '<', this_month)],
+                                  ['amount_total:sum'], []], {'lazy': False}),
+            'recent_sales': ('sale.order', 'search_read', [confirmed], {
+                'fields': ['name', 'partner_id', 'date_order', 'amount_total', 'state'],
+                'order': 'date_order desc, id desc', 'limit': 10,
+            }),
+            'customers': ('res.partner', 'search_count', [[('customer_rank', '>', 0)]]),
+            'providers_by_active': ('res.partner', 'read_group',
+                                    [[('supplier_rank', '>', 0), ('active', 'in', [True, False])], [], ['active']],
+                                    {'lazy': False}),
+            'providers_with_orders': ('purchase.order', 'read_group',
+                                      [[('state', 'in', CONFIRMED_PURCHASE_STATES)], [], ['partner_id']], {'lazy': False}),
+        }
+
+    def _run_queries(self, queries: Dict[str, tuple]) -> Dict[str, Any]:
+        """Lanza las consultas a la vez; las que fallan (p. ej. módulo de ventas no
+        instalado) quedan como None. Si fallan todas, Odoo no está disponible."""
+        results = self.execute_batch(list(queries.values()))
+        if results and all(r['error'] for r in results):
+            raise OdooUnavailableError(f"Odoo no respondió a las consultas del dashboard: {results[0]['error']}")
+        answers = {}
+        for name, result in zip(queries, results):
+            if result['error']:
+                logger.warning(f"Consulta del dashboard '{name}' fallida: {result['error'][:200]}")
+            answers[name] = result['result'] if not result['error'] else None
+        return answers
+
+    @staticmethod
+    def _group_counts(rows: Optional[List[dict]], key: str) -> Dict[Any, int]:
+        return {row.get(key): row.get('__count', 0) for row in rows or []}
+
+    @staticmethod
+    def _total(rows: Optional[List[dict]], field: str) -> float:
+        return float(rows[0].get(field) or 0.0) if rows else 0.0
+
+    def get_category_counts(self) -> List[Dict[str, Any]]:
+        """Productos activos por categoría (un read_group), de mayor a menor"""
+        rows = self._call_kw('product.template', 'read_group',
+                             [[('active', '=', True)], [], ['categ_id']], {'lazy': False})
+        return self._categories_from_groups(rows)
+
+    @staticmethod
+    def _categories_from_groups(rows: Optional[List[dict]]) -> List[Dict[str, Any]]:
+        categories = []
+        for row in rows or []:
+            category_id, name = _many2one(row.get('categ_id'))
+            categories.append({'id': category_id or 0, 'name': name or 'Sin categoría', 'count': row.get('__count', 0)})
+        categories.sort(key=lambda c: (-c['count'], c['name']))
+        return categories
+
+    def get_dashboard_stats(self, today: Optional[date] = None) -> DashboardStats:
+        """Estadísticas del dashboard con un puñado de consultas agregadas en paralelo"""
+        answers = self._run_queries(self._dashboard_queries(today or date.today()))
+
+        by_active = self._group_counts(answers['products_by_active'], 'active')
+        active_products, inactive_products = by_active.get(True, 0), by_active.get(False, 0)
+        out_of_stock = answers['out_of_stock'] or 0
+        categories = self._categories_from_groups(answers['products_by_category'])
+
+        sales_count = self._total(answers['sales'], '__count')
+        sales_amount = self._total(answers['sales'], 'amount_total')
+        this_month = self._total(answers['sales_this_month'], 'amount_total')
+        last_month = self._total(answers['sales_last_month'], 'amount_total')
+        providers = self._group_counts(answers['providers_by_active'], 'active')
+
+        return DashboardStats(
+            totalProducts=active_products,
+            activeProducts=active_products,
+            inactiveProducts=inactive_products,
+            productsWithStock=max(active_products - out_of_stock, 0),
+            productsWithoutStock=out_of_stock,
+            totalCategories=answers['categories'] or 0,
+            totalSales=sales_count,
+            salesThisMonth=round(this_month, 2),
+            salesLastMonth=round(last_month, 2),
+            salesGrowth=round((this_month - last_month) / last_month * 100, 2) if last_month else 0.0,
+            averageOrderValue=round(sales_amount / sales_count, 2) if sales_count else 0.0,
+            totalCustomers=answers['customers'] or 0,
+            totalProviders=sum(providers.values()),
+            activeProviders=providers.get(True, 0),
+            providersWithOrders=len([row for row in answers['providers_with_orders'] or [] if row.get('partner_id')]),
+            lowStockProducts=answers['low_stock'] or 0,
+            outOfStockProducts=out_of_stock,
+            topCategories=categories[:5],
+            low_stock_products=[self._low_stock_product(p) for p in answers['low_stock_products'] or []],
+            recentSales=[self._recent_sale(s) for s in answers['recent_sales'] or []],
+        )
+
+    @staticmethod
+    def _low_stock_product(record: dict) -> Product:
+        category_id, category = _many2one(record.get('categ_id'))
+        quantity = record.get('qty_available') or 0.0
+        return Product(
+            id=record['id'], name=record.get('name') or '', default_code=record.get('default_code') or None,
+            list_price=record.get('list_price') or 0.0, standard_price=record.get('standard_price') or 0.0,
+            categ_id=category_id, category=category, qty_available=quantity, stock=int(quantity),
+        )
+
+    @staticmethod
+    def _recent_sale(record: dict) -> Sale:
+        partner_id, partner_name = _many2one(record.get('partner_id'))
+        amount = record.get('amount_total') or 0.0
+        return Sale(
+            id=record['id'], name=record.get('name') or '', partner_id=[partner_id] if partner_id else [],
+            date_order=record.get('date_order'), amount_total=amount, state=record.get('state') or 'draft',
+            customer_id=partner_id, customer_name=partner_name, total=amount, total_amount=amount,
+            date=record.get('date_order'), status=record.get('state'),
+        )
+
+    async def get_dashboard_stats_async(self, today: Optional[date] = None) -> DashboardStats:
+        """Versión asíncrona de get_dashboard_stats (se ejecuta en el threadpool)"""
+        return await self._run_async(self.get_dashboard_stats, today)
+
+    async def get_snapshot_async(self, refresh: bool = False):
+        """Instantánea precalculada del dashboard; con ``refresh`` se recalcula
+        (agrupándose con cualquier recálculo en curso)"""
+        from .dashboard_snapshot import get_dashboard_snapshot
+        snapshot = get_dashboard_snapshot(self)
+        return await self._run_async(snapshot.get_fresh if refresh else snapshot.get)
+
+    async def get_category_counts_async(self) -> List[Dict[str, Any]]:
+        """Versión asíncrona de get_category_counts"""
+        return await self._run_async(self.get_category_counts)
+
+
+# Instancia global usada por las rutas del dashboard
+odoo_dashboard_service = OdooDashboardService()
@@ -1,6 +1,7 @@
 from typing import List, Dict, Any, Optional
 import logging
 from .odoo_base_service import OdooBaseService
+from .odoo_resilience import OdooUnavailableError
 
 logger = logging.getLogger("odoo_invoice_service")
 
@@ -10,14 +11,19 @@ class OdooInvoiceService(OdooBaseService):
     def __init__(self):
         super().__init__()
         # Obtener impuesto compra 21 %
-        tax_ids = self._execute_kw(
-            "account.tax",
-            "search",
-            [[["type_tax_use", "=", "purchase"], ["amount", "=", 21]]],
-            {"limit": 1}
-        )
+        try:
+            tax_ids = self._execute_kw(
+                "account.tax",
+                "search",
+                [[["type_tax_use", "=", "purchase"], ["amount", "=", 21]]],
+                {"limit": 1}
+            )
+            re_ids = self._execute_kw("account.tax", "search", [[["type_tax_use","=","purchase"],["amount","=",5.2]]], {"limit":1})
+        except OdooUnavailableError as e:
+            # Se instancia al importar el módulo: no impedir el arranque si Odoo está caído
+            logger.warning(f"No se pudieron obtener los impuestos de compra: {e}")
+            tax_ids, re_ids = None, None
         self.INVOICE_TAX_ID = tax_ids[0] if tax_ids else 0
-        re_ids = self._execute_kw("account.tax", "search", [[["type_tax_use","=","purchase"],["amount","=",5.2]]], {"limit":1})
         self.RE_TAX_ID = re_ids[0] if re_ids else 0
 
     def find_supplier_invoice(self, partner_id: int, ref: str) -> Optional[int]:
@@ -30,6 +36,16 @@ class OdooInvoiceService(OdooBaseService):
         ids = self._execute_kw("account.move", "search", [domain], {"limit": 1})
         return ids[0] if ids else None
 
+    async def find_supplier_invoice_async(self, partner_id: int, ref: str) -> Optional[int]:
+        """Versión asíncrona de find_supplier_invoice."""
+        domain = [
+            ("partner_id", "=", partner_id),
+            ("move_type", "=", "in_invoice"),
+            ("ref", "=", ref)
+        ]
+        ids = await self._execute_kw_async("account.move", "search", [domain], {"limit": 1})
+        return ids[0] if ids else None
+
     def _ensure_product(self, default_code: str, name: str) -> int:
         """Busca product.product por default_code, si no existe crea stub y devuelve product_id"""
         product_domain = [("default_code", "=", default_code)]
@@ -88,3 +104,7 @@ class OdooInvoiceService(OdooBaseService):
         except Exception as e:
             logger.error(f"Error creando factura: {e}")
             return {"created": False, "error": str(e)}
+
+    async def create_supplier_invoice_async(self, *args, **kwargs) -> Dict[str, Any]:
+        """Versión asíncrona de create_supplier_invoice (se ejecuta en el threadpool)."""
+        return await self._run_async(self.create_supplier_invoice, *args, **kwargs)
@@ -0,0 +1,96 @@
+"""Dataloader de registros many2one para una petición.
+
+Durante una petición (o una operación por lotes) los servicios anotan los IDs
+que van a necesitar con ``want`` y el loader los resuelve con un único ``read``
+por modelo, sin repetir IDs. Así una página de 100 productos hace como mucho
+una lectura de ``product.category`` y otra de ``res.partner``.
+"""
+import logging
+import threading
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger("odoo_name_loader")
+
+_current_loader: ContextVar[Optional["Many2oneLoader"]] = ContextVar("odoo_many2one_loader", default=None)
+
+
+def current_loader() -> Optional["Many2oneLoader"]:
+    """Loader de la petición en curso (None fuera de un ``many2one_loader``)"""
+    return _current_loader.get()
+
+
+def many2one_id(value: Any) -> Optional[int]:
+    """Extrae el ID de un valor many2one de Odoo (``[id, nombre]``, ``id`` o False)"""
+    if isinstance(value, (list, tuple)):
+        return value[0] if value else None
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return None
+
+
+class Many2oneLoader:
+    """Acumula IDs por modelo y los lee en bloque la primera vez que se consultan"""
+
+    def __init__(self, service):
+        self._service = service
+        self._pending: Dict[str, Set[int]] = {}
+        self._fields: Dict[str, Set[str]] = {}
+        self._records: Dict[str, Dict[int, dict]] = {}
+        self._lock = threading.Lock()
+        self.reads = 0
+
+    def want(self, model: str, ids: Iterable[Any], fields: Optional[List[str]] = None) -> None:
+        """Anota IDs (o valores many2one) que se van a necesitar"""
+        with self._lock:
+            wanted = set(fields or ['name'])
+            model_fields = self._fields.setdefault(model, set())
+            new_fields = wanted - model_fields
+            model_fields |= wanted
+            loaded = self._records.setdefault(model, {})
+            pending = self._pending.setdefault(model, set())
+            if new_fields:
+                # Los registros ya leídos no tienen los campos nuevos
+                pending.update(loaded)
+            for value in ids:
+                record_id = many2one_id(value)
+                if record_id and record_id not in loaded:
+                    pending.add(record_id)
+
+    def _flush(self, model: str) -> None:
+        with self._lock:
+            ids = sorted(self._pending.get(model, ()))
+            fields = sorted(self._fields.get(model, {'name'}))
+            self._pending[model] = set()
+        if not ids:
+            return
+        self.reads += 1
+        records = self._service._execute_kw(model, 'read', [ids], {'fields': fields}) or []
+        with self._lock:
+            loaded = self._records.setdefault(model, {})
+            for record in records:
+                loaded[record['id']] = record
+            # IDs inexistentes o error de lectura: no volver a pedirlos en esta petición
+            for record_id in ids:
+                loaded.setdefault(record_id, {})
+
+    def load_many(self, model: str, ids: Iterable[Any], fields: Optional[List[str]] = None) -> Dict[int, dict]:
+        """Devuelve ``{id: registro}`` de los IDs pedidos (una lectura como mucho)"""
+        ids = [record_id for record_id in (many2one_id(v) for v in ids) if record_id]
+        self.want(model, ids, fields)
+        self._flush(model)
+        loaded = self._records.get(model, {})
+        return {record_id: loaded.get(record_id, {}) for record_id in ids}
+
+    def get(self, model: str, value: Any, field: str = 'name', default: Any = None) -> Any:
+        """Valor de ``field`` del registro; resuelve antes todos los IDs pendientes del modelo"""
+        record_id = many2one_id(value)
+        if not record_id:
+            return default
+        record = self._records.get(model, {}).get(record_id)
+        if record is None or (record and field not in record):
+            self.want(model, [record_id], [field])
+            self._flush(model)
+            record = self._records.get(model, {}).get(record_id, {})
+        value = record.get(field, default)
+        return default if value is False and default is not None else value
@@ -1,5 +1,18 @@
-from typing import List, Optional, Dict, Union, Any
+import base64
+import json
+import xmlrpc.client
+from typing import Iterator, List, Optional, Dict, Union, Any
 from .odoo_base_service import OdooBaseService
+from .odoo_catalog_mirror import (PRODUCT_SORT_COLUMNS, fresh_catalog_mirror, search_match_expression,
+                                  searchable_catalog_mirror)
+from .odoo_category_cache import get_category_tree
+from .odoo_supplier_directory import get_supplier_directory
+from .odoo_name_loader import current_loader
+from .odoo_stock_levels import get_stock_levels, get_stock_version
+from .odoo_resilience import OdooUnavailableError
+from ..utils.config import config
+from ..utils.sparse_fields import odoo_fields_for, select_fields
+from ..utils.ttl_cache import TTLCache
 import logging
 from ..models.schemas import Product, ProductCreate, OdooProductUpdate
 from fastapi import HTTPException
@@ -7,20 +20,89 @@ import logging
 from .product_transform import prepare_product_vals
 from .product_lookup import find_existing_product
 
+# Resultado de initialize_custom_fields por (url, db): se comprueba una vez por proceso
+_custom_fields_checked = TTLCache(ttl=config.ODOO_METADATA_TTL)
+
+
+def _from_web_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Convierte un registro de web_search_read al formato de search_read
+    (many2one como ``[id, nombre]`` y x2many como lista de IDs)"""
+    converted = {}
+    for name, value in record.items():
+        if isinstance(value, dict):
+            value = [value['id'], value.get('display_name')] if value.get('id') else False
+        elif isinstance(value, list) and value and isinstance(value[0], dict):
+            value = [item['id'] for item in value]
+        converted[name] = value
+    return converted
+
+
+def encode_cursor(sort_by: str, descending: bool, key: Any, last_id: int) -> str:
+    """Cursor opaco (base64 URL-safe) con la clave de orden del último producto"""
+    payload = json.dumps({'s': sort_by, 'd': descending, 'k': key, 'i': last_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decodifica un cursor de encode_cursor; ValueError si está mal formado"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return {'sort_by': str(data['s']), 'desc': bool(data['d']), 'key': data['k'], 'id': int(data['i'])}
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Cursor no válido: {e}")
+
+
+def _keyset_domain(sort_by: str, descending: bool, after: Dict[str, Any]) -> list:
+    """Dominio de los registros posteriores a ``after`` en el orden (sort_by, id).
+    PostgreSQL ordena los NULL (False en Odoo) al final en ASC y al principio en DESC.
+    """
+    last_id = after['id']
+    id_leaf = ('id', '<', last_id) if descending else ('id', '>', last_id)
+    if sort_by == 'id':
+        return [id_leaf]
+    key = after['key']
+    if key is False or key is None:
+        if descending:
+            # Tras los NULL vienen todos los valores no nulos
+            return ['|', '&', (sort_by, '=', False), id_leaf, (sort_by, '!=', False)]
+        return ['&', (sort_by, '=', False), id_leaf]
+    after_key = (sort_by, '<', key) if descending else (sort_by, '>', key)
+    same_key = ['&', (sort_by, '=', key), id_leaf]
+    if descending:
+        return ['|', after_key] + same_key
+    # En ASC los NULL van al final: también son "posteriores"
+    return ['|', '|', after_key] + same_key + [(sort_by, '=', False)]
+
+
 class OdooProductService(OdooBaseService):
     """Servicio para gestión de productos en Odoo"""
+
+    # Campos leídos para la ficha de un producto
+    PRODUCT_DETAIL_FIELDS = [
+        'id', 'name', 'default_code', 'list_price', 'categ_id', 'active',
+        'type', 'standard_price', 'barcode', 'weight', 'sale_ok', 'purchase_ok',
+        'available_in_pos', 'to_weight', 'is_published', 'website_sequence',
+        'description_sale', 'description', 'description_purchase'
+    ]
     
     def initialize_custom_fields(self):
-        """Inicializa los campos personalizados necesarios en Odoo"""
+        """Inicializa los campos personalizados necesarios en Odoo.
+        Gracias a la caché de metadatos solo consulta a Odoo una vez por proceso (y TTL).
+        """
+        key = (self._url, self._db)
+        checked = _custom_fields_checked.get(key)
+        if checked is not None:
+            return checked
         try:
-            if not self._models:
-                self._get_connection()
-                
             # Crear campos personalizados para márgenes y alertas si no existen
-            self._ensure_custom_field('product.template', 'x_margen_calculado', 'float', 'Margen Calculado (%)')
-            self._ensure_custom_field('product.template', 'x_alerta_margen', 'boolean', 'Alerta de Margen')
-            logging.info("Campos personalizados para márgenes y alertas verificados/creados correctamente")
-            return True
+            ok = self._ensure_custom_field('product.template', 'x_margen_calculado', 'float', 'Margen Calculado (%)')
+            ok = self._ensure_custom_field('product.template', 'x_alerta_margen', 'boolean', 'Alerta de Margen') and ok
+            if ok:
+                logging.info("Campos personalizados para márgenes y alertas verificados/creados correctamente")
+            # Un fallo se vuelve a intentar al cabo de un minuto, no en cada petición
+            _custom_fields_checked.set(key, ok, ttl=None if ok else 60)
+            return ok
         except Exception as e:
             logging.error(f"Error al inicializar campos personalizados: {str(e)}")
             return False
@@ -39,12 +121,7 @@ class OdooProductService(OdooBaseService):
                 [[['id', '=', product_id]]], 
                 {
                     'limit': 1,
-                    'fields': [
-                        'id', 'name', 'default_code', 'list_price', 'categ_id', 'active',
-                        'type', 'standard_price', 'barcode', 'weight', 'sale_ok', 'purchase_ok',
-                        'available_in_pos', 'to_weight', 'is_published', 'website_sequence',
-                        'description_sale', 'description', 'description_purchase'
-                    ]
+                    'fields': self.PRODUCT_DETAIL_FIELDS
                 }
             )
             
@@ -57,7 +134,34 @@ class OdooProductService(OdooBaseService):
             category_name = None
             if product.get('categ_id'):
                 category_id = product['categ_id'][0] if isinstance(product['categ_id'], list) else product['categ_id']
-                category_data = self._execute_kw(
+                category_name = self._get_category_name(category_id)
+            
+            return self._to_product(product, category_name)
+            
+        except OdooUnavailableError:
+            raise
+        except Exception as e:
+            logging.error(f"Error obteniendo producto por ID {product_id}: {e}")
+            return None
+
+    async def get_product_by_id_async(self, product_id: int) -> Optional[Product]:
+        """Versión asíncrona de get_product_by_id (no bloquea el event loop)"""
+        try:
+            product_data = await self._execute_kw_async(
+                'product.template',
+                'search_read',
+                [[['id', '=', product_id]]],
+                {'limit': 1, 'fields': self.PRODUCT_DETAIL_FIELDS}
+            )
+            if not product_data:
+                return None
+            product = product_data[0]
+            category_name = None
+            if product.get('categ_id'):
+                category_id = product['categ_id'][0] if isinstance(product['categ_id'], list) else product['categ_id']
+                category_name = get_category_tree(self).cached_name(category_id)
+            if product.get('categ_id') and not category_name:
+                category_data = await self._execute_kw_async(
                     'product.category',
                     'read',
                     [category_id],
@@ -65,95 +169,103 @@ class OdooProductService(OdooBaseService):
                 )
                 if category_data:
                     category_name = category_data[0]['name']
-            
-            # Construir objeto Product
-            return Product(
-                id=product['id'],
-                name=product['name'],
-                default_code=product.get('default_code', ''),
-                list_price=product.get('list_price', 0.0),
-                standard_price=product.get('standard_price', 0.0),
-                categ_id=product['categ_id'][0] if isinstance(product['categ_id'], list) else product.get('categ_id'),
-                category=category_name,
-                active=product.get('active', True),
-                type=product.get('type', 'product'),
-                barcode=product.get('barcode'),
-                weight=product.get('weight', 0.0),
-                sale_ok=product.get('sale_ok', True),
-                purchase_ok=product.get('purchase_ok', True),
-                available_in_pos=product.get('available_in_pos', False),
-                to_weight=product.get('to_weight', False),
-                is_published=product.get('is_published', False),
-                website_sequence=product.get('website_sequence', 0),
-                description_sale=product.get('description_sale', ''),
-                description=product.get('description', ''),
-                description_purchase=product.get('description_purchase', '')
-            )
-            
+            return self._to_product(product, category_name)
+        except OdooUnavailableError:
+            raise
         except Exception as e:
-            logging.error(f"Error obteniendo producto por ID {product_id}: {e}")
+            logging.error(f"Error obteniendo producto por ID {product_id} (async): {e}")
             return None
-            
+
+    def _to_product(self, product: Dict[str, Any], category_name: Optional[str]) -> Product:
+        """Construye el modelo Product a partir de un registro de product.template"""
+        return Product(
+            id=product['id'],
+            name=product['name'],
+            default_code=product.get('default_code', ''),
+            list_price=product.get('list_price', 0.0),
+            standard_price=product.get('standard_price', 0.0),
+            categ_id=product['categ_id'][0] if isinstance(product['categ_id'], list) else product.get('categ_id'),
+            category=category_name,
+            active=product.get('active', True),
+            type=product.get('type', 'product'),
+            barcode=product.get('barcode'),
+            weight=product.get('weight', 0.0),
+            sale_ok=product.get('sale_ok', True),
+            purchase_ok=product.get('purchase_ok', True),
+            available_in_pos=product.get('available_in_pos', False),
+            to_weight=product.get('to_weight', False),
+            is_published=product.get('is_published', False),
+            website_sequence=product.get('website_sequence', 0),
+            description_sale=product.get('description_sale', ''),
+            description=product.get('description', ''),
+            description_purchase=product.get('description_purchase', '')
+        )
+            
+    # Campos del catálogo completo (get_all_products y exportación)
+    CATALOGUE_FIELDS = [
+        'id', 'name', 'default_code', 'list_price', 'standard_price',
+        'categ_id', 'active', 'type', 'barcode'
+    ]
+
     def get_all_products(self) -> List[Dict[str, Any]]:
         """
         Obtiene todos los productos activos de la base de datos de Odoo.
+        Para catálogos grandes es preferible ``iter_product_chunks``, que no
+        acumula todo en memoria.
         """
         try:
-            if not self._models:
-                self._get_connection()
-                
-            # Obtener productos activos
-            products = self._execute_kw(
+            return [row for chunk in self.iter_product_chunks() for row in chunk]
+        except OdooUnavailableError:
+            raise
+        except Exception as e:
+            logging.error(f"Error obteniendo todos los productos: {e}")
+            return []
+
+    def iter_product_chunks(self, chunk_size: Optional[int] = None, include_inactive: bool = False) -> Iterator[List[Dict[str, Any]]]:
+        """Recorre el catálogo en bloques de ``chunk_size`` productos ordenados por ID.
+
+        Usa paginación por clave (``id > último``) en lugar de offset, así cada
+        bloque cuesta lo mismo aunque el catálogo tenga decenas de miles de
+        productos, y la memoria se mantiene en un bloque. Los errores de Odoo se
+        propagan: un bloque que falla no debe acabar en un catálogo truncado.
+        """
+        chunk_size = chunk_size or config.ODOO_EXPORT_CHUNK_SIZE
+        domain = [] if include_inactive else [('active', '=', True)]
+        context = {'active_test': False} if include_inactive else {}
+        last_id = 0
+        while True:
+            products = self._call_kw(
                 'product.template',
                 'search_read',
-                [[['active', '=', True]]],
-                {
-                    'fields': [
-                        'id', 'name', 'default_code', 'list_price', 'standard_price',
-                        'categ_id', 'active', 'type', 'barcode'
-                    ]
-                }
+                [domain + [('id', '>', last_id)]],
+                {'fields': self.CATALOGUE_FIELDS, 'order': 'id asc', 'limit': chunk_size, 'context': context}
             )
-            
             if not products:
-                return []
-                
-            # Transformar productos
-            transformed_products = []
-            for product in products:
-                # Extraer categoría
-                category_name = None
-                if product.get('categ_id'):
-                    category_id = product['categ_id'][0] if isinstance(product['categ_id'], list) else product['categ_id']
-                    category_data = self._execute_kw(
-                        'product.category',
-                        'read',
-                        [category_id],
-                        {'fields': ['name']}
-                    )
-                    if category_data:
-                        category_name = category_data[0]['name']
-                
-                # Construir diccionario de producto
-                transformed_product = {
-                    'id': product['id'],
-                    'name': product['name'],
-                    'default_code': product.get('default_code', ''),
-                    'list_price': product.get('list_price', 0.0),
-                    'standard_price': product.get('standard_price', 0.0),
-                    'categ_id': product['categ_id'][0] if isinstance(product['categ_id'], list) else product.get('categ_id'),
-                    'category': category_name,
-                    'active': product.get('active', True),
-                    'type': product.get('type', 'product'),
-                    'barcode': product.get('barcode', '')
-                }
-                transformed_products.append(transformed_product)
-                
-            return transformed_products
-            
-        except Exception as e:
-            logging.error(f"Error obteniendo todos los productos: {e}")
-            return []
+                return
+            last_id = products[-1]['id']
+            # Categorías del bloque: árbol en caché y, si falta alguna, una sola lectura
+            with self.many2one_loader() as loader:
+                loader.want('product.category', [p.get('categ_id') for p in products])
+                rows = [self._catalogue_row(product) for product in products]
+            yield rows
+            if len(products) < chunk_size:
+                return
+
+    def _catalogue_row(self, product: Dict[str, Any]) -> Dict[str, Any]:
+        """Fila del catálogo completo a partir de un registro de product.template"""
+        category_id = product['categ_id'][0] if isinstance(product.get('categ_id'), list) else product.get('categ_id')
+        return {
+            'id': product['id'],
+            'name': product['name'],
+            'default_code': product.get('default_code', ''),
+            'list_price': product.get('list_price', 0.0),
+            'standard_price': product.get('standard_price', 0.0),
+            'categ_id': category_id,
+            'category': self._get_category_name(category_id) if category_id else None,
+            'active': product.get('active', True),
+            'type': product.get('type', 'product'),
+            'barcode': product.get('barcode', '')
+        }
             
     def create_product(self, product: ProductCreate) -> Optional[int]:
         """
@@ -330,14 +442,7 @@ class OdooProductService(OdooBaseService):
             category_name = None
             if product.get('categ_id'):
                 category_id = product['categ_id'][0] if isinstance(product['categ_id'], list) else product['categ_id']
-                category_data = self._execute_kw(
-                    'product.category',
-                    'read',
-                    [category_id],
-                    {'fields': ['name']}
-                )
-                if category_data:
-                    category_name = category_data[0]['name']
+                category_name = self._get_category_name(category_id)
             
             # Construir diccionario de producto
             return {
@@ -415,62 +520,139 @@ class OdooProductService(OdooBaseService):
             logging.error(f"Error en create_or_update para producto '{ref_code}': {e}", exc_info=True)
             return None
     
-    def get_paginated_products(self, page: int = 1, limit: int = 10, sort_by: str = 'id', sort_order: str = 'asc', search: Optional[str] = None, category: Optional[str] = None, include_inactive: bool = False):
-        """Obtiene productos paginados, ordenados y filtrados desde Odoo."""
+    # Claves de cada producto del listado y campos de Odoo de los que se obtienen
+    # (para el parámetro ``fields=``: solo se leen los campos de las claves pedidas)
+    LIST_FIELD_SOURCES = {
+        'id': [],
+        'name': ['name'],
+        'default_code': ['default_code'],
+        'code': ['default_code'],
+        'list_price': ['list_price'],
+        'price': ['list_price'],
+        'standard_price': ['standard_price'],
+        'categ_id': ['categ_id'],
+        'categ_name': ['categ_id'],
+        'category': ['categ_id'],
+        'active': ['active'],
+        'is_published': ['is_published'],
+        'x_margen_calculado': ['x_margen_calculado', 'list_price', 'standard_price'],
+        'x_alerta_margen': ['x_alerta_margen'],
+        'stock': ['qty_available'],
+        'supplier_name': ['seller_ids'],
+        'supplier_id': ['seller_ids'],
+    }
+
+    def _product_list_query(self, search: Optional[str], category: Optional[str], include_inactive: bool,
+                            output_fields: Optional[List[str]] = None):
+        """Dominio y campos del listado de productos (paginado por página o por cursor).
+        El mismo dominio sirve para todos los caminos del listado y para su validador
+        (get_products_version). Con ``output_fields`` (claves de LIST_FIELD_SOURCES) solo se leen los campos
+        de Odoo necesarios para esas claves.
+        """
+        import logging
+        logger = logging.getLogger("odoo_product_service.get_paginated")
+        
+        # Verificar qué campos existen en el modelo product.template
+        available_fields = self._check_available_fields('product.template')
+        logger.info(f"Campos disponibles en product.template: {available_fields[:10]}...")
+        
+        # Lista base de campos a solicitar
+        fields = [
+            'id', 'name', 'default_code', 'active', 'is_published',
+            'list_price', 'standard_price', 'categ_id', 'seller_ids',
+            'product_variant_ids'  # Para obtener variantes del producto
+        ]
+        
+        # Añadir campos personalizados solo si existen
+        if 'x_margen_calculado' in available_fields:
+            fields.append('x_margen_calculado')
+            logger.info("Campo x_margen_calculado encontrado y añadido")
+        else:
+            logger.warning("Campo x_margen_calculado no encontrado en el modelo")
+            
+        if 'x_alerta_margen' in available_fields:
+            fields.append('x_alerta_margen')
+            logger.info("Campo x_alerta_margen encontrado y añadido")
+        else:
+            logger.warning("Campo x_alerta_margen no encontrado en el modelo")
+        
+        # Stock a mano (módulo de inventario): Odoo lo calcula en la misma lectura de la página
+        if 'qty_available' in available_fields:
+            fields.append('qty_available')
+        
+        if output_fields is not None:
+            needed = odoo_fields_for(output_fields, self.LIST_FIELD_SOURCES)
+            fields = [name for name in fields if name in needed]
+            
+        # Construir dominio de búsqueda
+        domain = []
+        
+        # Filtro de activos/inactivos
+        if not include_inactive:
+            domain.append(('active', '=', True))
+        else:
+            # Un filtro explícito sobre 'active' desactiva el active_test implícito de Odoo
+            domain.append(('active', 'in', [True, False]))
+
+        # Filtro de búsqueda por nombre o código
+        if search:
+            domain.append('|')
+            domain.append(('name', 'ilike', search))
+            domain.append(('default_code', 'ilike', search))
+            
+        # Filtro por categoría (árbol en caché en lugar de un ilike en Odoo);
+        # si ninguna categoría coincide no se filtra
+        if category:
+            category_ids = get_category_tree(self).search(self, category)
+            if category_ids:
+                domain.append(('categ_id', 'in', category_ids))
+        
+        return domain, fields
+
+    def get_paginated_products(self, page: int = 1, limit: int = 10, sort_by: str = 'id', sort_order: str = 'asc', search: Optional[str] = None, category: Optional[str] = None, include_inactive: bool = False,
+                               fields: Optional[List[str]] = None):
+        """Obtiene productos paginados, ordenados y filtrados desde Odoo.
+        ``fields`` limita las claves de cada producto (y lo que se lee de Odoo).
+        """
         import logging
         logger = logging.getLogger("odoo_product_service.get_paginated")
         
         try:
+            offset = (page - 1) * limit
+            order = f"{sort_by} {sort_order}"
+            
+            source, mirror = self._listing_source(search, sort_by)
+            
+            # Réplica local sincronizada hace poco: sin llamadas a Odoo
+            if source == 'mirror':
+                result = mirror.query_products(search, category, include_inactive, sort_by, sort_order, offset, limit)
+                if result is not None:
+                    odoo_products, total, sellers = result
+                    return self._transform_products(odoo_products, sellers=sellers, output_fields=fields), total
+            
+            # Búsqueda con el índice de texto local: IDs por relevancia y una sola lectura en Odoo
+            page_ids = None
+            if source == 'index':
+                page_ids = mirror.search_product_ids(search, category, include_inactive, sort_by, sort_order, offset, limit)
+            if page_ids is not None:
+                ids, total = page_ids
+                odoo_products, sellers = self._read_products(ids, fields)
+                return self._transform_products(odoo_products, sellers=sellers, output_fields=fields), total
+            
             # Asegurar conexión
             if not self._models:
                 self._get_connection()
             
-            # Verificar qué campos existen en el modelo product.template
-            available_fields = self._check_available_fields('product.template')
-            logger.info(f"Campos disponibles en product.template: {available_fields[:10]}...")
-            
-            # Lista base de campos a solicitar
-            fields = [
-                'id', 'name', 'default_code', 'active', 'is_published',
-                'list_price', 'standard_price', 'categ_id', 'seller_ids',
-                'product_variant_ids'  # Para obtener variantes del producto
-            ]
-            
-            # Añadir campos personalizados solo si existen
-            if 'x_margen_calculado' in available_fields:
-                fields.append('x_margen_calculado')
-                logger.info("Campo x_margen_calculado encontrado y añadido")
-            else:
-                logger.warning("Campo x_margen_calculado no encontrado en el modelo")
-                
-            if 'x_alerta_margen' in available_fields:
-                fields.append('x_alerta_margen')
-                logger.info("Campo x_alerta_margen encontrado y añadido")
-            else:
-                logger.warning("Campo x_alerta_margen no encontrado en el modelo")
-                
-            # Construir dominio de búsqueda
-            domain = []
+            # Una sola llamada (registros + total + proveedores) si el servidor tiene web_search_read
+            if self._supports_web_search_read():
+                domain, odoo_fields = self._product_list_query(search, category, include_inactive, output_fields=fields)
+                result = self._web_search_products(domain, odoo_fields, offset, limit, order)
+                if result is not None:
+                    odoo_products, total, sellers = result
+                    logger.info(f"Total productos encontrados: {total}")
+                    return self._transform_products(odoo_products, sellers=sellers, output_fields=fields), total
             
-            # Filtro de activos/inactivos
-            if not include_inactive:
-                domain.append(('active', '=', True))
-                
-            # Filtro de búsqueda por nombre o código
-            if search:
-                domain.append('|')
-                domain.append(('name', 'ilike', search))
-                domain.append(('default_code', 'ilike', search))
-                
-            # Filtro por categoría
-            if category:
-                category_ids = self._execute_kw(
-                    'product.category',
-                    'search',
-                    [[('name', 'ilike', category)]]
-                )
-                if category_ids:
-                    domain.append(('categ_id', 'in', category_ids))
+            domain, odoo_fields = self._product_list_query(search, category, include_inactive, output_fields=fields)
             
             # Obtener total de registros para paginación
             total = self._execute_kw(
@@ -485,12 +667,6 @@ class OdooProductService(OdooBaseService):
             if total == 0:
                 return [], 0
                 
-            # Calcular offset para paginación
-            offset = (page - 1) * limit
-            
-            # Ordenación
-            order = f"{sort_by} {sort_order}"
-            
             # Obtener productos paginados
             odoo_products = self._execute_kw(
                 'product.template',
@@ -500,7 +676,7 @@ class OdooProductService(OdooBaseService):
                     'offset': offset,
                     'limit': limit,
                     'order': order,
-                    'fields': fields
+                    'fields': odoo_fields
                 }
             )
             
@@ -515,130 +691,353 @@ class OdooProductService(OdooBaseService):
                 return [], total
                 
             # Transformar productos a formato de API
-            products = self._transform_products(odoo_products)
+            products = self._transform_products(odoo_products, output_fields=fields)
             
             return products, total
             
+        except OdooUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error obteniendo productos paginados: {e}", exc_info=True)
             return [], 0
             
-    def _transform_products(self, odoo_products):
-        """Transforma productos de Odoo al formato de API"""
+    def _listing_source(self, search: Optional[str], sort_by: str = 'id'):
+        """De dónde sale el listado paginado: ``('mirror', réplica)``, ``('index', réplica)``
+        (IDs del índice de texto y datos de Odoo) u ``('odoo', None)``. El listado y su
+        validador usan la misma fuente para describir los mismos productos."""
+        if sort_by not in PRODUCT_SORT_COLUMNS:
+            return 'odoo', None
+        mirror = fresh_catalog_mirror(self)
+        if mirror is not None:
+            return 'mirror', mirror
+        index = searchable_catalog_mirror(self) if search else None
+        if index is not None and search_match_expression(search):
+            return 'index', index
+        return 'odoo', None
+
+    def get_products_version(self, search: Optional[str] = None, category: Optional[str] = None,
+                             include_inactive: bool = False, sort_by: str = 'id', keyset: bool = False,
+                             with_stock: bool = False):
+        """Validador (registros, write_date máximo) del listado filtrado, para el GET condicional.
+        Se calcula sobre la misma fuente que el listado; con ``keyset`` (paginación por
+        cursor, que siempre consulta Odoo) sobre el dominio de Odoo.
+
+        Con ``with_stock`` (la respuesta lleva el stock) se añade la versión de stock.quant:
+        ``(registros, write_date máximo de ambos, versión del stock)``. Si no se puede
+        calcular se devuelve None y la respuesta va sin validador."""
+        source, mirror = ('odoo', None) if keyset else self._listing_source(search, sort_by)
+        with_stock = with_stock and self._has_stock()
+        if source == 'mirror':
+            # Stock replicado con los productos: sin llamadas a Odoo
+            return mirror.products_version(search, category, include_inactive, with_stock=with_stock)
+        version = self._products_version(source, mirror, search, category, include_inactive)
+        if version is None or not with_stock:
+            return version
+        stock = get_stock_version(self)
+        if stock is None:
+            return None
+        count, last_write = version
+        stock_count, stock_write = stock
+        return count, max(filter(None, [last_write, stock_write]), default=None), f"{stock_count}|{stock_write or ''}"
+
+    def _products_version(self, source, mirror, search, category, include_inactive):
+        if source == 'index':
+            # Los productos que da el índice, con el write_date actual de Odoo (de ahí sale la página)
+            ids = mirror.matching_product_ids(search, category, include_inactive)
+            if ids is not None:
+                if not ids:
+                    return 0, None
+                version = self.get_list_version('product.template', [('id', 'in', ids), ('active', 'in', [True, False])])
+                return (len(ids), version[1]) if version is not None else None
+        domain, _ = self._product_list_query(search, category, include_inactive)
+        return self.get_list_version('product.template', domain)
+
+    def _has_stock(self) -> bool:
+        """True si Odoo tiene el módulo de inventario (product.template.qty_available)"""
+        return 'qty_available' in self._check_available_fields('product.template')
+
+    # Campos del proveedor (product.supplierinfo) que se leen junto con cada producto
+    SELLER_FIELDS = ['partner_id', 'price', 'delay', 'min_qty', 'product_name', 'product_code']
+
+    def _supports_web_search_read(self) -> bool:
+        """web_search_read con ``specification`` existe desde Odoo 17"""
+        version = self.get_server_major_version()
+        return version is not None and version >= 17
+
+    def _web_search_products(self, domain: list, fields: List[str], offset: int, limit: int, order: str):
+        """Listado en una sola llamada con ``web_search_read`` (Odoo 17+).
+
+        Devuelve ``(registros, total, proveedores)`` con los registros en el mismo
+        formato que ``search_read`` y el primer proveedor de cada producto, o None
+        si la llamada falla (se usa entonces el camino clásico).
+        """
         import logging
-        logger = logging.getLogger("odoo_product_service.transform")
+        logger = logging.getLogger("odoo_product_service.get_paginated")
+        
+        try:
+            result = self._call_kw(
+                'product.template',
+                'web_search_read',
+                [domain, self._product_specification(fields)],
+                {'offset': offset, 'limit': limit, 'order': order}
+            )
+        except xmlrpc.client.Fault as fault:
+            logger.warning(f"web_search_read falló, se usa search_count + search_read: {fault.faultString[:200]}")
+            return None
         
-        transformed = []
-        for p in odoo_products:
+        records, sellers = self._from_web_records(result.get('records', []))
+        return records, result.get('length', len(records)), sellers
+
+    def _product_specification(self, fields: List[str]) -> Dict[str, Any]:
+        """``specification`` de web_search_read / web_read: categoría con nombre y proveedores anidados"""
+        many2one = {'fields': {'display_name': {}}}
+        specification = {name: {} for name in fields}
+        if 'categ_id' in specification:
+            specification['categ_id'] = many2one
+        if 'seller_ids' in specification:
+            specification['seller_ids'] = {'fields': {
+                name: (many2one if name == 'partner_id' else {}) for name in self.SELLER_FIELDS
+            }}
+        return specification
+
+    @staticmethod
+    def _from_web_records(web_records: List[dict]):
+        """Registros de web_read en formato search_read y primer proveedor de cada producto"""
+        records, sellers = [], {}
+        for record in web_records:
+            seller_records = record.get('seller_ids') or []
+            if seller_records and isinstance(seller_records[0], dict):
+                # Primer proveedor en el orden del modelo, como en la lectura en bloque
+                sellers[record['id']] = _from_web_record(seller_records[0])
+            records.append(_from_web_record(record))
+        return records, sellers
+
+    def _read_products(self, ids: List[int], output_fields: Optional[List[str]] = None):
+        """Lee los productos ``ids`` (en ese orden) con los campos del listado: un único
+        web_read en Odoo 17+ (proveedores incluidos) o un read en versiones anteriores.
+        Devuelve ``(registros, proveedores)``; proveedores es None si no vienen en la lectura."""
+        if not ids:
+            return [], {}
+        _, fields = self._product_list_query(None, None, False, output_fields=output_fields)
+        records, sellers = None, None
+        if self._supports_web_search_read():
             try:
-                # Obtener nombre de categoría
-                categ_name = None
-                categ_id = None
-                
-                if p.get('categ_id'):
-                    if isinstance(p['categ_id'], list) and len(p['categ_id']) > 0:
-                        categ_id = p['categ_id'][0]
-                        categ_name = p['categ_id'][1] if len(p['categ_id']) > 1 else self._get_category_name(categ_id)
-                    elif isinstance(p['categ_id'], int):
-                        categ_id = p['categ_id']
-                        categ_name = self._get_category_name(categ_id)
-                
-                # Obtener información del proveedor si existe
-                supplier_name = None
-                supplier_id = None
-                
-                if p.get('seller_ids') and len(p.get('seller_ids', [])) > 0:
-                    try:
-                        # Obtener todos los proveedores del producto
-                        seller_ids = p['seller_ids']
-                        logger.info(f"Producto {p.get('id')} tiene {len(seller_ids)} proveedores: {seller_ids}")
+                web_records = self._call_kw('product.template', 'web_read', [ids],
+                                            {'specification': self._product_specification(fields)})
+                records, sellers = self._from_web_records(web_records or [])
+            except xmlrpc.client.Fault as fault:
+                logging.warning(f"web_read falló, se usa read: {fault.faultString[:200]}")
+        if records is None:
+            records = self._execute_kw('product.template', 'read', [ids], {'fields': fields}) or []
+        by_id = {record['id']: record for record in records}
+        return [by_id[i] for i in ids if i in by_id], sellers
+
+    # Campos por los que se puede paginar con cursor (almacenados y comparables en Odoo)
+    CURSOR_SORT_FIELDS = ('id', 'name', 'default_code', 'list_price')
+
+    def get_products_after(self, cursor: Optional[str] = None, after_id: Optional[int] = None, limit: int = 10,
+                           sort_by: str = 'id', sort_order: str = 'asc', search: Optional[str] = None,
+                           category: Optional[str] = None, include_inactive: bool = False, with_count: bool = False,
+                           fields: Optional[List[str]] = None):
+        """Paginación por cursor (keyset): lee los ``limit`` productos siguientes al cursor.
+
+        En lugar de ``offset`` se filtra por la clave de orden del último producto
+        devuelto (``sort_by``, ``id``), así una página profunda cuesta lo mismo que
+        la primera. El total solo se calcula si se pide ``with_count``. ``fields``
+        limita las claves de cada producto como en get_paginated_products.
+        Devuelve ``(productos, next_cursor, total)``; ``next_cursor`` es None en la
+        última página y ``total`` es None si no se ha pedido.
+        Lanza ValueError si el cursor no es válido o no corresponde a la ordenación.
+        """
+        import logging
+        logger = logging.getLogger("odoo_product_service.get_paginated")
+        
+        if sort_by not in self.CURSOR_SORT_FIELDS:
+            raise ValueError(f"No se puede paginar con cursor por '{sort_by}' (admitidos: {', '.join(self.CURSOR_SORT_FIELDS)})")
+        descending = sort_order.lower() == 'desc'
+        after = None
+        if cursor:
+            after = decode_cursor(cursor)
+            if after['sort_by'] != sort_by or after['desc'] != descending:
+                raise ValueError("El cursor corresponde a otra ordenación")
+        elif after_id:
+            if sort_by != 'id':
+                raise ValueError("after_id solo se admite ordenando por id; use el cursor devuelto")
+            after = {'sort_by': 'id', 'desc': descending, 'key': after_id, 'id': after_id}
+        
+        try:
+            domain, odoo_fields = self._product_list_query(search, category, include_inactive, output_fields=fields)
+            if sort_by not in odoo_fields:
+                # La clave de orden del último producto va en el cursor
+                odoo_fields.append(sort_by)
+            total = self._execute_kw('product.template', 'search_count', [domain]) if with_count else None
+            
+            page_domain = domain + _keyset_domain(sort_by, descending, after) if after else domain
+            direction = 'desc' if descending else 'asc'
+            order = f"id {direction}" if sort_by == 'id' else f"{sort_by} {direction}, id {direction}"
+            # Se pide uno más para saber si hay página siguiente sin contar
+            odoo_products = self._execute_kw(
+                'product.template',
+                'search_read',
+                [page_domain],
+                {'limit': limit + 1, 'order': order, 'fields': odoo_fields}
+            )
+            if odoo_products is None:
+                logger.error("search_read devolvió None. Posible problema de conexión con Odoo.")
+                return [], None, total
+            
+            next_cursor = None
+            if len(odoo_products) > limit:
+                odoo_products = odoo_products[:limit]
+                last = odoo_products[-1]
+                next_cursor = encode_cursor(sort_by, descending, last.get(sort_by), last['id'])
+            
+            return self._transform_products(odoo_products, output_fields=fields), next_cursor, total
+        
+        except OdooUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Error obteniendo productos por cursor: {e}", exc_info=True)
+            return [], None, 0 if with_count else None
+
+    def _transform_products(self, odoo_products, sellers: Optional[Dict[int, dict]] = None,
+                            output_fields: Optional[List[str]] = None):
+        """Transforma productos de Odoo al formato de API.
+        Los nombres de categorías y proveedores que falten se resuelven en bloque
+        (una lectura por modelo) con el loader many2one de la petición.
+        ``sellers`` (primer proveedor por ID de producto) evita leerlos si ya vienen
+        en la misma respuesta. Con ``output_fields`` cada producto lleva solo esas
+        claves y no se calcula el margen si no se ha pedido.
+        """
+        import logging
+        logger = logging.getLogger("odoo_product_service.transform")
+        
+        with self.many2one_loader() as loader:
+            # Categorías que llegan sin nombre (solo el ID)
+            loader.want('product.category', [
+                p['categ_id'] for p in odoo_products
+                if isinstance(p.get('categ_id'), int) or (isinstance(p.get('categ_id'), list) and len(p['categ_id']) == 1)
+            ])
+            
+            # Primer proveedor de cada producto: un único search_read de product.supplierinfo
+            # para toda la página, unido en memoria por seller_ids
+            seller_owner = {}
+            for p in odoo_products:
+                for seller_id in p.get('seller_ids') or []:
+                    seller_owner.setdefault(seller_id, p.get('id'))
+            first_sellers = dict(sellers) if sellers is not None else {}
+            if seller_owner and sellers is None:
+                try:
+                    # En Odoo 18, el campo 'name' se ha cambiado a 'partner_id' en product.supplierinfo.
+                    # Sin 'order' se usa el orden del modelo (secuencia), el mismo que por producto.
+                    seller_info = self._execute_kw(
+                        'product.supplierinfo',
+                        'search_read',
+                        [[('id', 'in', list(seller_owner))]],
+                        {'fields': ['partner_id', 'price', 'delay', 'min_qty', 'product_name', 'product_code']}
+                    ) or []
+                    logger.info(f"Información de proveedores: {len(seller_info)} registros para {len(odoo_products)} productos")
+                    for seller in seller_info:
+                        # Tomar el primer proveedor de cada producto
+                        first_sellers.setdefault(seller_owner.get(seller['id']), seller)
+                except OdooUnavailableError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Error obteniendo proveedores de los productos: {e}", exc_info=True)
+            
+            # Stock de la página: viene en la lectura (qty_available) o desde la caché de stock
+            wants_stock = output_fields is None or 'stock' in output_fields
+            # Registros sin qty_available: solo se lee si Odoo tiene el módulo de inventario
+            if wants_stock and any('qty_available' not in p for p in odoo_products):
+                wants_stock = self._has_stock()
+            stock_levels = get_stock_levels(self, odoo_products) if wants_stock else {}
+            
+            # Proveedores que llegan sin nombre: se leen todos juntos en res.partner
+            loader.want('res.partner', [
+                seller.get('partner_id') for seller in first_sellers.values()
+                if not (isinstance(seller.get('partner_id'), list) and len(seller['partner_id']) > 1)
+            ])
+            
+            transformed = []
+            for p in odoo_products:
+                try:
+                    # Obtener nombre de categoría
+                    categ_name = None
+                    categ_id = None
+                    
+                    if p.get('categ_id'):
+                        if isinstance(p['categ_id'], list) and len(p['categ_id']) > 0:
+                            categ_id = p['categ_id'][0]
+                            categ_name = p['categ_id'][1] if len(p['categ_id']) > 1 else self._get_category_name(categ_id)
+                        elif isinstance(p['categ_id'], int):
+                            categ_id = p['categ_id']
+                            categ_name = self._get_category_name(categ_id)
+                    
+                    # Obtener información del proveedor si existe
+                    supplier_name = None
+                    supplier_id = None
+                    
+                    first_seller = first_sellers.get(p.get('id'))
+                    partner_id_data = first_seller.get('partner_id') if first_seller else None
+                    if partner_id_data:
+                        # En Odoo, los campos many2one vienen como [id, display_name]
+                        if isinstance(partner_id_data, list) and len(partner_id_data) > 1:
+                            supplier_id = partner_id_data[0]
+                            supplier_name = partner_id_data[1]
+                            logger.debug(f"Proveedor encontrado: {supplier_name} (ID: {supplier_id})")
+                        else:
+                            # Si solo tenemos el ID, el nombre sale de la lectura en bloque de res.partner
+                            supplier_id = partner_id_data[0] if isinstance(partner_id_data, list) else partner_id_data
+                            supplier_name = loader.get('res.partner', supplier_id)
+                            if supplier_name:
+                                logger.debug(f"Nombre de proveedor obtenido de res.partner: {supplier_name}")
+                    
+                    # Crear diccionario de producto con valores por defecto
+                    product_dict = {
+                        'id': p.get('id', 0),
+                        'name': p.get('name', ''),
+                        'default_code': p.get('default_code', ''),
+                        'list_price': p.get('list_price', 0.0),
+                        'standard_price': p.get('standard_price', 0.0),
+                        'categ_id': categ_id,
+                        'categ_name': categ_name,  # Campo adicional para compatibilidad con frontend
+                        'category': categ_name,
+                        'active': p.get('active', True),
+                        'is_published': p.get('is_published', False),
+                        'x_margen_calculado': 0.0,  # Valor por defecto
+                        'x_alerta_margen': False,   # Valor por defecto
+                        # Campos adicionales para compatibilidad con frontend
+                        'code': p.get('default_code', ''),
+                        'price': p.get('list_price', 0.0),
+                        # Unidades a mano (truncadas: el modelo Product declara stock entero)
+                        'stock': int(stock_levels.get(p.get('id'), 0)),
+                        'supplier_name': supplier_name,
+                        'supplier_id': supplier_id
+                    }
+                    
+                    # Añadir campos personalizados si existen en la respuesta de Odoo
+                    if 'x_margen_calculado' in p:
+                        product_dict['x_margen_calculado'] = p.get('x_margen_calculado', 0.0)
                         
-                        if seller_ids:
-                            # Obtener información detallada de los proveedores
-                            # En Odoo 18, el campo 'name' se ha cambiado a 'partner_id' en product.supplierinfo
-                            seller_info = self._execute_kw(
-                                'product.supplierinfo',
-                                'search_read',
-                                [[('id', 'in', seller_ids)]],
-                                {'fields': ['partner_id', 'price', 'delay', 'min_qty', 'product_name', 'product_code']}
-                            )
-                            
-                            logger.info(f"Información de proveedores para producto {p.get('id')}: {seller_info}")
-                            
-                            if seller_info and len(seller_info) > 0:
-                                # Tomar el primer proveedor
-                                first_seller = seller_info[0]
-                                partner_id_data = first_seller.get('partner_id')
-                                
-                                if partner_id_data:
-                                    # En Odoo, los campos many2one vienen como [id, display_name]
-                                    if isinstance(partner_id_data, list) and len(partner_id_data) > 1:
-                                        supplier_id = partner_id_data[0]
-                                        supplier_name = partner_id_data[1]
-                                        logger.info(f"Proveedor encontrado: {supplier_name} (ID: {supplier_id})")
-                                    else:
-                                        # Si solo tenemos el ID, buscar el nombre en res.partner
-                                        if isinstance(partner_id_data, list):
-                                            supplier_id = partner_id_data[0]
-                                        else:
-                                            supplier_id = partner_id_data
-                                        
-                                        if supplier_id:
-                                            partner_info = self._execute_kw(
-                                                'res.partner',
-                                                'read',
-                                                [supplier_id],
-                                                {'fields': ['name', 'email', 'phone']}
-                                            )
-                                            
-                                            if partner_info and len(partner_info) > 0:
-                                                supplier_name = partner_info[0].get('name')
-                                                logger.info(f"Nombre de proveedor obtenido de res.partner: {supplier_name}")
-                    except Exception as e:
-                        logger.warning(f"Error obteniendo proveedor para producto {p.get('id')}: {e}", exc_info=True)
-                
-                # Crear diccionario de producto con valores por defecto
-                product_dict = {
-                    'id': p.get('id', 0),
-                    'name': p.get('name', ''),
-                    'default_code': p.get('default_code', ''),
-                    'list_price': p.get('list_price', 0.0),
-                    'standard_price': p.get('standard_price', 0.0),
-                    'categ_id': categ_id,
-                    'categ_name': categ_name,  # Campo adicional para compatibilidad con frontend
-                    'category': categ_name,
-                    'active': p.get('active', True),
-                    'is_published': p.get('is_published', False),
-                    'x_margen_calculado': 0.0,  # Valor por defecto
-                    'x_alerta_margen': False,   # Valor por defecto
-                    # Campos adicionales para compatibilidad con frontend
-                    'code': p.get('default_code', ''),
-                    'price': p.get('list_price', 0.0),
-                    'stock': 0,  # Placeholder, se podría obtener de stock.quant
-                    'supplier_name': supplier_name,
-                    'supplier_id': supplier_id
-                }
-                
-                # Añadir campos personalizados si existen en la respuesta de Odoo
-                if 'x_margen_calculado' in p:
-                    product_dict['x_margen_calculado'] = p.get('x_margen_calculado', 0.0)
+                    if 'x_alerta_margen' in p:
+                        product_dict['x_alerta_margen'] = p.get('x_alerta_margen', False)
                     
-                if 'x_alerta_margen' in p:
-                    product_dict['x_alerta_margen'] = p.get('x_alerta_margen', False)
-                
-                # Calcular margen si no existe el campo personalizado pero tenemos precio de venta y coste
-                if product_dict['x_margen_calculado'] == 0.0 and product_dict['standard_price'] > 0:
-                    try:
-                        margen = ((product_dict['list_price'] - product_dict['standard_price']) / product_dict['standard_price']) * 100
-                        product_dict['x_margen_calculado'] = round(margen, 2)
-                    except (ZeroDivisionError, TypeError):
-                        product_dict['x_margen_calculado'] = 0.0
-                
-                transformed.append(product_dict)
-            except Exception as e:
-                logger.error(f"Error transformando producto {p.get('id', 'unknown')}: {e}")
-                # Continuar con el siguiente producto
-                continue
+                    # Calcular margen si no existe el campo personalizado pero tenemos precio de venta y coste
+                    wants_margin = output_fields is None or 'x_margen_calculado' in output_fields
+                    if wants_margin and product_dict['x_margen_calculado'] == 0.0 and product_dict['standard_price'] > 0:
+                        try:
+                            margen = ((product_dict['list_price'] - product_dict['standard_price']) / product_dict['standard_price']) * 100
+                            product_dict['x_margen_calculado'] = round(margen, 2)
+                        except (ZeroDivisionError, TypeError):
+                            product_dict['x_margen_calculado'] = 0.0
+                    
+                    transformed.append(select_fields(product_dict, output_fields))
+                except OdooUnavailableError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error transformando producto {p.get('id', 'unknown')}: {e}")
+                    # Continuar con el siguiente producto
+                    continue
                 
         logger.info(f"Transformados {len(transformed)} productos de {len(odoo_products)} recibidos")
         return transformed
@@ -648,6 +1047,13 @@ class OdooProductService(OdooBaseService):
         if not category_id:
             return None
             
+        # Primero el árbol de categorías en caché; si no está (recién creada), lectura
+        name = get_category_tree(self).name(self, category_id)
+        if name:
+            return name
+        loader = current_loader()
+        if loader is not None:
+            return loader.get('product.category', category_id)
         try:
             category_data = self._execute_kw(
                 'product.category',
@@ -666,7 +1072,7 @@ class OdooProductService(OdooBaseService):
     def _ensure_custom_field(self, model_name, field_name, field_type, field_label):
         """
         Asegura que un campo personalizado existe en un modelo de Odoo.
-        Si no existe, lo crea.
+        Si no existe, lo crea. La comprobación usa la caché de metadatos del proceso.
         
         Args:
             model_name: Nombre del modelo (ej: 'product.template')
@@ -678,23 +1084,13 @@ class OdooProductService(OdooBaseService):
             bool: True si el campo ya existía o se creó correctamente, False en caso de error
         """
         try:
-            if not self._models:
-                self._get_connection()
-                
             # Verificar si el campo ya existe
-            ir_model_fields = self._models.execute_kw(
-                'ir.model.fields', 
-                'search_read', 
-                [[['model', '=', model_name], ['name', '=', field_name]]], 
-                {'fields': ['id']}
-            )
-            
-            if ir_model_fields:
-                logging.info(f"Campo personalizado {field_name} ya existe en {model_name}")
+            if field_name in self.get_model_fields(model_name):
+                logging.debug(f"Campo personalizado {field_name} ya existe en {model_name}")
                 return True
                 
             # Obtener el ID del modelo
-            model_id = self._models.execute_kw(
+            model_id = self._execute_kw(
                 'ir.model', 
                 'search', 
                 [[['model', '=', model_name]]]
@@ -714,7 +1110,12 @@ class OdooProductService(OdooBaseService):
                 'store': True,
             }
             
-            field_id = self._models.execute_kw('ir.model.fields', 'create', [field_vals])
+            field_id = self._execute_kw('ir.model.fields', 'create', [field_vals])
+            # El modelo ha cambiado: descartar sus metadatos en caché
+            self.invalidate_model_fields(model_name)
+            if not field_id:
+                logging.error(f"No se pudo crear el campo personalizado {field_name} en {model_name}")
+                return False
             logging.info(f"Campo personalizado {field_name} creado en {model_name} con ID {field_id}")
             return True
             
@@ -723,26 +1124,9 @@ class OdooProductService(OdooBaseService):
             return False
     
     def _check_available_fields(self, model_name):
-        """Verifica qué campos están disponibles en un modelo de Odoo"""
+        """Verifica qué campos están disponibles en un modelo de Odoo (caché de metadatos)"""
         try:
-            if not self._models:
-                self._get_connection()
-                
-            # Obtener todos los campos del modelo
-            fields_data = self._execute_kw(
-                'ir.model.fields',
-                'search_read',
-                [[('model', '=', model_name)]],
-                {'fields': ['name', 'field_description']}
-            )
-            
-            if not fields_data:
-                return []
-                
-            # Extraer solo los nombres de los campos
-            field_names = [field['name'] for field in fields_data]
-            return field_names
-            
+            return list(self.get_model_fields(model_name).keys())
         except Exception as e:
             logging.error(f"Error al verificar campos disponibles en {model_name}: {e}")
             return []
@@ -756,63 +1140,69 @@ class OdooProductService(OdooBaseService):
             category_name = "Sin Categoría"
 
         try:
-            if not self._models:
-                self._get_connection()
-
-            domain = [('name', '=', category_name)]
-            category_ids = self._execute_kw('product.category', 'search', [domain], {'limit': 1})
-
-            if category_ids:
-                category_id = category_ids[0]
-                logging.info(f"Categoría encontrada: '{category_name}' con ID: {category_id}")
-                return category_id
-            else:
-                logging.info(f"Categoría '{category_name}' no encontrada. Creando...")
-                new_category_vals = {'name': category_name}
-                new_category_id = self._execute_kw('product.category', 'create', [new_category_vals])
-                
-                if new_category_id:
-                    logging.info(f"Categoría '{category_name}' creada con ID: {new_category_id}")
-                    return new_category_id
-                else:
-                    logging.error(f"No se pudo crear la categoría '{category_name}'")
-                    raise Exception(f"Fallo al crear la categoría '{category_name}' en Odoo.")
+            # Búsqueda en el árbol en caché; solo se llama a Odoo si hay que crearla
+            category_id = get_category_tree(self).get_or_create(self, category_name)
+            if not category_id:
+                logging.error(f"No se pudo crear la categoría '{category_name}'")
+                raise Exception(f"Fallo al crear la categoría '{category_name}' en Odoo.")
+            return category_id
 
         except Exception as e:
             logging.error(f"Error en find_or_create_category para '{category_name}': {e}")
             raise
 
 # Instancia global para evitar errores de importación circular
-    def front_to_odoo_product_dict(self, producto, proveedor_nombre):
+    def _resolve_supplier_id(self, proveedor_nombre, logger):
+        """Busca el ID del proveedor por nombre en el directorio de proveedores (None si no existe).
+        Solo proveedores (``supplier_rank > 0``, como la búsqueda anterior) y sin distinguir
+        mayúsculas, acentos ni puntuación: "Bosch S.L." encuentra a "BOSCH SL"."""
+        proveedor = get_supplier_directory(self).find_by_name(self, proveedor_nombre)
+        
+        if proveedor:
+            proveedor_id = proveedor['id']
+            logger.info(f"Proveedor encontrado: {proveedor_nombre} (ID: {proveedor_id})")
+            return proveedor_id
+        logger.warning(f"Proveedor no encontrado: {proveedor_nombre}. Se creará el producto sin proveedor.")
+        return None
+
+    def _resolve_category_id(self, categoria_nombre, subcategoria_nombre, logger):
+        """Busca o crea la categoría (y subcategoría) en el árbol en caché y devuelve el ID final"""
+        tree = get_category_tree(self)
+        # Categoría con ese nombre en cualquier rama; si no existe se crea bajo 'All' (ID 1)
+        categoria_id = tree.get_or_create(self, categoria_nombre, parent_id=1)
+        
+        # Manejar subcategoría si existe: debe colgar de la categoría anterior
+        if subcategoria_nombre:
+            categoria_id = tree.get_or_create(self, subcategoria_nombre, parent_id=categoria_id, any_parent=False)
+        logger.debug(f"Categoría resuelta: {categoria_nombre} / {subcategoria_nombre} (ID: {categoria_id})")
+        return categoria_id
+
+    def front_to_odoo_product_dict(self, producto, proveedor_nombre, lookup_cache=None):
         """
         Convierte un producto del formato frontend/Excel al formato Odoo para crear o actualizar.
         
         Args:
             producto: Diccionario con datos del producto desde el frontend o Excel
             proveedor_nombre: Nombre del proveedor para asociar al producto
+            lookup_cache: Diccionario opcional compartido entre llamadas de un mismo lote
+                para no repetir la búsqueda del proveedor ni de las categorías
             
         Returns:
             Diccionario con formato compatible con Odoo para crear/actualizar producto
         """
         import logging
         logger = logging.getLogger("odoo_product_service.transform")
+        if lookup_cache is None:
+            lookup_cache = {}
         
         try:
             # Buscar ID del proveedor por nombre
             proveedor_id = None
             if proveedor_nombre:
-                proveedores = self._execute_kw(
-                    'res.partner',
-                    'search_read',
-                    [[('name', '=', proveedor_nombre), ('supplier_rank', '>', 0)]],
-                    {'fields': ['id', 'name'], 'limit': 1}
-                )
-                
-                if proveedores and len(proveedores) > 0:
-                    proveedor_id = proveedores[0]['id']
-                    logger.info(f"Proveedor encontrado: {proveedor_nombre} (ID: {proveedor_id})")
-                else:
-                    logger.warning(f"Proveedor no encontrado: {proveedor_nombre}. Se creará el producto sin proveedor.")
+                key = ('supplier', proveedor_nombre)
+                if key not in lookup_cache:
+                    lookup_cache[key] = self._resolve_supplier_id(proveedor_nombre, logger)
+                proveedor_id = lookup_cache[key]
             
             # Buscar o crear categoría
             categoria_id = 1  # Categoría por defecto 'All'
@@ -820,46 +1210,10 @@ class OdooProductService(OdooBaseService):
             subcategoria_nombre = producto.get('subcategoria', '').strip()
             
             if categoria_nombre:
-                # Buscar categoría existente
-                categorias = self._execute_kw(
-                    'product.category',
-                    'search_read',
-                    [[('name', '=', categoria_nombre)]],
-                    {'fields': ['id', 'name'], 'limit': 1}
-                )
-                
-                if categorias and len(categorias) > 0:
-                    categoria_id = categorias[0]['id']
-                    logger.info(f"Categoría encontrada: {categoria_nombre} (ID: {categoria_id})")
-                else:
-                    # Crear nueva categoría
-                    categoria_id = self._execute_kw(
-                        'product.category',
-                        'create',
-                        [{'name': categoria_nombre, 'parent_id': 1}]  # parent_id: 1 = 'All'
-                    )
-                    logger.info(f"Categoría creada: {categoria_nombre} (ID: {categoria_id})")
-                
-                # Manejar subcategoría si existe
-                if subcategoria_nombre:
-                    subcategorias = self._execute_kw(
-                        'product.category',
-                        'search_read',
-                        [[('name', '=', subcategoria_nombre), ('parent_id', '=', categoria_id)]],
-                        {'fields': ['id', 'name'], 'limit': 1}
-                    )
-                    
-                    if subcategorias and len(subcategorias) > 0:
-                        categoria_id = subcategorias[0]['id']  # Usar la subcategoría como categoría final
-                    else:
-                        # Crear subcategoría
-                        subcategoria_id = self._execute_kw(
-                            'product.category',
-                            'create',
-                            [{'name': subcategoria_nombre, 'parent_id': categoria_id}]
-                        )
-                        categoria_id = subcategoria_id  # Usar la subcategoría como categoría final
-                        logger.info(f"Subcategoría creada: {subcategoria_nombre} (ID: {subcategoria_id})")
+                key = ('category', categoria_nombre, subcategoria_nombre)
+                if key not in lookup_cache:
+                    lookup_cache[key] = self._resolve_category_id(categoria_nombre, subcategoria_nombre, logger)
+                categoria_id = lookup_cache[key]
             
             # Preparar valores para Odoo
             nombre_producto = producto.get('nombre', '').strip()
@@ -996,6 +1350,165 @@ class OdooProductService(OdooBaseService):
             logger.error(f"Error al crear/actualizar producto en Odoo: {e}", exc_info=True)
             return None
             
+    def upsert_products_concurrently(self, products_vals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Ejecuta create_or_update_product para muchos productos en paralelo.
+        Los productos con la misma referencia se procesan en orden dentro del mismo
+        hilo para no crear duplicados. Devuelve, en el orden de entrada, un
+        diccionario por producto con ``result`` (ID o None) y ``error``.
+        """
+        groups: Dict[Any, List[int]] = {}
+        for idx, vals in enumerate(products_vals):
+            groups.setdefault(vals.get('default_code') or ('sin_codigo', idx), []).append(idx)
+
+        results: List[Dict[str, Any]] = [{"result": None, "error": None} for _ in products_vals]
+
+        def _upsert_group(indexes):
+            for idx in indexes:
+                try:
+                    results[idx]["result"] = self.create_or_update_product(products_vals[idx])
+                except Exception as e:
+                    results[idx]["error"] = str(e)
+
+        self.map_concurrent(_upsert_group, groups.values())
+        return results
+
+    def _bulk_vals(self, product: ProductCreate, category_ids: Dict[str, int]) -> Dict[str, Any]:
+        """Valores de Odoo de un producto del alta masiva (categorías resueltas una vez por nombre)"""
+        raw = product.model_dump(exclude_unset=True)
+        if raw.get('default_code'):
+            raw['default_code'] = raw['default_code'].strip()
+        category = raw.pop('category', None)
+        if category and 'categ_id' not in raw:
+            if category not in category_ids:
+                category_ids[category] = self.find_or_create_category(category)
+            raw['categ_id'] = category_ids[category]
+        vals = prepare_product_vals(raw)
+        # La categoría inferida por el nombre solo se usa en las altas, no al actualizar
+        vals['_explicit_categ'] = 'categ_id' in raw
+        return vals
+
+    def bulk_upsert_products(self, products: List[ProductCreate]) -> List[Dict[str, Any]]:
+        """Crea o actualiza muchos productos con el mínimo de llamadas a Odoo.
+
+        Las plantillas existentes se buscan por ``default_code`` con un único
+        ``search_read`` (``in``, incluidas las archivadas); las altas se envían en
+        ``create`` por lotes (lista de vals) y las actualizaciones en ``write``
+        agrupados por valores idénticos. Un lote que falla se repite elemento a
+        elemento para aislar el producto problemático.
+
+        Devuelve, en el orden de entrada, un diccionario por producto con
+        ``index``, ``default_code``, ``status`` (``created``/``updated``/``error``),
+        ``id`` y ``error``. Los productos repetidos con la misma referencia se
+        fusionan (el último valor gana) y comparten resultado.
+        """
+        results: List[Dict[str, Any]] = [
+            {'index': idx, 'default_code': p.default_code, 'status': 'error', 'id': None, 'error': None}
+            for idx, p in enumerate(products)
+        ]
+        category_ids: Dict[str, int] = {}
+        # Una entrada por referencia (o por producto sin referencia): (índices, vals)
+        entries: Dict[Any, List] = {}
+        for idx, product in enumerate(products):
+            try:
+                vals = self._bulk_vals(product, category_ids)
+            except Exception as e:
+                results[idx]['error'] = str(e)
+                continue
+            key = vals.get('default_code') or ('sin_codigo', idx)
+            if key in entries:
+                entries[key][0].append(idx)
+                explicit = entries[key][1]['_explicit_categ'] or vals['_explicit_categ']
+                entries[key][1].update(vals)
+                entries[key][1]['_explicit_categ'] = explicit
+            else:
+                entries[key] = [[idx], vals]
+
+        codes = [key for key in entries if isinstance(key, str)]
+        existing: Dict[str, int] = {}
+        if codes:
+            found = self._execute_kw(
+                'product.template', 'search_read',
+                [[('default_code', 'in', codes)]],
+                {'fields': ['id', 'default_code'], 'order': 'id', 'context': {'active_test': False}}
+            )
+            if found is None:
+                for indexes, _ in entries.values():
+                    for idx in indexes:
+                        results[idx]['error'] = "No se pudieron consultar los productos existentes en Odoo"
+                return results
+            for record in found:
+                existing.setdefault(record['default_code'], record['id'])
+
+        to_create, to_write = [], {}
+        for key, (indexes, vals) in entries.items():
+            explicit_categ = vals.pop('_explicit_categ')
+            product_id = existing.get(key) if isinstance(key, str) else None
+            if product_id:
+                # La referencia es la clave de búsqueda: sin ella los vals se pueden agrupar
+                vals.pop('default_code', None)
+                if not explicit_categ:
+                    vals.pop('categ_id', None)
+                group = json.dumps(vals, sort_keys=True, default=str)
+                to_write.setdefault(group, (vals, []))[1].append((product_id, indexes))
+            else:
+                vals.setdefault('type', 'product')
+                vals.setdefault('active', True)
+                to_create.append((vals, indexes))
+
+        def _outcome(indexes, status, product_id=None, error=None):
+            for idx in indexes:
+                results[idx].update(status=status, id=product_id, error=error)
+
+        batch_size = max(1, config.ODOO_BULK_BATCH_SIZE)
+        batches = [to_create[i:i + batch_size] for i in range(0, len(to_create), batch_size)]
+        groups = list(to_write.values())
+        calls = [('product.template', 'create', [[vals for vals, _ in batch]]) for batch in batches]
+        calls += [('product.template', 'write', [[pid for pid, _ in targets], vals]) for vals, targets in groups]
+        answers = self.execute_batch(calls)
+
+        retries, retry_targets = [], []
+        for batch, answer in zip(batches, answers[:len(batches)]):
+            new_ids = answer['result']
+            if answer['error'] is None and isinstance(new_ids, list) and len(new_ids) == len(batch):
+                for (_, indexes), new_id in zip(batch, new_ids):
+                    _outcome(indexes, 'created', new_id)
+                continue
+            if len(batch) == 1:
+                _outcome(batch[0][1], 'error', error=answer['error'] or "Odoo no devolvió el ID creado")
+                continue
+            logging.warning(f"Alta masiva: lote de {len(batch)} productos rechazado, se reintenta uno a uno")
+            for vals, indexes in batch:
+                retries.append(('product.template', 'create', [[vals]]))
+                retry_targets.append(('created', indexes, None))
+        for (vals, targets), answer in zip(groups, answers[len(batches):]):
+            if answer['error'] is None:
+                for product_id, indexes in targets:
+                    _outcome(indexes, 'updated', product_id)
+                continue
+            if len(targets) == 1:
+                _outcome(targets[0][1], 'error', targets[0][0], answer['error'])
+                continue
+            for product_id, indexes in targets:
+                retries.append(('product.template', 'write', [[product_id], vals]))
+                retry_targets.append(('updated', indexes, product_id))
+
+        for (status, indexes, product_id), answer in zip(retry_targets, self.execute_batch(retries)):
+            if answer['error'] is not None:
+                _outcome(indexes, 'error', product_id, answer['error'])
+            elif status == 'created':
+                _outcome(indexes, status, (answer['result'] or [None])[0])
+            else:
+                _outcome(indexes, status, product_id)
+        return results
+
+    def get_margin_report(self, threshold: Optional[float] = None, include_inactive: bool = False,
+                          write_flags: bool = False, top: int = 20) -> Dict[str, Any]:
+        """Informe de márgenes de todo el catálogo (cálculo vectorizado, ver margin_analytics).
+        Con ``write_flags`` escribe ``x_alerta_margen`` en Odoo en writes agrupados."""
+        # pandas solo se carga cuando se pide el informe
+        from .margin_analytics import margin_report
+        return margin_report(self, threshold, include_inactive, write_flags, top)
+
     def archive_product(self, product_id):
         """
         Archiva (desactiva) un producto en Odoo.
@@ -1044,6 +1557,40 @@ class OdooProductService(OdooBaseService):
             logger.error(f"Error al archivar producto con ID {product_id}: {e}", exc_info=True)
             return False
 
+    # --- Variantes asíncronas para las rutas async de FastAPI ---
+
+    async def get_paginated_products_async(self, *args, **kwargs):
+        """Versión asíncrona de get_paginated_products (se ejecuta en el threadpool)"""
+        return await self._run_async(self.get_paginated_products, *args, **kwargs)
+
+    async def get_products_version_async(self, *args, **kwargs):
+        """Versión asíncrona de get_products_version (se ejecuta en el threadpool)"""
+        return await self._run_async(self.get_products_version, *args, **kwargs)
+
+    async def get_products_after_async(self, *args, **kwargs):
+        """Versión asíncrona de get_products_after (se ejecuta en el threadpool)"""
+        return await self._run_async(self.get_products_after, *args, **kwargs)
+
+    async def create_product_async(self, product: ProductCreate) -> Optional[int]:
+        """Versión asíncrona de create_product"""
+        return await self._run_async(self.create_product, product)
+
+    async def bulk_upsert_products_async(self, products: List[ProductCreate]) -> List[Dict[str, Any]]:
+        """Versión asíncrona de bulk_upsert_products"""
+        return await self._run_async(self.bulk_upsert_products, products)
+
+    async def get_margin_report_async(self, *args, **kwargs) -> Dict[str, Any]:
+        """Versión asíncrona de get_margin_report (se ejecuta en el threadpool)"""
+        return await self._run_async(self.get_margin_report, *args, **kwargs)
+
+    async def update_product_async(self, product_id: int, product_update: OdooProductUpdate) -> bool:
+        """Versión asíncrona de update_product"""
+        return await self._run_async(self.update_product, product_id, product_update)
+
+    async def archive_product_async(self, product_id: int) -> bool:
+        """Versión asíncrona de archive_product"""
+        return await self._run_async(self.archive_product, product_id)
+
 
 # Instancia global para evitar errores de importación circular
 odoo_product_service = OdooProductService()
\ No newline at end of file
@@ -1,10 +1,105 @@
 from typing import List, Optional
 from .odoo_base_service import OdooBaseService
+from .odoo_catalog_mirror import fresh_catalog_mirror
+from .odoo_resilience import OdooUnavailableError
+from .odoo_supplier_directory import get_supplier_directory
 from ..models.schemas import Provider, ProviderCreate
+from ..utils.config import config
+from ..utils.sparse_fields import odoo_fields_for, select_fields
+from ..utils.ttl_cache import TTLCache
+
+# Total de proveedores por (url, db, dominio normalizado): evita un search_count en cada página
+_provider_count_cache = TTLCache(ttl=config.ODOO_PROVIDER_COUNT_TTL, maxsize=1000)
+
+
+def _count_key(domain: list) -> tuple:
+    """Clave de caché de un dominio: hojas como tuplas y los términos ``ilike`` en
+    minúsculas (la búsqueda no distingue mayúsculas, así "Sony" y "sony" comparten total)"""
+    key = []
+    for leaf in domain:
+        if isinstance(leaf, (list, tuple)) and len(leaf) == 3:
+            field, operator, value = leaf
+            if operator == 'ilike' and isinstance(value, str):
+                value = value.lower()
+            key.append((field, operator, tuple(value) if isinstance(value, list) else value))
+        else:
+            key.append(leaf)
+    return tuple(key)
 
 class OdooProviderService(OdooBaseService):
     """Servicio para gestión de proveedores en Odoo"""
 
+    # Campos de res.partner leídos para un proveedor
+    PROVIDER_FIELDS = [
+        'id', 'name', 'email', 'phone', 'mobile', 'website',
+        'street', 'street2', 'city', 'state_id', 'zip', 'country_id',
+        'vat', 'supplier_rank', 'customer_rank', 'is_company',
+        'category_id', 'comment', 'active'
+    ]
+
+    # Claves del proveedor en los listados y campos de res.partner de los que salen
+    # (para el parámetro ``fields=``: solo se leen los campos de las claves pedidas)
+    PROVIDER_FIELD_SOURCES = {
+        'id': [], 'name': ['name'], 'email': ['email'], 'phone': ['phone'], 'mobile': ['mobile'],
+        'website': ['website'], 'street': ['street'], 'street2': ['street2'], 'city': ['city'],
+        'zip': ['zip'], 'country': ['country_id'], 'vat': ['vat'], 'supplier_rank': ['supplier_rank'],
+        'customer_rank': ['customer_rank'], 'is_company': ['is_company'], 'category_id': ['category_id'],
+        'comment': ['comment'], 'active': ['active'],
+    }
+
+    @staticmethod
+    def _providers_domain(search_term: str | None = None) -> list:
+        """Dominio de res.partner de los proveedores (empresas con supplier_rank)"""
+        domain = [['is_company', '=', True], ['supplier_rank', '>', 0]]
+        search_term = (search_term or '').strip()
+        if search_term:
+            domain.append(['name', 'ilike', search_term])
+        return domain
+
+    def _count_cache_key(self, domain: list) -> tuple:
+        return (self._url, self._db) + _count_key(domain)
+
+    def count_providers(self, search_term: str | None = None) -> Optional[int]:
+        """Total de proveedores que cumplen la búsqueda, desde la caché si está
+        (``ODOO_PROVIDER_COUNT_TTL``). None si Odoo no lo ha podido calcular."""
+        domain = self._providers_domain(search_term)
+        if config.ODOO_PROVIDER_COUNT_TTL <= 0:
+            return self._execute_kw('res.partner', 'search_count', [domain])
+        return _provider_count_cache.get_or_set(
+            self._count_cache_key(domain),
+            lambda: self._execute_kw('res.partner', 'search_count', [domain])
+        )
+
+    async def count_providers_async(self, search_term: str | None = None) -> Optional[int]:
+        """Versión asíncrona de count_providers"""
+        domain = self._providers_domain(search_term)
+        key = self._count_cache_key(domain)
+        total = _provider_count_cache.get(key) if config.ODOO_PROVIDER_COUNT_TTL > 0 else None
+        if total is None:
+            total = await self._execute_kw_async('res.partner', 'search_count', [domain])
+            if total is not None and config.ODOO_PROVIDER_COUNT_TTL > 0:
+                _provider_count_cache.set(key, total)
+        return total
+
+    def invalidate_provider_counts(self) -> None:
+        """Olvida los totales en caché de este Odoo (tras crear o modificar un proveedor)"""
+        prefix = (self._url, self._db)
+        _provider_count_cache.invalidate_where(lambda key: key[:2] == prefix)
+
+    def _read_fields(self, fields: Optional[List[str]]) -> List[str]:
+        """Campos de res.partner a leer para las claves pedidas (todos si no se pide ninguna)"""
+        if fields is None:
+            return self.PROVIDER_FIELDS
+        # is_company y active siempre: sin ellos _to_provider no construye un Provider válido
+        return odoo_fields_for(list(fields) + ['is_company', 'active'], self.PROVIDER_FIELD_SOURCES)
+
+    def _to_providers(self, odoo_providers: List[dict], fields: Optional[List[str]] = None) -> list:
+        """Proveedores como modelos Provider o, con ``fields``, como dicts con solo esas claves"""
+        providers = [self._to_provider(p) for p in odoo_providers]
+        if fields is None:
+            return providers
+        return [select_fields(p.model_dump(), fields) for p in providers]
+
     def get_paginated_providers(self, page: int = 1, limit: int = 10, search_term: str | None = None):
         """Obtiene proveedores paginados y el total"""
         import logging
@@ -18,124 +113,128 @@ class OdooProviderService(OdooBaseService):
             total = len(all_providers)
             logger.info(f"Proveedores devueltos: {len(paginated)} (offset={offset})")
             return paginated, total
+        except OdooUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"EXCEPCIÓN CRÍTICA en get_paginated_providers: {e}", exc_info=True)
             return [], 0
     
-    def get_providers(self, offset: int = 0, limit: int = 100, search_term: str | None = None) -> List[Provider]:
-        """Obtiene proveedores desde Odoo"""
+    def get_providers(self, offset: int = 0, limit: int = 100, search_term: str | None = None,
+                      fields: Optional[List[str]] = None) -> List[Provider]:
+        """Obtiene proveedores desde Odoo (``fields`` limita las claves de cada uno)"""
+        mirror = fresh_catalog_mirror(self)
+        if mirror is not None:
+            records, _ = mirror.query_providers(search_term, offset, limit)
+            return self._to_providers(records, fields)
         try:
             if not self._models:
                 self._get_connection()
         
             print(f"ODOO_SERVICE: Obteniendo proveedores de Odoo con offset {offset} y límite {limit}...")
             # Construir dominio de búsqueda dinámico
-            domain = [['is_company', '=', True], ['supplier_rank', '>', 0]]
-            if search_term:
-                domain.append(['name', 'ilike', search_term])
+            domain = self._providers_domain(search_term)
             odoo_providers = self._execute_kw(
                 'res.partner',
                 'search_read',
                 [domain],
-                {'offset': offset, 'limit': limit, 'fields': [
-                    'id', 'name', 'email', 'phone', 'mobile', 'website',
-                    'street', 'street2', 'city', 'state_id', 'zip', 'country_id',
-                    'vat', 'supplier_rank', 'customer_rank', 'is_company',
-                    'category_id', 'comment', 'active'
-                ]}
+                {'offset': offset, 'limit': limit, 'fields': self._read_fields(fields)}
             )
             print(f"ODOO_SERVICE: Datos obtenidos: {len(odoo_providers) if odoo_providers else 0} proveedores")
         
             if not odoo_providers:
                 print("ODOO_SERVICE: No se pudieron leer datos, usando fallback")
-                return self._get_fallback_providers()
+                return self._get_fallback_providers(fields)
         
             # Transformar a formato esperado
             print("ODOO_SERVICE: Transformando datos...")
-            transformed_providers = []
-            for p in odoo_providers:
-                # Manejar state_id y country_id que pueden venir como [id, name]
-                state_name = ''
-                if p.get('state_id'):
-                    if isinstance(p['state_id'], list) and len(p['state_id']) > 1:
-                        state_name = p['state_id'][1]
-                    elif isinstance(p['state_id'], str):
-                        state_name = p['state_id']
-                
-                country_name = ''
-                if p.get('country_id'):
-                    if isinstance(p['country_id'], list) and len(p['country_id']) > 1:
-                        country_name = p['country_id'][1]
-                    elif isinstance(p['country_id'], str):
-                        country_name = p['country_id']
-
-                # Saneamiento de campos que pueden ser False en lugar de None o string vacío
-                email = p.get('email') or ''
-                if email is False:
-                    email = ''
-                
-                phone = p.get('phone') or ''
-                if phone is False:
-                    phone = ''
-                
-                mobile = p.get('mobile') or ''
-                if mobile is False:
-                    mobile = ''
-                
-                website = p.get('website') or ''
-                if website is False:
-                    website = ''
-                
-                street = p.get('street') or ''
-                if street is False:
-                    street = ''
-                
-                street2 = p.get('street2') or ''
-                if street2 is False:
-                    street2 = ''
-                
-                city = p.get('city') or ''
-                if city is False:
-                    city = ''
-                
-                zip_code = p.get('zip') or ''
-                if zip_code is False:
-                    zip_code = ''
-                
-                vat = p.get('vat') or ''
-                if vat is False:
-                    vat = ''
-                
-                comment = p.get('comment') or ''
-                if comment is False:
-                    comment = ''
-
-                transformed_providers.append(Provider(
-                    id=p['id'],
-                    name=p.get('name', 'N/A'),
-                    email=email,
-                    phone=phone,
-                    mobile=mobile,
-                    website=website,
-                    street=street,
-                    street2=street2,
-                    city=city,
-                    state=state_name,
-                    zip=zip_code,
-                    country=country_name,
-                    vat=vat,
-                    supplier_rank=p.get('supplier_rank', 0),
-                    customer_rank=p.get('customer_rank', 0),
-                    is_company=p.get('is_company', False),
-                    category_id=p.get('category_id', []),
-                    comment=comment,
-                    active=p.get('active', False)
-                ))
+            transformed_providers = self._to_providers(odoo_providers, fields)
             print("ODOO_SERVICE: Transformación completada.")
             return transformed_providers
+        except OdooUnavailableError:
+            raise
         except Exception as e:
             print(f"ODOO_SERVICE: Error conectando a Odoo o procesando datos: {e}")
-            return self._get_fallback_providers()
+            return self._get_fallback_providers(fields)
+
+    def _to_provider(self, p: dict) -> Provider:
+        """Transforma un registro res.partner de Odoo al modelo Provider"""
+        # Manejar state_id y country_id que pueden venir como [id, name]
+        state_name = ''
+        if p.get('state_id'):
+            if isinstance(p['state_id'], list) and len(p['state_id']) > 1:
+                state_name = p['state_id'][1]
+            elif isinstance(p['state_id'], str):
+                state_name = p['state_id']
+
+        country_name = ''
+        if p.get('country_id'):
+            if isinstance(p['country_id'], list) and len(p['country_id']) > 1:
+                country_name = p['country_id'][1]
+            elif isinstance(p['country_id'], str):
+                country_name = p['country_id']
+
+        # Saneamiento de campos que pueden ser False en lugar de None o string vacío
+        email = p.get('email') or ''
+        if email is False:
+            email = ''
+
+        phone = p.get('phone') or ''
+        if phone is False:
+            phone = ''
+
+        mobile = p.get('mobile') or ''
+        if mobile is False:
+            mobile = ''
+
+        website = p.get('website') or ''
+        if website is False:
+            website = ''
+
+        street = p.get('street') or ''
+        if street is False:
+            street = ''
+
+        street2 = p.get('street2') or ''
+        if street2 is False:
+            street2 = ''
+
+        city = p.get('city') or ''
+        if city is False:
+            city = ''
+
+        zip_code = p.get('zip') or ''
+        if zip_code is False:
+            zip_code = ''
+
+        vat = p.get('vat') or ''
+        if vat is False:
+            vat = ''
+
+        comment = p.get('comment') or ''
+        if comment is False:
+            comment = ''
+
+        return Provider(
+            id=p['id'],
+            name=p.get('name', 'N/A'),
+            email=email,
+            phone=phone,
+            mobile=mobile,
+            website=website,
+            street=street,
+            street2=street2,
+            city=city,
+            state=state_name,
+            zip=zip_code,
+            country=country_name,
+            vat=vat,
+            supplier_rank=p.get('supplier_rank', 0),
+            customer_rank=p.get('customer_rank', 0),
+            is_company=p.get('is_company', False),
+            category_id=p.get('category_id', []),
+            comment=comment,
+            active=p.get('active', False)
+        )
 
     def get_provider_by_id(self, provider_id: int) -> Optional[Provider]:
         """Obtiene un proveedor específico por su ID directamente desde Odoo"""
@@ -149,12 +248,7 @@ class OdooProviderService(OdooBaseService):
                 'res.partner',
                 'read',
                 [[provider_id]],
-                {'fields': [
-                    'id', 'name', 'email', 'phone', 'mobile', 'website',
-                    'street', 'street2', 'city', 'state_id', 'zip', 'country_id',
-                    'vat', 'supplier_rank', 'customer_rank', 'is_company',
-                    'category_id', 'comment', 'active'
-                ]}
+                {'fields': self.PROVIDER_FIELDS}
             )
             if not result:
                 return None
@@ -188,6 +282,8 @@ class OdooProviderService(OdooBaseService):
                 comment=p.get('comment') or '',
                 active=p.get('active', False)
             )
+        except OdooUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error obteniendo proveedor {provider_id}: {e}")
             return None
@@ -213,18 +309,14 @@ class OdooProviderService(OdooBaseService):
             else:
                 raise ValueError("El formato de datos del proveedor no es válido.")
 
-            # --- Comprobación de duplicados ---
-            vat_value = data.get('vat')
-            existing_ids: list = []
-            if vat_value:
-                existing_ids = self._execute_kw('res.partner', 'search', [[['vat', '=', vat_value], ['is_company', '=', True], ['supplier_rank', '>', 0]]]) or []
-            if not existing_ids and data.get('name'):
-                # Búsqueda aproximada por nombre si no hay VAT o no se encontró coincidencia
-                existing_ids = self._execute_kw('res.partner', 'search', [[['name', 'ilike', data['name']], ['is_company', '=', True], ['supplier_rank', '>', 0]]]) or []
-
-            if existing_ids:
-                logger.info(f"Proveedor duplicado detectado, id existente: {existing_ids[0]}. No se crea uno nuevo.")
-                provider_data = self._execute_kw('res.partner','read',[[existing_ids[0]]],{'fields':['id','name','vat','email','phone']})
+            # --- Comprobación de duplicados (NIF, luego nombre exacto o contenido) en el directorio ---
+            existing = get_supplier_directory(self).resolve(
+                self, name=data.get('name'), vat=data.get('vat'), companies_only=True
+            )
+
+            if existing:
+                logger.info(f"Proveedor duplicado detectado, id existente: {existing['id']}. No se crea uno nuevo.")
+                provider_data = self._execute_kw('res.partner','read',[[existing['id']]],{'fields':['id','name','vat','email','phone']})
                 return Provider(**provider_data[0])
 
             # Saneamiento de campos string
@@ -283,6 +375,7 @@ class OdooProviderService(OdooBaseService):
             logger.info(f"Creando proveedor en Odoo con valores: {vals}")
             new_id = self._execute_kw('res.partner','create',[vals])
             logger.info(f"Proveedor creado con ID {new_id}")
+            self.invalidate_provider_counts()
             # Leer y devolver como Provider
             provider_data = self._execute_kw('res.partner','read',[[new_id]],{'fields':['id','name','vat','email','phone']})
             return Provider(**provider_data[0])
@@ -327,6 +420,8 @@ class OdooProviderService(OdooBaseService):
 
             # Actualizar en Odoo
             self._execute_kw('res.partner', 'write', [[provider_id], vals])
+            # Nombre, rango o archivado cambian qué búsquedas lo incluyen
+            self.invalidate_provider_counts()
 
             # Leer el proveedor actualizado y devolverlo
             provider = self._execute_kw('res.partner', 'read', [[provider_id]], {'fields': list(vals.keys())})
@@ -337,9 +432,9 @@ class OdooProviderService(OdooBaseService):
             logger.error(f"Error actualizando proveedor {provider_id}: {e}")
             return None
 
-    def _get_fallback_providers(self) -> List[Provider]:
+    def _get_fallback_providers(self, fields: Optional[List[str]] = None) -> List[Provider]:
         """Datos de proveedores de respaldo"""
-        return [
+        providers = [
             Provider(
                 id=1,
                 name="Proveedor Ejemplo S.L.",
@@ -383,26 +478,123 @@ class OdooProviderService(OdooBaseService):
                 active=True
             )
         ]
+        if fields is None:
+            return providers
+        return [select_fields(p.model_dump(), fields) for p in providers]
 
 # Instancia global del servicio
-    def get_paginated_providers(self, page: int = 1, limit: int = 10, search_term: str | None = None):
+    def get_paginated_providers(self, page: int = 1, limit: int = 10, search_term: str | None = None,
+                                fields: Optional[List[str]] = None):
         """Devuelve tupla (lista_proveedores, total) con paginación real o simulada"""
         # Calcular desplazamiento
         offset = (page - 1) * limit if limit else 0
+        mirror = fresh_catalog_mirror(self)
+        if mirror is not None:
+            records, total = mirror.query_providers(search_term, offset, limit)
+            return self._to_providers(records, fields), total
         # Obtener lote
-        providers = self.get_providers(offset=offset, limit=limit, search_term=search_term)
+        providers = self.get_providers(offset=offset, limit=limit, search_term=search_term, fields=fields)
         try:
-            total = self._execute_kw(
-                'res.partner',
-                'search_count',
-                [[['is_company', '=', True], ['supplier_rank', '>', 0]]]
-            )
+            total = self.count_providers(search_term)
             if total is None:
                 total = len(providers)
+        except OdooUnavailableError:
+            raise
         except Exception:
             # En caso de error de conexión, usar longitud del lote
             total = len(providers)
         return providers, total
 
+    # --- Variantes asíncronas para las rutas async de FastAPI ---
+
+    async def get_providers_async(self, offset: int = 0, limit: int = 100, search_term: str | None = None,
+                                  fields: Optional[List[str]] = None) -> List[Provider]:
+        """Versión asíncrona de get_providers (no bloquea el event loop)"""
+        mirror = fresh_catalog_mirror(self)
+        if mirror is not None:
+            records, _ = mirror.query_providers(search_term, offset, limit)
+            return self._to_providers(records, fields)
+        domain = self._providers_domain(search_term)
+        odoo_providers = await self._execute_kw_async(
+            'res.partner',
+            'search_read',
+            [domain],
+            {'offset': offset, 'limit': limit, 'fields': self._read_fields(fields)}
+        )
+        if not odoo_providers:
+            return self._get_fallback_providers(fields)
+        try:
+            return self._to_providers(odoo_providers, fields)
+        except Exception as e:
+            print(f"ODOO_SERVICE: Error procesando datos de proveedores: {e}")
+            return self._get_fallback_providers(fields)
+
+    async def get_paginated_providers_async(self, page: int = 1, limit: int = 10, search_term: str | None = None,
+                                            fields: Optional[List[str]] = None):
+        """Versión asíncrona de get_paginated_providers"""
+        offset = (page - 1) * limit if limit else 0
+        mirror = fresh_catalog_mirror(self)
+        if mirror is not None:
+            records, total = mirror.query_providers(search_term, offset, limit)
+            return self._to_providers(records, fields), total
+        providers = await self.get_providers_async(offset=offset, limit=limit, search_term=search_term, fields=fields)
+        total = await self.count_providers_async(search_term)
+        if total is None:
+            total = len(providers)
+        return providers, total
+
+    async def get_providers_version_async(self, search_term: str | None = None):
+        """Validador (registros, write_date máximo) del listado de proveedores, para el GET condicional"""
+        mirror = fresh_catalog_mirror(self)
+        if mirror is not None:
+            return mirror.providers_version(search_term)
+        return await self.get_list_version_async('res.partner', self._providers_domain(search_term))
+
+    async def get_provider_by_id_async(self, provider_id: int) -> Optional[Provider]:
+        """Versión asíncrona de get_provider_by_id"""
+        result = await self._execute_kw_async(
+            'res.partner',
+            'read',
+            [[provider_id]],
+            {'fields': self.PROVIDER_FIELDS}
+        )
+        if not result:
+            return None
+        try:
+            return self._to_provider(result[0])
+        except Exception as e:
+            import logging
+            logging.getLogger("odoo_provider_service.get_provider_by_id").error(f"Error obteniendo proveedor {provider_id}: {e}")
+            return None
+
+    def match_supplier(self, name: str | None = None, vat: str | None = None, fuzzy: bool = False) -> Optional[dict]:
+        """Proveedor por NIF y/o nombre desde el directorio en memoria, con ``match``
+        indicando cómo se encontró (ver SupplierDirectory.resolve). None si no existe."""
+        return get_supplier_directory(self).resolve(self, name=name, vat=vat, fuzzy=fuzzy)
+
+    async def match_supplier_async(self, name: str | None = None, vat: str | None = None,
+                                   fuzzy: bool = False) -> Optional[dict]:
+        """Versión asíncrona de match_supplier (la carga del directorio va al threadpool)"""
+        return await self._run_async(self.match_supplier, name, vat, fuzzy)
+
+    def resolve_supplier(self, name: str | None = None, vat: str | None = None, fuzzy: bool = False) -> Optional[int]:
+        """ID del proveedor por NIF y/o nombre desde el directorio en memoria (None si no existe).
+        Con ``fuzzy`` acepta también el nombre más parecido."""
+        found = self.match_supplier(name, vat, fuzzy)
+        return found['id'] if found else None
+
+    async def resolve_supplier_async(self, name: str | None = None, vat: str | None = None,
+                                     fuzzy: bool = False) -> Optional[int]:
+        """Versión asíncrona de resolve_supplier (la carga del directorio va al threadpool)"""
+        return await self._run_async(self.resolve_supplier, name, vat, fuzzy)
+
+    async def create_supplier_async(self, supplier_data) -> Optional[Provider]:
+        """Versión asíncrona de create_supplier (se ejecuta en el threadpool)"""
+        return await self._run_async(self.create_supplier, supplier_data)
+
+    async def update_provider_async(self, provider_id: int, update_data: dict) -> Optional[Provider]:
+        """Versión asíncrona de update_provider (se ejecuta en el threadpool)"""
+        return await self._run_async(self.update_provider, provider_id, update_data)
+
 # Instancia global del servicio
 odoo_provider_service = OdooProviderService()
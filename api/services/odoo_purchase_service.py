@@ -81,6 +81,22 @@ class OdooPurchaseService(OdooBaseService):
             logging.error(f"Error creando purchase.order: {e}")
             return None
 
+    async def create_purchase_order_async(self, supplier_id: int, order_lines: List[Dict[str, Any]]) -> int | None:
+        """Versión asíncrona de create_purchase_order (no bloquea el event loop)."""
+        domain = [["type_tax_use", "=", "purchase"], ["amount", "=", 21]]
+        tax_ids = await self._execute_kw_async('account.tax', 'search', [domain], {'limit': 1})
+        if tax_ids:
+            for line in order_lines:
+                line[2]['taxes_id'] = [(6, 0, [tax_ids[0]])]
+        po_vals = {
+            'partner_id': supplier_id,
+            'order_line': order_lines,
+            'state': 'draft',
+        }
+        po_id = await self._execute_kw_async('purchase.order', 'create', [po_vals])
+        logging.info(f"Purchase order creado ID={po_id}")
+        return po_id
+
     def create_invoice_from_po(self, po_id: int) -> int | None:
         self.last_error = None
         """Crea factura de proveedor a partir del pedido mediante acción estándar."""
@@ -131,5 +147,9 @@ class OdooPurchaseService(OdooBaseService):
             logging.error(f"Error creando factura desde PO {po_id}: {e}")
             return None
 
+    async def create_invoice_from_po_async(self, po_id: int) -> int | None:
+        """Versión asíncrona de create_invoice_from_po (se ejecuta en el threadpool)."""
+        return await self._run_async(self.create_invoice_from_po, po_id)
+
 # instancia singleton
 odoo_purchase_service = OdooPurchaseService()
@@ -0,0 +1,144 @@
+"""Reintentos con backoff y circuit breaker para las llamadas a Odoo.
+
+* Errores de transporte transitorios (conexión rechazada/cortada, timeouts,
+  502/503/504) se reintentan con backoff exponencial con jitter. Las lecturas
+  se reintentan siempre; las escrituras solo si la petición no llegó a salir
+  (conexión rechazada), para no duplicar altas.
+* Tras ``ODOO_BREAKER_THRESHOLD`` fallos seguidos el breaker se abre y durante
+  ``ODOO_BREAKER_COOLDOWN`` segundos las llamadas fallan al instante con
+  ``OdooUnavailableError`` en lugar de acumularse contra un Odoo caído.
+  Pasado ese tiempo se deja pasar una llamada de prueba (half-open).
+"""
+import http.client
+import logging
+import random
+import threading
+import time
+import xmlrpc.client
+from typing import Dict
+
+import httpx
+
+from ..utils.config import config
+
+logger = logging.getLogger("odoo_resilience")
+
+# Métodos de solo lectura: se pueden repetir sin efectos secundarios
+READ_METHODS = frozenset({
+    'search', 'search_read', 'read', 'search_count', 'read_group', 'fields_get',
+    'name_get', 'name_search', 'web_search_read', 'web_read', 'default_get',
+    'check_access_rights', 'version', 'authenticate', 'login',
+})
+
+_TRANSIENT_STATUS = (502, 503, 504)
+
+
+class OdooUnavailableError(Exception):
+    """Odoo no responde (reintentos agotados o circuit breaker abierto)"""
+
+    def __init__(self, message: str, retry_after: float = 0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Errores de red o de sobrecarga de Odoo que merece la pena reintentar"""
+    if isinstance(error, xmlrpc.client.ProtocolError):
+        return error.errcode in _TRANSIENT_STATUS
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in _TRANSIENT_STATUS
+    return isinstance(error, (
+        ConnectionError, TimeoutError, http.client.HTTPException, httpx.TransportError
+    ))
+
+
+def is_request_not_sent(error: Exception) -> bool:
+    """La petición no llegó a Odoo, así que es seguro repetir incluso una escritura"""
+    return isinstance(error, (ConnectionRefusedError, httpx.ConnectError))
+
+
+def is_retryable(error: Exception, method: str) -> bool:
+    if method in READ_METHODS:
+        return is_transient_error(error)
+    return is_request_not_sent(error)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Backoff exponencial con jitter completo para el reintento ``attempt`` (desde 0)"""
+    cap = min(config.ODOO_RETRY_BACKOFF_MAX, config.ODOO_RETRY_BACKOFF_BASE * (2 ** attempt))
+    return random.uniform(0, cap)
+
+
+class CircuitBreaker:
+    """Circuit breaker thread-safe (closed -> open -> half_open -> closed)"""
+
+    def __init__(self, name: str, threshold: int, cooldown: float):
+        self.name = name
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Lanza OdooUnavailableError si el breaker no deja pasar la llamada"""
+        with self._lock:
+            if self._state == "closed":
+                return
+            remaining = self._opened_at + self.cooldown - time.monotonic()
+            if self._state == "open" and remaining <= 0:
+                self._state = "half_open"
+                self._trial_in_flight = False
+            if self._state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            raise OdooUnavailableError(
+                f"Odoo no disponible (circuit breaker abierto para {self.name})",
+                retry_after=max(remaining, 1),
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != "closed":
+                logger.info(f"Circuit breaker de {self.name} cerrado: Odoo responde de nuevo")
+            self._state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.threshold:
+                if self._state != "open":
+                    logger.error(f"Circuit breaker de {self.name} abierto tras {self._failures} fallos seguidos")
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def state(self) -> dict:
+        with self._lock:
+            info = {"state": self._state, "consecutive_failures": self._failures}
+            if self._state == "open":
+                info["retry_in"] = round(max(self._opened_at + self.cooldown - time.monotonic(), 0), 1)
+            return info
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    """Devuelve el breaker compartido de la URL de Odoo indicada"""
+    with _breakers_lock:
+        breaker = _breakers.get(url)
+        if breaker is None:
+            breaker = CircuitBreaker(url, config.ODOO_BREAKER_THRESHOLD, config.ODOO_BREAKER_COOLDOWN)
+            _breakers[url] = breaker
+        return breaker
+
+
+def get_breaker_states() -> Dict[str, dict]:
+    """Estado de todos los breakers del proceso (para /health)"""
+    return {url: breaker.state() for url, breaker in list(_breakers.items())}
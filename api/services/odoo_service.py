@@ -3,6 +3,8 @@ import xmlrpc.client
 from typing import List, Optional, Dict, Any
 from ..utils.config import config
 from ..models.schemas import Product, Provider, Customer, Sale, ProductCreate
+from .odoo_auth_cache import authenticate
+from .odoo_transport import get_service_proxy
 
 class OdooService:
     """Servicio para interactuar con Odoo via XML-RPC"""
@@ -23,21 +25,21 @@ class OdooService:
             print(f"Intentando conectar a Odoo con URL: {self._url}")
             if not self._common:
                 print(f"Creando proxy para {self._url}/xmlrpc/2/common")
-                self._common = xmlrpc.client.ServerProxy(f'{self._url}/xmlrpc/2/common')
+                self._common = get_service_proxy(self._url, 'common')
             
             if not self._uid:
                 print(f"Autenticando en Odoo con DB: {self.config['db']}, Usuario: {self.config['username']}")
-                self._uid = self._common.authenticate(
+                self._uid = authenticate(
+                    self._url,
                     self.config["db"],
                     self.config["username"],
-                    self.config["password"],
-                    {}
+                    self.config["password"]
                 )
                 print(f"Autenticación completada, UID: {self._uid}")
             
             if not self._models and self._uid:
                 print(f"Creando proxy para {self._url}/xmlrpc/2/object")
-                self._models = xmlrpc.client.ServerProxy(f'{self._url}/xmlrpc/2/object')
+                self._models = get_service_proxy(self._url, 'object')
             
             return self._uid is not None
         except Exception as e:
@@ -83,8 +85,8 @@ class OdooServiceCompatible(OdooServiceRefactored):
     """Clase de compatibilidad que mantiene la interfaz original y delega a servicios especializados"""
 
     # -------- Proveedores --------
-    def get_paginated_providers(self, page: int = 1, limit: int = 10, search_term: str | None = None):
-        return odoo_provider_service.get_paginated_providers(page, limit, search_term)
+    def get_paginated_providers(self, page: int = 1, limit: int = 10, search_term: str | None = None, fields=None):
+        return odoo_provider_service.get_paginated_providers(page, limit, search_term, fields)
 
     def get_providers(self, search_term: str | None = None):
         return odoo_provider_service.get_providers(search_term=search_term)
@@ -98,5 +100,24 @@ class OdooServiceCompatible(OdooServiceRefactored):
     def update_provider(self, provider_id: int, update_vals: dict):
         return odoo_provider_service.update_provider(provider_id, update_vals)
 
+    # -------- Proveedores (async) --------
+    async def get_paginated_providers_async(self, page: int = 1, limit: int = 10, search_term: str | None = None, fields=None):
+        return await odoo_provider_service.get_paginated_providers_async(page, limit, search_term, fields)
+
+    async def get_providers_version_async(self, search_term: str | None = None):
+        return await odoo_provider_service.get_providers_version_async(search_term)
+
+    async def get_providers_async(self, search_term: str | None = None):
+        return await odoo_provider_service.get_providers_async(search_term=search_term)
+
+    async def get_provider_by_id_async(self, provider_id: int):
+        return await odoo_provider_service.get_provider_by_id_async(provider_id)
+
+    async def create_provider_async(self, provider_data: dict):
+        return await odoo_provider_service.create_supplier_async(provider_data)
+
+    async def update_provider_async(self, provider_id: int, update_vals: dict):
+        return await odoo_provider_service.update_provider_async(provider_id, update_vals)
+
 # Instancia del servicio (ahora usando la versión refactorizada)
 odoo_service = OdooServiceCompatible()
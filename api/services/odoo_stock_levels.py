@@ -0,0 +1,94 @@
+"""Stock a mano de los productos de un listado, en bloque.
+
+Las lecturas de página de Odoo ya traen ``qty_available`` (Odoo lo calcula para
+toda la página agregando ``stock.quant`` de las ubicaciones internas), así que
+el stock no cuesta ninguna llamada adicional, y la réplica local lo guarda con
+cada producto. Para los registros que no lo traen se leen todos los que falten
+con un único ``read`` de ``qty_available``.
+
+Las cantidades se guardan en una caché en proceso con un TTL corto
+(``ODOO_STOCK_CACHE_TTL``). Sin módulo de inventario (product.template sin
+``qty_available``) el servicio de productos no llama aquí.
+
+``get_stock_version`` da la versión del stock (registros y ``write_date`` máximo
+de ``stock.quant``) para el GET condicional de los listados; cuando cambia se
+descartan las cantidades en caché de ese Odoo.
+"""
+import logging
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from .odoo_resilience import OdooUnavailableError
+from ..utils.config import config
+from ..utils.ttl_cache import TTLCache
+
+logger = logging.getLogger("odoo_stock_levels")
+
+# Cantidad a mano por (url, db, product.template)
+_stock_cache = TTLCache(ttl=config.ODOO_STOCK_CACHE_TTL, maxsize=50000)
+
+# Última versión de stock.quant vista por (url, db)
+_stock_versions: Dict[tuple, Tuple[int, Optional[str]]] = {}
+_stock_versions_lock = threading.Lock()
+
+
+def _remember(prefix: tuple, template_id: int, quantity: float) -> None:
+    if config.ODOO_STOCK_CACHE_TTL > 0:
+        _stock_cache.set(prefix + (template_id,), quantity)
+
+
+def get_stock_levels(service, products: Iterable[dict]) -> Dict[int, float]:
+    """Cantidad a mano por ID de plantilla para los registros de product.template dados.
+    Los productos cuyo stock no se ha podido obtener no aparecen en el resultado.
+    """
+    prefix = (service._url, service._db)
+    levels: Dict[int, float] = {}
+    missing = []
+    for product in products:
+        template_id = product.get('id')
+        if not template_id:
+            continue
+        if 'qty_available' in product:
+            levels[template_id] = product.get('qty_available') or 0.0
+            _remember(prefix, template_id, levels[template_id])
+            continue
+        cached = _stock_cache.get(prefix + (template_id,))
+        if cached is None:
+            missing.append(template_id)
+        else:
+            levels[template_id] = cached
+    if not missing:
+        return levels
+
+    try:
+        records = service._execute_kw('product.template', 'read', [missing], {'fields': ['qty_available']})
+    except OdooUnavailableError:
+        raise
+    except Exception as e:
+        logger.warning(f"No se pudo obtener el stock de {len(missing)} productos: {e}")
+        records = None
+    if records is None:
+        logger.warning(f"Stock no disponible para {len(missing)} productos")
+        return levels
+    for record in records:
+        levels[record['id']] = record.get('qty_available') or 0.0
+        _remember(prefix, record['id'], levels[record['id']])
+    return levels
+
+
+def get_stock_version(service) -> Optional[Tuple[int, Optional[str]]]:
+    """``(registros, write_date máximo)`` de stock.quant: cambia con cada movimiento de
+    stock. Si ha cambiado desde la consulta anterior se descartan las cantidades en caché
+    de ese Odoo, para que la respuesta con el validador nuevo no salga con stock anterior.
+    None si no se puede calcular."""
+    prefix = (service._url, service._db)
+    version = service.get_list_version('stock.quant', [])
+    with _stock_versions_lock:
+        changed = version is None or _stock_versions.get(prefix) != version
+        if version is None:
+            _stock_versions.pop(prefix, None)
+        else:
+            _stock_versions[prefix] = version
+    if changed:
+        _stock_cache.invalidate_where(lambda key: key[:2] == prefix)
+    return version
@@ -0,0 +1,323 @@
+"""Directorio en proceso de los proveedores (res.partner con ``supplier_rank``).
+
+Se cargan todos los proveedores (id, nombre, NIF, empresa) con un único
+``search_read`` y se indexan por:
+
+* NIF normalizado (sin espacios ni guiones, en mayúsculas y sin el prefijo de
+  país: "ES B-12345678" y "B12345678" son el mismo),
+* nombre exacto normalizado (sin mayúsculas, acentos ni puntuación),
+* trigramas del nombre, para buscar por subcadena (como ``ilike``) y por
+  parecido (coeficiente de Dice), útil con nombres leídos por OCR.
+
+Cada ``ODOO_SUPPLIER_DIRECTORY_REFRESH`` segundos (o tras una escritura de la
+API en res.partner) se traen solo los proveedores con ``write_date`` posterior
+a la última carga; cada ``ODOO_SUPPLIER_DIRECTORY_RELOAD`` segundos se recarga
+entero para recoger borrados. Las búsquedas son consultas a diccionarios.
+
+Si Odoo no responde a una carga o un refresco se sigue sirviendo lo ya
+cargado y no se reintenta hasta pasados ``ODOO_SUPPLIER_DIRECTORY_REFRESH``
+segundos, para no añadir una llamada a Odoo (y su espera) a cada consulta.
+"""
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..utils.config import config
+from .odoo_resilience import OdooUnavailableError
+
+logger = logging.getLogger("odoo_supplier_directory")
+
+_FIELDS = ['id', 'name', 'vat', 'is_company', 'active', 'write_date']
+_DOMAIN = [('supplier_rank', '>', 0)]
+# Margen sobre la marca de agua: write_date tiene resolución de segundos
+_WATERMARK_OVERLAP = timedelta(seconds=2)
+# Parecido mínimo (Dice sobre trigramas) de una coincidencia aproximada. Alto a propósito:
+# "Comercial Lopez SL" / "Comercial Perez SL" ya dan 0,72 y son proveedores distintos
+FUZZY_THRESHOLD = 0.9
+
+
+def normalize_vat(vat: Optional[str]) -> str:
+    """NIF/VAT comparable: alfanumérico en mayúsculas y sin prefijo de país"""
+    value = re.sub(r'[^0-9A-Z]', '', str(vat or '').upper())
+    return re.sub(r'^[A-Z]{2}(?=[0-9A-Z]{8,}$)', '', value)
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Nombre comparable: sin acentos ni mayúsculas, "S.L." como "sl" y el resto de
+    signos como espacios"""
+    text = unicodedata.normalize('NFKD', str(name or ''))
+    text = ''.join(c for c in text if not unicodedata.combining(c)).casefold().replace('.', '')
+    return ' '.join(re.sub(r'[^0-9a-zñ]+', ' ', text).split())
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _numbers(key: str) -> List[str]:
+    """Números de un nombre normalizado ("Distribución 12" y "Distribución 21" no se parecen)"""
+    return re.findall(r'\d+', key)
+
+
+class SupplierDirectory:
+    """Proveedores de un Odoo (url, db) indexados por NIF y nombre"""
+
+    def __init__(self, refresh_interval: float, reload_interval: float):
+        self.refresh_interval = refresh_interval
+        self.reload_interval = reload_interval
+        self._lock = threading.RLock()
+        self._loaded_at: Optional[float] = None
+        self._refreshed_at: Optional[float] = None
+        self._watermark: Optional[str] = None
+        self._stale = False
+        self._by_id: Dict[int, dict] = {}
+        self._by_vat: Dict[str, List[int]] = {}
+        self._by_name: Dict[str, List[int]] = {}
+        self._by_trigram: Dict[str, Set[int]] = {}
+
+    # --- carga ---
+
+    def _needs_reload(self) -> bool:
+        if self._loaded_at is None:
+            # Sin directorio: tras una carga fallida (_refreshed_at) se espera a reintentar
+            return self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.refresh_interval
+        return time.monotonic() - self._loaded_at >= self.reload_interval
+
+    def _needs_refresh(self) -> bool:
+        return self._stale or time.monotonic() - self._refreshed_at >= self.refresh_interval
+
+    def _ensure_loaded(self, service) -> bool:
+        """Carga, recarga o refresca el directorio si toca. False si no hay directorio."""
+        if not self._needs_reload() and (self._loaded_at is None or not self._needs_refresh()):
+            return self._loaded_at is not None
+        with self._lock:
+            if self._needs_reload():
+                return self._reload(service)
+            if self._loaded_at is None:
+                return False
+            if self._needs_refresh():
+                self._refresh(service)
+            return True
+
+    def _reload(self, service) -> bool:
+        try:
+            records = service._execute_kw('res.partner', 'search_read', [list(_DOMAIN)], {'fields': _FIELDS})
+        except OdooUnavailableError:
+            records = None
+        if records is None:
+            logger.warning("No se pudo cargar el directorio de proveedores; se usará el último disponible")
+            now = time.monotonic()
+            if self._loaded_at is not None:
+                # La recarga se reintenta tras refresh_interval, no en cada consulta
+                self._loaded_at = now - self.reload_interval + self.refresh_interval
+            self._refreshed_at = now
+            return self._loaded_at is not None
+        self._by_id, self._by_vat, self._by_name, self._by_trigram = {}, {}, {}, {}
+        self._watermark = None
+        self._upsert(records)
+        self._loaded_at = self._refreshed_at = time.monotonic()
+        self._stale = False
+        logger.info(f"Directorio de proveedores cargado: {len(self._by_id)} proveedores")
+        return True
+
+    def _refresh(self, service) -> None:
+        """Trae solo los proveedores modificados desde la última carga (incluidos los archivados)"""
+        domain = list(_DOMAIN)
+        if self._watermark:
+            since = datetime.strptime(self._watermark, "%Y-%m-%d %H:%M:%S") - _WATERMARK_OVERLAP
+            domain.append(('write_date', '>=', since.strftime("%Y-%m-%d %H:%M:%S")))
+        self._stale = False
+        try:
+            records = service._execute_kw('res.partner', 'search_read', [domain],
+                                          {'fields': _FIELDS, 'context': {'active_test': False}})
+        except OdooUnavailableError:
+            records = None
+        if records is None:
+            logger.warning("No se pudo refrescar el directorio de proveedores; se usará el último disponible")
+            self._refreshed_at = time.monotonic()
+            return
+        self._upsert(records)
+        self._refreshed_at = time.monotonic()
+        if records:
+            logger.info(f"Directorio de proveedores refrescado: {len(records)} cambios")
+
+    def _upsert(self, records: List[dict]) -> None:
+        for record in records:
+            self._remove(record['id'])
+            self._watermark = max(self._watermark or '', str(record.get('write_date') or '')[:19]) or None
+            if record.get('active') is False:
+                continue
+            entry = {
+                'id': record['id'],
+                'name': record.get('name') or '',
+                'vat': record.get('vat') or '',
+                'is_company': bool(record.get('is_company')),
+            }
+            key = normalize_name(entry['name'])
+            entry['_key'] = key
+            entry['_trigrams'] = _trigrams(f" {key} ")
+            self._by_id[entry['id']] = entry
+            vat = normalize_vat(entry['vat'])
+            if vat:
+                self._by_vat.setdefault(vat, []).append(entry['id'])
+            self._by_name.setdefault(key, []).append(entry['id'])
+            for trigram in entry['_trigrams']:
+                self._by_trigram.setdefault(trigram, set()).add(entry['id'])
+
+    def _remove(self, partner_id: int) -> None:
+        entry = self._by_id.pop(partner_id, None)
+        if entry is None:
+            return
+        vat = normalize_vat(entry['vat'])
+        if vat and partner_id in self._by_vat.get(vat, []):
+            self._by_vat[vat].remove(partner_id)
+        if partner_id in self._by_name.get(entry['_key'], []):
+            self._by_name[entry['_key']].remove(partner_id)
+        for trigram in entry['_trigrams']:
+            self._by_trigram.get(trigram, set()).discard(partner_id)
+
+    def mark_stale(self) -> None:
+        """La API ha escrito en res.partner: se refresca en la próxima consulta"""
+        self._stale = True
+
+    def invalidate(self) -> None:
+        """Fuerza la recarga completa en la próxima consulta"""
+        with self._lock:
+            self._loaded_at = self._refreshed_at = None
+
+    # --- consultas ---
+
+    def _pick(self, ids, companies_only: bool) -> List[dict]:
+        entries = [self._by_id[i] for i in ids if i in self._by_id]
+        if companies_only:
+            entries = [e for e in entries if e['is_company']]
+        return [{k: v for k, v in e.items() if not k.startswith('_')} for e in entries]
+
+    def find_by_vat(self, service, vat: Optional[str], companies_only: bool = False) -> Optional[dict]:
+        """Proveedor con ese NIF (normalizado), o None"""
+        vat = normalize_vat(vat)
+        if not vat or not self._ensure_loaded(service):
+            return None
+        with self._lock:
+            found = self._pick(sorted(self._by_vat.get(vat, [])), companies_only)
+        return found[0] if found else None
+
+    def find_all_by_name(self, service, name: Optional[str], companies_only: bool = False) -> List[dict]:
+        """Proveedores con ese nombre, sin distinguir mayúsculas, acentos ni puntuación"""
+        key = normalize_name(name)
+        if not key or not self._ensure_loaded(service):
+            return []
+        with self._lock:
+            return self._pick(sorted(self._by_name.get(key, [])), companies_only)
+
+    def find_by_name(self, service, name: Optional[str], companies_only: bool = False,
+                     any_partner: bool = False) -> Optional[dict]:
+        """Proveedor con ese nombre (normalizado, ver find_all_by_name). Con ``any_partner``,
+        si no hay ningún proveedor así se busca en Odoo cualquier contacto con ese nombre
+        exacto (``('name', '=', name)``), también los que no tienen ``supplier_rank``."""
+        found = self.find_all_by_name(service, name, companies_only)
+        if found or not any_partner or not name:
+            return found[0] if found else None
+        ids = service._execute_kw('res.partner', 'search', [[('name', '=', name)]], {'limit': 1})
+        return {'id': ids[0], 'name': name, 'vat': '', 'is_company': False} if ids else None
+
+    def search(self, service, term: Optional[str], limit: Optional[int] = None,
+               companies_only: bool = False) -> List[dict]:
+        """Proveedores cuyo nombre contiene ``term`` (como ``ilike``), los más cortos primero"""
+        needle = normalize_name(term)
+        if not needle or not self._ensure_loaded(service):
+            return []
+        with self._lock:
+            if len(needle) >= 3:
+                postings = [self._by_trigram.get(t, set()) for t in _trigrams(needle)]
+                candidates = set.intersection(*postings) if postings else set()
+            else:
+                candidates = set(self._by_id)
+            ids = sorted((i for i in candidates if needle in self._by_id[i]['_key']),
+                         key=lambda i: (len(self._by_id[i]['_key']), i))
+            return self._pick(ids, companies_only)[:limit]
+
+    def find_similar(self, service, name: Optional[str], threshold: float = FUZZY_THRESHOLD,
+                     limit: int = 5, companies_only: bool = False) -> List[Tuple[dict, float]]:
+        """Proveedores de nombre parecido (Dice sobre trigramas >= ``threshold``), el más parecido primero"""
+        key = normalize_name(name)
+        if not key or not self._ensure_loaded(service):
+            return []
+        query = _trigrams(f" {key} ")
+        numbers = _numbers(key)
+        with self._lock:
+            shared = Counter()
+            for trigram in query:
+                shared.update(self._by_trigram.get(trigram, ()))
+            scored = []
+            for partner_id, count in shared.items():
+                entry = self._by_id[partner_id]
+                score = 2 * count / (len(query) + len(entry['_trigrams']))
+                if score >= threshold and _numbers(entry['_key']) == numbers:
+                    scored.append((partner_id, score))
+            scored.sort(key=lambda item: (-item[1], item[0]))
+            entries = {e['id']: e for e in self._pick([i for i, _ in scored], companies_only)}
+        return [(entries[i], round(score, 3)) for i, score in scored if i in entries][:limit]
+
+    def resolve(self, service, name: Optional[str] = None, vat: Optional[str] = None,
+                fuzzy: bool = False, companies_only: bool = False) -> Optional[dict]:
+        """Mejor proveedor para un NIF y/o nombre: NIF, nombre exacto, nombre contenido
+        y, con ``fuzzy``, el nombre más parecido. El resultado indica cómo se encontró en
+        ``match`` (``vat``, ``name``, ``contains`` o ``fuzzy``, este con ``score``).
+
+        Si se da un NIF, las coincidencias por nombre con otro NIF distinto se descartan:
+        son otra empresa con un nombre igual o parecido."""
+        found = self.find_by_vat(service, vat, companies_only) if vat else None
+        if found is not None:
+            return dict(found, match='vat')
+        if not name:
+            return None
+        vat = normalize_vat(vat)
+
+        def compatible(entry: dict) -> bool:
+            other = normalize_vat(entry['vat'])
+            return not vat or not other or other == vat
+
+        for entry in self.find_all_by_name(service, name, companies_only):
+            if compatible(entry):
+                return dict(entry, match='name')
+        for entry in self.search(service, name, companies_only=companies_only):
+            if compatible(entry):
+                return dict(entry, match='contains')
+        if fuzzy:
+            for entry, score in self.find_similar(service, name, companies_only=companies_only):
+                if compatible(entry):
+                    return dict(entry, match='fuzzy', score=score)
+        return None
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+
+_directories: Dict[Tuple[str, str], SupplierDirectory] = {}
+_directories_lock = threading.Lock()
+
+
+def get_supplier_directory(service) -> SupplierDirectory:
+    """Directorio de proveedores compartido para el Odoo (url, db) del servicio"""
+    key = (service._url, service._db)
+    with _directories_lock:
+        directory = _directories.get(key)
+        if directory is None:
+            directory = SupplierDirectory(config.ODOO_SUPPLIER_DIRECTORY_REFRESH, config.ODOO_SUPPLIER_DIRECTORY_RELOAD)
+            _directories[key] = directory
+        return directory
+
+
+def notify_partner_write(service, model: str) -> None:
+    """Avisa al directorio (si existe) de que la API ha modificado res.partner"""
+    if model != 'res.partner':
+        return
+    directory = _directories.get((service._url, service._db))
+    if directory is not None:
+        directory.mark_stale()
@@ -0,0 +1,96 @@
+"""Transportes intercambiables para hablar con Odoo.
+
+``ODOO_TRANSPORT`` selecciona el protocolo:
+
+* ``xmlrpc`` (por defecto): ``/xmlrpc/2/<service>`` con ``xmlrpc.client``.
+* ``jsonrpc``: endpoint ``/jsonrpc`` de Odoo. Las respuestas grandes
+  (``search_read`` de miles de productos) se decodifican mucho más rápido que
+  el XML, sobre todo si está instalado ``orjson``.
+
+Ambos devuelven un proxy con la misma interfaz (``proxy.authenticate(...)``,
+``proxy.execute_kw(...)``) y los errores de Odoo se elevan como
+``xmlrpc.client.Fault`` para que el resto del código no dependa del transporte.
+Los dos reutilizan el pool de conexiones keep-alive.
+"""
+import itertools
+import json
+import xmlrpc.client
+from typing import Any, Dict, Tuple
+
+from ..utils.config import config
+from .odoo_connection_pool import OdooConnectionPool, get_connection_pool, get_server_proxy
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; json de la stdlib funciona igual, solo más lento
+    orjson = None
+
+TRANSPORTS = ("xmlrpc", "jsonrpc")
+
+_request_ids = itertools.count(1)
+
+
+def encode_jsonrpc_request(service: str, method: str, args: tuple) -> bytes:
+    """Construye el cuerpo de una llamada ``call`` al endpoint /jsonrpc"""
+    payload = {
+        "jsonrpc": "2.0",
+        "method": "call",
+        "params": {"service": service, "method": method, "args": list(args)},
+        "id": next(_request_ids),
+    }
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
+def decode_jsonrpc_response(body: bytes) -> Any:
+    """Decodifica la respuesta JSON-RPC y convierte los errores de Odoo en Fault"""
+    data = orjson.loads(body) if orjson is not None else json.loads(body)
+    error = data.get("error")
+    if error:
+        details = error.get("data") or {}
+        name = details.get("name", "")
+        message = details.get("message") or error.get("message", "Odoo Server Error")
+        # Mismo código que usa Odoo en XML-RPC para AccessDenied
+        code = 3 if name.endswith("AccessDenied") else error.get("code", 1)
+        raise xmlrpc.client.Fault(code, f"{name}: {message}" if name else message)
+    return data.get("result")
+
+
+class JsonRpcServiceProxy:
+    """Proxy de un servicio de Odoo (common, object...) sobre /jsonrpc"""
+
+    def __init__(self, pool: OdooConnectionPool, service: str):
+        self._pool = pool
+        self._service = service
+
+    def _call(self, method: str, *args: Any) -> Any:
+        body = self._pool.post("/jsonrpc", encode_jsonrpc_request(self._service, method, args), {
+            "Content-Type": "application/json",
+        })
+        return decode_jsonrpc_response(body)
+
+    def __getattr__(self, method: str):
+        if method.startswith("_"):
+            raise AttributeError(method)
+        return lambda *args: self._call(method, *args)
+
+
+_json_proxies: Dict[Tuple[str, str], JsonRpcServiceProxy] = {}
+
+
+def get_transport_name() -> str:
+    """Transporte configurado (``xmlrpc`` si el valor no es válido)"""
+    name = (config.ODOO_TRANSPORT or "xmlrpc").lower()
+    return name if name in TRANSPORTS else "xmlrpc"
+
+
+def get_service_proxy(url: str, service: str):
+    """Devuelve el proxy compartido del servicio según ``ODOO_TRANSPORT``"""
+    if get_transport_name() == "jsonrpc":
+        key = (url, service)
+        proxy = _json_proxies.get(key)
+        if proxy is None:
+            proxy = _json_proxies.setdefault(key, JsonRpcServiceProxy(get_connection_pool(url), service))
+        return proxy
+    return get_server_proxy(url, service)
@@ -205,49 +205,49 @@ def categorize_existing_products(odoo_service) -> Dict[str, int]:
         "errors": 0
     }
     
-    for product in products:
-        try:
-            product_id = product['id']
-            product_name = product['name']
-            
-            # Obtener proveedor si existe
-            supplier_name = None
-            if product.get('seller_ids'):
-                seller_id = product['seller_ids'][0]
-                supplier_data = odoo_service._execute_kw(
-                    'product.supplierinfo',
-                    'read',
-                    [seller_id],
-                    {'fields': ['partner_id']}
-                )
-                if supplier_data and supplier_data[0].get('partner_id'):
-                    partner_id = supplier_data[0]['partner_id'][0]
-                    partner_data = odoo_service._execute_kw(
-                        'res.partner',
-                        'read',
-                        [partner_id],
-                        {'fields': ['name']}
-                    )
-                    if partner_data:
-                        supplier_name = partner_data[0]['name']
-            
-            # Determinar categoría
-            category_id = get_category_for_product(product_name, supplier_name)
-            
-            # Si la categoría es distinta de "All", actualizar
-            if category_id != 1:
-                odoo_service._execute_kw(
-                    'product.template',
-                    'write',
-                    [[product_id], {'categ_id': category_id}]
-                )
-                stats["updated"] += 1
-                logging.info(f"Producto {product_id} '{product_name}' actualizado a categoría {category_id}")
-            else:
-                stats["skipped"] += 1
-                
-        except Exception as e:
-            logging.error(f"Error al categorizar producto {product.get('id')}: {e}")
-            stats["errors"] += 1
+    # Primer proveedor de cada producto y su nombre: una lectura por modelo para todo el lote
+    with odoo_service.many2one_loader() as loader:
+        sellers = loader.load_many(
+            'product.supplierinfo',
+            [p['seller_ids'][0] for p in products if p.get('seller_ids')],
+            ['partner_id']
+        )
+        loader.load_many('res.partner', [s.get('partner_id') for s in sellers.values()])
+    
+        for product in products:
+            _categorize_product(odoo_service, loader, product, sellers, stats)
             
     return stats
+
+
+def _categorize_product(odoo_service, loader, product, sellers, stats):
+    """Asigna la categoría a un producto de 'All' y actualiza las estadísticas"""
+    try:
+        product_id = product['id']
+        product_name = product['name']
+        
+        # Obtener proveedor si existe
+        supplier_name = None
+        if product.get('seller_ids'):
+            supplier_data = sellers.get(product['seller_ids'][0], {})
+            if supplier_data.get('partner_id'):
+                supplier_name = loader.get('res.partner', supplier_data['partner_id'])
+        
+        # Determinar categoría
+        category_id = get_category_for_product(product_name, supplier_name)
+        
+        # Si la categoría es distinta de "All", actualizar
+        if category_id != 1:
+            odoo_service._execute_kw(
+                'product.template',
+                'write',
+                [[product_id], {'categ_id': category_id}]
+            )
+            stats["updated"] += 1
+            logging.info(f"Producto {product_id} '{product_name}' actualizado a categoría {category_id}")
+        else:
+            stats["skipped"] += 1
+            
+    except Exception as e:
+        logging.error(f"Error al categorizar producto {product.get('id')}: {e}")
+        stats["errors"] += 1
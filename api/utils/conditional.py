@@ -0,0 +1,50 @@
+"""GET condicional (ETag / Last-Modified) para los listados.
+
+El validador de un listado es barato de calcular en Odoo: número de registros
+del dominio y ``write_date`` máximo (un único ``read_group``). Junto con la ruta
+y los parámetros de la petición identifica la página: si el cliente envía el
+mismo ETag en ``If-None-Match`` se responde 304 sin leer ni transformar nada.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+
+def validator_headers(request: Request, count: int, last_write: Optional[str], *extra: str) -> Dict[str, str]:
+    """Cabeceras ETag, Last-Modified y Cache-Control de un listado. ``extra`` son otras
+    partes de la versión (p. ej. la del stock) que entran en el ETag"""
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    version = "|".join([str(count), last_write or ''] + [str(part) for part in extra])
+    digest = hashlib.sha1(f"{request.url.path}?{query}|{version}".encode()).hexdigest()
+    headers = {
+        "ETag": f'"{digest[:32]}"',
+        # El cliente puede guardar la respuesta, pero debe revalidarla siempre
+        "Cache-Control": "private, no-cache",
+    }
+    if last_write:
+        try:
+            # Odoo guarda write_date en UTC con formato "YYYY-MM-DD HH:MM:SS"
+            moment = datetime.strptime(str(last_write)[:19], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+            headers["Last-Modified"] = format_datetime(moment, usegmt=True)
+        except ValueError:
+            pass
+    return headers
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """True si ``If-None-Match`` incluye ``etag`` (comparación débil, como pide la RFC 9110)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    """Respuesta 304 (sin cuerpo) con los validadores"""
+    return Response(status_code=304, headers=headers)
@@ -30,6 +30,54 @@ class Config:
     ODOO_USERNAME: str = os.getenv("ODOO_USERNAME", "yo@mail.com")
     ODOO_PASSWORD: str = os.getenv("ODOO_PASSWORD", "admin")
     
+    # Pool de conexiones HTTP persistentes hacia Odoo (compartido por todos los servicios)
+    ODOO_POOL_SIZE: int = int(os.getenv("ODOO_POOL_SIZE", "10"))
+    ODOO_POOL_IDLE_TIMEOUT: float = float(os.getenv("ODOO_POOL_IDLE_TIMEOUT", "60"))  # segundos
+    ODOO_TIMEOUT: float = float(os.getenv("ODOO_TIMEOUT", "60"))  # segundos por llamada
+    # Llamadas simultáneas de execute_batch/map_concurrent (no supera el tamaño del pool)
+    ODOO_BATCH_CONCURRENCY: int = min(int(os.getenv("ODOO_BATCH_CONCURRENCY", "8")), ODOO_POOL_SIZE)
+    # Reintentos ante errores transitorios (backoff exponencial con jitter, en segundos)
+    ODOO_RETRY_ATTEMPTS: int = int(os.getenv("ODOO_RETRY_ATTEMPTS", "2"))
+    ODOO_RETRY_BACKOFF_BASE: float = float(os.getenv("ODOO_RETRY_BACKOFF_BASE", "0.2"))
+    ODOO_RETRY_BACKOFF_MAX: float = float(os.getenv("ODOO_RETRY_BACKOFF_MAX", "2"))
+    # Circuit breaker: fallos seguidos para abrirlo y segundos que permanece abierto
+    ODOO_BREAKER_THRESHOLD: int = int(os.getenv("ODOO_BREAKER_THRESHOLD", "5"))
+    ODOO_BREAKER_COOLDOWN: float = float(os.getenv("ODOO_BREAKER_COOLDOWN", "30"))
+    # Segundos que se guardan en caché los metadatos de modelos (fields_get)
+    ODOO_METADATA_TTL: float = float(os.getenv("ODOO_METADATA_TTL", "3600"))
+    # Segundos entre recargas del árbol de categorías en caché
+    ODOO_CATEGORY_CACHE_TTL: float = float(os.getenv("ODOO_CATEGORY_CACHE_TTL", "300"))
+    # Productos por bloque en la exportación en streaming del catálogo
+    ODOO_EXPORT_CHUNK_SIZE: int = int(os.getenv("ODOO_EXPORT_CHUNK_SIZE", "1000"))
+    # Segundos que se guarda en caché el stock a mano de los productos de los listados (0 = sin caché)
+    ODOO_STOCK_CACHE_TTL: float = float(os.getenv("ODOO_STOCK_CACHE_TTL", "30"))
+    # Segundos que se guarda en caché el total de proveedores de cada búsqueda (0 = sin caché)
+    ODOO_PROVIDER_COUNT_TTL: float = float(os.getenv("ODOO_PROVIDER_COUNT_TTL", "60"))
+    # Directorio de proveedores en proceso: segundos entre refrescos por write_date y entre recargas completas
+    ODOO_SUPPLIER_DIRECTORY_REFRESH: float = float(os.getenv("ODOO_SUPPLIER_DIRECTORY_REFRESH", "60"))
+    ODOO_SUPPLIER_DIRECTORY_RELOAD: float = float(os.getenv("ODOO_SUPPLIER_DIRECTORY_RELOAD", "3600"))
+    # Productos por llamada create en el alta masiva (POST /products/bulk)
+    ODOO_BULK_BATCH_SIZE: int = int(os.getenv("ODOO_BULK_BATCH_SIZE", "200"))
+    # Protocolo hacia Odoo: "xmlrpc" (por defecto) o "jsonrpc" (más rápido en lecturas grandes)
+    ODOO_TRANSPORT: str = os.getenv("ODOO_TRANSPORT", "xmlrpc")
+    # Réplica local (SQLite) del catálogo para los listados de productos y proveedores
+    ODOO_MIRROR_ENABLED: bool = os.getenv("ODOO_MIRROR_ENABLED", "false").lower() in ("1", "true", "yes")
+    ODOO_MIRROR_PATH: str = os.getenv("ODOO_MIRROR_PATH", "odoo_mirror.db")
+    ODOO_MIRROR_SYNC_INTERVAL: float = float(os.getenv("ODOO_MIRROR_SYNC_INTERVAL", "60"))  # segundos
+    # Antigüedad máxima (segundos) de la última sincronización para servir desde la réplica
+    ODOO_MIRROR_MAX_STALENESS: float = float(os.getenv("ODOO_MIRROR_MAX_STALENESS", "300"))
+    # Antigüedad máxima (segundos) del índice de búsqueda para resolver búsquedas con él
+    ODOO_MIRROR_SEARCH_MAX_AGE: float = float(os.getenv("ODOO_MIRROR_SEARCH_MAX_AGE", "900"))
+    
+    # Instantánea del dashboard: segundos entre recálculos en segundo plano (0 = sin hilo),
+    # antigüedad a partir de la cual se marca como antigua y fichero donde se guarda ("" = solo memoria)
+    DASHBOARD_REFRESH_INTERVAL: float = float(os.getenv("DASHBOARD_REFRESH_INTERVAL", "300"))
+    DASHBOARD_STALE_AFTER: float = float(os.getenv("DASHBOARD_STALE_AFTER", "600"))
+    DASHBOARD_SNAPSHOT_PATH: str = os.getenv("DASHBOARD_SNAPSHOT_PATH", "")
+    
+    # Margen (% sobre el coste) por debajo del cual un producto se marca con alerta
+    MARGIN_ALERT_THRESHOLD: float = float(os.getenv("MARGIN_ALERT_THRESHOLD", "15"))
+    
     # Configuración de paginación
     DEFAULT_PAGE_SIZE: int = 10
     MAX_PAGE_SIZE: int = 100
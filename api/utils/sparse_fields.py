@@ -0,0 +1,42 @@
+"""Parámetro ``fields=`` de los listados (sparse fieldsets).
+
+El cliente pide solo las columnas que va a mostrar (``fields=id,name,price``);
+el servicio lee de Odoo únicamente los campos necesarios para construirlas y la
+respuesta incluye solo esas claves.
+"""
+from typing import Dict, Iterable, List, Optional
+
+
+def parse_fields(value: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """Lista de campos pedidos (sin duplicados, en orden) o None si no se pide ninguno.
+
+    El ``id`` se incluye siempre. Lanza ValueError si hay campos desconocidos.
+    """
+    if value is None or not value.strip():
+        return None
+    requested = ['id']
+    for name in (part.strip() for part in value.split(',')):
+        if name and name not in requested:
+            requested.append(name)
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise ValueError(f"Campos desconocidos en 'fields': {', '.join(unknown)}. "
+                         f"Disponibles: {', '.join(allowed)}")
+    return requested
+
+
+def odoo_fields_for(requested: Iterable[str], sources: Dict[str, List[str]]) -> List[str]:
+    """Campos de Odoo necesarios para construir las claves ``requested`` de la respuesta"""
+    fields = ['id']
+    for name in requested:
+        for source in sources.get(name, []):
+            if source not in fields:
+                fields.append(source)
+    return fields
+
+
+def select_fields(row: dict, requested: Optional[List[str]]) -> dict:
+    """Deja en ``row`` solo las claves pedidas (todas si ``requested`` es None)"""
+    if requested is None:
+        return row
+    return {name: row.get(name) for name in requested}
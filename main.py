@@ -1,4 +1,5 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.staticfiles import StaticFiles
@@ -6,6 +7,7 @@ from pathlib import Path
 
 # Importar configuración
 from api.utils.config import config
+from api.services.odoo_resilience import OdooUnavailableError
 
 # Importar rutas
 from api.routes.auth import router as auth_router
@@ -14,7 +16,7 @@ from api.routes.providers import router as providers_router
 # from api.routes.inventory import router as inventory_router
 # from api.routes.sales import router as sales_router
 # from api.routes.customers import router as customers_router
-# from api.routes.dashboard import router as dashboard_router
+from api.routes.dashboard import router as dashboard_router
 # from api.routes.tasks import router as tasks_router
 # from api.routes.ocr import router as ocr_router
 from api.routes.mistral_ocr import router as mistral_ocr_router
@@ -41,6 +43,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Odoo caído o circuit breaker abierto: 503 en lugar de respuestas vacías
+@app.exception_handler(OdooUnavailableError)
+async def odoo_unavailable_handler(request: Request, exc: OdooUnavailableError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(exc.retry_after or 1))}
+    )
+
+# Réplica local del catálogo: primera sincronización y hilo en segundo plano
+@app.on_event("startup")
+def start_catalog_mirror():
+    if not config.ODOO_MIRROR_ENABLED:
+        return
+    from api.services.odoo_base_service import OdooBaseService
+    from api.services.odoo_catalog_mirror import get_catalog_mirror
+    service = OdooBaseService()
+    get_catalog_mirror(service).start(service, config.ODOO_MIRROR_SYNC_INTERVAL)
+
+@app.on_event("shutdown")
+def stop_catalog_mirror():
+    from api.services.odoo_catalog_mirror import close_catalog_mirrors
+    close_catalog_mirrors()
+
+# Instantánea del dashboard recalculada en segundo plano
+@app.on_event("startup")
+def start_dashboard_snapshot():
+    if config.DASHBOARD_REFRESH_INTERVAL <= 0:
+        return
+    from api.services.dashboard_snapshot import get_dashboard_snapshot
+    from api.services.odoo_dashboard_service import odoo_dashboard_service
+    get_dashboard_snapshot(odoo_dashboard_service).start(config.DASHBOARD_REFRESH_INTERVAL)
+
+@app.on_event("shutdown")
+def stop_dashboard_snapshot():
+    from api.services.dashboard_snapshot import close_dashboard_snapshots
+    close_dashboard_snapshots()
+
+# Clientes HTTP asíncronos hacia Odoo: se cierran con el event loop de la aplicación
+@app.on_event("shutdown")
+async def close_async_odoo():
+    from api.services.odoo_async_client import close_async_odoo_clients
+    await close_async_odoo_clients()
+
 # Configurar OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -56,7 +102,7 @@ app.include_router(providers_router)
 # app.include_router(inventory_router)
 # app.include_router(sales_router)
 # app.include_router(customers_router)
-# app.include_router(dashboard_router)
+app.include_router(dashboard_router)
 # app.include_router(tasks_router)
 # app.include_router(ocr_router)
 app.include_router(mistral_ocr_router)
@@ -66,19 +112,28 @@ app.include_router(invoices_router)
 app.include_router(mistral_llm_excel_router)
 app.include_router(excel_importer_router)
 
-# Incluir rutas de interfaz web (al final para que no interfieran con las API)
-app.include_router(web_ui_router)
-
-# El endpoint raíz ahora se maneja en web_ui_router
-
 @app.get("/health")
 async def health_check():
     """Endpoint de verificación de salud"""
+    from api.services.odoo_auth_cache import get_auth_stats
+    from api.services.odoo_connection_pool import get_pool_stats
+    from api.services.odoo_resilience import get_breaker_states
+    breakers = get_breaker_states()
+    degraded = any(b["state"] != "closed" for b in breakers.values())
     return {
-        "status": "healthy",
-        "version": config.API_VERSION
+        "status": "degraded" if degraded else "healthy",
+        "version": config.API_VERSION,
+        "odoo_pool": get_pool_stats(),
+        "odoo_auth": get_auth_stats(),
+        "odoo_breaker": breakers
     }
 
+# Incluir rutas de interfaz web (al final para que no interfieran con las API;
+# su ruta comodín capturaría también /health si se registrara antes)
+app.include_router(web_ui_router)
+
+# El endpoint raíz ahora se maneja en web_ui_router
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
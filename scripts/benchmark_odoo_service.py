@@ -0,0 +1,90 @@
+"""Benchmark reproducible de OdooProductService y del importador contra el Odoo falso.
+
+Uso:
+    python scripts/benchmark_odoo_service.py
+    python scripts/benchmark_odoo_service.py --products 5000 --latency 5 --transport jsonrpc
+
+Arranca ``tests/fake_odoo_server.py`` en un hilo (sin Odoo real ni red) con un
+catálogo de ``--products`` productos y una latencia fija por petición, y mide
+cada escenario junto con el número de llamadas RPC que hace. La latencia simula
+el viaje de ida y vuelta a Odoo: los escenarios que hacen una llamada por
+producto se notan en seguida.
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from fake_odoo_server import FakeOdoo  # noqa: E402
+
+
+def scenarios(product_service, provider_service, import_rows):
+    """(nombre, función) de cada escenario; la función se llama una vez por repetición"""
+    def import_batch():
+        lookup_cache = {}
+        vals = [product_service.front_to_odoo_product_dict(row, 'Bosch Distribución 1', lookup_cache) for row in import_rows]
+        product_service.upsert_products_concurrently(vals)
+
+    return [
+        ("get_all_products", product_service.get_all_products),
+        ("get_paginated_products (50)", lambda: product_service.get_paginated_products(page=3, limit=50)),
+        ("get_paginated_products búsqueda", lambda: product_service.get_paginated_products(page=1, limit=50, search='bosch', category='frío')),
+        ("get_product_by_id x20", lambda: [product_service.get_product_by_id(i) for i in range(1, 21)]),
+        ("get_paginated_providers", lambda: provider_service.get_paginated_providers(1, 20, None)),
+        (f"importar {len(import_rows)} productos", import_batch),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=2000, help='Productos del catálogo falso (por defecto 2000)')
+    parser.add_argument('--latency', type=float, default=2.0, help='Latencia por petición en ms (por defecto 2)')
+    parser.add_argument('--import-rows', type=int, default=100, help='Filas del escenario de importación')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por escenario (se usa la mediana)')
+    parser.add_argument('--transport', choices=('xmlrpc', 'jsonrpc'), default='xmlrpc')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    with FakeOdoo(products=args.products, latency=args.latency / 1000) as odoo:
+        os.environ.update(odoo.environ())
+        os.environ['ODOO_TRANSPORT'] = args.transport
+        from api.utils.config import config
+        config.ODOO_TRANSPORT = args.transport
+        from api.services.odoo_product_service import OdooProductService
+        from api.services.odoo_provider_service import OdooProviderService
+
+        product_service = OdooProductService()
+        provider_service = OdooProviderService()
+        product_service.get_model_fields('product.template')  # conexión y metadatos fuera de la medida
+
+        print(f"Odoo falso: {args.products} productos, {args.latency:g} ms por petición, transporte {args.transport}\n")
+        print(f"  {'escenario':<34} {'mediana':>10} {'RPC':>6}")
+        for name, func in scenarios(product_service, provider_service, _import_rows(args.import_rows)):
+            samples, rpc = [], 0
+            for _ in range(args.repeat):
+                odoo.reset_counters()
+                start = time.perf_counter()
+                func()
+                samples.append(time.perf_counter() - start)
+                rpc = odoo.requests
+            print(f"  {name:<34} {statistics.median(samples) * 1000:8.1f} ms {rpc:>6}")
+
+
+def _import_rows(count):
+    return [
+        {
+            'nombre': f'Lavadora importada {i:05d}', 'referencia_proveedor': f'IMP-{i:06d}',
+            'precio_coste': 300 + i % 50, 'categoria': 'Electrodomésticos', 'subcategoria': 'Lavado',
+        }
+        for i in range(count)
+    ]
+
+
+if __name__ == '__main__':
+    main()
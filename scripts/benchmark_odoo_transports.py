@@ -0,0 +1,118 @@
+"""Compara los transportes XML-RPC y JSON-RPC de Odoo en un search_read de 5.000 filas.
+
+Uso:
+    python scripts/benchmark_odoo_transports.py            # sin Odoo: mide solo la decodificación
+    python scripts/benchmark_odoo_transports.py --live     # contra el Odoo configurado en .env
+
+En modo offline se generan 5.000 filas sintéticas de product.template con los
+mismos campos que usa /api/v1/products y se mide el coste de decodificar la
+respuesta en cada formato, que es la parte que consume CPU en los workers.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import xmlrpc.client
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from api.services import odoo_transport  # noqa: E402
+from api.services.odoo_transport import decode_jsonrpc_response  # noqa: E402
+
+FIELDS = [
+    'id', 'name', 'default_code', 'list_price', 'standard_price', 'categ_id',
+    'type', 'barcode', 'active', 'sale_ok', 'purchase_ok', 'description_sale',
+]
+
+
+def synthetic_rows(count):
+    return [
+        {
+            'id': i,
+            'name': f'Frigorífico combi No Frost {i}',
+            'default_code': f'REF-{i:06d}',
+            'list_price': 499.0 + i % 100,
+            'standard_price': 350.25 + i % 50,
+            'categ_id': [i % 40 + 1, f'Electrodomésticos / Frío / Familia {i % 40}'],
+            'type': 'consu',
+            'barcode': False if i % 3 else f'84{i:011d}',
+            'active': True,
+            'sale_ok': True,
+            'purchase_ok': True,
+            'description_sale': 'Clase energética E, 186 cm, acero inoxidable',
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def timeit(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def run_offline(rows, repeat):
+    xml_body = xmlrpc.client.dumps((rows,), methodresponse=True, allow_none=True).encode('utf-8')
+    json_body = json.dumps({'jsonrpc': '2.0', 'id': 1, 'result': rows}).encode('utf-8')
+    print(f"Tamaño de respuesta: XML-RPC {len(xml_body) / 1024:.0f} KiB, JSON-RPC {len(json_body) / 1024:.0f} KiB")
+
+    results = {'xmlrpc': timeit(lambda: xmlrpc.client.loads(xml_body), repeat)}
+    orjson = odoo_transport.orjson
+    odoo_transport.orjson = None
+    try:
+        results['jsonrpc (json)'] = timeit(lambda: decode_jsonrpc_response(json_body), repeat)
+    finally:
+        odoo_transport.orjson = orjson
+    if orjson is not None:
+        results['jsonrpc (orjson)'] = timeit(lambda: decode_jsonrpc_response(json_body), repeat)
+    return results
+
+
+def run_live(limit, repeat):
+    from api.utils.config import config
+    from api.services.odoo_auth_cache import authenticate
+
+    results = {}
+    for transport in odoo_transport.TRANSPORTS:
+        config.ODOO_TRANSPORT = transport
+        uid = authenticate(config.ODOO_URL, config.ODOO_DB, config.ODOO_USERNAME, config.ODOO_PASSWORD)
+        models = odoo_transport.get_service_proxy(config.ODOO_URL, 'object')
+
+        def call():
+            return models.execute_kw(
+                config.ODOO_DB, uid, config.ODOO_PASSWORD,
+                'product.template', 'search_read', [[]],
+                {'fields': FIELDS, 'limit': limit, 'context': {'active_test': False}}
+            )
+
+        rows = call()
+        print(f"{transport}: {len(rows)} filas")
+        results[transport] = timeit(call, repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--live', action='store_true', help='Medir contra el servidor Odoo configurado')
+    parser.add_argument('--rows', type=int, default=5000, help='Filas del search_read (por defecto 5000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Repeticiones por transporte (se usa la mediana)')
+    args = parser.parse_args()
+
+    if args.live:
+        results = run_live(args.rows, args.repeat)
+    else:
+        results = run_offline(synthetic_rows(args.rows), args.repeat)
+
+    baseline = results['xmlrpc']
+    print(f"\nsearch_read de {args.rows} filas ({'Odoo real' if args.live else 'solo decodificación'}):")
+    for name, seconds in results.items():
+        print(f"  {name:<18} {seconds * 1000:8.1f} ms   x{baseline / seconds:.1f}")
+
+
+if __name__ == '__main__':
+    main()
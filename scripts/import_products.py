@@ -1,6 +1,7 @@
 import xmlrpc.client
 import pandas as pd
 import os
+import sys
 from datetime import datetime
 
 # Conexión a Odoo
@@ -13,6 +14,17 @@ common = xmlrpc.client.ServerProxy(f'{url}/xmlrpc/2/common')
 uid = common.authenticate(db, username, password, {})
 models = xmlrpc.client.ServerProxy(f'{url}/xmlrpc/2/object')
 
+# Directorio de proveedores de la API: todos los proveedores se leen una vez y
+# cada fila se resuelve en memoria en lugar de con una búsqueda en Odoo
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+for var, value in (('ODOO_URL', url), ('ODOO_DB', db), ('ODOO_USERNAME', username), ('ODOO_PASSWORD', password)):
+    os.environ.setdefault(var, value)
+from api.services.odoo_base_service import OdooBaseService  # noqa: E402
+from api.services.odoo_supplier_directory import get_supplier_directory  # noqa: E402
+
+odoo = OdooBaseService()
+supplier_directory = get_supplier_directory(odoo)
+
 # Ruta al archivo CSV normalizado
 csv_file = '/home/espasiko/mainmanusodoo/manusodoo-roto/odoo_import/normalized_supplier_data_20250619_215528.csv'
 
@@ -102,7 +114,9 @@ for batch_idx, batch in enumerate(batches):
 
             # Manejar proveedor (seller_ids)
             if pd.notna(row['supplier_id']) and row['supplier_id']:
-                supplier_id = models.execute_kw(db, uid, password, 'res.partner', 'search', [[['name', '=', row['supplier_id']]]])
+                # Como antes, vale cualquier contacto con ese nombre exacto aunque no tenga supplier_rank
+                supplier = supplier_directory.find_by_name(odoo, row['supplier_id'], any_partner=True)
+                supplier_id = [supplier['id']] if supplier else []
                 if supplier_id:
                     supplier_info = {
                         'partner_id': supplier_id[0],  # Usar partner_id para identificar al proveedor
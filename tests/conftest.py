@@ -0,0 +1,73 @@
+"""Fixtures compartidos: un Odoo falso por test y fábricas de servicios y de la app.
+
+El tamaño del Odoo falso se elige con el marcador ``fake_odoo`` (argumentos de
+FakeOdoo), en el test o para todo el módulo::
+
+    pytestmark = pytest.mark.fake_odoo(products=120, suppliers=10)
+
+Un módulo que necesita datos propios redefine ``odoo`` pidiendo el de aquí::
+
+    @pytest.fixture
+    def odoo(odoo):
+        odoo.db.write('product.template', [1], {'list_price': 99.0})
+        return odoo
+"""
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from api.models.schemas import User
+from api.services.auth_service import get_current_user
+from api.services.odoo_base_service import OdooBaseService
+from fake_odoo_server import FakeOdoo
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "fake_odoo(**options): argumentos de FakeOdoo para el fixture odoo")
+
+
+@pytest.fixture
+def odoo(request):
+    """Odoo falso arrancado para el test (ver el marcador ``fake_odoo``)"""
+    marker = request.node.get_closest_marker("fake_odoo")
+    with FakeOdoo(**(marker.kwargs if marker else {})) as server:
+        yield server
+
+
+@pytest.fixture
+def make_service(request):
+    """Fábrica de servicios apuntados al Odoo falso del test"""
+    def make(cls=OdooBaseService):
+        odoo = request.getfixturevalue("odoo")
+        with patch.dict("os.environ", odoo.environ()):
+            return cls()
+    return make
+
+
+@pytest.fixture
+def make_app():
+    """Fábrica de apps con los routers dados, un usuario autenticado y ``overrides``
+    de dependencias adicionales"""
+    def make(*routers, overrides=None):
+        app = FastAPI()
+        for router in routers:
+            app.include_router(router)
+        app.dependency_overrides[get_current_user] = lambda: User(username="test")
+        app.dependency_overrides.update(overrides or {})
+        return app
+    return make
+
+
+@pytest.fixture
+def call_api():
+    """Hace una petición a la app en proceso (ASGI) y devuelve la respuesta de httpx"""
+    def call(app, method, url, **kwargs):
+        async def request():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.request(method, url, **kwargs)
+        return asyncio.run(request())
+    return call
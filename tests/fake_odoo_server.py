@@ -0,0 +1,1107 @@
+"""Odoo falso en proceso para tests sin red y benchmarks reproducibles.
+
+Implementa lo que usa el middleware de un Odoo 17:
+
+* ``/xmlrpc/2/common`` y ``/xmlrpc/2/object`` (también ``/xmlrpc/...``) y el
+  endpoint ``/jsonrpc``, con HTTP/1.1 keep-alive como el servidor real.
+* ``common.version`` / ``common.authenticate`` y ``object.execute_kw`` con
+  ``search``, ``search_read``, ``read``, ``search_count``, ``read_group``,
+  ``create``, ``write``, ``unlink``, ``fields_get``, ``name_search`` y
+  ``web_search_read`` / ``web_read`` (solo si ``server_version`` >= 17), más las
+  acciones de flujo que llaman los servicios (``button_confirm``,
+  ``action_post``, ``action_create_invoice``).
+* Dominios en notación polaca (``&``, ``|``, ``!``), rutas con punto
+  (``categ_id.name``), ``child_of`` y el filtro implícito ``active``.
+* Valores many2one como ``[id, display_name]`` y comandos x2many
+  (``(0, 0, vals)``, ``(4, id)``, ``(6, 0, ids)``...).
+
+Los modelos son product.template, product.product, product.category,
+product.supplierinfo, res.partner, res.company, account.move,
+purchase.order, purchase.order.line, sale.order, stock.quant, account.tax, account.journal,
+account.account, ir.model e ir.model.fields. El catálogo se genera de forma
+determinista (``products``, ``suppliers``, ``categories``, ``seed``) y cada
+petición puede llevar una latencia fija (``latency`` en segundos) para simular
+la red y el tiempo de respuesta de Odoo.
+
+Uso::
+
+    with FakeOdoo(products=5000, latency=0.005) as odoo:
+        with patch.dict("os.environ", odoo.environ()):
+            service = OdooProductService()
+            service.get_paginated_products(page=1, limit=100)
+        print(odoo.calls)   # Counter de (modelo, método)
+"""
+import json
+import random
+import re
+import socket
+import threading
+import time
+import xmlrpc.client
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+ACCESS_DENIED = "odoo.exceptions.AccessDenied"
+
+# --- esquema -----------------------------------------------------------------
+
+
+def _f(ftype: str, string: str = "", relation: Optional[str] = None, inverse: Optional[str] = None) -> dict:
+    field = {'type': ftype, 'string': string or ftype}
+    if relation:
+        field['relation'] = relation
+    if inverse:
+        field['relation_field'] = inverse
+    return field
+
+
+_COMMON = {
+    'id': _f('integer', 'ID'),
+    'display_name': _f('char', 'Nombre mostrado'),
+    'create_date': _f('datetime', 'Creado el'),
+    'write_date': _f('datetime', 'Última actualización'),
+}
+
+SCHEMA: Dict[str, Dict[str, dict]] = {
+    'product.category': {
+        'name': _f('char', 'Nombre'),
+        'complete_name': _f('char', 'Nombre completo'),
+        'parent_id': _f('many2one', 'Categoría padre', 'product.category'),
+        'child_id': _f('one2many', 'Categorías hijas', 'product.category', 'parent_id'),
+    },
+    'product.template': {
+        'name': _f('char', 'Nombre'),
+        'default_code': _f('char', 'Referencia interna'),
+        'barcode': _f('char', 'Código de barras'),
+        'list_price': _f('float', 'Precio de venta'),
+        'standard_price': _f('float', 'Coste'),
+        'categ_id': _f('many2one', 'Categoría', 'product.category'),
+        'type': _f('selection', 'Tipo'),
+        'active': _f('boolean', 'Activo'),
+        'sale_ok': _f('boolean', 'Puede ser vendido'),
+        'purchase_ok': _f('boolean', 'Puede ser comprado'),
+        'available_in_pos': _f('boolean', 'Disponible en TPV'),
+        'to_weight': _f('boolean', 'Para pesar'),
+        'is_published': _f('boolean', 'Publicado'),
+        'website_sequence': _f('integer', 'Secuencia web'),
+        'weight': _f('float', 'Peso'),
+        'description': _f('text', 'Descripción'),
+        'description_sale': _f('text', 'Descripción de venta'),
+        'description_purchase': _f('text', 'Descripción de compra'),
+        'qty_available': _f('float', 'Cantidad a mano'),
+        'seller_ids': _f('one2many', 'Proveedores', 'product.supplierinfo', 'product_tmpl_id'),
+        'product_variant_ids': _f('one2many', 'Variantes', 'product.product', 'product_tmpl_id'),
+        'taxes_id': _f('many2many', 'Impuestos cliente', 'account.tax'),
+        'supplier_taxes_id': _f('many2many', 'Impuestos proveedor', 'account.tax'),
+        'public_categ_ids': _f('many2many', 'Categorías web', 'product.category'),
+        'property_account_income_id': _f('many2one', 'Cuenta de ingresos', 'account.account'),
+        'property_account_expense_id': _f('many2one', 'Cuenta de gastos', 'account.account'),
+    },
+    'product.product': {
+        'name': _f('char', 'Nombre'),
+        'default_code': _f('char', 'Referencia interna'),
+        'barcode': _f('char', 'Código de barras'),
+        'active': _f('boolean', 'Activo'),
+        'product_tmpl_id': _f('many2one', 'Plantilla', 'product.template'),
+        'list_price': _f('float', 'Precio de venta'),
+        'standard_price': _f('float', 'Coste'),
+        'qty_available': _f('float', 'Cantidad a mano'),
+    },
+    'stock.quant': {
+        'product_id': _f('many2one', 'Producto', 'product.product'),
+        'quantity': _f('float', 'Cantidad'),
+    },
+    'product.supplierinfo': {
+        'partner_id': _f('many2one', 'Proveedor', 'res.partner'),
+        'product_tmpl_id': _f('many2one', 'Plantilla', 'product.template'),
+        'product_id': _f('many2one', 'Variante', 'product.product'),
+        'price': _f('float', 'Precio'),
+        'min_qty': _f('float', 'Cantidad mínima'),
+        'delay': _f('integer', 'Plazo de entrega'),
+        'product_name': _f('char', 'Nombre del producto del proveedor'),
+        'product_code': _f('char', 'Código del producto del proveedor'),
+        'sequence': _f('integer', 'Secuencia'),
+    },
+    'res.partner': {
+        'name': _f('char', 'Nombre'),
+        'ref': _f('char', 'Referencia'),
+        'vat': _f('char', 'NIF'),
+        'email': _f('char', 'Correo electrónico'),
+        'phone': _f('char', 'Teléfono'),
+        'mobile': _f('char', 'Móvil'),
+        'website': _f('char', 'Sitio web'),
+        'street': _f('char', 'Calle'),
+        'street2': _f('char', 'Calle 2'),
+        'city': _f('char', 'Ciudad'),
+        'zip': _f('char', 'C.P.'),
+        'state_id': _f('many2one', 'Provincia', 'res.country.state'),
+        'country_id': _f('many2one', 'País', 'res.country'),
+        'is_company': _f('boolean', 'Es una empresa'),
+        'supplier_rank': _f('integer', 'Rango proveedor'),
+        'customer_rank': _f('integer', 'Rango cliente'),
+        'category_id': _f('many2many', 'Etiquetas', 'res.partner.category'),
+        'comment': _f('html', 'Notas'),
+        'active': _f('boolean', 'Activo'),
+    },
+    'res.company': {
+        'name': _f('char', 'Nombre'),
+        'partner_id': _f('many2one', 'Empresa', 'res.partner'),
+        'vat': _f('char', 'NIF'),
+    },
+    'account.tax': {
+        'name': _f('char', 'Nombre'),
+        'amount': _f('float', 'Importe'),
+        'amount_type': _f('selection', 'Tipo de cálculo'),
+        'type_tax_use': _f('selection', 'Tipo de impuesto'),
+        'active': _f('boolean', 'Activo'),
+    },
+    'account.journal': {
+        'name': _f('char', 'Nombre'),
+        'code': _f('char', 'Código'),
+        'type': _f('selection', 'Tipo'),
+    },
+    'account.account': {
+        'name': _f('char', 'Nombre'),
+        'code': _f('char', 'Código'),
+        'account_type': _f('selection', 'Tipo'),
+    },
+    'account.move': {
+        'name': _f('char', 'Número'),
+        'ref': _f('char', 'Referencia'),
+        'move_type': _f('selection', 'Tipo'),
+        'state': _f('selection', 'Estado'),
+        'partner_id': _f('many2one', 'Empresa', 'res.partner'),
+        'journal_id': _f('many2one', 'Diario', 'account.journal'),
+        'invoice_date': _f('date', 'Fecha de factura'),
+        'invoice_origin': _f('char', 'Origen'),
+        'amount_total': _f('float', 'Total'),
+        'invoice_line_ids': _f('one2many', 'Líneas', 'account.move.line', 'move_id'),
+    },
+    'account.move.line': {
+        'move_id': _f('many2one', 'Asiento', 'account.move'),
+        'product_id': _f('many2one', 'Producto', 'product.product'),
+        'name': _f('char', 'Etiqueta'),
+        'quantity': _f('float', 'Cantidad'),
+        'price_unit': _f('float', 'Precio unitario'),
+        'account_id': _f('many2one', 'Cuenta', 'account.account'),
+        'tax_ids': _f('many2many', 'Impuestos', 'account.tax'),
+    },
+    'purchase.order': {
+        'name': _f('char', 'Referencia'),
+        'partner_id': _f('many2one', 'Proveedor', 'res.partner'),
+        'partner_ref': _f('char', 'Referencia de proveedor'),
+        'state': _f('selection', 'Estado'),
+        'date_order': _f('datetime', 'Fecha de pedido'),
+        'amount_total': _f('float', 'Total'),
+        'order_line': _f('one2many', 'Líneas', 'purchase.order.line', 'order_id'),
+        'invoice_ids': _f('many2many', 'Facturas', 'account.move'),
+    },
+    'sale.order': {
+        'name': _f('char', 'Referencia'),
+        'partner_id': _f('many2one', 'Cliente', 'res.partner'),
+        'state': _f('selection', 'Estado'),
+        'date_order': _f('datetime', 'Fecha de pedido'),
+        'amount_total': _f('float', 'Total'),
+    },
+    'purchase.order.line': {
+        'order_id': _f('many2one', 'Pedido', 'purchase.order'),
+        'product_id': _f('many2one', 'Producto', 'product.product'),
+        'name': _f('char', 'Descripción'),
+        'product_qty': _f('float', 'Cantidad'),
+        'price_unit': _f('float', 'Precio unitario'),
+        'taxes_id': _f('many2many', 'Impuestos', 'account.tax'),
+    },
+    'ir.model': {
+        'name': _f('char', 'Descripción'),
+        'model': _f('char', 'Modelo'),
+    },
+    'ir.model.fields': {
+        'name': _f('char', 'Nombre del campo'),
+        'model': _f('char', 'Modelo'),
+        'model_id': _f('many2one', 'Modelo', 'ir.model'),
+        'field_description': _f('char', 'Etiqueta'),
+        'ttype': _f('selection', 'Tipo de campo'),
+        'relation': _f('char', 'Modelo relacionado'),
+        'state': _f('selection', 'Tipo'),
+        'store': _f('boolean', 'Almacenado'),
+        'required': _f('boolean', 'Obligatorio'),
+        'help': _f('text', 'Ayuda'),
+    },
+}
+
+for _fields in SCHEMA.values():
+    for _name, _field in _COMMON.items():
+        _fields.setdefault(_name, dict(_field))
+
+# Orden por defecto (_order) de los modelos cuyo orden importa a los servicios
+DEFAULT_ORDER = {
+    'product.category': 'complete_name, id',
+    'product.supplierinfo': 'sequence, min_qty desc, price, id',
+    'res.partner': 'name, id',
+}
+
+_NUMERIC = {'integer', 'float', 'monetary'}
+_X2MANY = {'one2many', 'many2many'}
+
+
+class OdooError(Exception):
+    """Error que el servidor devuelve como Fault / error JSON-RPC"""
+
+    def __init__(self, message: str, name: str = "odoo.exceptions.UserError", code: int = 1):
+        super().__init__(message)
+        self.name = name
+        self.code = code
+
+
+# --- datos --------------------------------------------------------------------
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class FakeOdooDatabase:
+    """Tablas en memoria con la semántica de ORM que necesitan los servicios"""
+
+    def __init__(self):
+        self.schema = {model: {name: dict(f) for name, f in fields.items()} for model, fields in SCHEMA.items()}
+        self.tables: Dict[str, Dict[int, dict]] = {model: {} for model in self.schema}
+        self._next_id: Dict[str, int] = {model: 1 for model in self.schema}
+        self._versions: Counter = Counter()
+        self._inverse: Dict[Tuple[str, str], Tuple[int, Dict[int, List[int]]]] = {}
+        self.lock = threading.RLock()
+
+    # -- utilidades de registros --
+
+    def _model(self, model: str) -> Dict[int, dict]:
+        if model not in self.tables:
+            raise OdooError(f"Object {model} doesn't exist", name="builtins.KeyError", code=2)
+        return self.tables[model]
+
+    def _field(self, model: str, name: str) -> dict:
+        field = self.schema[model].get(name)
+        if field is None:
+            raise OdooError(f"Invalid field '{name}' on model '{model}'", name="builtins.ValueError")
+        return field
+
+    def _children_of(self, relation: str, inverse: str, record_id: int) -> List[int]:
+        """IDs de ``relation`` cuyo ``inverse`` apunta a ``record_id`` (índice por versión de tabla)"""
+        version = self._versions[relation]
+        cached = self._inverse.get((relation, inverse))
+        if cached is None or cached[0] != version:
+            index: Dict[int, List[int]] = {}
+            for child in self.tables[relation].values():
+                if child.get(inverse):
+                    index.setdefault(child[inverse], []).append(child['id'])
+            cached = (version, index)
+            self._inverse[(relation, inverse)] = cached
+        return sorted(cached[1].get(record_id, []))
+
+    def display_name(self, model: str, record_id: int) -> str:
+        record = self.tables[model].get(record_id)
+        if record is None:
+            return ""
+        if model == 'product.category':
+            return self._complete_name(record_id)
+        if model == 'product.supplierinfo':
+            return self.display_name('res.partner', record.get('partner_id')) if record.get('partner_id') else ""
+        return record.get('name') or f"{model},{record_id}"
+
+    def _complete_name(self, category_id: int) -> str:
+        names, seen = [], set()
+        record = self.tables['product.category'].get(category_id)
+        while record and record['id'] not in seen:
+            seen.add(record['id'])
+            names.append(record.get('name') or '')
+            record = self.tables['product.category'].get(record.get('parent_id'))
+        return " / ".join(reversed(names))
+
+    def _raw(self, model: str, record: dict, name: str) -> Any:
+        """Valor interno de un campo: IDs para relaciones, False si está vacío"""
+        field = self.schema[model][name]
+        if name == 'display_name':
+            return self.display_name(model, record['id'])
+        if name == 'complete_name' and model == 'product.category':
+            return self._complete_name(record['id'])
+        if field['type'] == 'one2many':
+            return self._children_of(field['relation'], field['relation_field'], record['id'])
+        value = record.get(name)
+        if field['type'] == 'many2many':
+            return list(value or [])
+        if value is None:
+            return 0 if field['type'] in _NUMERIC else False
+        return value
+
+    def _export(self, model: str, record: dict, name: str) -> Any:
+        """Valor tal y como lo devuelve ``read`` (many2one como ``[id, nombre]``)"""
+        value = self._raw(model, record, name)
+        field = self.schema[model][name]
+        if field['type'] == 'many2one':
+            if not value:
+                return False
+            relation = field['relation']
+            if relation in self.tables and value not in self.tables[relation]:
+                return False
+            return [value, self.display_name(relation, value) if relation in self.tables else f"{relation},{value}"]
+        return value
+
+    def _record_dict(self, model: str, record: dict, fields: Optional[List[str]]) -> dict:
+        names = fields or [n for n, f in self.schema[model].items() if f['type'] != 'binary']
+        result = {'id': record['id']}
+        for name in names:
+            self._field(model, name)
+            result[name] = self._export(model, record, name)
+        return result
+
+    # -- dominios --
+
+    def _path_values(self, model: str, records: Iterable[dict], path: List[str]) -> List[Any]:
+        """Valores de una ruta con punto (``categ_id.parent_id.name``) en varios registros"""
+        name, rest = path[0], path[1:]
+        field = self._field(model, name)
+        values: List[Any] = []
+        for record in records:
+            raw = self._raw(model, record, name)
+            if not rest:
+                values.append(raw)
+                continue
+            if field['type'] not in {'many2one'} | _X2MANY:
+                raise OdooError(f"Invalid field path '{'.'.join(path)}' on model '{model}'", name="builtins.ValueError")
+            ids = raw if isinstance(raw, list) else ([raw] if raw else [])
+            table = self.tables.get(field['relation'], {})
+            related = [table[i] for i in ids if i in table]
+            values.extend(self._path_values(field['relation'], related, rest))
+        return values
+
+    def _descendants(self, model: str, ids: List[int]) -> set:
+        result, frontier = set(ids), set(ids)
+        while frontier:
+            frontier = {r['id'] for r in self.tables[model].values() if r.get('parent_id') in frontier} - result
+            result |= frontier
+        return result
+
+    def _compile_leaf(self, model: str, leaf: Tuple) -> Callable[[dict], bool]:
+        """Convierte una hoja del dominio en un predicado sobre registros"""
+        if leaf in (True, False) or tuple(leaf) == (1, '=', 1):
+            return lambda record: True
+        if tuple(leaf) == (0, '=', 1):
+            return lambda record: False
+        path, operator, value = leaf
+        parts = path.split('.')
+        field = self._field(model, parts[0])
+        if len(parts) == 1 and field['type'] not in {'many2one'} | _X2MANY and operator != 'child_of':
+            # Campo simple: comparación directa (el caso habitual)
+            name, scalar = parts[0], field['type'] not in _NUMERIC
+            return lambda record: _compare(
+                record.get(name, False if scalar else 0) if name not in ('display_name', 'complete_name')
+                else self._raw(model, record, name), operator, value)
+        # ('categ_id', 'ilike', 'frío') compara con el nombre del registro relacionado
+        if len(parts) == 1 and field['type'] == 'many2one' and isinstance(value, str):
+            parts = parts + ['display_name']
+        if operator == 'child_of':
+            roots = value if isinstance(value, list) else [value]
+            relation = field.get('relation', model) if field['type'] == 'many2one' else model
+            target = self._descendants(relation, roots)
+            return lambda record: any(v in target for v in self._path_values(model, [record], parts))
+        x2many = field['type'] in _X2MANY and len(parts) == 1
+
+        def predicate(record: dict) -> bool:
+            values = self._path_values(model, [record], parts)
+            if x2many:
+                values = [v for value_list in values for v in value_list]
+            return _compare_any(values or [False], operator, value)
+        return predicate
+
+    def _compile(self, model: str, domain: List) -> Callable[[dict], bool]:
+        """Compila un dominio (notación polaca) en un único predicado"""
+        tokens = iter(_normalize(domain))
+
+        def build() -> Callable[[dict], bool]:
+            token = next(tokens)
+            if token == '!':
+                inner = build()
+                return lambda record: not inner(record)
+            if token in ('&', '|'):
+                left, right = build(), build()
+                if token == '&':
+                    return lambda record: left(record) and right(record)
+                return lambda record: left(record) or right(record)
+            return self._compile_leaf(model, token)
+        return build() if domain else (lambda record: True)
+
+    def filter(self, model: str, domain: List, active_test: bool = True) -> List[dict]:
+        table = self._model(model)
+        domain = list(domain or [])
+        if active_test and 'active' in self.schema[model] and not _mentions(domain, 'active'):
+            domain = ['&', ('active', '=', True)] + domain if domain else [('active', '=', True)]
+        predicate = self._compile(model, domain)
+        return [record for record in self._candidates(table, domain) if predicate(record)]
+
+    @staticmethod
+    def _candidates(table: Dict[int, dict], domain: List) -> Iterable[dict]:
+        """Acota por ``id`` cuando el dominio es una conjunción que lo fija (como el índice de la PK)"""
+        if any(token in ('|', '!') for token in domain):
+            return table.values()
+        for token in domain:
+            if isinstance(token, (list, tuple)) and len(token) == 3 and token[0] == 'id' and token[1] in ('=', 'in'):
+                ids = token[2] if token[1] == 'in' else [token[2]]
+                return [table[i] for i in ids if i in table]
+        return table.values()
+
+    # -- orden --
+
+    def sort(self, model: str, records: List[dict], order: Optional[str]) -> List[dict]:
+        order = order or DEFAULT_ORDER.get(model, 'id')
+        for part in reversed([p.strip() for p in order.split(',') if p.strip()]):
+            tokens = part.split()
+            name, reverse = tokens[0], len(tokens) > 1 and tokens[1].lower() == 'desc'
+            field = self._field(model, name)
+
+            def key(record, name=name, field=field):
+                value = self._raw(model, record, name)
+                if field['type'] == 'many2one':
+                    value = self.display_name(field['relation'], value) if value and field['relation'] in self.tables else value
+                return (value is False or value is None, value if value not in (False, None) else 0)
+
+            records = sorted(records, key=key, reverse=reverse)
+        return records
+
+    # -- escritura --
+
+    def _apply_values(self, model: str, record: dict, vals: dict) -> None:
+        self._versions[model] += 1
+        for name, value in vals.items():
+            field = self._field(model, name)
+            if field['type'] == 'many2one':
+                record[name] = value[0] if isinstance(value, (list, tuple)) else (value or False)
+            elif field['type'] == 'many2many':
+                record[name] = self._x2many_commands(list(record.get(name) or []), value, field)
+            elif field['type'] == 'one2many':
+                self._one2many_commands(record['id'], value, field)
+            else:
+                record[name] = value
+
+    def _x2many_commands(self, current: List[int], commands: Any, field: dict) -> List[int]:
+        if commands and all(isinstance(c, int) for c in commands):
+            return list(commands)
+        for command in commands or []:
+            op = command[0]
+            if op == 0:
+                current.append(self.create(field['relation'], [command[2]])[0])
+            elif op == 4 and command[1] not in current:
+                current.append(command[1])
+            elif op == 6:
+                current = list(command[2])
+            elif op == 5:
+                current = []
+            elif op in (2, 3) and command[1] in current:
+                current.remove(command[1])
+                if op == 2:
+                    self.unlink(field['relation'], [command[1]])
+            elif op == 1:
+                self.write(field['relation'], [command[1]], command[2])
+        return current
+
+    def _one2many_commands(self, record_id: int, commands: Any, field: dict) -> None:
+        relation, inverse = field['relation'], field['relation_field']
+        for command in commands or []:
+            op = command[0]
+            if op == 0:
+                self.create(relation, [dict(command[2], **{inverse: record_id})])
+            elif op == 1:
+                self.write(relation, [command[1]], command[2])
+            elif op in (2, 3):
+                self.unlink(relation, [command[1]])
+            elif op == 4:
+                self.write(relation, [command[1]], {inverse: record_id})
+            elif op in (5, 6):
+                keep = set(command[2]) if op == 6 else set()
+                for child in list(self.tables[relation].values()):
+                    if child.get(inverse) == record_id and child['id'] not in keep:
+                        self.unlink(relation, [child['id']])
+                for child_id in keep:
+                    self.write(relation, [child_id], {inverse: record_id})
+
+    def create(self, model: str, vals_list: List[dict]) -> List[int]:
+        table = self._model(model)
+        ids = []
+        for vals in vals_list:
+            record_id = self._next_id[model]
+            self._next_id[model] += 1
+            record = {'id': record_id, 'create_date': _now(), 'write_date': _now()}
+            if 'active' in self.schema[model]:
+                record['active'] = True
+            table[record_id] = record
+            self._apply_values(model, record, vals)
+            self._after_create(model, record, vals)
+            ids.append(record_id)
+        return ids
+
+    def _after_create(self, model: str, record: dict, vals: dict) -> None:
+        if model == 'product.template' and 'product_variant_ids' not in vals:
+            self.create('product.product', [{
+                'product_tmpl_id': record['id'], 'name': record.get('name'),
+                'default_code': record.get('default_code'), 'barcode': record.get('barcode'),
+                'list_price': record.get('list_price', 0.0), 'standard_price': record.get('standard_price', 0.0),
+            }])
+            record.setdefault('type', 'consu')
+            record.setdefault('sale_ok', True)
+            record.setdefault('purchase_ok', True)
+        elif model == 'ir.model.fields':
+            # Los campos personalizados pasan a existir en el modelo, como en Odoo
+            target = record.get('model') or self.tables['ir.model'].get(record.get('model_id'), {}).get('model')
+            if target in self.schema:
+                self.schema[target][record['name']] = _f(record.get('ttype') or 'char', record.get('field_description') or '')
+        elif model == 'account.move':
+            record.setdefault('state', 'draft')
+        elif model == 'purchase.order':
+            record.setdefault('state', 'draft')
+            record.setdefault('name', f"P{record['id']:05d}")
+        elif model == 'sale.order':
+            record.setdefault('state', 'draft')
+            record.setdefault('name', f"S{record['id']:05d}")
+
+    def write(self, model: str, ids: List[int], vals: dict) -> bool:
+        table = self._model(model)
+        for record_id in ids:
+            if record_id not in table:
+                raise OdooError(f"Record does not exist or has been deleted. ({model}({record_id},))",
+                                name="odoo.exceptions.MissingError")
+            self._apply_values(model, table[record_id], vals)
+            table[record_id]['write_date'] = _now()
+            if model == 'product.template':
+                self._sync_variant(table[record_id], vals)
+        return True
+
+    def _sync_variant(self, template: dict, vals: dict) -> None:
+        shared = {k: v for k, v in vals.items() if k in ('name', 'default_code', 'barcode', 'active', 'list_price', 'standard_price')}
+        if shared:
+            for variant_id in self._children_of('product.product', 'product_tmpl_id', template['id']):
+                variant = self.tables['product.product'][variant_id]
+                self._apply_values('product.product', variant, shared)
+                variant['write_date'] = template['write_date']
+
+    def unlink(self, model: str, ids: List[int]) -> bool:
+        table = self._model(model)
+        for record_id in ids:
+            table.pop(record_id, None)
+        self._versions[model] += 1
+        return True
+
+    def set_write_date(self, model: str, record_id: int, when: str) -> None:
+        """Fija ``write_date`` (para tests de sincronización incremental)"""
+        self.tables[model][record_id]['write_date'] = when
+
+
+def _mentions(domain: List, field: str) -> bool:
+    return any(isinstance(t, (list, tuple)) and len(t) == 3 and str(t[0]).split('.')[0] == field for t in domain)
+
+
+def _normalize(domain: List) -> List:
+    """Añade los ``&`` implícitos para tener notación polaca completa"""
+    result, expected = [], 1
+    for token in domain:
+        if expected == 0:
+            result.insert(0, '&')
+            expected = 1
+        result.append(tuple(token) if isinstance(token, list) else token)
+        if token in ('&', '|'):
+            expected += 1
+        elif token != '!':
+            expected -= 1
+    return result
+
+
+def _like(value: Any, pattern: Any, case: bool, anchored: bool) -> bool:
+    if value in (False, None):
+        return False
+    text, pattern = str(value), str(pattern)
+    if anchored:
+        regex = re.escape(pattern).replace('%', '.*').replace('_', '.')
+        return re.fullmatch(regex, text, 0 if case else re.IGNORECASE) is not None
+    return pattern in text if case else pattern.casefold() in text.casefold()
+
+
+def _compare(value: Any, operator: str, target: Any) -> bool:
+    if operator in ('=', '=='):
+        return value == target or (target is False and value in (None, '', False))
+    if operator in ('!=', '<>'):
+        return not _compare(value, '=', target)
+    if operator == 'in':
+        return value in (target or []) or (False in (target or []) and value in (None, False))
+    if operator == 'not in':
+        return not _compare(value, 'in', target)
+    if operator in ('like', 'ilike'):
+        return _like(value, target, operator == 'like', anchored=False)
+    if operator in ('not like', 'not ilike'):
+        return not _like(value, target, operator == 'not like', anchored=False)
+    if operator in ('=like', '=ilike'):
+        return _like(value, target, operator == '=like', anchored=True)
+    if value is None or value is False:
+        return False
+    try:
+        return {'<': value < target, '>': value > target, '<=': value <= target, '>=': value >= target}[operator]
+    except KeyError:
+        raise OdooError(f"Invalid domain operator {operator!r}", name="builtins.ValueError")
+
+
+def _compare_any(values: List[Any], operator: str, target: Any) -> bool:
+    # Operadores negativos sobre varios valores: ninguno debe cumplir la condición positiva
+    if operator in ('!=', '<>', 'not in', 'not like', 'not ilike'):
+        positive = {'!=': '=', '<>': '=', 'not in': 'in', 'not like': 'like', 'not ilike': 'ilike'}[operator]
+        return not any(_compare(v, positive, target) for v in values)
+    return any(_compare(v, operator, target) for v in values)
+
+
+# --- modelo de datos de ejemplo --------------------------------------------------
+
+_FAMILIES = {
+    'Electrodomésticos': ['Frío', 'Lavado', 'Cocción', 'Lavavajillas'],
+    'Climatización': ['Aire acondicionado', 'Calefacción', 'Ventilación'],
+    'Imagen y sonido': ['Televisores', 'Barras de sonido', 'Auriculares'],
+    'Pequeño electrodoméstico': ['Cafeteras', 'Aspiradoras', 'Cuidado personal'],
+    'Informática': ['Portátiles', 'Monitores', 'Accesorios'],
+}
+_BRANDS = ['Bosch', 'Balay', 'Samsung', 'LG', 'Teka', 'Cecotec', 'Siemens', 'Haier', 'Hisense', 'Philips']
+
+
+def populate(db: FakeOdooDatabase, products: int = 200, suppliers: int = 20, categories: int = 20, seed: int = 0) -> None:
+    """Genera un catálogo determinista de ``products`` plantillas"""
+    rng = random.Random(seed)
+    company_partner = db.create('res.partner', [{'name': 'Pelotazo Electrodomésticos', 'is_company': True, 'vat': 'ESB00000000'}])[0]
+    db.create('res.company', [{'name': 'Pelotazo Electrodomésticos', 'partner_id': company_partner, 'vat': 'ESB00000000'}])
+    db.create('account.tax', [
+        {'name': 'IVA 21% (Bienes)', 'amount': 21.0, 'amount_type': 'percent', 'type_tax_use': 'sale'},
+        {'name': '21% IVA soportado (bienes corrientes)', 'amount': 21.0, 'amount_type': 'percent', 'type_tax_use': 'purchase'},
+        {'name': 'IVA 10%', 'amount': 10.0, 'amount_type': 'percent', 'type_tax_use': 'sale'},
+        {'name': '10% IVA soportado', 'amount': 10.0, 'amount_type': 'percent', 'type_tax_use': 'purchase'},
+    ])
+    db.create('account.journal', [
+        {'name': 'Facturas de proveedores', 'code': 'BILL', 'type': 'purchase'},
+        {'name': 'Facturas de clientes', 'code': 'INV', 'type': 'sale'},
+    ])
+    db.create('account.account', [
+        {'name': 'Compras de mercaderías', 'code': '600000', 'account_type': 'expense'},
+        {'name': 'Ventas de mercaderías', 'code': '700000', 'account_type': 'income'},
+    ])
+    db.create('ir.model', [{'model': model, 'name': model} for model in SCHEMA])
+
+    root = db.create('product.category', [{'name': 'All'}])[0]
+    leaves, budget = [], max(categories - 1, 0)
+    for family, children in _FAMILIES.items():
+        if budget <= 0:
+            break
+        parent = db.create('product.category', [{'name': family, 'parent_id': root}])[0]
+        budget -= 1
+        created = db.create('product.category', [{'name': c, 'parent_id': parent} for c in children[:budget]])
+        budget -= len(created)
+        leaves.extend(created or [parent])
+    leaves = leaves or [root]
+
+    supplier_ids = db.create('res.partner', [
+        {
+            'name': f"{_BRANDS[i % len(_BRANDS)]} Distribución {i + 1}", 'is_company': True,
+            'supplier_rank': 1, 'vat': f"ESB{10000000 + i:08d}", 'email': f"pedidos{i + 1}@proveedor.test",
+            'phone': f"+34 91 {100000 + i:06d}", 'city': rng.choice(['Madrid', 'Sevilla', 'Valencia', 'Bilbao']),
+        }
+        for i in range(suppliers)
+    ])
+
+    for i in range(1, products + 1):
+        brand = _BRANDS[i % len(_BRANDS)]
+        cost = round(rng.uniform(20, 900), 2)
+        template = {
+            'name': f"{brand} {rng.choice(['Frigorífico', 'Lavadora', 'Horno', 'Televisor', 'Split', 'Cafetera'])} {i:05d}",
+            'default_code': f"REF-{i:06d}",
+            'barcode': f"84{i:011d}" if i % 3 else False,
+            'list_price': round(cost * rng.uniform(1.15, 1.6), 2),
+            'standard_price': cost,
+            'categ_id': leaves[i % len(leaves)],
+            'type': 'consu',
+            'sale_ok': True,
+            'purchase_ok': True,
+            'available_in_pos': i % 2 == 0,
+            'is_published': i % 4 == 0,
+            'weight': round(rng.uniform(1, 80), 1),
+            'description_sale': f"{brand}, clase energética {rng.choice('ABCDE')}",
+            'qty_available': float(rng.randint(0, 40)),
+            'taxes_id': [1],
+            'supplier_taxes_id': [2],
+        }
+        if supplier_ids:
+            template['seller_ids'] = [
+                (0, 0, {'partner_id': supplier_ids[(i + k) % len(supplier_ids)], 'price': round(cost * (1 + k * 0.03), 2),
+                        'min_qty': 1.0, 'delay': 3 + k, 'sequence': 10 + k, 'product_code': f"P{i:05d}-{k}"})
+                for k in range(1 + i % 2)
+            ]
+        db.create('product.template', [template])
+    for variant in db.tables['product.product'].values():
+        variant['qty_available'] = db.tables['product.template'][variant['product_tmpl_id']].get('qty_available', 0.0)
+
+
+# --- servicio RPC ------------------------------------------------------------------
+
+
+class FakeOdooService:
+    """Resuelve ``common`` y ``object`` sobre una FakeOdooDatabase"""
+
+    def __init__(self, db: FakeOdooDatabase, dbname: str, login: str, password: str, server_version: str = "17.0"):
+        self.server_version = server_version
+        self.db = db
+        self.dbname = dbname
+        self.login = login
+        self.password = password
+        self.uid = 2
+        self.calls: Counter = Counter()
+        self.authentications = 0
+
+    def dispatch(self, service: str, method: str, args: List[Any]) -> Any:
+        if service == 'common':
+            if method == 'version':
+                major, minor = (int(part) for part in self.server_version.split('.')[:2])
+                return {
+                    'server_version': self.server_version, 'server_serie': self.server_version,
+                    'server_version_info': [major, minor, 0, 'final', 0, ''], 'protocol_version': 1,
+                }
+            if method in ('authenticate', 'login'):
+                self.authentications += 1
+                dbname, login, password = args[0], args[1], args[2]
+                ok = dbname == self.dbname and login == self.login and password == self.password
+                return self.uid if ok else False
+        if service == 'object' and method == 'execute_kw':
+            dbname, uid, password, model, model_method = args[:5]
+            call_args = args[5] if len(args) > 5 else []
+            kwargs = args[6] if len(args) > 6 else {}
+            if dbname != self.dbname or uid != self.uid or password != self.password:
+                raise OdooError("Access Denied", name=ACCESS_DENIED, code=3)
+            self.calls[(model, model_method)] += 1
+            with self.db.lock:
+                return self.execute(model, model_method, list(call_args or []), dict(kwargs or {}))
+        raise OdooError(f"Método {service}.{method} no soportado por el Odoo falso", name="builtins.NameError")
+
+    def execute(self, model: str, method: str, args: List[Any], kwargs: Dict[str, Any]) -> Any:
+        db = self.db
+        context = kwargs.pop('context', {}) or {}
+        active_test = context.get('active_test', True)
+        if method in ('search', 'search_read', 'search_count'):
+            domain = args[0] if args else kwargs.get('domain', [])
+            records = db.filter(model, domain, active_test)
+            if method == 'search_count' or kwargs.get('count'):
+                return len(records)
+            records = db.sort(model, records, kwargs.get('order'))
+            offset = kwargs.get('offset') or 0
+            limit = kwargs.get('limit')
+            records = records[offset:offset + limit if limit else None]
+            if method == 'search':
+                return [r['id'] for r in records]
+            fields = kwargs.get('fields') or (args[1] if len(args) > 1 else None)
+            return [db._record_dict(model, r, fields) for r in records]
+        if method == 'read':
+            ids = args[0] if isinstance(args[0], list) else [args[0]]
+            fields = kwargs.get('fields') or (args[1] if len(args) > 1 else None)
+            table = db._model(model)
+            return [db._record_dict(model, table[i], fields) for i in ids if i in table]
+        if method == 'create':
+            vals = args[0]
+            if isinstance(vals, list):
+                return db.create(model, vals)
+            return db.create(model, [vals])[0]
+        if method == 'write':
+            return db.write(model, args[0] if isinstance(args[0], list) else [args[0]], args[1])
+        if method == 'unlink':
+            return db.unlink(model, args[0] if isinstance(args[0], list) else [args[0]])
+        if method == 'fields_get':
+            attributes = kwargs.get('attributes')
+            fields = db.schema[model] if model in db.schema else db._model(model)
+            return {
+                name: {k: v for k, v in field.items() if not attributes or k in attributes}
+                for name, field in fields.items()
+                if not args or not args[0] or name in args[0]
+            }
+        if method == 'name_search':
+            name = args[0] if args else kwargs.get('name', '')
+            domain = kwargs.get('args') or []
+            limit = kwargs.get('limit', 100)
+            records = db.sort(model, [r for r in db.filter(model, domain, active_test)
+                                      if _like(db.display_name(model, r['id']), name, False, False)], None)
+            return [[r['id'], db.display_name(model, r['id'])] for r in records[:limit]]
+        if method in ('web_search_read', 'web_read') and int(self.server_version.split('.')[0]) >= 17:
+            return self._web_read(model, method, args, kwargs, active_test)
+        if method == 'read_group':
+            return self._read_group(model, args, kwargs, active_test)
+        if method == 'check_access_rights':
+            return True
+        return self._action(model, method, args)
+
+    def _web_read(self, model: str, method: str, args: List[Any], kwargs: Dict[str, Any], active_test: bool) -> Any:
+        """web_search_read / web_read de Odoo 17 (lectura guiada por ``specification``)"""
+        db = self.db
+        if method == 'web_read':
+            ids = args[0] if isinstance(args[0], list) else [args[0]]
+            specification = args[1] if len(args) > 1 else kwargs.get('specification', {})
+            table = db._model(model)
+            return [self._spec_record(model, table[i], specification) for i in ids if i in table]
+        domain = args[0] if args else kwargs.get('domain', [])
+        specification = args[1] if len(args) > 1 else kwargs.get('specification', {})
+        records = db.sort(model, db.filter(model, domain, active_test), kwargs.get('order'))
+        offset = kwargs.get('offset') or 0
+        limit = kwargs.get('limit')
+        page = records[offset:offset + limit if limit else None]
+        return {'length': len(records), 'records': [self._spec_record(model, r, specification) for r in page]}
+
+    def _spec_record(self, model: str, record: dict, specification: Dict[str, Any]) -> dict:
+        db = self.db
+        result = {'id': record['id']}
+        for name, spec in specification.items():
+            field = db._field(model, name)
+            value = db._raw(model, record, name)
+            sub_fields = (spec or {}).get('fields')
+            relation = field.get('relation')
+            if field['type'] == 'many2one':
+                if not value or relation not in db.tables or value not in db.tables[relation]:
+                    value = False
+                elif sub_fields:
+                    value = self._spec_record(relation, db.tables[relation][value], sub_fields)
+            elif field['type'] in _X2MANY and sub_fields:
+                table = db.tables[relation]
+                children = db.sort(relation, [table[i] for i in value if i in table], (spec or {}).get('order'))
+                value = [self._spec_record(relation, child, sub_fields) for child in children]
+            result[name] = value
+        return result
+
+    def _read_group(self, model: str, args: List[Any], kwargs: Dict[str, Any], active_test: bool) -> List[dict]:
+        db = self.db
+        domain = args[0] if args else kwargs.get('domain', [])
+        specs = (args[1] if len(args) > 1 else kwargs.get('fields')) or []
+        groupby = (args[2] if len(args) > 2 else kwargs.get('groupby')) or []
+        groupby = [groupby] if isinstance(groupby, str) else list(groupby)
+        lazy = kwargs.get('lazy', True)
+        if lazy:
+            groupby = groupby[:1]
+        records = db.filter(model, domain, active_test)
+
+        aggregates = []
+        for spec in specs:
+            alias, _, func = spec.partition(':')
+            field, func = alias, func or ''
+            match = re.match(r'(\w+)\((\w+)\)$', func)
+            if match:
+                func, field = match.group(1), match.group(2)
+            if field in groupby or (not func and db.schema[model].get(field, {}).get('type') not in _NUMERIC):
+                continue
+            db._field(model, field)
+            aggregates.append((alias, func or 'sum', field))
+
+        groups: Dict[Tuple, List[dict]] = {}
+        for record in records:
+            key = tuple(db._raw(model, record, name) if not isinstance(db._raw(model, record, name), list)
+                        else tuple(db._raw(model, record, name)) for name in groupby)
+            groups.setdefault(key, []).append(record)
+        if not groupby:
+            groups = {(): records}
+
+        rows = []
+        for key, members in groups.items():
+            row: Dict[str, Any] = {}
+            for name, value in zip(groupby, key):
+                field = db.schema[model][name]
+                row[name] = [value, db.display_name(field['relation'], value)] if field['type'] == 'many2one' and value else value
+            row['__count' if not lazy or not groupby else f"{groupby[0]}_count"] = len(members)
+            for alias, func, field in aggregates:
+                values = [db._raw(model, r, field) for r in members]
+                values = [v for v in values if v not in (False, None)]
+                row[alias] = _aggregate(func, values)
+            row['__domain'] = [(name, '=', value) for name, value in zip(groupby, key)] + list(domain or [])
+            rows.append(row)
+        orderby = kwargs.get('orderby')
+        if orderby:
+            for part in reversed(orderby.split(',')):
+                tokens = part.split()
+                rows.sort(key=lambda r, n=tokens[0]: (r.get(n) is False, r.get(n) or 0),
+                          reverse=len(tokens) > 1 and tokens[1].lower() == 'desc')
+        offset = kwargs.get('offset') or 0
+        limit = kwargs.get('limit')
+        return rows[offset:offset + limit if limit else None]
+
+    def _action(self, model: str, method: str, args: List[Any]) -> Any:
+        db = self.db
+        ids = args[0] if args and isinstance(args[0], list) else ([args[0]] if args else [])
+        if model == 'purchase.order' and method == 'button_confirm':
+            return db.write(model, ids, {'state': 'purchase'})
+        if model == 'account.move' and method == 'action_post':
+            return db.write(model, ids, {'state': 'posted'})
+        if model == 'purchase.order' and method == 'action_create_invoice':
+            invoice_ids = []
+            for order_id in ids:
+                order = db.tables[model][order_id]
+                invoice_ids.extend(db.create('account.move', [{
+                    'move_type': 'in_invoice', 'partner_id': order.get('partner_id'),
+                    'invoice_origin': order.get('name'), 'journal_id': 1,
+                }]))
+                db.write(model, [order_id], {'invoice_ids': [(4, i) for i in invoice_ids]})
+            return {'type': 'ir.actions.act_window', 'res_model': 'account.move', 'res_id': invoice_ids[-1] if invoice_ids else False}
+        raise OdooError(f"The method '{method}' does not exist on the model '{model}'", name="builtins.AttributeError")
+
+
+def _aggregate(func: str, values: List[Any]) -> Any:
+    if func == 'count':
+        return len(values)
+    if func == 'count_distinct':
+        return len(set(values))
+    if not values:
+        return False if func in ('max', 'min') else 0
+    if func == 'max':
+        return max(values)
+    if func == 'min':
+        return min(values)
+    if func == 'avg':
+        return sum(values) / len(values)
+    return sum(values)
+
+
+# --- servidor HTTP --------------------------------------------------------------------
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def setup(self):
+        super().setup()
+        # Cabeceras y cuerpo van en dos escrituras: sin esto Nagle + ACK retardado añaden ~40 ms
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        fake = self.server.fake
+        fake.requests += 1
+        if fake.latency:
+            time.sleep(fake.latency)
+        path = self.path.rstrip('/')
+        if path == '/jsonrpc':
+            self._reply(self._jsonrpc(fake, body), 'application/json')
+        elif path.startswith('/xmlrpc/'):
+            self._reply(self._xmlrpc(fake, path.rsplit('/', 1)[-1], body), 'text/xml')
+        else:
+            self.send_error(404)
+
+    def _xmlrpc(self, fake: "FakeOdoo", service: str, body: bytes) -> bytes:
+        try:
+            params, method = xmlrpc.client.loads(body, use_builtin_types=True)
+            result = fake.service.dispatch(service, method, list(params))
+            return xmlrpc.client.dumps((_marshallable(result),), methodresponse=True, allow_none=True).encode('utf-8')
+        except OdooError as e:
+            return xmlrpc.client.dumps(xmlrpc.client.Fault(e.code, f"{e.name}: {e}" if e.code != 3 else str(e))).encode('utf-8')
+        except Exception as e:  # error interno: se devuelve como Fault, igual que Odoo
+            return xmlrpc.client.dumps(xmlrpc.client.Fault(1, f"{type(e).__name__}: {e}")).encode('utf-8')
+
+    def _jsonrpc(self, fake: "FakeOdoo", body: bytes) -> bytes:
+        request = json.loads(body or b'{}')
+        params = request.get('params') or {}
+        try:
+            result = fake.service.dispatch(params.get('service'), params.get('method'), list(params.get('args') or []))
+            payload = {'jsonrpc': '2.0', 'id': request.get('id'), 'result': result}
+        except Exception as e:
+            name = e.name if isinstance(e, OdooError) else f"builtins.{type(e).__name__}"
+            payload = {'jsonrpc': '2.0', 'id': request.get('id'), 'error': {
+                'code': 200, 'message': 'Odoo Server Error',
+                'data': {'name': name, 'message': str(e), 'arguments': [str(e)]},
+            }}
+        return json.dumps(payload, default=str).encode('utf-8')
+
+    def _reply(self, body: bytes, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _marshallable(value: Any) -> Any:
+    """XML-RPC no admite claves no str ni tuplas con None como Odoo; se normaliza"""
+    if isinstance(value, dict):
+        return {str(k): _marshallable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_marshallable(v) for v in value]
+    return value
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    fake: "FakeOdoo"
+
+
+class FakeOdoo:
+    """Servidor Odoo falso en un hilo: ``start()``/``stop()`` o ``with FakeOdoo(...)``"""
+
+    def __init__(self, products: int = 200, suppliers: int = 20, categories: int = 20,
+                 latency: float = 0.0, db: str = "fake_odoo", login: str = "admin",
+                 password: str = "admin", seed: int = 0, server_version: str = "17.0"):
+        self.latency = latency
+        self.requests = 0
+        self.db = FakeOdooDatabase()
+        populate(self.db, products=products, suppliers=suppliers, categories=categories, seed=seed)
+        self.service = FakeOdooService(self.db, db, login, password, server_version)
+        self._server: Optional[_Server] = None
+
+    @property
+    def calls(self) -> Counter:
+        """Llamadas ``execute_kw`` por (modelo, método)"""
+        return self.service.calls
+
+    @property
+    def url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("El Odoo falso no está arrancado")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environ(self) -> Dict[str, str]:
+        """Variables de entorno para apuntar los servicios a este servidor"""
+        return {
+            'ODOO_URL': self.url, 'ODOO_DB': self.service.dbname,
+            'ODOO_USERNAME': self.service.login, 'ODOO_PASSWORD': self.service.password,
+        }
+
+    def reset_counters(self) -> None:
+        self.service.calls.clear()
+        self.requests = 0
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> "FakeOdoo":
+        self._server = _Server((host, port), _Handler)
+        self._server.fake = self
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), name="fake-odoo", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeOdoo":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Arranca un Odoo falso para desarrollo sin servidor real")
+    parser.add_argument('--port', type=int, default=8069)
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.0, help='Latencia por petición en segundos')
+    options = parser.parse_args()
+    server = FakeOdoo(products=options.products, latency=options.latency).start(port=options.port)
+    print(f"Odoo falso en {server.url} (db={server.service.dbname}, usuario admin/admin). Ctrl+C para parar.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,74 @@
+from unittest.mock import patch
+
+import pytest
+
+from api.routes import products, providers
+from api.services.odoo_product_service import OdooProductService
+from api.services.odoo_provider_service import OdooProviderService
+
+pytestmark = pytest.mark.fake_odoo(products=80, suppliers=6)
+
+
+@pytest.fixture
+def app(make_service, make_app):
+    product_service = make_service(OdooProductService)
+    return make_app(products.router, providers.router,
+                    overrides={products.get_product_service: lambda: product_service})
+
+
+@pytest.fixture
+def get_url(call_api):
+    def get(app, url, **headers):
+        return call_api(app, "GET", url, headers=headers)
+    return get
+
+
+def test_products_answer_304_without_reading_the_page(odoo, app, get_url):
+    first = get_url(app, "/api/v1/products?size=20&search=REF")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.headers["cache-control"] == "private, no-cache"
+    assert first.headers["last-modified"].endswith("GMT")
+
+    odoo.reset_counters()
+    again = get_url(app, "/api/v1/products?search=REF&size=20", **{"If-None-Match": f'W/{etag}'})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["etag"] == etag
+    assert odoo.calls == {('product.template', 'read_group'): 1, ('stock.quant', 'read_group'): 1}
+
+    # Otra página u otros campos: otro ETag
+    assert get_url(app, "/api/v1/products?size=20&search=REF&page=2").headers["etag"] != etag
+    assert get_url(app, "/api/v1/products?size=20&search=REF&fields=name").headers["etag"] != etag
+
+    # Un producto modificado cambia el validador
+    odoo.db.set_write_date('product.template', 3, '2099-01-01 00:00:00')
+    changed = get_url(app, "/api/v1/products?size=20&search=REF", **{"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert changed.headers["last-modified"] == "Thu, 01 Jan 2099 00:00:00 GMT"
+
+
+def test_stock_moves_invalidate_listings_that_show_stock(odoo, app, get_url):
+    [quant] = odoo.db.create('stock.quant', [{'product_id': 40, 'quantity': 2.0}])
+    full = get_url(app, "/api/v1/products?size=10&search=REF-00004")
+    sparse = get_url(app, "/api/v1/products?size=10&search=REF-00004&fields=id,name")
+    assert get_url(app, "/api/v1/products?size=10&search=REF-00004", **{"If-None-Match": full.headers["etag"]}).status_code == 304
+
+    odoo.db.tables['product.template'][40]['qty_available'] = 99.0
+    odoo.db.set_write_date('stock.quant', quant, '2099-06-01 00:00:00')
+    changed = get_url(app, "/api/v1/products?size=10&search=REF-00004", **{"If-None-Match": full.headers["etag"]})
+    assert changed.status_code == 200 and changed.headers["etag"] != full.headers["etag"]
+    assert changed.json()["data"][0]["stock"] == 99
+    # Sin stock en la respuesta el validador no depende de stock.quant
+    assert get_url(app, "/api/v1/products?size=10&search=REF-00004&fields=id,name",
+                **{"If-None-Match": sparse.headers["etag"]}).status_code == 304
+
+
+def test_providers_answer_304(odoo, make_service, app, get_url):
+    provider_service = make_service(OdooProviderService)
+    with patch.object(providers, "odoo_service", provider_service):
+        first = get_url(app, "/api/v1/providers?size=5")
+        assert first.status_code == 200 and len(first.json()["data"]) == 5
+        etag = first.headers["etag"]
+        assert get_url(app, "/api/v1/providers?size=5", **{"If-None-Match": f'"otro", {etag}'}).status_code == 304
+
+        odoo.db.create('res.partner', [{'name': 'Proveedor nuevo', 'is_company': True, 'supplier_rank': 1}])
+        assert get_url(app, "/api/v1/providers?size=5", **{"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,101 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+
+from api.models.schemas import DashboardStats
+from api.services.dashboard_snapshot import DashboardSnapshotStore
+
+
+class SlowDashboard:
+    """Servicio de dashboard que tarda en calcular y cuenta los cálculos"""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.calls = 0
+        self.fail = False
+        self._lock = threading.Lock()
+
+    def get_dashboard_stats(self, today: date = None) -> DashboardStats:
+        with self._lock:
+            self.calls += 1
+            calls = self.calls
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("Odoo caído")
+        return DashboardStats(totalProducts=calls, topCategories=[{'id': 1, 'name': 'TV', 'count': calls}])
+
+
+def test_concurrent_refreshes_share_one_computation():
+    service = SlowDashboard()
+    store = DashboardSnapshotStore(service, stale_after=60)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: store.get_fresh(), range(8)))
+
+    assert service.calls == 1
+    assert {r.totalProducts for r in results} == {1}
+    assert not results[0].stale and results[0].stale_after > results[0].generated_at
+
+    # Terminado el recálculo, el siguiente vuelve a calcular
+    assert store.get_fresh().totalProducts == 2
+
+
+def test_snapshot_is_served_instantly_and_refreshed_in_background_when_stale():
+    service = SlowDashboard(delay=0.1)
+    store = DashboardSnapshotStore(service, stale_after=60)
+    assert store.get().totalProducts == 1  # sin instantánea: se calcula en la petición
+
+    started = time.monotonic()
+    assert store.get().totalProducts == 1
+    assert time.monotonic() - started < 0.05 and service.calls == 1
+
+    store.stale_after = 0
+    stale = store.get()
+    assert stale.stale and stale.totalProducts == 1
+    deadline = time.monotonic() + 2
+    while service.calls < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.15)
+    assert store.get().totalProducts == 2
+
+
+def test_failed_refresh_keeps_previous_snapshot():
+    service = SlowDashboard(delay=0.05)
+    store = DashboardSnapshotStore(service, stale_after=60)
+    store.get_fresh()
+
+    service.fail = True
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(store.refresh) for _ in range(3)]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result()
+    assert service.calls == 2
+    assert store.get().totalProducts == 1
+
+
+def test_snapshot_survives_a_restart_on_disk(tmp_path):
+    path = str(tmp_path / "dashboard.json")
+    service = SlowDashboard(delay=0)
+    first = DashboardSnapshotStore(service, stale_after=60, path=path).get()
+
+    restarted = DashboardSnapshotStore(service, stale_after=60, path=path).get()
+    assert service.calls == 1
+    assert restarted.topCategories == first.topCategories and restarted.generated_at == first.generated_at
+
+
+def test_background_thread_refreshes_on_schedule():
+    service = SlowDashboard(delay=0)
+    store = DashboardSnapshotStore(service, stale_after=60)
+    store.start(interval=0.05)
+    try:
+        deadline = time.monotonic() + 2
+        while service.calls < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert service.calls >= 3
+    finally:
+        store.stop()
+    assert store.get().totalProducts >= 3
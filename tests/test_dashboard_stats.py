@@ -0,0 +1,101 @@
+from collections import Counter
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from api.routes import dashboard
+from api.services.dashboard_snapshot import close_dashboard_snapshots
+from api.services.odoo_dashboard_service import OdooDashboardService
+
+pytestmark = pytest.mark.fake_odoo(products=120, suppliers=5)
+
+TODAY = date(2024, 6, 15)
+
+
+@pytest.fixture
+def odoo(odoo):
+    db = odoo.db
+    templates = db.tables['product.template']
+    templates[4]['active'] = False
+    templates[5]['qty_available'] = 0.0
+    templates[6]['qty_available'] = 3.0
+    customer = db.create('res.partner', [{'name': 'Cliente', 'customer_rank': 1}])[0]
+    db.create('sale.order', [
+        {'partner_id': customer, 'state': 'sale', 'date_order': '2024-06-03 10:00:00', 'amount_total': 300.0},
+        {'partner_id': customer, 'state': 'done', 'date_order': '2024-06-10 09:30:00', 'amount_total': 100.0},
+        {'partner_id': customer, 'state': 'sale', 'date_order': '2024-05-20 12:00:00', 'amount_total': 200.0},
+        {'partner_id': customer, 'state': 'cancel', 'date_order': '2024-06-11 12:00:00', 'amount_total': 999.0},
+        {'partner_id': customer, 'state': 'draft', 'date_order': '2024-06-12 12:00:00', 'amount_total': 999.0},
+    ])
+    order = db.create('purchase.order', [{'partner_id': 1, 'state': 'purchase'}])[0]
+    assert order
+    return odoo
+
+
+def test_stats_come_from_aggregates_without_reading_the_catalog(odoo, make_service):
+    service = make_service(OdooDashboardService)
+    odoo.reset_counters()
+
+    stats = service.get_dashboard_stats(today=TODAY)
+
+    templates = [t for t in odoo.db.tables['product.template'].values()]
+    active = [t for t in templates if t.get('active', True)]
+    assert stats.totalProducts == stats.activeProducts == len(active) == 119
+    assert stats.inactiveProducts == 1
+    assert stats.outOfStockProducts == stats.productsWithoutStock == sum(1 for t in active if t['qty_available'] <= 0)
+    assert stats.lowStockProducts == sum(1 for t in active if t['qty_available'] < 5)
+    assert stats.totalCategories == len(odoo.db.tables['product.category'])
+    assert sum(c['count'] for c in stats.topCategories) <= len(active)
+    assert stats.topCategories[0]['count'] == max(Counter(t['categ_id'] for t in active).values())
+
+    assert stats.totalSales == 3
+    assert stats.salesThisMonth == 400.0 and stats.salesLastMonth == 200.0
+    assert stats.salesGrowth == 100.0 and stats.averageOrderValue == 200.0
+    assert [s.amount_total for s in stats.recentSales] == [100.0, 300.0, 200.0]
+    assert stats.recentSales[0].customer_name == 'Cliente'
+    assert stats.totalCustomers == 1
+    assert stats.totalProviders == stats.activeProviders == 5 and stats.providersWithOrders == 1
+    assert len(stats.low_stock_products) == 10
+    assert all(p.stock < 5 and p.qty_available == odoo.db.tables['product.template'][p.id]['qty_available']
+               for p in stats.low_stock_products)
+
+    # Solo agregados y lecturas con limit: ninguna lectura del catálogo completo
+    product_reads = [kw for (model, method), kw in odoo.calls.items()
+                     if model == 'product.template' and method in ('search_read', 'read', 'web_search_read')]
+    assert product_reads == [1]
+    assert odoo.calls[('product.template', 'read_group')] == 2
+    assert ('sale.order', 'read_group') in odoo.calls
+
+
+def test_missing_sales_module_only_blanks_sales(odoo, make_service):
+    service = make_service(OdooDashboardService)
+    del odoo.db.schema['sale.order']
+    del odoo.db.tables['sale.order']
+
+    stats = service.get_dashboard_stats(today=TODAY)
+    assert stats.totalProducts == 119
+    assert stats.totalSales == 0 and stats.recentSales == []
+
+
+def test_routes_serve_stats_and_categories(odoo, make_service, make_app, call_api):
+    service = make_service(OdooDashboardService)
+    app = make_app(dashboard.router)
+
+    try:
+        with patch.object(dashboard, "odoo_dashboard_service", service):
+            stats = call_api(app, "GET", "/api/v1/dashboard/stats")
+            categories = call_api(app, "GET", "/api/v1/dashboard/categories")
+            odoo.reset_counters()
+            again = call_api(app, "GET", "/api/v1/dashboard/stats")
+            refreshed = call_api(app, "POST", "/api/v1/dashboard/refresh")
+    finally:
+        close_dashboard_snapshots()
+    assert stats.status_code == 200 and stats.json()['totalProducts'] == 119
+    assert stats.json()['stale'] is False and stats.json()['stale_after']
+    # La segunda lectura sale de la instantánea; /refresh vuelve a consultar Odoo
+    assert again.json() == stats.json()
+    assert refreshed.status_code == 200 and odoo.requests > 0
+    assert categories.status_code == 200
+    counts = [c['count'] for c in categories.json()['categories']]
+    assert counts == sorted(counts, reverse=True) and sum(counts) == 119
@@ -0,0 +1,80 @@
+import http.client
+import time
+import xmlrpc.client
+
+import pytest
+
+from api.services.odoo_auth_cache import is_access_denied
+from api.services.odoo_product_service import OdooProductService
+from api.services.odoo_transport import decode_jsonrpc_response, encode_jsonrpc_request
+
+pytestmark = pytest.mark.fake_odoo(products=300, suppliers=12)
+
+
+def test_xmlrpc_and_jsonrpc_return_the_same_records(odoo, make_service):
+    domain = [('categ_id.name', '=', 'Frío'), '|', ('list_price', '>', 500), ('barcode', '=', False)]
+    kwargs = {'fields': ['name', 'list_price', 'categ_id', 'seller_ids'], 'limit': 5, 'order': 'list_price desc'}
+    rows = make_service()._execute_kw('product.template', 'search_read', [domain], kwargs)
+
+    body = encode_jsonrpc_request("object", "execute_kw", (
+        odoo.service.dbname, 2, "admin", 'product.template', 'search_read', [domain], kwargs
+    ))
+    conn = http.client.HTTPConnection(odoo.url[len("http://"):])
+    conn.request("POST", "/jsonrpc", body, {"Content-Type": "application/json"})
+    assert decode_jsonrpc_response(conn.getresponse().read()) == rows
+
+    assert len(rows) == 5
+    assert [r['categ_id'][1] for r in rows] == ['All / Electrodomésticos / Frío'] * 5
+    assert all(r['seller_ids'] for r in rows)
+    assert rows[0]['list_price'] >= rows[-1]['list_price']
+
+
+def test_domains_follow_odoo_semantics(make_service):
+    service = make_service()
+    total = service._execute_kw('product.template', 'search_count', [[]])
+    product_id = service._execute_kw('product.template', 'search', [[]], {'limit': 1})[0]
+    service._execute_kw('product.template', 'write', [[product_id], {'active': False}])
+
+    assert service._execute_kw('product.template', 'search_count', [[]]) == total - 1
+    assert service._execute_kw('product.template', 'search_count', [[('active', 'in', [True, False])]]) == total
+    assert service._execute_kw('product.template', 'search_count', [['!', ('id', '=', product_id)]],
+                               {'context': {'active_test': False}}) == total - 1
+    family = service._execute_kw('product.category', 'search', [[('name', '=', 'Electrodomésticos')]])
+    under_family = service._execute_kw('product.template', 'search_count', [[('categ_id', 'child_of', family)]])
+    by_path = service._execute_kw('product.template', 'search_count', [[('categ_id', 'ilike', 'Electrodomésticos /')]])
+    assert 0 < under_family == by_path < total
+
+
+def test_create_with_commands_custom_fields_and_access_denied(odoo, make_service):
+    service = make_service(OdooProductService)
+    assert service._ensure_custom_field('product.template', 'x_marca', 'char', 'Marca')
+    assert 'x_marca' in service.get_model_fields('product.template')
+
+    product_id = service._execute_kw('product.template', 'create', [{
+        'name': 'Nevera de prueba', 'default_code': 'TEST-1', 'x_marca': 'Bosch',
+        'seller_ids': [(0, 0, {'partner_id': 2, 'price': 100.0})], 'taxes_id': [(6, 0, [1])],
+    }])
+    record = service._execute_kw('product.template', 'read', [[product_id]],
+                                 {'fields': ['x_marca', 'seller_ids', 'taxes_id', 'product_variant_ids']})[0]
+    assert record['x_marca'] == 'Bosch' and record['taxes_id'] == [1]
+    assert len(record['seller_ids']) == 1 and len(record['product_variant_ids']) == 1
+
+    with pytest.raises(xmlrpc.client.Fault) as excinfo:
+        xmlrpc.client.ServerProxy(f"{odoo.url}/xmlrpc/2/object").execute_kw(
+            odoo.service.dbname, 2, "mala", 'product.template', 'search', [[]])
+    assert is_access_denied(excinfo.value)
+    with pytest.raises(xmlrpc.client.Fault, match="Invalid field"):
+        xmlrpc.client.ServerProxy(f"{odoo.url}/xmlrpc/2/object").execute_kw(
+            odoo.service.dbname, 2, "admin", 'product.template', 'read', [[product_id]], {'fields': ['no_existe']})
+
+
+@pytest.mark.fake_odoo(products=50, latency=0.05)
+def test_read_group_and_injected_latency(odoo, make_service):
+    service = make_service()
+    start = time.perf_counter()
+    groups = service._execute_kw('product.template', 'read_group', [[], ['list_price:sum', 'write_date:max'], ['categ_id']],
+                                 {'lazy': False})
+    assert time.perf_counter() - start >= 0.05
+    assert sum(g['__count'] for g in groups) == 50
+    assert all(g['categ_id'][1] and g['write_date'] for g in groups)
+    assert odoo.calls[('product.template', 'read_group')] == 1
@@ -0,0 +1,77 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from api.routes import products
+from api.services.odoo_product_service import OdooProductService
+
+pytestmark = pytest.mark.fake_odoo(products=250, suppliers=6)
+
+
+@pytest.fixture
+def odoo(odoo):
+    templates = odoo.db.tables['product.template']
+    templates[1].update(list_price=80.0, standard_price=100.0)  # margen negativo
+    templates[2].update(list_price=50.0, standard_price=0.0)  # sin coste: sin margen
+    templates[3].update(list_price=110.0, standard_price=100.0)  # 10 %
+    return odoo
+
+
+def _margins(odoo):
+    """Margen de cada producto activo calculado a mano"""
+    return {
+        t['id']: (t['list_price'] - t['standard_price']) / t['standard_price'] * 100
+        for t in odoo.db.tables['product.template'].values()
+        if t.get('active', True) and t['standard_price'] > 0
+    }
+
+
+def test_report_matches_a_row_by_row_computation(odoo, make_service):
+    service = make_service(OdooProductService)
+    margins = _margins(odoo)
+    odoo.reset_counters()
+
+    with patch("api.utils.config.config.ODOO_EXPORT_CHUNK_SIZE", 100):
+        report = service.get_margin_report(threshold=30, top=5)
+
+    assert report['products'] == 250 and report['without_cost'] == 1
+    assert report['alerts'] == sum(1 for m in margins.values() if m < 30)
+    assert report['summary']['p50'] == round(float(np.percentile(list(margins.values()), 50)), 2)
+    assert [p['id'] for p in report['worst']][:2] == [1, 3]
+    assert report['worst'][0]['margin_pct'] == -20.0
+
+    templates = odoo.db.tables['product.template']
+    for group in report['by_category']:
+        members = [m for i, m in margins.items() if templates[i]['categ_id'] == group['id']]
+        assert group['products'] == len(members)
+        assert group['p90'] == round(float(np.percentile(members, 90)), 2)
+    assert [g['p50'] for g in report['by_supplier']] == sorted(g['p50'] for g in report['by_supplier'])
+    assert sum(g['products'] for g in report['by_supplier']) == len(margins)
+
+    # Por bloques: dos lecturas por bloque (plantillas y proveedores), ninguna por producto
+    assert odoo.calls[('product.template', 'search_read')] == 3
+    assert odoo.calls[('product.supplierinfo', 'search_read')] == 3
+
+
+def test_alert_flags_are_written_in_grouped_writes_only_when_they_change(odoo, make_service, make_app, call_api):
+    service = make_service(OdooProductService)
+    app = make_app(products.router, overrides={products.get_product_service: lambda: service})
+
+    first = call_api(app, "POST", "/api/v1/products/margins/alerts?threshold=30&top=0")
+    assert first.status_code == 200
+    body = first.json()
+    templates = odoo.db.tables['product.template']
+    flagged = {i for i, t in templates.items() if t.get('x_alerta_margen')}
+    assert flagged == {i for i, m in _margins(odoo).items() if m < 30}
+    assert body['written'] == {'flagged': len(flagged), 'cleared': 0, 'errors': []}
+
+    odoo.reset_counters()
+    templates[1]['list_price'] = 200.0
+    again = call_api(app, "POST", "/api/v1/products/margins/alerts?threshold=30").json()
+    assert again['written'] == {'flagged': 0, 'cleared': 1, 'errors': []}
+    assert odoo.calls[('product.template', 'write')] == 1
+    assert not templates[1]['x_alerta_margen']
+
+    report = call_api(app, "GET", "/api/v1/products/margins").json()
+    assert report['written'] is None and report['threshold'] == 15
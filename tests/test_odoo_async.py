@@ -0,0 +1,171 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from api.services.odoo_async_client import AsyncOdooClient, close_async_odoo_clients
+from api.services.odoo_auth_cache import get_cached_uid, invalidate_uid, store_uid
+from api.services.odoo_base_service import OdooBaseService
+from api.services.odoo_invoice_service import OdooInvoiceService
+from api.services.odoo_product_service import OdooProductService
+from api.services.odoo_provider_service import OdooProviderService
+from api.services.odoo_resilience import OdooUnavailableError, get_circuit_breaker
+from api.utils.config import config
+
+pytestmark = pytest.mark.fake_odoo(products=40, suppliers=6)
+
+
+def _client(odoo, password="admin"):
+    return AsyncOdooClient(odoo.url, odoo.service.dbname, "admin", password)
+
+
+def _run(coro_factory):
+    """Ejecuta en un event loop nuevo y cierra los clientes abiertos en él"""
+    async def run():
+        try:
+            return await coro_factory()
+        finally:
+            await close_async_odoo_clients()
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("transport", ["xmlrpc", "jsonrpc"])
+def test_async_client_executes_kw(odoo, transport):
+    client = _client(odoo)
+
+    async def run():
+        try:
+            count = await client.execute_kw("product.template", "search_count", [[]])
+            records = await client.execute_kw("product.template", "read", [[1, 2]], {"fields": ["name"]})
+            return count, records
+        finally:
+            await client.aclose()
+
+    with patch.object(config, "ODOO_TRANSPORT", transport):
+        count, records = asyncio.run(run())
+    assert count == 40
+    assert [r["name"] for r in records] == [odoo.db.tables["product.template"][i]["name"] for i in (1, 2)]
+
+
+def test_one_http_client_per_event_loop_closed_with_aclose(odoo):
+    client = _client(odoo)
+
+    async def use():
+        await client.execute_kw("res.partner", "search_count", [[]])
+        return client._get_http_client()
+
+    async def use_and_close():
+        http = await use()
+        await client.aclose()
+        return http
+
+    first = asyncio.run(use_and_close())
+    second = asyncio.run(use_and_close())
+    assert first is not second
+    assert first.is_closed and second.is_closed
+    assert len(client._clients) == 0
+
+
+def test_rejected_login_raises_on_both_paths_and_is_not_cached(odoo):
+    key = (odoo.url, odoo.service.dbname, "admin")
+    invalidate_uid(*key)
+    with patch.dict("os.environ", {**odoo.environ(), "ODOO_PASSWORD": "mala"}):
+        service = OdooBaseService()
+    with pytest.raises(PermissionError):
+        service._get_connection()
+    assert get_cached_uid(*key) is None
+
+    async def run():
+        try:
+            await _client(odoo, password="mala").authenticate()
+        finally:
+            await close_async_odoo_clients()
+
+    with pytest.raises(PermissionError):
+        asyncio.run(run())
+    assert get_cached_uid(*key) is None
+    # Cada intento vuelve a preguntar a Odoo: el rechazo no queda en caché
+    assert odoo.service.authentications == 2
+
+
+def test_async_calls_reauthenticate_when_odoo_rejects_the_cached_uid(odoo, make_service):
+    service = make_service()
+    key = (odoo.url, odoo.service.dbname, "admin")
+    store_uid(*key, 999)  # sesión que Odoo ya no acepta
+    before = odoo.service.authentications
+
+    count = _run(lambda: service._execute_kw_async("res.partner", "search_count", [[]]))
+    assert count == len(odoo.db.tables["res.partner"])
+    assert odoo.service.authentications == before + 1
+    assert get_cached_uid(*key) == odoo.service.uid
+
+
+@patch.object(config, "ODOO_RETRY_BACKOFF_BASE", 0.0)
+@patch.object(config, "ODOO_RETRY_ATTEMPTS", 2)
+def test_async_reads_retry_transient_errors(make_service):
+    service = make_service()
+    original = AsyncOdooClient.execute_kw
+    failures = []
+
+    async def flaky(self, *args, **kwargs):
+        if len(failures) < 2:
+            failures.append(1)
+            raise httpx.ConnectError("conexión rechazada")
+        return await original(self, *args, **kwargs)
+
+    with patch.object(AsyncOdooClient, "execute_kw", flaky):
+        assert _run(lambda: service._call_kw_async("product.template", "search_count", [[]])) == 40
+    assert len(failures) == 2
+
+
+@patch.object(config, "ODOO_RETRY_BACKOFF_BASE", 0.0)
+@patch.object(config, "ODOO_RETRY_ATTEMPTS", 1)
+def test_async_calls_open_the_breaker_and_fail_fast(odoo, make_service):
+    service = make_service()
+    calls = []
+
+    async def down(self, *args, **kwargs):
+        calls.append(1)
+        raise httpx.ConnectError("conexión rechazada")
+
+    with patch.object(AsyncOdooClient, "execute_kw", down):
+        for _ in range(config.ODOO_BREAKER_THRESHOLD):
+            with pytest.raises(OdooUnavailableError):
+                _run(lambda: service._execute_kw_async("product.template", "search_count", [[]]))
+        assert get_circuit_breaker(odoo.url).state()["state"] == "open"
+        calls.clear()
+        with pytest.raises(OdooUnavailableError):
+            _run(lambda: service._execute_kw_async("product.template", "search_read", [[]]))
+        assert calls == []
+    get_circuit_breaker(odoo.url).record_success()
+
+    # Un error de Odoo (no transitorio) no cuenta como caída: None, como en _execute_kw
+    assert _run(lambda: service._execute_kw_async("modelo.inexistente", "search", [[]])) is None
+    assert get_circuit_breaker(odoo.url).state()["state"] == "closed"
+
+
+def test_native_async_variants_match_the_sync_ones(odoo, make_service):
+    products = make_service(OdooProductService)
+    providers = make_service(OdooProviderService)
+    invoices = make_service(OdooInvoiceService)
+    # Los textos vacíos llegan de Odoo como False y el modelo Product exige str
+    odoo.db.write("product.template", [5], {"description": "", "description_purchase": ""})
+    partner = next(iter(odoo.db.tables["res.partner"]))
+    [move] = odoo.db.create("account.move", [{"partner_id": partner, "move_type": "in_invoice", "ref": "F-77"}])
+
+    async def run():
+        return (
+            await products.get_product_by_id_async(5),
+            await products.get_product_by_id_async(99999),
+            await providers.get_paginated_providers_async(page=1, limit=3),
+            await invoices.find_supplier_invoice_async(partner, "F-77"),
+            await invoices.find_supplier_invoice_async(partner, "otra"),
+        )
+
+    product, missing, (page, total), found, not_found = _run(run)
+    assert product == products.get_product_by_id(5) and product.id == 5
+    assert missing is None
+    assert (page, total) == providers.get_paginated_providers(page=1, limit=3)
+    assert total == providers.count_providers() and len(page) == 3
+    assert (found, not_found) == (move, None)
@@ -0,0 +1,95 @@
+import asyncio
+import socketserver
+import threading
+import xmlrpc.client
+from unittest.mock import patch
+from xmlrpc.server import SimpleXMLRPCRequestHandler, SimpleXMLRPCServer
+
+from api.services.odoo_auth_cache import get_auth_stats, get_cached_uid
+from api.services.odoo_async_client import AsyncOdooClient
+from api.services.odoo_base_service import OdooBaseService
+
+
+class _Handler(SimpleXMLRPCRequestHandler):
+    rpc_paths = ("/xmlrpc/2/common", "/xmlrpc/2/object")
+    protocol_version = "HTTP/1.1"
+
+
+class _ThreadedServer(socketserver.ThreadingMixIn, SimpleXMLRPCServer):
+    daemon_threads = True
+
+
+def _start_server():
+    """Odoo mínimo: cada authenticate emite un UID nuevo y solo acepta el último"""
+    srv = _ThreadedServer(("127.0.0.1", 0), requestHandler=_Handler, allow_none=True, logRequests=False)
+    state = {"uid": 0, "auth_calls": 0}
+
+    def authenticate(db, user, pwd, ctx):
+        state["auth_calls"] += 1
+        state["uid"] += 1
+        return state["uid"]
+
+    def execute_kw(db, uid, pwd, model, method, args, kwargs=None):
+        if uid != state["uid"]:
+            raise xmlrpc.client.Fault(3, "Access Denied")
+        return 42
+
+    srv.register_function(authenticate)
+    srv.register_function(execute_kw)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, state
+
+
+def _service(url):
+    with patch.dict("os.environ", {"ODOO_URL": url, "ODOO_DB": "test", "ODOO_USERNAME": "admin"}):
+        return OdooBaseService()
+
+
+def test_uid_is_shared_between_service_instances():
+    srv, state = _start_server()
+    url = f"http://127.0.0.1:{srv.server_address[1]}"
+    try:
+        before = get_auth_stats()["authentications"]
+        for _ in range(5):
+            assert _service(url)._execute_kw("res.partner", "search_count", [[]]) == 42
+        assert state["auth_calls"] == 1
+        assert get_auth_stats()["authentications"] - before == 1
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+
+def test_reauthenticates_once_when_odoo_rejects_cached_uid():
+    srv, state = _start_server()
+    url = f"http://127.0.0.1:{srv.server_address[1]}"
+    try:
+        service = _service(url)
+        assert service._execute_kw("res.partner", "search_count", [[]]) == 42
+        # Odoo invalida la sesión (por ejemplo, cambio de contraseña o reinicio)
+        state["uid"] += 1
+        assert service._execute_kw("res.partner", "search_count", [[]]) == 42
+        assert state["auth_calls"] == 2
+        assert get_cached_uid(url, "test", "admin") == state["uid"]
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+
+def test_async_client_uses_shared_uid():
+    srv, state = _start_server()
+    url = f"http://127.0.0.1:{srv.server_address[1]}"
+    try:
+        assert _service(url)._execute_kw("res.partner", "search_count", [[]]) == 42
+        client = AsyncOdooClient(url, "test", "admin", "admin")
+
+        async def run():
+            try:
+                return await client.execute_kw("res.partner", "search_count", [[]])
+            finally:
+                await client.aclose()
+
+        assert asyncio.run(run()) == 42
+        assert state["auth_calls"] == 1
+    finally:
+        srv.shutdown()
+        srv.server_close()
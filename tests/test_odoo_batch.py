@@ -0,0 +1,76 @@
+import socketserver
+import threading
+import time
+import xmlrpc.client
+from unittest.mock import patch
+from xmlrpc.server import SimpleXMLRPCRequestHandler, SimpleXMLRPCServer
+
+from api.services.odoo_base_service import OdooBaseService
+from api.services.odoo_product_service import OdooProductService
+
+
+class _Handler(SimpleXMLRPCRequestHandler):
+    rpc_paths = ("/xmlrpc/2/common", "/xmlrpc/2/object")
+    protocol_version = "HTTP/1.1"
+
+
+class _ThreadedServer(socketserver.ThreadingMixIn, SimpleXMLRPCServer):
+    daemon_threads = True
+
+
+def _start_server(latency=0.05):
+    srv = _ThreadedServer(("127.0.0.1", 0), requestHandler=_Handler, allow_none=True, logRequests=False)
+
+    def execute_kw(db, uid, pwd, model, method, args, kwargs=None):
+        time.sleep(latency)
+        if method == "read":
+            return [{"id": args[0][0], "name": f"Registro {args[0][0]}"}]
+        raise xmlrpc.client.Fault(2, f"Método {method} no permitido")
+
+    srv.register_function(lambda db, user, pwd, ctx: 2, "authenticate")
+    srv.register_function(execute_kw)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+def test_execute_batch_runs_concurrently_and_keeps_order():
+    srv = _start_server()
+    url = f"http://127.0.0.1:{srv.server_address[1]}"
+    try:
+        with patch.dict("os.environ", {"ODOO_URL": url, "ODOO_DB": "batch"}):
+            service = OdooBaseService()
+        calls = [("res.partner", "read", [[i]], {"fields": ["name"]}) for i in range(1, 41)]
+        calls.insert(5, ("res.partner", "unlink", [[1]]))
+
+        start = time.perf_counter()
+        results = service.execute_batch(calls, max_workers=8)
+        elapsed = time.perf_counter() - start
+
+        assert len(results) == 41
+        assert results[5]["result"] is None and "unlink" in results[5]["error"]
+        ok = [r["result"][0]["id"] for i, r in enumerate(results) if i != 5]
+        assert ok == list(range(1, 41))
+        # 41 llamadas de 50 ms en serie serían >2 s
+        assert elapsed < 1.5
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+
+def test_upsert_products_concurrently_serializes_same_reference():
+    service = OdooProductService()
+    seen = []
+    lock = threading.Lock()
+
+    def fake_upsert(vals):
+        with lock:
+            seen.append(vals["default_code"])
+        return {"A": 1, "B": 2}.get(vals["default_code"])
+
+    products = [{"default_code": "A"}, {"default_code": "B"}, {"default_code": "A"}, {"default_code": "C"}]
+    with patch.object(service, "_get_connection"), \
+         patch.object(service, "create_or_update_product", side_effect=fake_upsert):
+        results = service.upsert_products_concurrently(products)
+
+    assert [r["result"] for r in results] == [1, 2, 1, None]
+    assert seen.count("A") == 2
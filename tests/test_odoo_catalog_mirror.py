@@ -0,0 +1,114 @@
+import time
+
+import pytest
+
+from api.services.odoo_catalog_mirror import MIRROR_MODELS, close_catalog_mirrors, get_catalog_mirror
+from api.services.odoo_product_service import OdooProductService
+from api.services.odoo_provider_service import OdooProviderService
+from api.services.odoo_stock_levels import _stock_cache
+from api.utils.config import config
+
+pytestmark = pytest.mark.fake_odoo(products=150, suppliers=8)
+
+
+@pytest.fixture
+def odoo(odoo, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ODOO_MIRROR_ENABLED", True)
+    monkeypatch.setattr(config, "ODOO_MIRROR_PATH", str(tmp_path / "mirror.db"))
+    # write_date antiguos y uno más reciente por modelo: la marca de agua queda en ese
+    for model in MIRROR_MODELS:
+        ids = sorted(odoo.db.tables[model])
+        for record_id in ids:
+            odoo.db.set_write_date(model, record_id, '2020-01-01 00:00:00')
+        odoo.db.set_write_date(model, ids[-1], '2020-06-01 00:00:00')
+    yield odoo
+    close_catalog_mirrors()
+
+
+@pytest.fixture
+def services(odoo, make_service):
+    return make_service(OdooProductService), make_service(OdooProviderService)
+
+
+QUERIES = [
+    dict(page=1, limit=20),
+    dict(page=2, limit=25, sort_by='list_price', sort_order='desc'),
+    dict(page=1, limit=50, search='ref-00001', sort_by='default_code'),
+    dict(page=1, limit=200, category='frío', sort_by='name'),
+    dict(page=1, limit=10, category='no-existe'),
+    dict(page=1, limit=200, include_inactive=True, sort_by='default_code', sort_order='desc'),
+]
+
+
+def test_listings_are_served_from_the_mirror_without_calling_odoo(odoo, services):
+    products, providers = services
+    odoo.db.write('product.template', [4], {'active': False})
+    live = [products.get_paginated_products(**query) for query in QUERIES]
+    live_providers = providers.get_paginated_providers(page=1, limit=5, search_term='distribución')
+
+    get_catalog_mirror(products).sync(products)
+    # El stock sale de la réplica, no de la caché que acaban de llenar las lecturas en vivo
+    _stock_cache.invalidate()
+    odoo.reset_counters()
+
+    assert [products.get_paginated_products(**query) for query in QUERIES] == live
+    assert providers.get_paginated_providers(page=1, limit=5, search_term='distribución')[0] == live_providers[0]
+    assert products.get_products_version() == (149, '2020-06-01 00:00:00')
+    assert products.get_products_version(with_stock=True)[:2] == (149, '2020-06-01 00:00:00')
+    assert odoo.requests == 0
+
+
+def test_sync_is_incremental_and_detects_deletions(odoo, services):
+    products, _ = services
+    mirror = get_catalog_mirror(products)
+    first = mirror.sync(products)
+    assert first['product.template'] == 150
+
+    odoo.db.write('product.template', [7], {'list_price': 1234.5})
+    odoo.db.unlink('product.template', [9])
+    second = mirror.sync(products)
+
+    # Solo lo posterior a la marca de agua: el registro de 2020-06-01 (solape) y el modificado
+    assert second == {'product.template': 2, 'product.supplierinfo': 1, 'product.category': 1, 'res.partner': 1}
+    rows, total, _ = mirror.query_products(search='REF-000007', include_inactive=True)
+    assert rows[0]['list_price'] == 1234.5
+    assert total == 1 and mirror.query_products(search='REF-000009')[1] == 0
+
+
+def test_writes_and_staleness_fall_back_to_odoo(odoo, services):
+    products, _ = services
+    mirror = get_catalog_mirror(products)
+    mirror.sync(products)
+
+    products._execute_kw('product.template', 'write', [[3], {'name': 'Renombrado'}])
+    odoo.reset_counters()
+    listed, _ = products.get_paginated_products(page=1, limit=5)
+    assert listed[2]['name'] == 'Renombrado' and odoo.requests > 0
+
+    mirror.sync(products)
+    odoo.reset_counters()
+    assert products.get_paginated_products(page=1, limit=5)[0][2]['name'] == 'Renombrado'
+    assert odoo.requests == 0
+
+    mirror.max_staleness = 0
+    products.get_paginated_products(page=1, limit=5)
+    assert odoo.requests > 0
+
+
+def test_background_thread_syncs_and_wakes_up_after_writes(odoo, services):
+    products, _ = services
+    mirror = get_catalog_mirror(products)
+    mirror.start(products, interval=60)
+    try:
+        deadline = time.monotonic() + 5
+        while not mirror.is_fresh() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert mirror.is_fresh()
+
+        # Una escritura despierta al hilo sin esperar al intervalo
+        products._execute_kw('product.template', 'write', [[5], {'list_price': 1.5}])
+        while not mirror.is_fresh() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert mirror.query_products(search='REF-000005')[0][0]['list_price'] == 1.5
+    finally:
+        mirror.stop()
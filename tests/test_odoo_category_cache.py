@@ -0,0 +1,78 @@
+from collections import Counter
+from unittest.mock import patch
+
+from api.services.odoo_category_cache import CategoryTreeCache, get_category_tree
+from api.services.odoo_product_service import OdooProductService
+
+CATEGORIES = [
+    {'id': 1, 'name': 'All', 'parent_id': False, 'complete_name': 'All'},
+    {'id': 2, 'name': 'Electrodomésticos', 'parent_id': [1, 'All'], 'complete_name': 'All / Electrodomésticos'},
+    {'id': 3, 'name': 'Frío', 'parent_id': [2, 'All / Electrodomésticos'], 'complete_name': 'All / Electrodomésticos / Frío'},
+    {'id': 4, 'name': 'Frío', 'parent_id': [1, 'All'], 'complete_name': 'All / Frío'},
+]
+
+
+def _fake_odoo(calls, categories):
+    def fake_execute_kw(self, model, method, args, kwargs=None):
+        calls[(model, method)] += 1
+        if method == 'search_read':
+            return [dict(c) for c in categories]
+        if method == 'create':
+            return 100 + calls[(model, method)]
+        return []
+    return fake_execute_kw
+
+
+def _service(name):
+    service = OdooProductService()
+    service._url = f"http://categorias-{name}.test"
+    return service
+
+
+def test_tree_is_loaded_once_for_many_lookups():
+    calls = Counter()
+    with patch.object(OdooProductService, "_execute_kw", _fake_odoo(calls, CATEGORIES)):
+        service = _service("lookups")
+        tree = get_category_tree(service)
+        assert [service._get_category_name(i) for i in (1, 2, 3, 3, 2)] == [
+            'All', 'Electrodomésticos', 'Frío', 'Frío', 'Electrodomésticos'
+        ]
+        assert tree.find_by_path(service, 'all / electrodomésticos /  FRÍO') == 3
+        assert tree.find_by_name(service, 'Frío') == 3  # primera por complete_name, como Odoo
+        assert tree.find_child(service, 1, 'Frío') == 4
+        assert sorted(tree.search(service, 'frí')) == [3, 4]
+        assert service.find_or_create_category('Electrodomésticos') == 2
+    assert calls == Counter({('product.category', 'search_read'): 1})
+
+
+def test_created_categories_are_added_without_reloading():
+    calls = Counter()
+    with patch.object(OdooProductService, "_execute_kw", _fake_odoo(calls, CATEGORIES)):
+        service = _service("create")
+        tree = get_category_tree(service)
+        sub_id = service._resolve_category_id('Electrodomésticos', 'Congeladores', _NullLogger())
+        assert sub_id == 101
+        assert tree.get(service, sub_id)['path'] == 'All / Electrodomésticos / Congeladores'
+        assert service._resolve_category_id('Electrodomésticos', 'Congeladores', _NullLogger()) == sub_id
+    assert calls[('product.category', 'search_read')] == 1
+    assert calls[('product.category', 'create')] == 1
+
+
+def test_tree_refreshes_after_ttl():
+    calls = Counter()
+    categories = list(CATEGORIES)
+    with patch.object(OdooProductService, "_execute_kw", _fake_odoo(calls, categories)):
+        service = _service("ttl")
+        tree = CategoryTreeCache(ttl=60)
+        assert tree.name(service, 5) is None
+        categories.append({'id': 5, 'name': 'Lavado', 'parent_id': [2, 'x'], 'complete_name': 'All / Electrodomésticos / Lavado'})
+        with patch("api.services.odoo_category_cache.time.monotonic", return_value=10 ** 9):
+            assert tree.name(service, 5) == 'Lavado'
+    assert calls[('product.category', 'search_read')] == 2
+
+
+class _NullLogger:
+    def info(self, *args):
+        pass
+
+    debug = info
@@ -0,0 +1,60 @@
+import socket
+import socketserver
+import threading
+import xmlrpc.client
+from concurrent.futures import ThreadPoolExecutor
+from xmlrpc.server import SimpleXMLRPCRequestHandler, SimpleXMLRPCServer
+
+from api.services.odoo_connection_pool import OdooConnectionPool, PooledTransport
+
+
+class _KeepAliveHandler(SimpleXMLRPCRequestHandler):
+    rpc_paths = ("/xmlrpc/2/object",)
+    protocol_version = "HTTP/1.1"
+
+
+class _ThreadedServer(socketserver.ThreadingMixIn, SimpleXMLRPCServer):
+    daemon_threads = True
+
+
+def _start_server():
+    srv = _ThreadedServer(("127.0.0.1", 0), requestHandler=_KeepAliveHandler, allow_none=True, logRequests=False)
+    srv.register_function(lambda x: x * 2, "double")
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+def test_pool_reuses_bounded_connections_across_threads():
+    srv = _start_server()
+    url = f"http://127.0.0.1:{srv.server_address[1]}"
+    pool = OdooConnectionPool(url, size=4, idle_timeout=60, timeout=10)
+    proxy = xmlrpc.client.ServerProxy(f"{url}/xmlrpc/2/object", transport=PooledTransport(pool), allow_none=True)
+    try:
+        with ThreadPoolExecutor(16) as ex:
+            results = list(ex.map(proxy.double, range(200)))
+        assert results == [i * 2 for i in range(200)]
+        stats = pool.stats()
+        assert stats["created"] <= 4
+        assert stats["in_use"] == 0
+    finally:
+        pool.close_all()
+        srv.shutdown()
+        srv.server_close()
+
+
+def test_pool_retries_when_idle_connection_was_closed():
+    srv = _start_server()
+    url = f"http://127.0.0.1:{srv.server_address[1]}"
+    pool = OdooConnectionPool(url, size=1, idle_timeout=60, timeout=10)
+    proxy = xmlrpc.client.ServerProxy(f"{url}/xmlrpc/2/object", transport=PooledTransport(pool), allow_none=True)
+    try:
+        assert proxy.double(1) == 2
+        # Simula que el servidor cerró la conexión keep-alive
+        conn, _ = pool._idle[0]
+        conn.sock.shutdown(socket.SHUT_RDWR)
+        assert proxy.double(2) == 4
+        assert pool.stats()["created"] == 2
+    finally:
+        pool.close_all()
+        srv.shutdown()
+        srv.server_close()
@@ -0,0 +1,65 @@
+import time
+from unittest.mock import patch
+
+from api.services.odoo_product_service import OdooProductService
+from api.utils.ttl_cache import TTLCache
+
+FIELDS = {
+    'id': {'type': 'integer'}, 'name': {'type': 'char'},
+    'x_margen_calculado': {'type': 'float'}, 'x_alerta_margen': {'type': 'boolean'},
+}
+
+
+def _service(url):
+    with patch.dict("os.environ", {"ODOO_URL": url}):
+        return OdooProductService()
+
+
+def test_ttl_cache_expires_and_invalidates():
+    cache = TTLCache(ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.get_or_set("b", lambda: None) is None and "b" not in cache
+    cache.set("c", 3)
+    cache.invalidate("c")
+    assert "c" not in cache
+
+
+def test_field_probing_happens_once_per_process():
+    calls = []
+
+    def fake_execute_kw(self, model, method, args, kwargs=None):
+        calls.append((model, method))
+        return FIELDS if method == 'fields_get' else None
+
+    with patch.object(OdooProductService, "_execute_kw", fake_execute_kw):
+        for _ in range(5):
+            service = _service("http://metadata-once.test")
+            assert service.initialize_custom_fields() is True
+            assert 'x_alerta_margen' in service._check_available_fields('product.template')
+
+    assert calls == [('product.template', 'fields_get')]
+
+
+def test_created_custom_field_invalidates_model_metadata():
+    fields = {'id': {'type': 'integer'}}
+    calls = []
+
+    def fake_execute_kw(self, model, method, args, kwargs=None):
+        calls.append((model, method))
+        if method == 'fields_get':
+            return dict(fields)
+        if model == 'ir.model':
+            return [7]
+        fields[args[0]['name']] = {'type': args[0]['ttype']}
+        return 99
+
+    with patch.object(OdooProductService, "_execute_kw", fake_execute_kw):
+        service = _service("http://metadata-create.test")
+        assert service._ensure_custom_field('product.template', 'x_nuevo', 'char', 'Nuevo') is True
+        assert 'x_nuevo' in service._check_available_fields('product.template')
+
+    assert calls.count(('product.template', 'fields_get')) == 2
+    assert ('ir.model.fields', 'create') in calls
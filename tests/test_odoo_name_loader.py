@@ -0,0 +1,50 @@
+from collections import Counter
+from unittest.mock import patch
+
+from api.services.odoo_base_service import OdooBaseService
+from api.services.odoo_product_service import OdooProductService
+
+
+def _fake_odoo(calls):
+    def fake_execute_kw(self, model, method, args, kwargs=None):
+        calls[(model, method)] += 1
+        if method == 'read':
+            return [{'id': i, 'name': f'{model} {i}'} for i in args[0] if i != 404]
+        if model == 'product.supplierinfo':
+            return [{'id': i, 'partner_id': [i % 7 + 1]} for i in args[0][0][2]]
+        return []
+    return fake_execute_kw
+
+
+def test_page_of_products_reads_each_related_model_once():
+    products = [
+        {'id': i, 'name': f'Producto {i}', 'categ_id': i % 5 + 1, 'seller_ids': [100 + i],
+         'list_price': 10.0, 'standard_price': 5.0}
+        for i in range(100)
+    ]
+    calls = Counter()
+    with patch.object(OdooProductService, "_execute_kw", _fake_odoo(calls)):
+        result = OdooProductService()._transform_products(products)
+
+    assert len(result) == 100
+    assert result[3]['category'] == 'product.category 4'
+    assert result[3]['supplier_name'] == f'res.partner {103 % 7 + 1}'
+    assert calls[('product.category', 'read')] == 1
+    assert calls[('res.partner', 'read')] == 1
+    assert calls[('product.supplierinfo', 'search_read')] == 1
+
+
+def test_loader_deduplicates_and_remembers_missing_ids():
+    calls = Counter()
+    with patch.object(OdooBaseService, "_execute_kw", _fake_odoo(calls)):
+        service = OdooBaseService()
+        with service.many2one_loader() as loader:
+            loader.want('res.partner', [1, [2, 'Dos'], 1, False, 404])
+            assert loader.get('res.partner', 2) == 'res.partner 2'
+            assert loader.get('res.partner', 404) is None
+            assert loader.get('res.partner', [1, 'Uno']) == 'res.partner 1'
+            with service.many2one_loader() as inner:
+                assert inner is loader
+            assert service._get_category_name([9, 'Nueve']) == 'product.category 9'
+        assert calls[('res.partner', 'read')] == 1
+        assert loader.reads == 2
@@ -0,0 +1,29 @@
+from unittest.mock import patch
+
+from api.services.odoo_product_service import OdooProductService
+from fake_odoo_server import FakeOdoo
+
+
+def test_page_of_products_resolves_suppliers_in_one_call():
+    with FakeOdoo(products=300, suppliers=15) as odoo:
+        with patch.dict("os.environ", odoo.environ()):
+            service = OdooProductService()
+        products = service._execute_kw('product.template', 'search_read', [[]], {
+            'fields': ['name', 'default_code', 'list_price', 'standard_price', 'categ_id', 'active', 'seller_ids', 'qty_available'],
+        })
+        # El segundo proveedor pasa a tener menor secuencia: debe ganar él, como en la consulta por producto
+        odoo.db.write('product.supplierinfo', [products[0]['seller_ids'][1]], {'sequence': 1})
+        odoo.reset_counters()
+
+        result = service._transform_products(products)
+
+        assert len(result) == 300
+        assert odoo.calls[('product.supplierinfo', 'search_read')] == 1
+        assert sum(odoo.calls.values()) == 1
+        for product, transformed in zip(products, result):
+            expected = service._execute_kw('product.supplierinfo', 'search_read',
+                                           [[('id', 'in', product['seller_ids'])]], {'fields': ['partner_id']})[0]
+            assert transformed['supplier_id'] == expected['partner_id'][0]
+            assert transformed['supplier_name'] == expected['partner_id'][1]
+            assert transformed['category'] == product['categ_id'][1]
+        assert result[0]['supplier_id'] == odoo.db.tables['product.supplierinfo'][products[0]['seller_ids'][1]]['partner_id']
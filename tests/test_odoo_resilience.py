@@ -0,0 +1,82 @@
+import socket
+import time
+import xmlrpc.client
+from unittest.mock import patch
+
+import pytest
+
+from api.services.odoo_base_service import OdooBaseService
+from api.services.odoo_resilience import CircuitBreaker, OdooUnavailableError, get_circuit_breaker
+from api.utils.config import config
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _service(url):
+    with patch.dict("os.environ", {"ODOO_URL": url}):
+        return OdooBaseService()
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    breaker = CircuitBreaker("test", threshold=2, cooldown=0.1)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    with pytest.raises(OdooUnavailableError):
+        breaker.before_call()
+    time.sleep(0.15)
+    breaker.before_call()  # llamada de prueba
+    with pytest.raises(OdooUnavailableError):
+        breaker.before_call()  # solo una a la vez en half-open
+    breaker.record_success()
+    assert breaker.state()["state"] == "closed"
+
+
+@patch.object(config, "ODOO_RETRY_BACKOFF_BASE", 0.0)
+@patch.object(config, "ODOO_RETRY_ATTEMPTS", 2)
+def test_read_retries_then_fails_fast_when_odoo_is_down():
+    url = f"http://127.0.0.1:{_free_port()}"
+    service = _service(url)
+    with patch.object(service, "_call_kw_once", wraps=service._call_kw_once) as once:
+        with pytest.raises(OdooUnavailableError):
+            service._execute_kw("product.template", "search_count", [[]])
+        assert once.call_count == 3
+
+    for _ in range(config.ODOO_BREAKER_THRESHOLD):
+        try:
+            service._execute_kw("product.template", "search_count", [[]])
+        except OdooUnavailableError:
+            pass
+    assert get_circuit_breaker(url).state()["state"] == "open"
+    with patch.object(service, "_call_kw_once") as once:
+        with pytest.raises(OdooUnavailableError):
+            service._execute_kw("product.template", "search_read", [[]])
+        once.assert_not_called()
+
+
+@patch.object(config, "ODOO_RETRY_BACKOFF_BASE", 0.0)
+def test_writes_only_retry_when_request_was_not_sent():
+    service = _service(f"http://odoo-write.test:{_free_port()}")
+    busy = xmlrpc.client.ProtocolError("odoo/xmlrpc/2/object", 503, "Service Unavailable", {})
+    with patch.object(service, "_call_kw_once", side_effect=[busy]) as once:
+        with pytest.raises(OdooUnavailableError):
+            service._call_kw("product.template", "create", [{"name": "X"}])
+        assert once.call_count == 1
+
+    with patch.object(service, "_call_kw_once", side_effect=[ConnectionRefusedError(), 77]) as once:
+        assert service._call_kw("product.template", "create", [{"name": "X"}]) == 77
+        assert once.call_count == 2
+
+
+def test_odoo_faults_are_not_retried_and_keep_breaker_closed():
+    url = f"http://odoo-fault.test:{_free_port()}"
+    service = _service(url)
+    fault = xmlrpc.client.Fault(2, "ValidationError")
+    with patch.object(service, "_call_kw_once", side_effect=fault) as once:
+        assert service._execute_kw("product.template", "search_read", [[]]) is None
+        assert once.call_count == 1
+    assert get_circuit_breaker(url).state()["state"] == "closed"
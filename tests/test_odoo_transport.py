@@ -0,0 +1,69 @@
+import json
+import threading
+import xmlrpc.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from api.services.odoo_auth_cache import is_access_denied
+from api.services.odoo_connection_pool import OdooConnectionPool
+from api.services.odoo_transport import JsonRpcServiceProxy, decode_jsonrpc_response, get_service_proxy
+
+
+class _JsonRpcHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        params = request["params"]
+        if params["method"] == "execute_kw" and params["args"][4] == "search_read":
+            payload = {"jsonrpc": "2.0", "id": request["id"], "result": [{"id": 1, "name": "Nevera", "categ_id": [3, "Frío"]}]}
+        else:
+            payload = {"jsonrpc": "2.0", "id": request["id"], "error": {
+                "code": 200, "message": "Odoo Server Error",
+                "data": {"name": "odoo.exceptions.AccessDenied", "message": "Access Denied"},
+            }}
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_jsonrpc_proxy_roundtrip_and_errors():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _JsonRpcHandler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    pool = OdooConnectionPool(f"http://127.0.0.1:{srv.server_address[1]}", size=2, idle_timeout=60, timeout=10)
+    proxy = JsonRpcServiceProxy(pool, "object")
+    try:
+        rows = proxy.execute_kw("db", 2, "pwd", "product.template", "search_read", [[]], {"fields": ["name"]})
+        assert rows == [{"id": 1, "name": "Nevera", "categ_id": [3, "Frío"]}]
+        with pytest.raises(xmlrpc.client.Fault) as excinfo:
+            proxy.execute_kw("db", 2, "bad", "product.template", "write", [[1], {}], {})
+        assert is_access_denied(excinfo.value)
+        assert pool.stats()["created"] == 1
+    finally:
+        pool.close_all()
+        srv.shutdown()
+        srv.server_close()
+
+
+def test_decode_jsonrpc_server_error_keeps_message():
+    body = json.dumps({"error": {"code": 200, "message": "Odoo Server Error",
+                                 "data": {"name": "odoo.exceptions.ValidationError", "message": "Campo obligatorio"}}})
+    with pytest.raises(xmlrpc.client.Fault) as excinfo:
+        decode_jsonrpc_response(body.encode("utf-8"))
+    assert "Campo obligatorio" in excinfo.value.faultString
+    assert not is_access_denied(excinfo.value)
+
+
+def test_transport_selected_by_config():
+    with patch("api.services.odoo_transport.config.ODOO_TRANSPORT", "jsonrpc"):
+        assert isinstance(get_service_proxy("http://odoo.test:8069", "object"), JsonRpcServiceProxy)
+    with patch("api.services.odoo_transport.config.ODOO_TRANSPORT", "xmlrpc"):
+        assert isinstance(get_service_proxy("http://odoo.test:8069", "object"), xmlrpc.client.ServerProxy)
@@ -0,0 +1,112 @@
+import pytest
+
+from api.services.odoo_catalog_mirror import close_catalog_mirrors, get_catalog_mirror, search_match_expression
+from api.services.odoo_product_service import OdooProductService
+from api.utils.config import config
+
+
+@pytest.fixture
+def mirror_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ODOO_MIRROR_ENABLED", True)
+    monkeypatch.setattr(config, "ODOO_MIRROR_PATH", str(tmp_path / "mirror.db"))
+    yield
+    close_catalog_mirrors()
+
+
+@pytest.fixture
+def indexed(odoo, make_service, mirror_config):
+    """Servicio con la réplica sincronizada; contadores de Odoo a cero"""
+    service = make_service(OdooProductService)
+    mirror = get_catalog_mirror(service)
+    mirror.sync(service)
+    # Réplica caducada: el índice da los IDs y los datos se leen de Odoo
+    mirror.max_staleness = 0
+    service.get_paginated_products(page=1, limit=1)  # versión y metadatos fuera de la medida
+    odoo.reset_counters()
+    return service, mirror
+
+
+def test_match_expression():
+    assert search_match_expression('REF-0001 frigoríf') == '"REF 0001" * AND "frigoríf" *'
+    assert search_match_expression(' -- ') is None
+
+
+@pytest.mark.fake_odoo(products=200)
+def test_accent_folded_prefix_search_hydrated_in_one_read(odoo, indexed):
+    service, _ = indexed
+    expected = sorted(r['id'] for r in odoo.db.tables['product.template'].values()
+                      if 'Frigorífico' in r['name'] and r['name'].startswith('Bosch'))
+
+    products, total = service.get_paginated_products(page=1, limit=100, search='frigorifico BOS')
+
+    assert total == len(expected) > 0
+    assert sorted(p['id'] for p in products) == expected
+    assert all(p['supplier_name'] for p in products)
+    assert odoo.calls == {('product.template', 'web_read'): 1}
+
+
+@pytest.mark.fake_odoo(products=200)
+def test_codes_barcodes_and_ranking(odoo, indexed):
+    service, _ = indexed
+
+    products, total = service.get_paginated_products(page=1, limit=20, search='REF-00012')
+    assert total == 10 and {p['code'] for p in products} == {f"REF-{i:06d}" for i in range(120, 130)}
+    assert service.get_paginated_products(page=1, limit=5, search='p00077-1')[0][0]['id'] == 77
+    assert service.get_paginated_products(page=1, limit=5, search='8400000000010')[0][0]['id'] == 10
+
+    # Una coincidencia en la referencia pesa más que en el nombre del producto
+    odoo.db.write('product.template', [5], {'name': 'Lavadora compatible con la 00042'})
+    get_catalog_mirror(service).sync(service)
+    ranked, _ = service.get_paginated_products(page=1, limit=5, search='00042')
+    assert [p['id'] for p in ranked] == [42, 5]
+
+
+@pytest.mark.fake_odoo(products=60, server_version="16.0")
+def test_index_follows_sync_and_older_servers_use_read(odoo, indexed):
+    service, mirror = indexed
+    odoo.db.write('product.template', [8], {'name': 'Vinoteca Liebherr'})
+    odoo.db.unlink('product.template', [9])
+    mirror.sync(service)
+    odoo.reset_counters()
+
+    products, total = service.get_paginated_products(page=1, limit=10, search='vinot')
+    assert total == 1 and products[0]['name'] == 'Vinoteca Liebherr'
+    assert odoo.calls == {('product.template', 'read'): 1, ('product.supplierinfo', 'search_read'): 1}
+    assert service.get_paginated_products(page=1, limit=10, search='REF-000009')[1] == 0
+
+
+@pytest.mark.fake_odoo(products=60)
+def test_index_past_its_age_limit_falls_back_to_odoo(odoo, indexed):
+    service, mirror = indexed
+    odoo.db.write('product.template', [8], {'name': 'Vinoteca Liebherr'})
+
+    # Sin sincronizar: el índice aún no conoce el nombre nuevo
+    assert service.get_paginated_products(page=1, limit=10, search='vinoteca')[1] == 0
+
+    # Pasado ODOO_MIRROR_SEARCH_MAX_AGE se busca con el dominio en Odoo
+    mirror.max_search_age = 0
+    odoo.reset_counters()
+    products, total = service.get_paginated_products(page=1, limit=10, search='vinoteca')
+    assert total == 1 and products[0]['id'] == 8
+    assert odoo.calls == {('product.template', 'web_search_read'): 1}
+
+
+@pytest.mark.fake_odoo(products=200)
+def test_version_describes_the_products_the_index_lists(odoo, indexed):
+    service, _ = indexed
+    products, total = service.get_paginated_products(page=1, limit=100, search='frigorifico')
+    ids = [p['id'] for p in products]
+    # El ilike de Odoo no encuentra "Frigorífico" sin acento: el validador no puede salir de ahí
+    domain, _ = service._product_list_query('frigorifico', None, False)
+    assert service.get_list_version('product.template', domain)[0] == 0
+
+    odoo.reset_counters()
+    version = service.get_products_version(search='frigorifico')
+    assert version == (total, max(odoo.db.tables['product.template'][i]['write_date'] for i in ids))
+    assert total > 0 and odoo.calls == {('product.template', 'read_group'): 1}
+
+    # Un producto de la lista modificado en Odoo cambia el validador
+    odoo.db.set_write_date('product.template', ids[-1], '2099-01-01 00:00:00')
+    assert service.get_products_version(search='frigorifico') == (total, '2099-01-01 00:00:00')
+    # Paginación por cursor (dominio de Odoo): validador del dominio
+    assert service.get_products_version(search='frigorifico', keyset=True)[0] == 0
@@ -0,0 +1,84 @@
+from unittest.mock import patch
+
+import pytest
+
+from api.models.schemas import ProductCreate
+from api.routes import products
+from api.services.odoo_product_service import OdooProductService
+from fake_odoo_server import OdooError
+
+pytestmark = pytest.mark.fake_odoo(products=40, suppliers=4)
+
+
+@pytest.fixture
+def post_bulk(make_app, call_api):
+    """POST /api/v1/products/bulk servido por ``service``"""
+    def post(service, payload):
+        app = make_app(products.router, overrides={products.get_product_service: lambda: service})
+        return call_api(app, "POST", "/api/v1/products/bulk", json=payload)
+    return post
+
+
+def test_bulk_upsert_uses_one_lookup_batched_creates_and_grouped_writes(odoo, make_service, post_bulk):
+    service = make_service(OdooProductService)
+    odoo.db.write('product.template', [6], {'active': False})
+    old_categ = odoo.db.tables['product.template'][3]['categ_id']
+
+    payload = [{"name": f"Lavadora nueva {i}", "default_code": f"NEW-{i:04d}", "list_price": 300 + i,
+                "category": "Tarifa 2026"} for i in range(450)]
+    # Subida de tarifa: mismas condiciones para varios productos existentes (uno archivado)
+    payload += [{"name": "Ignorado", "default_code": f"REF-{i:06d}", "list_price": 199.0} for i in (3, 4, 6)]
+    payload += [{"name": "Otra", "default_code": "REF-000010", "list_price": 50.0, "standard_price": 30.0}]
+    # Referencia repetida en el lote: se fusiona
+    payload += [{"name": "Lavadora nueva 0", "default_code": "NEW-0000", "list_price": 999.0}]
+
+    with patch("api.utils.config.config.ODOO_BULK_BATCH_SIZE", 200):
+        odoo.reset_counters()
+        response = post_bulk(service, payload)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["updated"], body["failed"]) == (451, 4, 0)
+    results = body["results"]
+    assert [r["index"] for r in results] == list(range(len(payload)))
+    assert [r["status"] for r in results[450:454]] == ["updated"] * 4
+    assert [r["id"] for r in results[450:453]] == [3, 4, 6]
+    assert results[454]["id"] == results[0]["id"] and results[454]["status"] == "created"
+
+    calls = odoo.calls
+    assert calls[('product.template', 'search_read')] == 1
+    assert calls[('product.template', 'create')] == 3  # 450 altas en lotes de 200
+    assert calls[('product.template', 'write')] == 2  # una por grupo de valores idénticos
+    assert calls[('product.category', 'create')] == 1
+
+    templates = odoo.db.tables['product.template']
+    assert templates[results[0]["id"]]["list_price"] == 999.0
+    assert templates[3]["list_price"] == 199.0 and templates[3]["categ_id"] == old_categ
+    assert sum(1 for t in templates.values() if t.get("default_code") == "REF-000006") == 1
+
+
+def test_a_rejected_batch_is_retried_item_by_item(odoo, make_service):
+    service = make_service(OdooProductService)
+    payload = [{"name": f"Producto {i}", "default_code": f"BULK-{i}"} for i in range(5)]
+    payload[2]["name"] = "Rechazado"
+    payload += [{"name": "Sin referencia"}]
+    create = odoo.db.create
+
+    def strict_create(model, vals_list):
+        # Como una restricción de Odoo: un registro inválido anula el create completo
+        if any(vals.get('name') == "Rechazado" for vals in vals_list):
+            raise OdooError("Nombre no permitido", name="odoo.exceptions.ValidationError")
+        return create(model, vals_list)
+
+    with patch.object(odoo.db, "create", side_effect=strict_create):
+        results = service.bulk_upsert_products([ProductCreate(**p) for p in payload])
+
+    assert [r["status"] for r in results] == ["created", "created", "error", "created", "created", "created"]
+    assert "Nombre no permitido" in results[2]["error"] and results[2]["id"] is None
+    created = [r["id"] for r in results if r["status"] == "created"]
+    assert len(set(created)) == 5
+    assert odoo.db.tables['product.template'][results[5]["id"]]["name"] == "Sin referencia"
+
+
+def test_empty_payload_is_rejected(make_service, post_bulk):
+    assert post_bulk(make_service(OdooProductService), []).status_code == 400
@@ -0,0 +1,48 @@
+import pytest
+
+from api.routes import products
+from api.services.odoo_product_service import OdooProductService
+
+pytestmark = pytest.mark.fake_odoo(products=230)
+
+
+@pytest.fixture
+def ties(odoo):
+    """Precios repetidos y referencias vacías para probar empates y NULL"""
+    odoo.db.write('product.template', list(range(1, 40)), {'list_price': 99.0})
+    odoo.db.write('product.template', [5, 50, 150], {'default_code': False})
+
+
+@pytest.mark.parametrize("sort_by,sort_order", [
+    ('id', 'asc'), ('list_price', 'desc'), ('default_code', 'asc'), ('default_code', 'desc'),
+])
+@pytest.mark.usefixtures("ties")
+def test_cursor_walk_matches_offset_order(odoo, make_service, sort_by, sort_order):
+    service = make_service(OdooProductService)
+    expected = [r['id'] for r in service._execute_kw('product.template', 'search_read', [[]], {
+        'fields': ['id'], 'order': f"{sort_by} {sort_order}, id {sort_order}" if sort_by != 'id' else f"id {sort_order}",
+    })]
+    odoo.reset_counters()
+
+    seen, cursor = [], None
+    while True:
+        page, cursor, total = service.get_products_after(cursor=cursor, limit=40, sort_by=sort_by, sort_order=sort_order)
+        seen.extend(p['id'] for p in page)
+        if cursor is None:
+            break
+    assert seen == expected
+    assert total is None
+    assert odoo.calls[('product.template', 'search_count')] == 0
+
+
+def test_route_cursor_mode(make_service, make_app, call_api):
+    service = make_service(OdooProductService)
+    app = make_app(products.router, overrides={products.get_product_service: lambda: service})
+
+    first = call_api(app, "GET", "/api/v1/products?after_id=0&size=100&with_count=true").json()
+    second = call_api(app, "GET", f"/api/v1/products?cursor={first['next_cursor']}&size=100").json()
+    wrong_sort = call_api(app, "GET", f"/api/v1/products?cursor={first['next_cursor']}&sort_by=name")
+    garbage = call_api(app, "GET", "/api/v1/products?cursor=no-es-un-cursor")
+    assert first['total'] == 230 and first['pages'] == 3 and len(first['data']) == 100
+    assert second['total'] is None and second['data'][0]['id'] == first['data'][-1]['id'] + 1
+    assert wrong_sort.status_code == 400 and garbage.status_code == 400
@@ -0,0 +1,40 @@
+import csv
+import io
+import json
+
+import pytest
+
+from api.routes import products
+from api.services.odoo_product_service import OdooProductService
+
+
+@pytest.mark.fake_odoo(products=2500)
+def test_export_streams_the_catalogue_in_id_ordered_chunks(odoo, make_service, make_app, call_api):
+    service = make_service(OdooProductService)
+    odoo.db.write('product.template', [7], {'active': False})
+    app = make_app(products.router, overrides={products.get_product_service: lambda: service})
+
+    response = call_api(app, "GET", "/api/v1/products/export?format=ndjson&chunk_size=1000")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 2499
+    assert [r['id'] for r in rows] == sorted(r['id'] for r in rows)
+    assert rows[0]['category'] and rows[0]['default_code'] == 'REF-000001'
+    assert odoo.calls[('product.template', 'search_read')] == 3
+
+    odoo.reset_counters()
+    response = call_api(app, "GET", "/api/v1/products/export?format=csv&include_inactive=true&chunk_size=1000")
+    table = list(csv.DictReader(io.StringIO(response.text)))
+    assert response.headers["content-disposition"] == 'attachment; filename="productos.csv"'
+    assert len(table) == 2500
+    assert table[6]['id'] == '7' and table[6]['active'] == 'False'
+    assert table[1]['barcode'] == '' or table[1]['barcode'].startswith('84')
+
+
+@pytest.mark.fake_odoo(products=120)
+def test_get_all_products_reads_in_chunks(make_service):
+    service = make_service(OdooProductService)
+    chunks = list(service.iter_product_chunks(chunk_size=50))
+    assert [len(c) for c in chunks] == [50, 50, 20]
+    assert [p['id'] for p in service.get_all_products()] == [r['id'] for c in chunks for r in c]
@@ -0,0 +1,81 @@
+from unittest.mock import patch
+
+import pytest
+
+from api.services.odoo_catalog_mirror import close_catalog_mirrors, get_catalog_mirror
+from api.services.odoo_product_service import OdooProductService
+from api.services.odoo_stock_levels import _stock_cache
+from api.utils.config import config
+
+pytestmark = pytest.mark.fake_odoo(products=60, suppliers=4)
+
+
+@pytest.mark.parametrize("server_version", ["17.0", "16.0"])
+def test_page_stock_is_read_with_the_page(odoo, make_service, server_version):
+    odoo.service.server_version = server_version
+    odoo.db.tables['product.template'][2]['qty_available'] = 7.9
+    service = make_service(OdooProductService)
+    service._check_available_fields('product.template')
+    odoo.reset_counters()
+
+    products, _ = service.get_paginated_products(page=1, limit=20)
+
+    templates = odoo.db.tables['product.template']
+    assert [p['stock'] for p in products] == [int(templates[p['id']]['qty_available']) for p in products]
+    assert products[1]['stock'] == 7
+    assert any(p['stock'] for p in products) and any(not p['stock'] for p in products)
+    # Sin llamadas extra por el stock
+    assert ('product.template', 'read') not in odoo.calls
+    assert service.get_paginated_products(page=1, limit=5, fields=['stock'])[0][1] == {'stock': 7}
+
+
+def test_mirror_pages_carry_replicated_stock_without_calling_odoo(odoo, make_service, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ODOO_MIRROR_ENABLED", True)
+    monkeypatch.setattr(config, "ODOO_MIRROR_PATH", str(tmp_path / "mirror.db"))
+    service = make_service(OdooProductService)
+    [quant] = odoo.db.create('stock.quant', [{'product_id': 11, 'quantity': 3.0}])
+    try:
+        mirror = get_catalog_mirror(service)
+        mirror.sync(service)
+        _stock_cache.invalidate()
+        odoo.reset_counters()
+
+        products, _ = service.get_paginated_products(page=2, limit=10)
+        version = service.get_products_version(with_stock=True)
+        templates = odoo.db.tables['product.template']
+        assert [p['stock'] for p in products] == [int(templates[p['id']]['qty_available']) for p in products]
+        assert version[:2] == service.get_products_version()
+        assert odoo.requests == 0
+
+        # Movimiento de stock: cambia stock.quant, no product.template. Llega con la sincronización
+        templates[11]['qty_available'] = 99.0
+        odoo.db.set_write_date('stock.quant', quant, '2099-06-01 00:00:00')
+        odoo.reset_counters()
+        mirror.sync(service)
+        assert odoo.calls[('stock.quant', 'search_read')] == 1
+        assert odoo.calls[('product.template', 'read')] == 1
+
+        odoo.reset_counters()
+        moved = service.get_products_version(with_stock=True)
+        assert moved != version and moved[1] == '2099-06-01 00:00:00'
+        assert service.get_paginated_products(page=2, limit=10)[0][0]['stock'] == 99
+        assert odoo.requests == 0
+
+        # Sin movimientos la sincronización no relee stock
+        odoo.reset_counters()
+        mirror.sync(service)
+        assert ('stock.quant', 'search_read') not in odoo.calls
+    finally:
+        close_catalog_mirrors()
+
+
+def test_without_the_stock_module_no_stock_is_read(odoo, make_service):
+    service = make_service(OdooProductService)
+    fields = dict(service.get_model_fields('product.template'))
+    del fields['qty_available']
+    with patch.object(OdooProductService, 'get_model_fields', lambda self, model: fields):
+        odoo.reset_counters()
+        products = service._transform_products([{'id': 3, 'name': 'Sin stock'}])
+        assert products[0]['stock'] == 0
+        assert service.get_products_version(with_stock=True) == service.get_products_version()
+    assert ('product.template', 'read') not in odoo.calls and ('stock.quant', 'read_group') not in odoo.calls
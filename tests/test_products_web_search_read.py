@@ -0,0 +1,53 @@
+import pytest
+
+from api.services.odoo_product_service import OdooProductService
+
+pytestmark = pytest.mark.fake_odoo(products=120, suppliers=10)
+
+
+def test_page_is_listed_with_a_single_web_search_read(odoo, make_service):
+    service = make_service(OdooProductService)
+    service.get_paginated_products(page=1, limit=5)  # versión y metadatos fuera de la medida
+    odoo.reset_counters()
+
+    products, total = service.get_paginated_products(page=2, limit=20, sort_by='list_price', sort_order='desc')
+
+    assert odoo.calls == {('product.template', 'web_search_read'): 1}
+    assert total == 120 and len(products) == 20
+
+    # Mismo resultado que el camino clásico (search_count + search_read + proveedores en bloque)
+    domain, fields = service._product_list_query(None, None, False)
+    classic = service._transform_products(service._execute_kw('product.template', 'search_read', [domain], {
+        'fields': fields, 'offset': 20, 'limit': 20, 'order': 'list_price desc',
+    }))
+    assert products == classic
+
+
+def test_category_filter_uses_the_same_domain_as_the_classic_path(odoo, make_service):
+    service = make_service(OdooProductService)
+    service.get_paginated_products(page=1, limit=5, category='frío')  # árbol de categorías fuera de la medida
+    odoo.reset_counters()
+
+    products, total = service.get_paginated_products(page=1, limit=200, category='frío')
+
+    assert odoo.calls == {('product.template', 'web_search_read'): 1}
+    assert 0 < total < 120 and len(products) == total
+    assert all(p['category'].endswith('Frío') for p in products)
+    domain, _ = service._product_list_query(None, 'frío', False)
+    assert service._execute_kw('product.template', 'search_count', [domain]) == total
+    assert service.get_products_version(category='frío')[0] == total
+
+    # Sin ninguna categoría que coincida no se filtra (como el camino clásico y el validador)
+    assert service.get_paginated_products(page=1, limit=10, category='no-existe')[1] == 120
+    assert service.get_products_version(category='no-existe')[0] == 120
+
+
+@pytest.mark.fake_odoo(products=30, server_version="16.0")
+def test_older_servers_use_search_count_and_search_read(odoo, make_service):
+    service = make_service(OdooProductService)
+    products, total = service.get_paginated_products(page=1, limit=10)
+
+    assert total == 30 and len(products) == 10
+    assert odoo.calls[('product.template', 'web_search_read')] == 0
+    assert odoo.calls[('product.template', 'search_count')] == 1
+    assert odoo.calls[('product.template', 'search_read')] == 1
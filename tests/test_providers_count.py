@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from api.services.odoo_provider_service import OdooProviderService
+from api.utils.config import config
+
+pytestmark = pytest.mark.fake_odoo(products=10, suppliers=12)
+
+
+def _matching(odoo, term):
+    return sum(1 for p in odoo.db.tables['res.partner'].values()
+               if p.get('is_company') and p.get('supplier_rank', 0) > 0 and term.lower() in p['name'].lower())
+
+
+def test_total_follows_the_search_term(odoo, make_service):
+    service = make_service(OdooProviderService)
+    brand = "bosch"
+
+    providers, total = service.get_paginated_providers(page=1, limit=3)
+    assert total == 12 and len(providers) == 3
+
+    providers, total = service.get_paginated_providers(page=1, limit=50, search_term=brand)
+    assert total == _matching(odoo, brand) == len(providers) < 12
+
+
+def test_pages_cost_one_rpc_once_the_count_is_cached(odoo, make_service):
+    service = make_service(OdooProviderService)
+    service.get_paginated_providers(page=1, limit=5, search_term="distribución")
+    odoo.reset_counters()
+
+    for page in (1, 2, 3):
+        _, total = service.get_paginated_providers(page=page, limit=5, search_term=" Distribución ")
+        assert total == 12
+    assert odoo.calls == {('res.partner', 'search_read'): 3}
+
+    odoo.reset_counters()
+    _, total = asyncio.run(service.get_paginated_providers_async(page=2, limit=5, search_term="DISTRIBUCIÓN"))
+    assert total == 12 and odoo.calls == {('res.partner', 'search_read'): 1}
+
+
+def test_create_and_update_invalidate_the_cached_totals(make_service):
+    service = make_service(OdooProviderService)
+    assert service.get_paginated_providers(page=1, limit=5)[1] == 12
+    assert service.get_paginated_providers(page=1, limit=5, search_term="Nuevo")[1] == 0
+
+    created = service.create_supplier({'name': 'Nuevo Proveedor S.L.', 'vat': 'ESB99999999'})
+    assert created is not None
+    assert service.get_paginated_providers(page=1, limit=5)[1] == 13
+    assert service.get_paginated_providers(page=1, limit=5, search_term="Nuevo")[1] == 1
+
+    asyncio.run(service.update_provider_async(created.id, {'name': 'Renombrado S.L.'}))
+    assert service.get_paginated_providers(page=1, limit=5, search_term="Nuevo")[1] == 0
+
+
+def test_count_cache_can_be_disabled(odoo, make_service, monkeypatch):
+    monkeypatch.setattr(config, "ODOO_PROVIDER_COUNT_TTL", 0)
+    service = make_service(OdooProviderService)
+    service.get_paginated_providers(page=1, limit=5)
+    service.get_paginated_providers(page=2, limit=5)
+    assert odoo.calls[('res.partner', 'search_count')] == 2
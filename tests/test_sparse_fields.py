@@ -0,0 +1,64 @@
+import pytest
+
+from api.routes import products
+from api.services.odoo_product_service import OdooProductService
+from api.services.odoo_provider_service import OdooProviderService
+from api.utils.sparse_fields import parse_fields
+
+pytestmark = pytest.mark.fake_odoo(products=60, suppliers=8)
+
+
+def test_parse_fields():
+    assert parse_fields(None, ['id', 'name']) is None
+    assert parse_fields(' ', ['id', 'name']) is None
+    assert parse_fields('name, id,name', ['id', 'name']) == ['id', 'name']
+    with pytest.raises(ValueError, match="precio"):
+        parse_fields('name,precio', ['id', 'name'])
+
+
+@pytest.mark.fake_odoo(products=40)
+@pytest.mark.parametrize("server_version", ["17.0", "16.0"])
+def test_sparse_products_read_only_the_requested_fields(odoo, make_service, server_version):
+    odoo.service.server_version = server_version
+    service = make_service(OdooProductService)
+    full, _ = service.get_paginated_products(page=1, limit=10)
+    odoo.reset_counters()
+
+    sparse, total = service.get_paginated_products(page=1, limit=10, fields=['id', 'name', 'price'])
+
+    assert total == 40
+    assert sparse == [{'id': p['id'], 'name': p['name'], 'price': p['price']} for p in full]
+    # Sin supplier_name/supplier_id no se unen los proveedores
+    assert odoo.calls[('product.supplierinfo', 'search_read')] == 0
+
+
+def test_sparse_products_cursor_keeps_the_sort_key(make_service):
+    service = make_service(OdooProductService)
+    first, cursor, _ = service.get_products_after(after_id=0, limit=25, sort_by='list_price', fields=['id', 'name'])
+    second, _, _ = service.get_products_after(cursor=cursor, limit=25, sort_by='list_price', fields=['id', 'name'])
+    assert set(first[0]) == {'id', 'name'}
+    assert not {p['id'] for p in first} & {p['id'] for p in second}
+
+
+def test_route_sparse_fields(make_service, make_app, call_api):
+    service = make_service(OdooProductService)
+    app = make_app(products.router, overrides={products.get_product_service: lambda: service})
+
+    sparse = call_api(app, "GET", "/api/v1/products?size=5&fields=name,category,supplier_name")
+    unknown = call_api(app, "GET", "/api/v1/products?size=5&fields=name,seller_ids")
+    assert sparse.status_code == 200
+    data = sparse.json()['data']
+    assert len(data) == 5 and set(data[0]) == {'id', 'name', 'category', 'supplier_name'}
+    assert all(p['supplier_name'] for p in data)
+    assert unknown.status_code == 400 and 'seller_ids' in unknown.json()['detail']
+
+
+def test_sparse_providers(odoo, make_service):
+    service = make_service(OdooProviderService)
+    full, total = service.get_paginated_providers(page=1, limit=5)
+    odoo.reset_counters()
+
+    sparse, sparse_total = service.get_paginated_providers(page=1, limit=5, fields=['id', 'name', 'country'])
+
+    assert sparse_total == total
+    assert sparse == [{'id': p.id, 'name': p.name, 'country': p.country} for p in full]
@@ -0,0 +1,230 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from api.services.odoo_product_service import OdooProductService
+from api.services.odoo_provider_service import OdooProviderService
+from api.services.odoo_resilience import OdooUnavailableError
+from api.services.odoo_supplier_directory import get_supplier_directory, normalize_name, normalize_vat
+
+pytestmark = pytest.mark.fake_odoo(products=10, suppliers=30)
+
+
+@pytest.fixture(autouse=True)
+def fresh_directory(request):
+    """Un puerto reutilizado no debe heredar el directorio de otro test"""
+    if "make_service" in request.fixturenames:
+        get_supplier_directory(request.getfixturevalue("make_service")()).invalidate()
+
+
+def _supplier(odoo, name):
+    return next(p['id'] for p in odoo.db.tables['res.partner'].values() if p.get('name') == name)
+
+
+def test_normalization():
+    assert normalize_vat("es b-1000 0000") == normalize_vat("B10000000") == "B10000000"
+    assert normalize_vat("X1234567L") == "X1234567L"
+    assert normalize_name("  Distribuciones  ÁLVAREZ, S.L. ") == "distribuciones alvarez sl"
+
+
+def test_lookups_are_answered_from_one_load(odoo, make_service):
+    service = make_service(OdooProviderService)
+    directory = get_supplier_directory(service)
+    odoo.reset_counters()
+
+    bosch = _supplier(odoo, "Bosch Distribución 1")
+    assert directory.find_by_vat(service, "ES-B 10000000")['id'] == bosch
+    assert directory.find_by_name(service, "BOSCH distribucion 1")['id'] == bosch
+    assert directory.find_by_name(service, "Bosch Distribución") is None
+    matches = directory.search(service, "distribución 1")
+    assert {m['name'] for m in matches} == {p['name'] for p in odoo.db.tables['res.partner'].values()
+                                            if p.get('supplier_rank') and 'Distribución 1' in p['name']}
+    assert len(matches) == 11 and [len(m['name']) for m in matches] == sorted(len(m['name']) for m in matches)
+    similar = directory.find_similar(service, "BOSCH DISTRIBUCION 21 S.L.")
+    assert similar[0][0]['name'] == "Bosch Distribución 21" and similar[0][1] >= 0.9
+    assert directory.find_similar(service, "Talleres Pérez") == []
+    # Mismo texto con otro número: otro proveedor
+    assert directory.find_similar(service, "Bosch Distribución 12 SL") == []
+    assert directory.resolve(service, name="Bosch Distribucion 21")['match'] == 'name'
+    assert directory.resolve(service, name="Bosch Distribución 21 S.L.", fuzzy=True)['match'] == 'fuzzy'
+
+    assert odoo.calls == {('res.partner', 'search_read'): 1}
+
+
+def test_similar_names_of_other_companies_are_not_matched(odoo, make_service):
+    service = make_service(OdooProviderService)
+    odoo.db.create('res.partner', [
+        {'name': 'Comercial Lopez SL', 'supplier_rank': 1, 'is_company': True, 'vat': 'ESB20000001'},
+        {'name': 'Distribuciones Norte S.A.', 'supplier_rank': 1, 'is_company': True, 'vat': 'ESA20000002'},
+    ])
+    directory = get_supplier_directory(service)
+    assert directory.resolve(service, name="Comercial Perez SL", fuzzy=True) is None
+    assert directory.resolve(service, name="Distribuciones Sur S.A.", fuzzy=True) is None
+
+    # Nombre igual o parecido pero otro NIF: es otra empresa
+    assert directory.resolve(service, name="Comercial Lopez SL", vat="B99999999", fuzzy=True) is None
+    assert directory.resolve(service, name="Comercial López, S.L", vat="ES B20000001", fuzzy=True)['match'] == 'vat'
+    assert directory.resolve(service, name="Comercial Lopez", vat="B99999999") is None
+    assert directory.resolve(service, name="COMERCIAL LOPEZ SL", vat="B20000001")['match'] == 'vat'
+
+
+def test_any_partner_lookup_keeps_exact_name_search_over_all_contacts(odoo, make_service):
+    service = make_service(OdooProviderService)
+    [contact] = odoo.db.create('res.partner', [{'name': 'Cliente Mayorista', 'supplier_rank': 0}])
+    directory = get_supplier_directory(service)
+
+    # Solo proveedores en el directorio: un contacto sin supplier_rank no aparece...
+    assert directory.find_by_name(service, "Cliente Mayorista") is None
+    # ...salvo con any_partner (import_products.py), que busca el nombre exacto en Odoo como antes
+    odoo.reset_counters()
+    assert directory.find_by_name(service, "Cliente Mayorista", any_partner=True)['id'] == contact
+    assert directory.find_by_name(service, "cliente mayorista", any_partner=True) is None
+    assert odoo.calls == {('res.partner', 'search'): 2}
+    # Los proveedores siguen saliendo del directorio, sin llamadas
+    odoo.reset_counters()
+    assert directory.find_by_name(service, "BALAY distribución 2", any_partner=True)['name'] == "Balay Distribución 2"
+    assert odoo.requests == 0
+
+
+def test_incremental_refresh_picks_up_changes_by_write_date(odoo, make_service):
+    service = make_service(OdooProviderService)
+    directory = get_supplier_directory(service)
+    assert directory.find_by_name(service, "Bosch Distribución 1") is not None
+    assert len(directory) == 30
+    db = odoo.db
+    [new_id] = db.create('res.partner', [{'name': 'Frío Industrial SA', 'supplier_rank': 1, 'is_company': True,
+                                          'vat': 'ESA11111111'}])
+    old = _supplier(odoo, "Bosch Distribución 1")
+    db.write('res.partner', [old], {'active': False})
+
+    # Hasta el siguiente refresco se sirve lo cargado
+    assert directory.find_by_vat(service, "A11111111") is None
+    directory.refresh_interval = 0
+    odoo.reset_counters()
+    assert directory.find_by_vat(service, "A11111111")['id'] == new_id
+    directory.refresh_interval = 60
+    assert directory.find_by_name(service, "Bosch Distribución 1") is None
+    assert len(directory) == 30
+    # Solo los modificados: el dominio lleva write_date
+    assert odoo.calls == {('res.partner', 'search_read'): 1}
+
+
+def test_odoo_outages_serve_the_loaded_directory_and_back_off(make_service):
+    service = make_service(OdooProviderService)
+    directory = get_supplier_directory(service)
+    calls = []
+
+    def down(*args, **kwargs):
+        calls.append(args[:2])
+        raise OdooUnavailableError("Odoo no responde")
+
+    # Sin directorio cargado: no se encuentra nada y no se reintenta en cada consulta
+    with patch.object(service, "_execute_kw", down):
+        assert directory.find_by_name(service, "Bosch Distribución 1") is None
+        assert directory.search(service, "Bosch") == []
+    assert len(calls) == 1
+
+    directory.refresh_interval = 0
+    assert directory.find_by_name(service, "Bosch Distribución 1") is not None
+    directory.refresh_interval = 60
+
+    # Refresco y recarga fallidos: se sirve lo cargado y se espera refresh_interval
+    for attr in ("_refreshed_at", "_loaded_at"):
+        calls.clear()
+        setattr(directory, attr, getattr(directory, attr) - 2 * directory.reload_interval)
+        with patch.object(service, "_execute_kw", down):
+            assert directory.find_by_name(service, "Bosch Distribución 1") is not None
+            assert directory.find_by_name(service, "Bosch Distribución 1") is not None
+        assert calls == [("res.partner", "search_read")]
+    assert len(directory) == 30
+
+
+def test_api_writes_mark_the_directory_stale(odoo, make_service):
+    service = make_service(OdooProviderService)
+    directory = get_supplier_directory(service)
+    assert directory.find_by_name(service, "Nuevo Proveedor") is None
+
+    created = service.create_supplier({'name': 'Nuevo Proveedor', 'vat': 'ESB55555555'})
+    assert directory.find_by_vat(service, "B55555555")['id'] == created.id
+
+    # Duplicado por NIF con otro formato: no se crea otro
+    odoo.reset_counters()
+    again = service.create_supplier({'name': 'Otro nombre', 'vat': 'es b55555555'})
+    assert again.id == created.id
+    assert ('res.partner', 'create') not in odoo.calls and ('res.partner', 'search') not in odoo.calls
+
+    asyncio.run(service.update_provider_async(created.id, {'name': 'Proveedor Renombrado'}))
+    assert service.resolve_supplier(name="proveedor renombrado") == created.id
+    assert asyncio.run(service.resolve_supplier_async(name="PROVEEDOR RENOMBRADO SL", fuzzy=True)) == created.id
+
+
+def test_product_import_resolves_suppliers_without_a_search_per_row(odoo, make_service):
+    service = make_service(OdooProductService)
+    odoo.reset_counters()
+    for i in range(5):
+        vals = service.front_to_odoo_product_dict(
+            {'nombre': f'Producto {i}', 'referencia_proveedor': f'REF{i}', 'precio_coste': 10},
+            "Balay Distribución 2"
+        )
+        assert vals['supplier_id'] == _supplier(odoo, "Balay Distribución 2")
+    assert odoo.calls[('res.partner', 'search_read')] == 1
+
+    # Nombre normalizado (mayúsculas, acentos, puntuación), solo entre proveedores
+    vals = service.front_to_odoo_product_dict({'nombre': 'Otro', 'precio_coste': 10}, "BALAY DISTRIBUCION 2.")
+    assert vals['supplier_id'] == _supplier(odoo, "Balay Distribución 2")
+    odoo.db.create('res.partner', [{'name': 'Solo Cliente', 'supplier_rank': 0}])
+    get_supplier_directory(service).invalidate()
+    assert 'supplier_id' not in service.front_to_odoo_product_dict({'nombre': 'Otro', 'precio_coste': 10}, "Solo Cliente")
+
+
+def test_ocr_invoice_does_not_update_or_book_to_a_fuzzy_match(odoo, make_service, make_app, call_api,
+                                                             monkeypatch, tmp_path):
+    from api.routes import mistral_ocr
+
+    service = make_service(OdooProviderService)
+    odoo.db.create('res.partner', [{'name': 'Comercial Lopez SL', 'supplier_rank': 1, 'is_company': True,
+                                    'vat': 'ESB20000001', 'street': 'Calle Mayor 1'}])
+    lopez = _supplier(odoo, 'Comercial Lopez SL')
+
+    class FakeOcr:
+        def get_supported_formats(self):
+            return ['.pdf']
+
+        def validate_file_size(self, path):
+            return True
+
+        def process_pdf_document(self, path, include_images=False):
+            return {'success': True, 'document_type': 'invoice'}
+
+        async def extract_invoice_data_with_ai(self, ocr_result):
+            return {'confidence': 'high', 'extracted_data': {
+                'supplier_name': 'Comercial Perez SL', 'supplier_address': 'Avenida Sur 9',
+                'invoice_number': 'F-1', 'total_amount': '121', 'subtotal': '100'}}
+
+    booked = []
+
+    class FakeInvoices:
+        async def create_supplier_invoice_async(self, partner_id, **kwargs):
+            booked.append(partner_id)
+            return {'id': 1, 'created': True}
+
+    monkeypatch.setattr(mistral_ocr, 'get_mistral_ocr_service', lambda: FakeOcr())
+    monkeypatch.setattr(mistral_ocr, 'odoo_provider_service', service)
+    monkeypatch.setattr(mistral_ocr, 'odoo_invoice_service', FakeInvoices())
+    # El registro CSV de trazabilidad va a un directorio temporal
+    monkeypatch.setattr(mistral_ocr, '__file__', str(tmp_path / 'routes' / 'mistral_ocr.py'))
+    app = make_app(mistral_ocr.router)
+
+    # Con un umbral bajo "Comercial Perez SL" casa con "Comercial Lopez SL"
+    monkeypatch.setattr(get_supplier_directory(service).__class__, 'find_similar',
+                        lambda self, svc, name, **kw: [(self.find_by_vat(svc, 'B20000001'), 0.72)])
+    data = call_api(app, "POST", "/api/v1/mistral-ocr/process-invoice?create_in_odoo=true",
+                    files={'file': ('factura.pdf', b'%PDF-1.4', 'application/pdf')}).json()
+
+    assert data['supplier_review'] == {'possible_match_id': lopez, 'possible_match_name': 'Comercial Lopez SL',
+                                       'similarity': 0.72}
+    partner = odoo.db.tables['res.partner'][lopez]
+    assert partner['name'] == 'Comercial Lopez SL' and partner['street'] == 'Calle Mayor 1'
+    [created] = [p['id'] for p in odoo.db.tables['res.partner'].values() if p.get('name') == 'Comercial Perez SL']
+    assert booked == [created]